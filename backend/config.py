@@ -3,6 +3,7 @@ Backend Configuration Module
 Tüm ayarlanabilir parametreleri merkezi bir yerde toplar.
 """
 import os
+import tempfile
 from typing import Dict, Any
 
 # ============================================
@@ -21,6 +22,20 @@ class AnalysisConfig:
     # Vector DB arama sonuç limiti
     VECTOR_SEARCH_LIMIT: int = 50
 
+    # Kullanıcının birimiyle index içinde süzülen vektör araması limiti
+    VECTOR_UNIT_SEARCH_LIMIT: int = 20
+
+    # BM25 (lexical) aday limiti
+    LEXICAL_SEARCH_LIMIT: int = 200
+
+    # Hibrit aday üretimi (BM25 + vektör, reciprocal rank fusion)
+    HYBRID_CANDIDATE_LIMIT: int = 100
+    HYBRID_BUDGET_MS: float = float(os.environ.get("HYBRID_BUDGET_MS", "1000"))
+    RRF_K: int = 60
+    # Kaynak başına çalışmaya devam eden zaman aşımına uğramış arama sınırı
+    # (vector + vector_unit için toplam, 8 thread'lik havuzun altında kalır)
+    HYBRID_MAX_ABANDONED_PER_SOURCE: int = 2
+
     # Context token limitleri
     MAX_POZ_CONTEXT_CHARS: int = 8000
     MAX_FEEDBACK_CONTEXT_CHARS: int = 2000
@@ -30,6 +45,18 @@ class AnalysisConfig:
     # RAG için top-k benzer örnek sayısı
     RAG_TOP_K: int = 3
 
+    # Eğitim verisi lazy modu: offset indeksi + mmap (output'lar gerektiğinde decode edilir)
+    TRAINING_LAZY_LOAD: bool = os.environ.get("TRAINING_LAZY_LOAD", "0") == "1"
+    # Lazy modda eklenen örnekler offset indeksine (.idx.json) bu kadar örnekte bir ve kapanışta yazılır
+    # (her eklemede tüm indeksi yeniden yazmamak için; yazılmamış eklemeler açılışta yeniden taranır)
+    TRAINING_INDEX_SAVE_EVERY: int = int(os.environ.get("TRAINING_INDEX_SAVE_EVERY", "1000"))
+
+    # Eğitim verisi dosyasında dışarıdan yapılan eklemeleri kontrol aralığı (saniye, 0 = kapalı)
+    TRAINING_RELOAD_INTERVAL: float = float(os.environ.get("TRAINING_RELOAD_INTERVAL", "10"))
+
+    # Eğitim örneği ANN aramasında lexical rerank'e giren aday sayısı
+    TRAINING_ANN_CANDIDATES: int = 30
+
     # Fiyat uyarı eşikleri
     HIGH_PRICE_WARNING_THRESHOLD: float = 100000.0  # TL
 
@@ -82,6 +109,111 @@ class ValidationConfig:
     }
 
 
+class CostRollupConfig:
+    """Birim fiyat roll-up (alt analiz zinciri) konfigürasyonu"""
+
+    # Yüklenici kârı ve genel giderler oranı (ÇŞB analizlerinde %25)
+    OVERHEAD_RATE: float = 0.25
+
+    # Başka bir analizin içinde kullanılan analizlerde kârsız tutar kullanılır
+    NESTED_USE_SUBTOTAL: bool = True
+
+    # Maliyet ağacı endpoint'inin varsayılan derinlik limiti
+    MAX_BREAKDOWN_DEPTH: int = 8
+
+
+class EmbeddingConfig:
+    """Embedding modeli ve sorgu embedding cache konfigürasyonu"""
+
+    MODEL_NAME: str = "emrecan/bert-base-turkish-cased-mean-nli-stsb-tr"
+
+    # Embedding backend: torch | torch-int8 | onnx | onnx-int8 (bkz. services/embedding_backends.py)
+    BACKEND: str = os.environ.get("EMBEDDING_BACKEND", "torch")
+
+    # ONNX export / quantize edilmiş modellerin saklandığı dizin
+    MODEL_CACHE_DIR: str = os.environ.get(
+        "EMBEDDING_MODEL_CACHE_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+    )
+
+    # LRU sorgu embedding cache boyutu (0 = kapalı)
+    QUERY_CACHE_SIZE: int = int(os.environ.get("EMBEDDING_QUERY_CACHE_SIZE", "1024"))
+
+    # Eşzamanlı sorgu encode çağrılarını tek inference thread'inde batch'le
+    MICROBATCH_ENABLED: bool = os.environ.get("EMBEDDING_MICROBATCH", "1") == "1"
+    MICROBATCH_WAIT_MS: float = 5.0
+    MICROBATCH_MAX_SIZE: int = 64
+    # Sorgu embedding'i için dispatcher'da beklenecek en uzun süre (saniye)
+    MICROBATCH_TIMEOUT_SECONDS: float = 30.0
+
+    # Embedding sidecar: model tek bir süreçte, worker'lar Unix socket ile encode ister (bkz. services/embedding_sidecar.py)
+    SIDECAR_ENABLED: bool = os.environ.get("EMBEDDING_SIDECAR", "0") == "1"
+    SIDECAR_SOCKET: str = os.environ.get(
+        "EMBEDDING_SIDECAR_SOCKET",
+        os.path.join(tempfile.gettempdir(), "approximate-cost-embedding.sock")
+    )
+    # Sidecar çalışmıyorsa ilk worker başlatsın
+    SIDECAR_AUTOSTART: bool = os.environ.get("EMBEDDING_SIDECAR_AUTOSTART", "1") == "1"
+    # Sidecar'ın modeli yükleyip hazır olması için beklenen süre / tek istek zaman aşımı (saniye)
+    SIDECAR_START_TIMEOUT: float = float(os.environ.get("EMBEDDING_SIDECAR_START_TIMEOUT", "180"))
+    SIDECAR_REQUEST_TIMEOUT: float = 60.0
+
+    # Vektör deposu: chroma (HNSW + SQLite) | numpy (mmap float16 matris, tam arama)
+    VECTOR_BACKEND: str = os.environ.get("VECTOR_DB_BACKEND", "chroma")
+    NUMPY_INDEX_DIR: str = os.environ.get(
+        "VECTOR_DB_NUMPY_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "numpy_vectors")
+    )
+    # Aramada tek seferde float32'ye çevrilip çarpılan satır sayısı
+    NUMPY_BLOCK_ROWS: int = 16384
+    # Çevrilen float32 blokları bellekte tut (sorgu ~10x hızlı, bellek 2x)
+    NUMPY_FLOAT32_CACHE: bool = os.environ.get("VECTOR_DB_NUMPY_FLOAT32_CACHE", "1") == "1"
+    # Değişikliklerin diske toplu yazılmadan önce beklenen süre (saniye)
+    NUMPY_FLUSH_DELAY: float = 2.0
+
+    # Ingestion pipeline: encode batch süresi hedefi ve batch boyutu sınırları (bkz. services/ingest_pipeline.py)
+    INGEST_TARGET_BATCH_SECONDS: float = 1.0
+    INGEST_MIN_BATCH_SIZE: int = 16
+    INGEST_MAX_BATCH_SIZE: int = 1024
+    # Encode ile upsert arasında bekleyebilecek batch sayısı
+    INGEST_QUEUE_SIZE: int = 2
+
+    # Önceden hesaplanmış embedding export dizini (embeddings.npy + manifest.json).
+    # Koleksiyon boşken açılışta modelsiz toplu yüklenir (bkz. services/embedding_export.py)
+    EXPORT_DIR: str = os.environ.get(
+        "VECTOR_DB_EXPORT_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "embeddings_export")
+    )
+
+
+class HttpClientConfig:
+    """Paylaşılan HTTP bağlantı havuzu konfigürasyonu (bkz. services/http_client.py)"""
+
+    # Havuzu tutulan farklı host sayısı (OpenRouter, Firecrawl, birimfiyat.net ...)
+    POOL_HOSTS: int = 10
+    # Host başına eşzamanlı/keep-alive bağlantı (consensus + self-consistency paralel istekleri)
+    POOL_PER_HOST: int = int(os.environ.get("HTTP_POOL_PER_HOST", "10"))
+    # Async client toplam bağlantı limiti (eşzamanlı async LLM çağrıları bu kadar bağlantı açabilir)
+    POOL_MAX_CONNECTIONS: int = int(os.environ.get("HTTP_POOL_MAX_CONNECTIONS", "200"))
+    # Async client'ta host başına eşzamanlı istek (tek host olan OpenRouter'a giden async analizler)
+    ASYNC_POOL_PER_HOST: int = int(os.environ.get("HTTP_ASYNC_POOL_PER_HOST", "100"))
+    # Boşta bekleyen bağlantının kapatılmadan önce tutulduğu süre (saniye)
+    KEEPALIVE_EXPIRY: float = 60.0
+
+
+class LLMCacheConfig:
+    """Kalıcı LLM yanıt cache'i konfigürasyonu (bkz. services/llm_cache.py)"""
+
+    ENABLED: bool = os.environ.get("LLM_CACHE", "1").lower() in ("1", "true", "yes")
+    PATH: str = os.environ.get("LLM_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_cache.db"))
+    # Kayıt ömrü (saniye); 0 = süresiz
+    TTL_SECONDS: float = float(os.environ.get("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+    # En fazla kayıt; aşılınca en uzun süredir okunmayanlar silinir
+    MAX_ENTRIES: int = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "5000"))
+    # Cache'in açık olduğu görevler (settings_service görev adları)
+    TASKS: set = {t.strip() for t in os.environ.get("LLM_CACHE_TASKS", "analyze,refine,critic").split(",") if t.strip()}
+
+
 class LogConfig:
     """Logging konfigürasyonu"""
 
@@ -117,6 +249,30 @@ def get_validation_config() -> ValidationConfig:
         _config_cache["validation"] = ValidationConfig()
     return _config_cache["validation"]
 
+def get_rollup_config() -> CostRollupConfig:
+    """CostRollupConfig singleton"""
+    if "rollup" not in _config_cache:
+        _config_cache["rollup"] = CostRollupConfig()
+    return _config_cache["rollup"]
+
+def get_embedding_config() -> EmbeddingConfig:
+    """EmbeddingConfig singleton"""
+    if "embedding" not in _config_cache:
+        _config_cache["embedding"] = EmbeddingConfig()
+    return _config_cache["embedding"]
+
+def get_http_config() -> HttpClientConfig:
+    """HttpClientConfig singleton"""
+    if "http" not in _config_cache:
+        _config_cache["http"] = HttpClientConfig()
+    return _config_cache["http"]
+
+def get_llm_cache_config() -> LLMCacheConfig:
+    """LLMCacheConfig singleton"""
+    if "llm_cache" not in _config_cache:
+        _config_cache["llm_cache"] = LLMCacheConfig()
+    return _config_cache["llm_cache"]
+
 def get_log_config() -> LogConfig:
     """LogConfig singleton"""
     if "log" not in _config_cache:
@@ -3,6 +3,7 @@ import logging
 import sys
 import os
 import asyncio
+import time
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -22,10 +23,17 @@ if root_dir not in sys.path:
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from typing import List, Optional
 from services.data_manager import CSVLoader
 from services.training_data_service import TrainingDataService
-from routers import ai, projects, analyses, feedback, settings, usage, dashboard, logs, files
+from routers import ai, projects, analyses, feedback, settings, usage, dashboard, logs, files, rollup, training
 from database import DatabaseManager
+from config import get_analysis_config, get_embedding_config
+from services.http_client import close_http_clients, get_http_stats
+from services.hybrid_retriever import get_retriever_stats
+from services.llm_cache import get_llm_cache_stats
 
 app = FastAPI(title="Approximate Cost API", version="1.0.0")
 
@@ -48,6 +56,8 @@ app.include_router(usage.router, prefix="/api")
 app.include_router(dashboard.router, prefix="/api")
 app.include_router(logs.router, prefix="/api")
 app.include_router(files.router, prefix="/api")
+app.include_router(rollup.router, prefix="/api")
+app.include_router(training.router, prefix="/api")
 
 # Global Data Cache
 POZ_DATA = {}
@@ -69,7 +79,10 @@ async def health_check():
         "files_loaded": len(LOADED_FILES),
         "files": LOADED_FILES,
         "training_data": training_stats,
-        "vector_db": vector_status
+        "vector_db": vector_status,
+        "http_client": get_http_stats(),
+        "hybrid_retriever": get_retriever_stats(),
+        "llm_cache": get_llm_cache_stats()
     }
 
 @app.on_event("startup")
@@ -124,6 +137,10 @@ async def load_initial_data_async():
 
             print(f"[STARTUP] ✅ Loaded {len(all_data)} items from {len(all_files)} files.")
 
+            # Semantik etiket bitmask + BM25 indeksleri (build_context_from_poz_data için)
+            await loop.run_in_executor(None, ai.get_poz_tag_index, all_data)
+            await loop.run_in_executor(None, ai.get_poz_lexical_index, all_data)
+
             # Load training data
             training_file = Path(__file__).parent.parent / "egitim_verisi_CLEANED.jsonl"
             TRAINING_DATA_SERVICE = TrainingDataService(str(training_file))
@@ -132,11 +149,25 @@ async def load_initial_data_async():
             training_stats = TRAINING_DATA_SERVICE.get_stats()
             print(f"[STARTUP] ✅ Loaded {training_stats.get('total_examples', 0)} training examples.")
 
+            # Eğitim dosyasına dışarıdan eklenen satırları periyodik olarak yükle
+            reload_interval = get_analysis_config().TRAINING_RELOAD_INTERVAL
+            if reload_interval > 0:
+                def _watch_training_file(service=TRAINING_DATA_SERVICE):
+                    while True:
+                        time.sleep(reload_interval)
+                        try:
+                            service.refresh()
+                        except Exception as e:
+                            logging.error(f"[TRAINING] Eğitim verisi yenilenemedi: {e}")
+
+                threading.Thread(target=_watch_training_file, daemon=True).start()
+
             # Initialize Vector DB — client hemen bağlanır, model arka planda preload edilir
             from services.vector_db_service import VectorDBService
             vector_service = VectorDBService()
             app.state.vector_db_service = vector_service
             app.state.poz_data_for_vector = list(all_data.values())
+            TRAINING_DATA_SERVICE.set_vector_service(vector_service)
 
             # Client bağlantısını hemen kur → status endpoint doğru çalışır
             vector_service._ensure_client_connected()
@@ -145,18 +176,45 @@ async def load_initial_data_async():
 
             # Model preload: arka planda yükle, ilk analiz beklemesini ortadan kaldırır
             def _preload_model():
+                # Boş koleksiyon + hazır export varsa embedding'ler modelsiz toplu yüklenir;
+                # ingest_data sonrasında sadece metni değişen/yeni pozları encode eder
+                from services.embedding_export import export_exists
+
+                export_dir = get_embedding_config().EXPORT_DIR
+                if existing_count == 0 and export_exists(export_dir):
+                    try:
+                        imported = vector_service.import_embeddings(export_dir, app.state.poz_data_for_vector)
+                        print(f"[STARTUP] [VECTOR_DB] Hazır embedding'ler yüklendi: {imported}")
+                    except Exception as e:
+                        logging.error(f"[VECTOR_DB] Embedding import hatası: {e}")
                 vector_service._ensure_model_loaded()
-                # Eğer disk'te veri yoksa (ilk çalışma), ingestion başlat
-                if vector_service.collection and vector_service.collection.count() == 0:
-                    vector_service.ingest_data(app.state.poz_data_for_vector)
-                    print(f"[STARTUP] [VECTOR_DB] Ingestion tamamlandı. {vector_service.collection.count()} kayıt.")
-                else:
-                    print(f"[STARTUP] [VECTOR_DB] Model preload tamamlandı. Mevcut kayıt: {vector_service.collection.count()}")
+                # Katalog ile koleksiyonu senkronize et: sadece yeni/değişen pozlar embed edilir
+                if vector_service.collection is not None:
+                    summary = vector_service.ingest_data(app.state.poz_data_for_vector)
+                    print(f"[STARTUP] [VECTOR_DB] Senkronizasyon tamamlandı: {summary}")
+                # Eğitim örnekleri: sadece yeni/silinen örnekler işlenir
+                result = vector_service.ingest_training_data(TRAINING_DATA_SERVICE.get_inputs())
+                print(f"[STARTUP] [VECTOR_DB] Eğitim örnekleri: +{result['added']} / ~{result.get('reembedded', 0)} / -{result['removed']} (toplam {result['total']})")
 
             preload_thread = threading.Thread(target=_preload_model, daemon=True)
             preload_thread.start()
             print(f"[STARTUP] [VECTOR_DB] Model preload arka planda başlatıldı.")
 
+            # Alt analiz grafiği (maliyet roll-up) — PDF taraması arka planda
+            from services.cost_rollup_service import get_cost_rollup_service
+            rollup_service = get_cost_rollup_service()
+            rollup_service.set_base_prices(all_data)
+            app.state.cost_rollup_service = rollup_service
+
+            def _load_rollup_graph():
+                try:
+                    rollup_service.load_from_folder(Path(__file__).parent.parent / "ANALIZ")
+                    rollup_service.recompute_all()
+                except Exception as e:
+                    logging.error(f"[STARTUP] [ROLLUP] Analiz grafiği yüklenemedi: {e}")
+
+            threading.Thread(target=_load_rollup_graph, daemon=True).start()
+
             DATA_LOADED = True
 
         except Exception as e:
@@ -210,6 +268,14 @@ def load_initial_data():
     # This function is kept only for backward compatibility
     # The async version should be used instead
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Keep-alive bağlantı havuzlarını kapat
+    await close_http_clients()
+    # Lazy modda eklenen eğitim örneklerini offset indeksine yaz (açılışta yeniden taranmasın)
+    if TRAINING_DATA_SERVICE is not None:
+        TRAINING_DATA_SERVICE.flush_offset_index()
+
 @app.get("/")
 def read_root():
     return {"message": "Approximate Cost API is running"}
@@ -281,11 +347,37 @@ async def trigger_vector_ingestion():
         vector_service.lazy_ingest(app.state.poz_data_for_vector)
         return {
             "status": "started",
-            "message": f"{len(app.state.poz_data_for_vector)} poz için ingestion başlatıldı"
+            "message": f"{len(app.state.poz_data_for_vector)} poz için artımlı ingestion başlatıldı (sonuç: status.last_ingest)"
         }
 
     return {"status": "error", "message": "Poz verisi bulunamadı"}
 
+@app.get("/api/vector-db/search-training")
+async def search_training_examples(q: str, limit: int = 10):
+    """Eğitim örneklerinde embedding tabanlı arama"""
+    if not hasattr(app.state, 'vector_db_service') or not app.state.vector_db_service:
+        return {"status": "not_initialized", "results": []}
+    results = await run_in_threadpool(app.state.vector_db_service.search_training, q, limit)
+    return {"status": "ok", "results": results}
+
+class VectorSearchManyRequest(BaseModel):
+    queries: List[str]
+    n_results: int = 5
+    unit: Optional[str] = None
+    institution: Optional[str] = None
+    code_prefix: Optional[str] = None
+
+@app.post("/api/vector-db/search-many")
+async def search_many_pozlar(request: VectorSearchManyRequest):
+    """Toplu poz araması (BOQ import, toplu fiyatlama): tek encode + tek Chroma sorgusu"""
+    if not hasattr(app.state, 'vector_db_service') or not app.state.vector_db_service:
+        return {"status": "not_initialized", "results": []}
+    results = await run_in_threadpool(
+        app.state.vector_db_service.search_many, request.queries, request.n_results,
+        unit=request.unit, institution=request.institution, code_prefix=request.code_prefix
+    )
+    return {"status": "ok", "results": results}
+
 @app.get("/api/vector-db/status")
 async def get_vector_db_status():
     """Vector DB durumunu döndür"""
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks
-from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from services.ai_service import AIAnalysisService
+from services.ai_service import AIAnalysisService, AsyncAIAnalysisService
 from services.consensus_service import ConsensusAnalysisService
 from services.self_consistency_service import SelfConsistencyService
 from services.cot_service import ChainOfThoughtService
@@ -11,13 +11,19 @@ from database import DatabaseManager
 from pathlib import Path
 from config import get_analysis_config, get_price_config, get_validation_config
 from utils.logger import get_ai_logger, get_price_logger, get_validation_logger
+from services.hybrid_retriever import HybridRetriever
+from services.http_client import run_async
+from services.llm_cache import get_llm_cache, get_llm_cache_stats
+from services.incremental_json import IncrementalComponentParser
 import json
 import uuid
 import asyncio
+import time
 from datetime import datetime
 import threading
 from services.description_parser import extract_included_services, should_exclude_component
 from services.density_service import calculate_transport_tonnage
+from utils.keyword_matcher import KeywordMatcher
 
 router = APIRouter(prefix="/ai", tags=["AI"])
 
@@ -298,7 +304,7 @@ def perform_analysis_sync(
         # Çoklu model konsensüs modu
         try:
             consensus_service = ConsensusAnalysisService(service)
-            result = asyncio.run(consensus_service.analyze_with_consensus(
+            result = run_async(consensus_service.analyze_with_consensus(
                 description, unit, full_context
             ))
             advanced_metrics["consensus_score"] = result.get("consensus_score", 0)
@@ -312,7 +318,7 @@ def perform_analysis_sync(
         # Self-consistency modu
         try:
             consistency_service = SelfConsistencyService(service, n_samples=3)
-            result = asyncio.run(consistency_service.analyze_with_consistency(
+            result = run_async(consistency_service.analyze_with_consistency(
                 description, unit, full_context
             ))
             advanced_metrics["consistency_score"] = result.get("consistency_score", 0)
@@ -596,12 +602,31 @@ async def list_analysis_jobs():
     return {"jobs": jobs, "total": len(jobs)}
 
 
+@router.get("/llm-cache")
+async def llm_cache_stats():
+    """
+    Kalıcı LLM yanıt cache'i istatistikleri (görev bazında hit/miss).
+    """
+    return get_llm_cache_stats()
+
+
+@router.delete("/llm-cache")
+async def clear_llm_cache():
+    """
+    LLM yanıt cache'ini temizle (prompt veya model davranışı değiştiğinde).
+    """
+    cache = get_llm_cache()
+    if cache is None:
+        return {"status": "disabled", "removed": 0}
+    return {"status": "success", "removed": cache.clear()}
+
+
 @router.post("/refine-feedback")
 async def refine_feedback(request: RefineRequest):
     """Kullanıcı geri bildirim açıklamasını iyileştir"""
-    service = AIAnalysisService()
+    service = AsyncAIAnalysisService()
     try:
-        refined_text = service.refine_feedback_description(request.text)
+        refined_text = await service.refine_feedback_description_async(request.text)
         return {"refined_text": refined_text}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -610,9 +635,9 @@ async def refine_feedback(request: RefineRequest):
 @router.post("/refine-request")
 async def refine_request(request: RefineRequest):
     """Kullanıcının basit talebini profesyonel bir poz analiz talebine dönüştür"""
-    service = AIAnalysisService()
+    service = AsyncAIAnalysisService()
     try:
-        refined_text = service.refine_construction_request(request.text)
+        refined_text = await service.refine_construction_request_async(request.text)
         return {"refined_text": refined_text}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -645,7 +670,7 @@ async def review_analysis(request: ReviewAnalysisRequest):
         }
         
         # Run critic review (returns CriticReview dataclass)
-        critic_review = critic.review_analysis(analysis_data, request.description)
+        critic_review = await critic.review_analysis_async(analysis_data, request.description)
         
         # Convert dataclass to dict
         critic_result = {
@@ -886,6 +911,15 @@ SEMANTIC_TAGS = {
 }
 
 
+# Tüm etiket anahtar kelimeleri tek bir otomatta (anahtar kelime -> etiketler)
+_SEMANTIC_TAG_KEYWORDS: Dict[str, List[str]] = {}
+for _tag, _keywords in SEMANTIC_TAGS.items():
+    for _keyword in _keywords:
+        _SEMANTIC_TAG_KEYWORDS.setdefault(_keyword, []).append(_tag)
+SEMANTIC_TAG_MATCHER = KeywordMatcher({kw: tuple(tags) for kw, tags in _SEMANTIC_TAG_KEYWORDS.items()})
+_SEMANTIC_TAG_ORDER = {tag: i for i, tag in enumerate(SEMANTIC_TAGS)}
+
+
 def extract_semantic_tags(text: str) -> List[str]:
     """
     Metinden semantik etiketler çıkar.
@@ -895,13 +929,12 @@ def extract_semantic_tags(text: str) -> List[str]:
         return []
 
     text_lower = text.lower()
-    found_tags = []
 
-    for tag, keywords in SEMANTIC_TAGS.items():
-        for keyword in keywords:
-            if keyword in text_lower:
-                found_tags.append(tag)
-                break  # Aynı tag'i birden fazla ekleme
+    # Tek geçişte tüm anahtar kelimeler; etiketler SEMANTIC_TAGS sırasıyla döner
+    hit_tags = set()
+    for tags in SEMANTIC_TAG_MATCHER.find_values(text_lower):
+        hit_tags.update(tags)
+    found_tags = sorted(hit_tags, key=_SEMANTIC_TAG_ORDER.__getitem__)
 
     # Default rule: "beton" var ama hazir_beton tetiklenmemişse → şantiye betonu varsayıl
     if 'beton' in text_lower and 'hazir_beton' not in found_tags and 'beton_harci' not in found_tags:
@@ -927,6 +960,80 @@ def calculate_tag_match_score(user_tags: List[str], poz_tags: List[str]) -> floa
     return intersection / union
 
 
+# Etiket çifti bonus/ceza kuralları: (kullanıcı etiketi, poz etiketi, puan)
+# Sıra önemlidir: build_context_from_poz_data puanı bu sırayla toplar.
+TAG_PAIR_BONUSES = [
+    # Kullanıcı "hazır beton" arıyorsa ve poz da "hazır beton" içeriyorsa
+    ('hazir_beton', 'hazir_beton', 50),
+    # Ters eşleşmeler: beton harcı ↔ hazır beton
+    ('beton_harci', 'hazir_beton', -40),
+    ('hazir_beton', 'beton_harci', -40),
+    # Trapez kanal
+    ('trapez_kanal', 'trapez_kanal', 40),
+    # Beton sınıfı eşleşmeleri
+    ('c20', 'c20', 30),
+    ('c25', 'c25', 30),
+    ('c30', 'c30', 30),
+    ('c35', 'c35', 30),
+    # Betonarme vs yalın beton ayrımı
+    ('betonarme', 'betonarme', 35),
+    ('yalin_beton', 'yalin_beton', 35),
+    # Kalıp tipi eşleşmeleri
+    ('kalip_ahsap', 'kalip_ahsap', 25),
+    ('kalip_metal', 'kalip_metal', 25),
+    # İmalat yöntemi eşleşmeleri
+    ('makine', 'makine', 20),
+    ('elle', 'elle', 20),
+]
+
+# POZ_DATA'dan türetilen indeksler: {isim: (kaynak dict, boyut, indeks)}
+_POZ_INDEXES: Dict[str, Any] = {}
+_POZ_INDEXES_LOCK = threading.Lock()
+
+
+def _is_current(cached, poz_data: Dict[str, Any]) -> bool:
+    # Dict'in kendisi tutulup `is` ile karşılaştırılır: id() serbest kalan dict'ten yeniden kullanılabilir
+    return cached is not None and cached[0] is poz_data and cached[1] == len(poz_data)
+
+
+def _get_cached_poz_index(name: str, poz_data: Dict[str, Any], factory):
+    """
+    POZ_DATA'ya bağlı indeksi cache'ten döndür.
+    Veri değiştiğinde (yeni dict veya farklı boyut) yeniden oluşturulur.
+    """
+    cached = _POZ_INDEXES.get(name)
+    if _is_current(cached, poz_data):
+        return cached[2]
+
+    with _POZ_INDEXES_LOCK:
+        cached = _POZ_INDEXES.get(name)
+        if not _is_current(cached, poz_data):
+            index = factory(poz_data)
+            _POZ_INDEXES[name] = (poz_data, len(poz_data), index)
+            logger.info(f"POZ {name} indeksi oluşturuldu ({len(index)} poz)")
+            return index
+        return cached[2]
+
+
+def get_poz_tag_index(poz_data: Dict[str, Any]):
+    """POZ_DATA için ön-hesaplanmış semantik etiket indeksi"""
+    from services.poz_tag_index import PozTagIndex
+
+    return _get_cached_poz_index("etiket", poz_data, lambda data: PozTagIndex(
+        data,
+        tag_names=list(SEMANTIC_TAGS.keys()),
+        extract_tags=extract_semantic_tags,
+        pair_bonuses=TAG_PAIR_BONUSES,
+    ))
+
+
+def get_poz_lexical_index(poz_data: Dict[str, Any]):
+    """POZ_DATA için BM25 ters indeksi (hibrit aday üretiminin lexical kaynağı)"""
+    from services.lexical_index import BM25Index
+
+    return _get_cached_poz_index("BM25", poz_data, BM25Index.from_poz_data)
+
+
 def truncate_context(context: str, max_chars: int, label: str = "context") -> str:
     """
     Context'i belirtilen karakter limitine göre kırp.
@@ -976,119 +1083,53 @@ def build_context_from_poz_data(description: str, unit: str, max_results: int =
 
     keywords = extract_keywords(description)
     user_tags = extract_semantic_tags(description)
-    matches = []
+    tag_index = get_poz_tag_index(poz_data)
 
     # ---------------------------------------------------------
-    # HİBRİT ARAMA: Vector DB -> Semantic Re-ranking
+    # HİBRİT ARAMA: (BM25 + Vector DB) RRF -> Semantic Re-ranking
     # ---------------------------------------------------------
     from services.vector_db_service import VectorDBService
     vector_service = VectorDBService()
 
-    # Lazy ingestion: İlk kullanımda arka planda veri yükle
     # Lazy ingestion OTOMATİK KAPATILDI (Kullanıcı isteği ile)
     # Artık veri yükleme işlemi sadece 'Ayarlar > Veri Yönetimi > Senkronize Et' ile manuel yapılıyor.
-    if not vector_service.is_ready:
-        logger.warning("[AI_ROUTER] Vector DB hazır değil. Lütfen 'Veri Yönetimi' sekmesinden veriyi senkronize edin.")
-
-    # 1. Aday Havuzu Oluştur (Vector Search)
-    candidates = []
-
-    # Vector DB'den adayları çek (limit config'den)
-    vector_results = vector_service.search(description, n_results=analysis_config.VECTOR_SEARCH_LIMIT)
-
-    if vector_results:
-        logger.info(f"Vector DB'den {len(vector_results)} aday bulundu")
-        for res in vector_results:
-            if res['code'] in poz_data:
-                candidates.append(poz_data[res['code']])
+    sources = {
+        "bm25": lambda q: [code for code, _ in get_poz_lexical_index(poz_data).search(
+            q, limit=analysis_config.LEXICAL_SEARCH_LIMIT
+        )],
+    }
+    # Model yüklenirken vektör araması havuz thread'ini bloklamasın diye sadece hazırsa eklenir
+    if vector_service.is_search_ready:
+        sources["vector"] = lambda q: [res['code'] for res in vector_service.search(
+            q, n_results=analysis_config.VECTOR_SEARCH_LIMIT
+        )]
+        # Aynı birimdeki pozlar index içinde süzülür (sorgu embedding'i cache'ten gelir);
+        # filtresiz kaynak farklı birimli bileşenleri (malzeme, nakliye) korur
+        if unit and unit.lower() != "otomatik":
+            sources["vector_unit"] = lambda q: [res['code'] for res in vector_service.search(
+                q, n_results=analysis_config.VECTOR_UNIT_SEARCH_LIMIT, unit=unit
+            )]
     else:
-        logger.warning("Vector DB boş, tam tarama yapılıyor (yavaş)")
-        candidates = list(poz_data.values())
+        logger.warning("[AI_ROUTER] Vector DB hazır değil (model yükleniyor veya koleksiyon boş), "
+                       "sadece BM25 adayları kullanılacak.")
+
+    # 1. Aday Havuzu: kaynaklar eşzamanlı, ortak gecikme bütçesiyle; sıralamalar RRF ile birleşir
+    retriever = HybridRetriever(sources, budget_ms=analysis_config.HYBRID_BUDGET_MS, rrf_k=analysis_config.RRF_K,
+                                max_abandoned=analysis_config.HYBRID_MAX_ABANDONED_PER_SOURCE)
+    hybrid = retriever.search(description, limit=analysis_config.HYBRID_CANDIDATE_LIMIT)
+    logger.info(f"Hibrit arama: {len(hybrid['results'])} aday ({hybrid['sources']})")
+    if not hybrid['results']:
+        return ""
+    # RRF sırası rerank'te eşit skorlu adaylar arasında öncelik belirler
+    candidates = tag_index.positions_for([code for code, _ in hybrid['results']])
 
     # 2. Adayları Puanla (Semantic Re-ranking)
-    for poz_info in candidates:
-        poz_no = poz_info.get('poz_no', '')
-        poz_desc = poz_info.get('description', '')
-        poz_unit = poz_info.get('unit', '')
-        poz_tags = extract_semantic_tags(poz_desc)
-
-        # Benzerlik puanı hesapla (ağırlıklı sistem)
-        score = 0
-
-        # ... (Existing scoring logic below)
-        
-        # 1. SEMANTİK ETİKET EŞLEŞMESİ (EN ÖNEMLİ!)
-        tag_match_score = calculate_tag_match_score(user_tags, poz_tags)
-        score += tag_match_score * 100  # En yüksek ağırlık
-
-        # 2. Açıklama benzerliği
-        # Eğer vector search'ten geldiyse zaten benzerdir, ama yine de hesapla
-        desc_similarity = calculate_similarity(description, poz_desc)
-        score += desc_similarity * 40
-
-        # 3. Anahtar kelime eşleşmesi
-        poz_desc_lower = poz_desc.lower()
-        keyword_matches = sum(1 for kw in keywords if kw in poz_desc_lower)
-        score += keyword_matches * 8
-
-        # 4. Birim eşleşmesi
-        if unit and unit.lower() != "otomatik" and unit.lower() == poz_unit.lower():
-            score += 15
-
-        # 5. Kritik etiket bonusları (özel durumlar)
-        # ... (Existing tag logic) ...
-        # Eğer kullanıcı "hazır beton" arıyorsa ve poz da "hazır beton" içeriyorsa
-        if 'hazir_beton' in user_tags and 'hazir_beton' in poz_tags:
-            score += 50
-
-        # Eğer kullanıcı "beton harcı" arıyorsa ama poz "hazır beton" ise ceza ver (ters eşleşme)
-        if 'beton_harci' in user_tags and 'hazir_beton' in poz_tags:
-            score -= 40
-
-        # Tam tersi: Kullanıcı "hazır beton" arıyorsa ama poz "beton harcı" ise ceza ver
-        if 'hazir_beton' in user_tags and 'beton_harci' in poz_tags:
-            score -= 40
-
-        # Trapez kanal araması için bonus
-        if 'trapez_kanal' in user_tags and 'trapez_kanal' in poz_tags:
-            score += 40
-
-        # Beton sınıfı eşleşmeleri için bonus
-        for concrete_class in ['c20', 'c25', 'c30', 'c35']:
-            if concrete_class in user_tags and concrete_class in poz_tags:
-                score += 30
-
-        # Betonarme vs yalın beton ayrımı
-        if 'betonarme' in user_tags and 'betonarme' in poz_tags:
-            score += 35
-        if 'yalin_beton' in user_tags and 'yalin_beton' in poz_tags:
-            score += 35
-
-        # Kalıp tipi eşleşmeleri
-        if 'kalip_ahsap' in user_tags and 'kalip_ahsap' in poz_tags:
-            score += 25
-        if 'kalip_metal' in user_tags and 'kalip_metal' in poz_tags:
-            score += 25
-
-        # İmalat yöntemi eşleşmeleri
-        if 'makine' in user_tags and 'makine' in poz_tags:
-            score += 20
-        if 'elle' in user_tags and 'elle' in poz_tags:
-            score += 20
-
-        if score > 5:  # Minimum eşik
-            matches.append({
-                'poz_no': poz_no,
-                'description': poz_desc,
-                'unit': poz_unit,
-                'unit_price': poz_info.get('unit_price', '0'),
-                'score': score,
-                'tags': poz_tags  # Debug için
-            })
-
-    # En yüksek puanlıları al
-    matches.sort(key=lambda x: x['score'], reverse=True)
-    top_matches = matches[:max_results]
+    # Puanlama (etiket Jaccard*100, benzerlik*40, anahtar kelime*8, birim +15,
+    # TAG_PAIR_BONUSES) ön-hesaplanmış bitmask'ler üzerinde vektörel yapılır.
+    top_matches = tag_index.rerank(
+        description, unit, keywords, user_tags, candidates,
+        max_results=max_results, min_score=5
+    )
 
     if not top_matches:
         return ""
@@ -1513,6 +1554,11 @@ def find_price_and_info_by_description(name: str, unit: str, poz_data: Dict, com
     return None
 
 
+# Kod doğrulamasında DB açıklaması ile bileşen adı arasında aranan kritik kelimeler
+CRITICAL_KEYWORDS = ['demir', 'kalıp', 'beton', 'iskele', 'duvar', 'alçı', 'boya', 'seramik', 'tesisat']
+CRITICAL_KEYWORD_MATCHER = KeywordMatcher(CRITICAL_KEYWORDS)
+
+
 def match_prices_from_poz_data(result: Dict) -> Dict:
     """
     AI analiz sonuçlarındaki bileşenler için POZ_DATA'dan birim fiyatları eşleştir.
@@ -1551,14 +1597,14 @@ def match_prices_from_poz_data(result: Dict) -> Dict:
             
             # Keyif Kaçıran Kelime Kontrolü (Keyword Mismatch)
             # Eğer DB açıklamasında kritik kelimeler var ama aranan isimde yoksa ceza ver
-            critical_keywords = ['demir', 'kalıp', 'beton', 'iskele', 'duvar', 'alçı', 'boya', 'seramik', 'tesisat']
             name_lower = name.lower()
             db_desc_lower = db_desc.lower()
             
-            for k in critical_keywords:
-                if k in db_desc_lower and k not in name_lower:
-                    # Kritik kelime uyumsuzluğu (örn: Demirci kodu ama Kalıpçı aranıyor)
-                    sim -= 0.3 # Ciddi ceza
+            missing_critical = (CRITICAL_KEYWORD_MATCHER.find_keywords(db_desc_lower)
+                                - CRITICAL_KEYWORD_MATCHER.find_keywords(name_lower))
+            for _ in missing_critical:
+                # Kritik kelime uyumsuzluğu (örn: Demirci kodu ama Kalıpçı aranıyor)
+                sim -= 0.3 # Ciddi ceza
             
             if sim > 0.45: # Eşik değer artırıldı (0.3 -> 0.45)
                 is_code_valid = True
@@ -2223,6 +2269,290 @@ def calculate_confidence_score(components: List[Dict], description: str) -> Dict
     }
 
 
+def _direct_lookup_analysis(request: AnalysisRequest, training_service) -> Optional[Dict[str, Any]]:
+    """
+    Eğitim verisinde tam eşleşme varsa analizi doğrudan oluştur (LLM çağrısı yok).
+    Eşleşme yoksa veya beton sınıfı uyuşmuyorsa None.
+    """
+    if training_service:
+        direct_match = training_service.direct_lookup(request.description, threshold=0.95)
+        
+        # --- Kritik Kelime Kontrolü (Concrete Class Check) ---
+        # Desteklenen formatlar: C25/30, C-25, C 25.30, c25, C25
+        if direct_match:
+            import re
+            try:
+                # Birincil beton sınıf sayısını çıkar (C sonrasındaki ilk sayı)
+                concrete_re = r'C[\s\-]*(\d+)(?:[/.\s]\d+)?'
+                user_concrete = re.search(concrete_re, request.description, re.IGNORECASE)
+                matched_concrete = re.search(concrete_re, direct_match['input'], re.IGNORECASE)
+
+                if user_concrete and matched_concrete:
+                    if user_concrete.group(1) != matched_concrete.group(1):
+                        print(f"❌ DIRECT LOOKUP REFUSED: Beton sınıfı uyuşmazlığı (C{user_concrete.group(1)} != C{matched_concrete.group(1)})")
+                        direct_match = None
+            except Exception as e:
+                print(f"Error in concrete check: {e}")
+
+        if direct_match:
+            print(f"✅ DIRECT LOOKUP HIT! Similarity: {direct_match['similarity']:.2%}")
+            print(f"   Input: {direct_match['input']}")
+
+            # POZ_DATA'yı al (isim düzeltmeleri için)
+            poz_data = get_poz_data()
+            
+            training_output = direct_match['output']
+            components = []
+
+            # Helper function for components
+            def add_components(source_list, type_name):
+                for item in source_list:
+                    kod = item.get('kod', '')
+                    ad = item.get('ad', '')
+                    
+                    # İsim boşsa POZ_DATA'dan doldur
+                    if (not ad or len(str(ad).strip()) < 2) and kod and kod in poz_data:
+                        ad = poz_data[kod].get('description', '')
+                        print(f"[NAME FIX] {type_name} '{kod}' → '{ad}'")
+                    
+                    components.append({
+                        'type': type_name,
+                        'code': kod,
+                        'name': ad,
+                        'unit': item.get('birim', ''),
+                        'quantity': item.get('miktar', 1.0),
+                        'unit_price': 0.0,
+                        'total_price': 0.0,
+                        'price_source': 'training_data'
+                    })
+
+            # Bileşenleri ekle
+            add_components(training_output.get('iscilik', []), 'İşçilik')
+            add_components(training_output.get('malzeme', []), 'Malzeme')
+            add_components(training_output.get('makine', []), 'Makine')
+            add_components(training_output.get('nakliye', []), 'Nakliye')
+
+            match_metadata = direct_match.get('metadata', {})
+            poz_no = match_metadata.get('ana_poz_no', 'N/A')
+            
+            from services.local_pdf_service import get_local_pdf_service
+            pdf_service = get_local_pdf_service()
+            technical_description = pdf_service.get_description(poz_no, return_structured=False) if poz_no != 'N/A' else ""
+            analysis_data = pdf_service.get_description(poz_no, return_structured=True) if poz_no != 'N/A' else {}
+
+            result = {
+                'suggested_unit': request.unit,
+                'unit': request.unit,
+                'explanation': f"Bu analiz ÇŞB (Çevre ve Şehircilik Bakanlığı) resmi analizlerinden eşleştirilmiştir (Referans Poz: {poz_no}).\n"
+                               f"Benzerlik: {direct_match['similarity']:.0%}\n"
+                               f"Birim fiyatlar POZ_DATA'dan güncellenmiştir.",
+                'components': components,
+                'technical_description': technical_description,
+                'analysis_data': analysis_data,
+                'metadata': {
+                    'source': 'direct_lookup',
+                    'match_type': direct_match['match_type'],
+                    'similarity': direct_match['similarity'],
+                    'training_example': direct_match['input'],
+                    'reference_poz': poz_no,
+                    'reference_source': match_metadata.get('source')
+                }
+            }
+
+            # PDF verilerinden birim fiyatları eşleştir
+            result = match_prices_from_poz_data(result)
+
+            # Özet bilgi ekle
+            result["metadata"]["poz_data_count"] = len(get_poz_data())
+            result["metadata"]["price_sources"] = summarize_price_sources(result)
+
+            return result
+
+    return None
+
+
+def build_analysis_context(request: AnalysisRequest, training_service) -> Dict[str, Any]:
+    """
+    LLM için zenginleştirilmiş context (POZ_DATA + feedback + eğitim RAG + teknik tarif).
+    technical_description: tarif araması yapılmadıysa None.
+    """
+    technical_desc_found = None
+    analysis_data_found = None
+
+    # 2.1. POZ_DATA context oluştur
+    poz_context = build_context_from_poz_data(request.description, request.unit)
+
+    # 2.2. Feedback context oluştur
+    feedback_context = build_feedback_context(request.description, request.unit)
+
+    # 2.3. Training Data RAG context oluştur (Benzer örnekleri ekle)
+    training_rag_context = ""
+    if training_service:
+        training_rag_context = training_service.build_rag_context(request.description, top_k=3)
+
+    # 2.4. Tüm context'leri birleştir (limit kontrolü ile)
+    full_context = merge_contexts(poz_context, feedback_context, training_rag_context)
+
+    # WEB SCRAPER INTEGRATION - Poz numarası varsa teknik tarif ekle
+    import re
+    ref_poz_no = None
+
+    # 1. Kullanıcı açıklamasında poz no var mı?
+    match_user = re.search(r'(\d{2}\.\d{3}\.\d{4})', request.description)
+    if match_user:
+        ref_poz_no = match_user.group(1)
+
+    # 2. RAG içeriğinde var mı? (İlk eşleşen)
+    if not ref_poz_no and training_rag_context:
+        match_rag = re.search(r'(\d{2}\.\d{3}\.\d{4})', training_rag_context)
+        if match_rag:
+            ref_poz_no = match_rag.group(1)
+        
+        # Scraper çağır ve context'e ekle
+        technical_desc_found = ""
+        analysis_data_found = {}
+        if ref_poz_no:
+            try:
+                # 1. ÖNCE YEREL PDF ARA (En Hızlı ve Güvenilir)
+                from services.local_pdf_service import get_local_pdf_service
+                local_service = get_local_pdf_service()
+                local_desc = local_service.get_description(ref_poz_no, return_structured=False)
+                local_data = local_service.get_description(ref_poz_no, return_structured=True)
+                
+                if local_desc:
+                    print(f"✅ Yerel PDF tarifi bulundu: {ref_poz_no} ({len(local_desc)} karakter)")
+                    full_context += f"\n\n[{ref_poz_no} POZUNUN ANALİZ PDF'İNDEN ALINAN RESMİ TARİFİ]:\n{local_desc}\n\nÖNEMLİ: Bu resmi tarife göre fiyata DAHİL olan kalemleri tekrar maliyetlendirme!\n"
+                    technical_desc_found = local_desc
+                    analysis_data_found = local_data
+                
+                else:
+                    # 2. BULUNAMAZSA WEB ARA (Fallback)
+                    from services.web_scraper_service import get_scraper_service
+                    scraper = get_scraper_service()
+                    web_desc = scraper.get_description(ref_poz_no)
+                    
+                    if web_desc:
+                        print(f"✅ Web tarifi eklendi: {ref_poz_no} ({len(web_desc)} karakter)")
+                        full_context += f"\n\n[{ref_poz_no} POZUNUN WEB TARİFİ]:\n{web_desc}\n\nÖNEMLİ: Bu tarife göre fiyata DAHİL olanları tekrar ekleme!\n"
+                        technical_desc_found = web_desc
+                        
+            except Exception as e:
+                print(f"⚠️ Tarif Çekme Hatası: {e}")
+
+    if request.context_data:
+        full_context += "\n\nKULLANICI EK BİLGİLERİ:\n" + request.context_data
+
+    return {
+        "full_context": full_context,
+        "feedback_context": feedback_context,
+        "training_rag_context": training_rag_context,
+        "technical_description": technical_desc_found,
+        "analysis_data": analysis_data_found
+    }
+
+
+async def finalize_llm_analysis(
+    result: Dict[str, Any],
+    request: AnalysisRequest,
+    context: Dict[str, Any],
+    advanced_metrics: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    LLM çıktısını son haline getir: validasyonlar, fiyat eşleştirme, güven skoru,
+    metadata ve critic incelemesi. /analyze ve /analyze/stream ortak kullanır.
+    """
+    full_context = context["full_context"]
+    feedback_context = context["feedback_context"]
+    training_rag_context = context["training_rag_context"]
+
+    # Advanced metrics'i result'a ekle
+    if advanced_metrics:
+        result["advanced_metrics"] = advanced_metrics
+
+    # 2.6. Validasyon (Çoklu katman)
+    if "components" in result:
+        # Kalıp mükerrerlik kontrolü (Özel kalıp varsa genel kalıbı sil)
+        result["components"] = validate_formwork_duplication(result["components"], request.description)
+        
+        # Önce kompozisyon kontrolü (hazır beton vs çimento/kum/çakıl)
+        result["components"] = validate_beton_composition(result["components"], request.description)
+        # Sonra beton/betonarme ayrımı
+        result["components"] = validate_beton_betonarme(result["components"], request.description)
+
+    # 2.7. PDF verilerinden birim fiyatları eşleştir
+    result = match_prices_from_poz_data(result)
+
+    # ========================================
+    # STEP 3: EK VALIDASYONLAR VE PUANLAMA (YENİ)
+    # ========================================
+    
+    # 3.1. Genel İnşaat Kuralları Validasyonu (Kazı->Nakliye, Duvar->Harç, Seramik->Derz vb.)
+    result["components"] = validate_general_construction_rules(result["components"], request.description)
+
+    # 3.1.5. Fire oranları (demir %5, beton %2, kalıp %10) — fiyat eşleştirme sonrası
+    result["components"] = apply_waste_rates(result["components"], request.description)
+
+    # 3.2. Güven Skoru Hesaplama
+    confidence_data = calculate_confidence_score(result["components"], request.description)
+
+    # 2.8. AI'dan önerilen birimi kullan (giriş birimi yerine)
+    suggested_unit = result.get("suggested_unit", request.unit)
+    result["unit"] = suggested_unit
+    
+    # 2.8.5. Teknik Tarifi ekle (eğer Step 1'de eklenmediyse)
+    if "technical_description" not in result and context["technical_description"] is not None:
+        result["technical_description"] = context["technical_description"]
+        result["analysis_data"] = context["analysis_data"]
+
+    # 2.9. Özet bilgi ekle
+    result["metadata"] = {
+        "source": "rag_llm",
+        "poz_data_count": len(get_poz_data()),
+        "context_provided": bool(full_context),
+        "feedback_used": bool(feedback_context),
+        "training_rag_used": bool(training_rag_context),
+        "price_sources": summarize_price_sources(result),
+        "analysis_score": confidence_data["score"],
+        "confidence_level": confidence_data["level"],
+        "warnings": [],  # Critic review sonrasında doldurulacak
+        "input_unit": request.unit,
+        "suggested_unit": suggested_unit
+    }
+
+
+    # ========================================
+    # CRITIC REVIEW: Eleştirmen AI Kontrolü
+    # ========================================
+    from services.critic_service import get_critic_service
+
+    critic = get_critic_service()
+    critic_review = await critic.review_analysis_async(result, request.description)
+
+    # Critic sonuçlarını result'a ekle
+    result["critic_review"] = {
+        "status": critic_review.status,
+        "issues": [
+            {
+                "severity": issue.severity,
+                "category": issue.category,
+                "message": issue.message,
+                "suggestion": issue.suggestion
+            }
+            for issue in critic_review.issues
+        ],
+        "suggestions": critic_review.suggestions
+    }
+
+    # Tüm critic issue'larını warnings'a ekle (severity'ye göre formatla)
+    for issue in critic_review.issues:
+        if issue.severity == "critical":
+            result["metadata"]["warnings"].append(f"🔴 KRİTİK: {issue.message}")
+        elif issue.severity == "warning":
+            result["metadata"]["warnings"].append(f"⚠️ {issue.message}")
+
+    return result
+
+
 @router.post("/analyze")
 async def analyze_poz(request: AnalysisRequest):
     """
@@ -2239,173 +2569,25 @@ async def analyze_poz(request: AnalysisRequest):
     - AI yanıtındaki fiyatları PDF verileriyle eşleştirir (kod + açıklama benzerliği)
     - Daha detaylı ve Türkiye'ye özel prompt kullanır
     """
-    service = AIAnalysisService()
+    # LLM çağrıları event loop'ta (httpx.AsyncClient) beklenir, threadpool'u meşgul etmez.
+    # Bloklayan işler (hibrit arama + sorgu embedding'i, PDF okuma, web scraper) thread'de
+    # çalışır; aksi halde tek yavaş istek tüm eşzamanlı LLM çağrılarını ve SSE akışlarını dondurur.
+    service = AsyncAIAnalysisService()
     training_service = get_training_service()
 
     try:
         # ========================================
         # STEP 1: DIRECT LOOKUP (Tam Eşleşme)
         # ========================================
-        if training_service:
-            direct_match = training_service.direct_lookup(request.description, threshold=0.95)
-            
-            # --- Kritik Kelime Kontrolü (Concrete Class Check) ---
-            # Desteklenen formatlar: C25/30, C-25, C 25.30, c25, C25
-            if direct_match:
-                import re
-                try:
-                    # Birincil beton sınıf sayısını çıkar (C sonrasındaki ilk sayı)
-                    concrete_re = r'C[\s\-]*(\d+)(?:[/.\s]\d+)?'
-                    user_concrete = re.search(concrete_re, request.description, re.IGNORECASE)
-                    matched_concrete = re.search(concrete_re, direct_match['input'], re.IGNORECASE)
-
-                    if user_concrete and matched_concrete:
-                        if user_concrete.group(1) != matched_concrete.group(1):
-                            print(f"❌ DIRECT LOOKUP REFUSED: Beton sınıfı uyuşmazlığı (C{user_concrete.group(1)} != C{matched_concrete.group(1)})")
-                            direct_match = None
-                except Exception as e:
-                    print(f"Error in concrete check: {e}")
-
-            if direct_match:
-                print(f"✅ DIRECT LOOKUP HIT! Similarity: {direct_match['similarity']:.2%}")
-                print(f"   Input: {direct_match['input']}")
-
-                # POZ_DATA'yı al (isim düzeltmeleri için)
-                poz_data = get_poz_data()
-                
-                training_output = direct_match['output']
-                components = []
-
-                # Helper function for components
-                def add_components(source_list, type_name):
-                    for item in source_list:
-                        kod = item.get('kod', '')
-                        ad = item.get('ad', '')
-                        
-                        # İsim boşsa POZ_DATA'dan doldur
-                        if (not ad or len(str(ad).strip()) < 2) and kod and kod in poz_data:
-                            ad = poz_data[kod].get('description', '')
-                            print(f"[NAME FIX] {type_name} '{kod}' → '{ad}'")
-                        
-                        components.append({
-                            'type': type_name,
-                            'code': kod,
-                            'name': ad,
-                            'unit': item.get('birim', ''),
-                            'quantity': item.get('miktar', 1.0),
-                            'unit_price': 0.0,
-                            'total_price': 0.0,
-                            'price_source': 'training_data'
-                        })
-
-                # Bileşenleri ekle
-                add_components(training_output.get('iscilik', []), 'İşçilik')
-                add_components(training_output.get('malzeme', []), 'Malzeme')
-                add_components(training_output.get('makine', []), 'Makine')
-                add_components(training_output.get('nakliye', []), 'Nakliye')
-
-                match_metadata = direct_match.get('metadata', {})
-                poz_no = match_metadata.get('ana_poz_no', 'N/A')
-                
-                from services.local_pdf_service import get_local_pdf_service
-                pdf_service = get_local_pdf_service()
-                technical_description = pdf_service.get_description(poz_no, return_structured=False) if poz_no != 'N/A' else ""
-                analysis_data = pdf_service.get_description(poz_no, return_structured=True) if poz_no != 'N/A' else {}
-
-                result = {
-                    'suggested_unit': request.unit,
-                    'unit': request.unit,
-                    'explanation': f"Bu analiz ÇŞB (Çevre ve Şehircilik Bakanlığı) resmi analizlerinden eşleştirilmiştir (Referans Poz: {poz_no}).\n"
-                                   f"Benzerlik: {direct_match['similarity']:.0%}\n"
-                                   f"Birim fiyatlar POZ_DATA'dan güncellenmiştir.",
-                    'components': components,
-                    'technical_description': technical_description,
-                    'analysis_data': analysis_data,
-                    'metadata': {
-                        'source': 'direct_lookup',
-                        'match_type': direct_match['match_type'],
-                        'similarity': direct_match['similarity'],
-                        'training_example': direct_match['input'],
-                        'reference_poz': poz_no,
-                        'reference_source': match_metadata.get('source')
-                    }
-                }
-
-                # PDF verilerinden birim fiyatları eşleştir
-                result = match_prices_from_poz_data(result)
-
-                # Özet bilgi ekle
-                result["metadata"]["poz_data_count"] = len(get_poz_data())
-                result["metadata"]["price_sources"] = summarize_price_sources(result)
-
-                return result
+        direct_result = await asyncio.to_thread(_direct_lookup_analysis, request, training_service)
+        if direct_result is not None:
+            return direct_result
 
         # ========================================
         # STEP 2: RAG + LLM (Benzer örneklerle)
         # ========================================
-
-        # 2.1. POZ_DATA context oluştur
-        poz_context = build_context_from_poz_data(request.description, request.unit)
-
-        # 2.2. Feedback context oluştur
-        feedback_context = build_feedback_context(request.description, request.unit)
-
-        # 2.3. Training Data RAG context oluştur (Benzer örnekleri ekle)
-        training_rag_context = ""
-        if training_service:
-            training_rag_context = training_service.build_rag_context(request.description, top_k=3)
-
-        # 2.4. Tüm context'leri birleştir (limit kontrolü ile)
-        full_context = merge_contexts(poz_context, feedback_context, training_rag_context)
-
-        # WEB SCRAPER INTEGRATION - Poz numarası varsa teknik tarif ekle
-        import re
-        ref_poz_no = None
-
-        # 1. Kullanıcı açıklamasında poz no var mı?
-        match_user = re.search(r'(\d{2}\.\d{3}\.\d{4})', request.description)
-        if match_user:
-            ref_poz_no = match_user.group(1)
-
-        # 2. RAG içeriğinde var mı? (İlk eşleşen)
-        if not ref_poz_no and training_rag_context:
-            match_rag = re.search(r'(\d{2}\.\d{3}\.\d{4})', training_rag_context)
-            if match_rag:
-                ref_poz_no = match_rag.group(1)
-            
-            # Scraper çağır ve context'e ekle
-            technical_desc_found = ""
-            analysis_data_found = {}
-            if ref_poz_no:
-                try:
-                    # 1. ÖNCE YEREL PDF ARA (En Hızlı ve Güvenilir)
-                    from services.local_pdf_service import get_local_pdf_service
-                    local_service = get_local_pdf_service()
-                    local_desc = local_service.get_description(ref_poz_no, return_structured=False)
-                    local_data = local_service.get_description(ref_poz_no, return_structured=True)
-                    
-                    if local_desc:
-                        print(f"✅ Yerel PDF tarifi bulundu: {ref_poz_no} ({len(local_desc)} karakter)")
-                        full_context += f"\n\n[{ref_poz_no} POZUNUN ANALİZ PDF'İNDEN ALINAN RESMİ TARİFİ]:\n{local_desc}\n\nÖNEMLİ: Bu resmi tarife göre fiyata DAHİL olan kalemleri tekrar maliyetlendirme!\n"
-                        technical_desc_found = local_desc
-                        analysis_data_found = local_data
-                    
-                    else:
-                        # 2. BULUNAMAZSA WEB ARA (Fallback)
-                        from services.web_scraper_service import get_scraper_service
-                        scraper = get_scraper_service()
-                        web_desc = scraper.get_description(ref_poz_no)
-                        
-                        if web_desc:
-                            print(f"✅ Web tarifi eklendi: {ref_poz_no} ({len(web_desc)} karakter)")
-                            full_context += f"\n\n[{ref_poz_no} POZUNUN WEB TARİFİ]:\n{web_desc}\n\nÖNEMLİ: Bu tarife göre fiyata DAHİL olanları tekrar ekleme!\n"
-                            technical_desc_found = web_desc
-                            
-                except Exception as e:
-                    print(f"⚠️ Tarif Çekme Hatası: {e}")
-
-        if request.context_data:
-            full_context += "\n\nKULLANICI EK BİLGİLERİ:\n" + request.context_data
+        context = await asyncio.to_thread(build_analysis_context, request, training_service)
+        full_context = context["full_context"]
 
         # 2.5. AI analizini al (zenginleştirilmiş context ile, gelişmiş modlar dahil)
         advanced_metrics = {}
@@ -2422,8 +2604,7 @@ async def analyze_poz(request: AnalysisRequest):
                 logger.info(f"Consensus analiz tamamlandı. Skor: {advanced_metrics.get('consensus_score', 0):.2f}")
             except Exception as e:
                 logger.warning(f"Consensus analiz hatası, standart moda dönülüyor: {e}")
-                result = await run_in_threadpool(
-                    service.generate_analysis,
+                result = await service.generate_analysis_async(
                     description=request.description,
                     unit=request.unit,
                     context_data=full_context
@@ -2443,8 +2624,7 @@ async def analyze_poz(request: AnalysisRequest):
                 logger.info(f"Self-consistency analiz tamamlandı. Skor: {advanced_metrics.get('consistency_score', 0):.2f}")
             except Exception as e:
                 logger.warning(f"Self-consistency analiz hatası, standart moda dönülüyor: {e}")
-                result = await run_in_threadpool(
-                    service.generate_analysis,
+                result = await service.generate_analysis_async(
                     description=request.description,
                     unit=request.unit,
                     context_data=full_context
@@ -2455,8 +2635,7 @@ async def analyze_poz(request: AnalysisRequest):
             try:
                 cot_service = ChainOfThoughtService()
                 cot_prompt = cot_service.build_cot_prompt(request.description, request.unit, full_context)
-                result = await run_in_threadpool(
-                    service.generate_analysis,
+                result = await service.generate_analysis_async(
                     description=request.description,
                     unit=request.unit,
                     context_data=cot_prompt,
@@ -2466,8 +2645,7 @@ async def analyze_poz(request: AnalysisRequest):
                 logger.info("Chain-of-Thought analiz tamamlandı.")
             except Exception as e:
                 logger.warning(f"CoT analiz hatası, standart moda dönülüyor: {e}")
-                result = await run_in_threadpool(
-                    service.generate_analysis,
+                result = await service.generate_analysis_async(
                     description=request.description,
                     unit=request.unit,
                     context_data=full_context
@@ -2475,104 +2653,101 @@ async def analyze_poz(request: AnalysisRequest):
 
         else:
             # Standart mod
-            result = await run_in_threadpool(
-                service.generate_analysis,
+            result = await service.generate_analysis_async(
                 description=request.description,
                 unit=request.unit,
                 context_data=full_context
             )
 
-        # Advanced metrics'i result'a ekle
-        if advanced_metrics:
-            result["advanced_metrics"] = advanced_metrics
-
-        # 2.6. Validasyon (Çoklu katman)
-        if "components" in result:
-            # Kalıp mükerrerlik kontrolü (Özel kalıp varsa genel kalıbı sil)
-            result["components"] = validate_formwork_duplication(result["components"], request.description)
-            
-            # Önce kompozisyon kontrolü (hazır beton vs çimento/kum/çakıl)
-            result["components"] = validate_beton_composition(result["components"], request.description)
-            # Sonra beton/betonarme ayrımı
-            result["components"] = validate_beton_betonarme(result["components"], request.description)
-
-        # 2.7. PDF verilerinden birim fiyatları eşleştir
-        result = match_prices_from_poz_data(result)
+        return await finalize_llm_analysis(result, request, context, advanced_metrics)
 
-        # ========================================
-        # STEP 3: EK VALIDASYONLAR VE PUANLAMA (YENİ)
-        # ========================================
-        
-        # 3.1. Genel İnşaat Kuralları Validasyonu (Kazı->Nakliye, Duvar->Harç, Seramik->Derz vb.)
-        result["components"] = validate_general_construction_rules(result["components"], request.description)
-
-        # 3.1.5. Fire oranları (demir %5, beton %2, kalıp %10) — fiyat eşleştirme sonrası
-        result["components"] = apply_waste_rates(result["components"], request.description)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # 3.2. Güven Skoru Hesaplama
-        confidence_data = calculate_confidence_score(result["components"], request.description)
 
-        # 2.8. AI'dan önerilen birimi kullan (giriş birimi yerine)
-        suggested_unit = result.get("suggested_unit", request.unit)
-        result["unit"] = suggested_unit
-        
-        # 2.8.5. Teknik Tarifi ekle (eğer Step 1'de eklenmediyse)
-        if "technical_description" not in result and 'technical_desc_found' in locals():
-            result["technical_description"] = technical_desc_found
-            result["analysis_data"] = analysis_data_found
-
-        # 2.9. Özet bilgi ekle
-        result["metadata"] = {
-            "source": "rag_llm",
-            "poz_data_count": len(get_poz_data()),
-            "context_provided": bool(full_context),
-            "feedback_used": bool(feedback_context),
-            "training_rag_used": bool(training_rag_context),
-            "price_sources": summarize_price_sources(result),
-            "analysis_score": confidence_data["score"],
-            "confidence_level": confidence_data["level"],
-            "warnings": [],  # Critic review sonrasında doldurulacak
-            "input_unit": request.unit,
-            "suggested_unit": suggested_unit
-        }
+def _sse(event: str, payload: Any) -> str:
+    """Server-Sent Events mesajı"""
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False, default=str)}\n\n"
 
 
-        # ========================================
-        # CRITIC REVIEW: Eleştirmen AI Kontrolü
-        # ========================================
-        from services.critic_service import get_critic_service
+@router.post("/analyze/stream")
+async def analyze_poz_stream(request: AnalysisRequest):
+    """
+    /analyze'ın Server-Sent Events (text/event-stream) varyantı.
 
-        critic = get_critic_service()
-        critic_review = await run_in_threadpool(critic.review_analysis, result, request.description)
+    LLM'den `stream: true` ile gelen JSON artımlı parse edilir; "components"
+    dizisindeki her bileşen kapandığı anda POZ_DATA fiyatı eşleştirilip gönderilir.
 
-        # Critic sonuçlarını result'a ekle
-        result["critic_review"] = {
-            "status": critic_review.status,
-            "issues": [
-                {
-                    "severity": issue.severity,
-                    "category": issue.category,
-                    "message": issue.message,
-                    "suggestion": issue.suggestion
-                }
-                for issue in critic_review.issues
-            ],
-            "suggestions": critic_review.suggestions
-        }
+    Olaylar:
+    - component: {"index", "component"} - geçici; validasyon/fire nihai sonuçta uygulanır
+    - result:    /analyze ile aynı yapıda nihai sonuç (validasyon + critic dahil)
+    - error:     {"detail": "..."}
 
-        # Tüm critic issue'larını warnings'a ekle (severity'ye göre formatla)
-        for issue in critic_review.issues:
-            if issue.severity == "critical":
-                result["metadata"]["warnings"].append(f"🔴 KRİTİK: {issue.message}")
-            elif issue.severity == "warning":
-                result["metadata"]["warnings"].append(f"⚠️ {issue.message}")
+    Direct lookup ve gelişmiş modlar (consensus, self-consistency, CoT) akışsız
+    çalışır; bileşenleri nihai sonuçtan hemen önce gönderilir.
+    """
+    async def events():
+        start = time.perf_counter()
+        try:
+            training_service = get_training_service()
+            if request.use_consensus or request.use_self_consistency or request.use_cot:
+                result = await analyze_poz(request)
+            else:
+                result = await asyncio.to_thread(_direct_lookup_analysis, request, training_service)
 
-        return result
+            if result is not None:
+                for index, component in enumerate(result.get("components", [])):
+                    yield _sse("component", {"index": index, "component": component})
+                yield _sse("result", result)
+                return
+
+            context = await asyncio.to_thread(build_analysis_context, request, training_service)
+            service = AsyncAIAnalysisService()
+            parser = IncrementalComponentParser()
+            llm_start = time.perf_counter()
+            first_component_ms = None
+            index = 0
+
+            async for chunk in service.stream_analysis_async(request.description, request.unit, context["full_context"]):
+                for component in parser.feed(chunk):
+                    try:
+                        # /analyze ile aynı normalizasyon (varsayılan alanlar, "0,5" gibi sayılar)
+                        component = service._finalize_component(component)
+                        component = match_prices_from_poz_data({"components": [component]})["components"][0]
+                    except Exception as e:
+                        # Tek bozuk bileşen akışı bitirmez; nihai sonuç tüm metinden yeniden parse edilir
+                        logger.warning(f"[STREAM] Bileşen işlenemedi, atlandı: {e} | {component}")
+                        continue
+                    if first_component_ms is None:
+                        first_component_ms = round((time.perf_counter() - llm_start) * 1000)
+                    yield _sse("component", {"index": index, "component": component})
+                    index += 1
+
+            llm_ms = round((time.perf_counter() - llm_start) * 1000)
+            result = await finalize_llm_analysis(service._process_response(parser.text), request, context)
+            result["metadata"]["stream"] = {
+                "streamed_components": index,
+                "time_to_first_component_ms": first_component_ms,
+                "llm_ms": llm_ms,
+                "total_ms": round((time.perf_counter() - start) * 1000)
+            }
+            logger.info(f"[STREAM] İlk bileşen {first_component_ms} ms, LLM {llm_ms} ms ({index} bileşen)")
+            yield _sse("result", result)
 
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
+        except HTTPException as e:
+            yield _sse("error", {"detail": e.detail})
+        except Exception as e:
+            logger.error(f"[STREAM] Analiz hatası: {e}")
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Proxy (nginx) tamponlamasın; olaylar anında iletilsin
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 def summarize_price_sources(result: Dict) -> Dict[str, int]:
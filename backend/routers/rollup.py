@@ -0,0 +1,59 @@
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel
+from typing import Dict, Optional
+from services.cost_rollup_service import get_cost_rollup_service
+
+router = APIRouter(prefix="/rollup", tags=["Cost Rollup"])
+
+
+class BasePriceUpdate(BaseModel):
+    prices: Dict[str, float]
+
+
+@router.get("/status")
+def get_rollup_status():
+    """Analiz grafiği istatistikleri"""
+    return get_cost_rollup_service().get_stats()
+
+
+@router.get("/breakdown/{poz_no}")
+def get_cost_breakdown(poz_no: str, max_depth: Optional[int] = None):
+    """
+    Pozun maliyet ağacını getir (alt analizler iç içe).
+    Grafta yoksa yerel ÇŞB PDF'inden yapısal analiz çekilip eklenir.
+    """
+    service = get_cost_rollup_service()
+    poz_no = poz_no.strip()
+
+    if not service.has_analysis(poz_no):
+        from services.local_pdf_service import get_local_pdf_service
+        analysis_data = get_local_pdf_service().get_description(poz_no, return_structured=True)
+        if analysis_data:
+            service.add_analysis(poz_no, analysis_data)
+
+    breakdown = service.get_breakdown(poz_no, max_depth=max_depth)
+    if breakdown is None:
+        raise HTTPException(status_code=404, detail="Poz için analiz bulunamadı")
+    return breakdown
+
+
+@router.post("/prices")
+def update_base_prices(payload: BasePriceUpdate):
+    """Rayiç fiyatlarını güncelle, sadece etkilenen bileşik pozları yeniden hesapla"""
+    service = get_cost_rollup_service()
+    changed = service.update_base_prices(payload.prices)
+    return {
+        "changed_count": len(changed),
+        "changed": changed[:200],
+        **service.last_recompute
+    }
+
+
+@router.post("/recompute")
+def recompute_all(request: Request):
+    """Tüm kataloğu POZ_DATA fiyatlarıyla yeniden hesapla"""
+    service = get_cost_rollup_service()
+    poz_data = getattr(request.app.state, 'poz_data', {})
+    if poz_data:
+        service.set_base_prices(poz_data)
+    return service.recompute_all()
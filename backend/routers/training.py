@@ -0,0 +1,51 @@
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+
+router = APIRouter(prefix="/training", tags=["Training Data"])
+
+
+class TrainingExample(BaseModel):
+    input: str
+    output: Dict[str, List[Dict[str, Any]]]
+    instruction: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+
+class TrainingExamplesAppend(BaseModel):
+    examples: List[TrainingExample]
+
+
+def _get_service(request: Request):
+    service = getattr(request.app.state, 'training_data_service', None)
+    if service is None:
+        raise HTTPException(status_code=503, detail="Eğitim verisi henüz yüklenmedi")
+    return service
+
+
+@router.get("/status")
+def get_training_status(request: Request):
+    """Eğitim verisi istatistikleri"""
+    return _get_service(request).get_stats()
+
+
+@router.post("/examples")
+def append_training_examples(payload: TrainingExamplesAppend, request: Request):
+    """
+    Yeni eğitim örneklerini JSONL dosyasına ekle.
+    İndeksler (tam eşleşme, anahtar kelime, vector koleksiyonu) yeniden başlatma olmadan güncellenir.
+    """
+    service = _get_service(request)
+    examples = [example.dict(exclude_none=True) for example in payload.examples]
+    if not examples:
+        raise HTTPException(status_code=400, detail="Eklenecek örnek yok")
+    try:
+        return service.append_examples(examples)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/reload")
+def reload_training_data(request: Request):
+    """Dosyaya dışarıdan eklenen/değiştirilen örnekleri yükle"""
+    return _get_service(request).refresh()
@@ -3,6 +3,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional
 from database import DatabaseManager
+from services.http_client import get_async_http_client
 from pathlib import Path
 import os
 from dotenv import load_dotenv
@@ -64,59 +65,60 @@ async def get_llm_usage():
         )
 
     try:
-        async with httpx.AsyncClient() as client:
-            # Get credits info (total_credits, total_usage)
-            credits_response = await client.get(
-                "https://openrouter.ai/api/v1/credits",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "HTTP-Referer": "https://approximatecostpro.com",
-                    "X-Title": "Approximate Cost Pro"
-                },
-                timeout=10.0
-            )
-            credits_response.raise_for_status()
-            credits_data = credits_response.json().get("data", {})
-            total_credits = credits_data.get("total_credits")
-            total_usage = credits_data.get("total_usage")
+        # Paylaşılan keep-alive havuzu (iki istek aynı bağlantıyı kullanır)
+        client = get_async_http_client()
+        # Get credits info (total_credits, total_usage)
+        credits_response = await client.get(
+            "https://openrouter.ai/api/v1/credits",
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "HTTP-Referer": "https://approximatecostpro.com",
+                "X-Title": "Approximate Cost Pro"
+            },
+            timeout=10.0
+        )
+        credits_response.raise_for_status()
+        credits_data = credits_response.json().get("data", {})
+        total_credits = credits_data.get("total_credits")
+        total_usage = credits_data.get("total_usage")
 
-            # Get detailed usage info (monthly, daily, weekly)
-            key_response = await client.get(
-                "https://openrouter.ai/api/v1/key",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "HTTP-Referer": "https://approximatecostpro.com",
-                    "X-Title": "Approximate Cost Pro"
-                },
-                timeout=10.0
-            )
-            key_response.raise_for_status()
-            key_data = key_response.json().get("data", {})
-            usage_monthly = key_data.get("usage_monthly")
-            usage_daily = key_data.get("usage_daily")
-            usage_weekly = key_data.get("usage_weekly")
+        # Get detailed usage info (monthly, daily, weekly)
+        key_response = await client.get(
+            "https://openrouter.ai/api/v1/key",
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "HTTP-Referer": "https://approximatecostpro.com",
+                "X-Title": "Approximate Cost Pro"
+            },
+            timeout=10.0
+        )
+        key_response.raise_for_status()
+        key_data = key_response.json().get("data", {})
+        usage_monthly = key_data.get("usage_monthly")
+        usage_daily = key_data.get("usage_daily")
+        usage_weekly = key_data.get("usage_weekly")
 
-            # Calculate remaining balance
-            has_credits = total_credits is not None
-            remaining = None
-            is_low_balance = False
+        # Calculate remaining balance
+        has_credits = total_credits is not None
+        remaining = None
+        is_low_balance = False
 
-            if has_credits and total_usage is not None:
-                remaining = total_credits - total_usage
-                is_low_balance = remaining <= warning_threshold
+        if has_credits and total_usage is not None:
+            remaining = total_credits - total_usage
+            is_low_balance = remaining <= warning_threshold
 
-            return LLMUsageResponse(
-                provider="OpenRouter",
-                usage=total_usage,
-                usage_monthly=usage_monthly,
-                usage_daily=usage_daily,
-                usage_weekly=usage_weekly,
-                total_credits=total_credits,
-                total_usage=total_usage,
-                remaining=remaining,
-                is_low_balance=is_low_balance,
-                has_credits=has_credits
-            )
+        return LLMUsageResponse(
+            provider="OpenRouter",
+            usage=total_usage,
+            usage_monthly=usage_monthly,
+            usage_daily=usage_daily,
+            usage_weekly=usage_weekly,
+            total_credits=total_credits,
+            total_usage=total_usage,
+            remaining=remaining,
+            is_low_balance=is_low_balance,
+            has_credits=has_credits
+        )
 
     except httpx.HTTPError as e:
         print(f"OpenRouter API error: {e}")
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import requests
 import re
@@ -6,6 +7,8 @@ import time
 import logging
 from typing import Dict, Any, Optional
 from services.settings_service import get_settings_service
+from services.http_client import get_http_session
+from services.llm_cache import LLMResponseCache, get_llm_cache
 
 # Logger setup
 logger = logging.getLogger("ai_service")
@@ -20,6 +23,14 @@ class APIError(Exception):
         self.retryable = retryable
 
 
+# LLM Critic yanıt vermezse kural tabanlı kontroller geçerli kalır
+REVIEW_FALLBACK = {"status": "ok", "issues": [], "general_comment": "LLM servisi yanıt vermedi, yerel kurallar geçerli."}
+
+# Retry sayısı ve bekleme süresi (saniye): (deneme + 1) * API_RETRY_BACKOFF
+API_MAX_ATTEMPTS = 3
+API_RETRY_BACKOFF = 2
+
+
 class AIAnalysisService:
     def __init__(self,
                  openrouter_key: Optional[str] = None,
@@ -39,8 +50,8 @@ class AIAnalysisService:
         self.settings_service.reload_settings()
         return self.settings_service.get_model_for_task(task)
 
-    def refine_feedback_description(self, text: str) -> str:
-        """Kullanıcının girdiği düzeltme metnini profesyonel bir dile çevirir."""
+    def _refine_feedback_messages(self, text: str) -> list:
+        """Geri bildirim iyileştirme isteğinin mesajları"""
         prompt = f"""Bir inşaat mühendisi gibi davran. Aşağıdaki gayri resmi düzeltme açıklamasını,
 gelecekteki analizlerde referans alınabilecek profesyonel, teknik ve net bir inşaat mühendisi
 talimatına (düzeltme notuna) dönüştür.
@@ -57,18 +68,18 @@ TALİMAT:
             {"role": "system", "content": "Sen uzman bir inşaat mühendisisin."},
             {"role": "user", "content": prompt}
         ]
+        return messages
 
+    def refine_feedback_description(self, text: str) -> str:
+        """Kullanıcının girdiği düzeltme metnini profesyonel bir dile çevirir."""
         try:
-            return self._submit_api_request(messages, model=self.get_model("refine"), temperature=0.3)
+            return self._submit_api_request(self._refine_feedback_messages(text), model=self.get_model("refine"), temperature=0.3, task="refine")
         except Exception as e:
             logger.error(f"Refine Feedback Error: {e}")
             return text
 
-    def refine_construction_request(self, text: str) -> str:
-        """
-        Kullanıcının basit talebini profesyonel bir poz analiz talebine dönüştürür.
-        Örnek: "beton kanal" → "Beton trapeze kanal imalatı, C25/30 kaliteli hazır beton ile"
-        """
+    def _refine_request_messages(self, text: str) -> list:
+        """Talep iyileştirme isteğinin mesajları"""
         prompt = f"""Sen 20+ yıl deneyimli bir Yaklaşık Maliyet ve İhale Uzmanı İnşaat Mühendisisin.
 Kullanıcının basit ve gayri resmi inşaat talebini, DETAYLI ve TEKNİK bir poz analiz talebine dönüştür.
 
@@ -110,18 +121,21 @@ KURALLAR:
             {"role": "system", "content": "Sen Yaklaşık Maliyet ve İhale Uzmanı bir İnşaat Mühendisisin. Basit talepleri profesyonel poz tanımlarına dönüştürürsün."},
             {"role": "user", "content": prompt}
         ]
+        return messages
 
+    def refine_construction_request(self, text: str) -> str:
+        """
+        Kullanıcının basit talebini profesyonel bir poz analiz talebine dönüştürür.
+        Örnek: "beton kanal" → "Beton trapeze kanal imalatı, C25/30 kaliteli hazır beton ile"
+        """
         try:
-            return self._submit_api_request(messages, model=self.get_model("refine"), temperature=0.4)
+            return self._submit_api_request(self._refine_request_messages(text), model=self.get_model("refine"), temperature=0.4, task="refine")
         except Exception as e:
             logger.error(f"Refine Request Error: {e}")
             return text
 
-    def review_analysis(self, analysis_data: Dict[str, Any], description: str) -> Dict[str, Any]:
-        """
-        Analizi LLM (Kıdemli Mühendis) ile inceler.
-        Mantık hatalarını, eksik kalemleri ve fiyat tutarsızlıklarını semantik olarak kontrol eder.
-        """
+    def _review_messages(self, analysis_data: Dict[str, Any], description: str) -> list:
+        """LLM Critic isteğinin mesajları"""
         prompt = f"""Sen Çevre ve Şehircilik Bakanlığı standartlarına hakim, 30 yıllık tecrübeli bir KIDEMLİ İHALE BAŞMÜHENDİSİSİN.
 Görevin, önüne gelen birim fiyat analizini (yaklaşık maliyet cetvelini) denetlemek ve hataları bulmaktır.
 
@@ -228,27 +242,42 @@ Eğer analiz MÜKEMMEL ise "issues" listesini boş bırak ve status="ok" döndü
 Çok katı ve dikkatli ol. Hata yoksa zorlama.
 """
 
-        errors = []
+        return [
+            {"role": "system", "content": "Sen hata affetmeyen, titiz bir Başmühendissin. JSON formatında yanıt verirsin."},
+            {"role": "user", "content": prompt}
+        ]
 
+    def review_analysis(self, analysis_data: Dict[str, Any], description: str) -> Dict[str, Any]:
+        """
+        Analizi LLM (Kıdemli Mühendis) ile inceler.
+        Mantık hatalarını, eksik kalemleri ve fiyat tutarsızlıklarını semantik olarak kontrol eder.
+        """
         try:
-            messages = [
-                {"role": "system", "content": "Sen hata affetmeyen, titiz bir Başmühendissin. JSON formatında yanıt verirsin."},
-                {"role": "user", "content": prompt}
-            ]
             logger.info("LLM Critic (OpenRouter) çağrılıyor...")
             content = self._submit_api_request(
-                messages, 
+                self._review_messages(analysis_data, description),
                 model=self.get_model("critic"), 
                 temperature=0.2,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                task="critic"
             )
             return self._process_response(content)
         except Exception as e:
-            errors.append(f"Critic Error: {e}")
             logger.error(f"Critic Failed: {e}")
 
         # If LLM fails, return empty result (let rule-based system handle it)
-        return {"status": "ok", "issues": [], "general_comment": "LLM servisi yanıt vermedi, yerel kurallar geçerli."}
+        return dict(REVIEW_FALLBACK)
+
+    def _analysis_messages(self, description: str, unit: str, context_data: str) -> list:
+        """Analiz isteğinin mesajları"""
+        prompt = self._build_professional_prompt(description, unit, context_data)
+        return [
+            {
+                "role": "system",
+                "content": "Sen Türkiye'de çalışan Yaklaşık Maliyet ve İhale Uzmanı bir İnşaat Mühendisisin. 4734 sayılı Kamu İhale Kanunu, ÇŞB/DSİ/Karayolları birim fiyat analizleri ve resmî işçilik normlarına hâkimsin. İhale dosyaları hazırlama konusunda 20+ yıl deneyime sahipsin. Poz analizleri oluştururken:\n\n• Malzeme miktarlarını ÇŞB resmî analizlerinden alırsın\n• Fire oranlarını KİK kabul gören değerlerde uygularsın (Demir %3-5, Beton %1-2, Kalıp %5-10)\n• İşçilik sürelerini adam/saat formatında ve resmî normlara uygun yazarsın\n• Makine kapasitelerini ve sürelerini gerçekçi hesaplarsın\n• Emsal poz referanslarını mutlaka kullanırsın\n• Nakliye mesafesini 20 km kabul edersin\n• Genel gider + kâr (%25) birim fiyatlara yedirilmiştir, ayrı satır yazmassın\n\nSadece JSON formatında, aşırı düşük sorgulamasında geçebilecek kalitede, gerçekçi ve piyasa rayiçlerine uygun analiz yanıtları verirsin."
+            },
+            {"role": "user", "content": prompt}
+        ]
 
     def generate_analysis(
         self,
@@ -269,17 +298,9 @@ Eğer analiz MÜKEMMEL ise "issues" listesini boş bırak ve status="ok" döndü
             model: Kullanılacak model (None ise varsayılan)
             temperature: LLM temperature (None ise varsayılan 0.1)
         """
-        prompt = self._build_professional_prompt(description, unit, context_data)
-        
         try:
-            messages = [
-                {
-                    "role": "system",
-                    "content": "Sen Türkiye'de çalışan Yaklaşık Maliyet ve İhale Uzmanı bir İnşaat Mühendisisin. 4734 sayılı Kamu İhale Kanunu, ÇŞB/DSİ/Karayolları birim fiyat analizleri ve resmî işçilik normlarına hâkimsin. İhale dosyaları hazırlama konusunda 20+ yıl deneyime sahipsin. Poz analizleri oluştururken:\n\n• Malzeme miktarlarını ÇŞB resmî analizlerinden alırsın\n• Fire oranlarını KİK kabul gören değerlerde uygularsın (Demir %3-5, Beton %1-2, Kalıp %5-10)\n• İşçilik sürelerini adam/saat formatında ve resmî normlara uygun yazarsın\n• Makine kapasitelerini ve sürelerini gerçekçi hesaplarsın\n• Emsal poz referanslarını mutlaka kullanırsın\n• Nakliye mesafesini 20 km kabul edersin\n• Genel gider + kâr (%25) birim fiyatlara yedirilmiştir, ayrı satır yazmassın\n\nSadece JSON formatında, aşırı düşük sorgulamasında geçebilecek kalitede, gerçekçi ve piyasa rayiçlerine uygun analiz yanıtları verirsin."
-                },
-                {"role": "user", "content": prompt}
-            ]
-            
+            messages = self._analysis_messages(description, unit, context_data)
+
             # Resolve model
             actual_model = model or self.get_model("analyze")
             logger.info(f"Analiz oluşturuluyor... (Model: {actual_model})")
@@ -289,7 +310,8 @@ Eğer analiz MÜKEMMEL ise "issues" listesini boş bırak ve status="ok" döndü
                 model=actual_model, 
                 temperature=temperature if temperature is not None else 0.1,
                 max_tokens=4096,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                task="analyze"
             )
             return self._process_response(content)
             
@@ -780,11 +802,9 @@ SADECE aşağıdaki JSON formatında yanıt ver, başka hiçbir şey yazma:
 • poz_tarifi alanını İMALAT TÜRÜNE ÖZEL olarak doldur, genel şablon kullanma!
 • JSON dışında hiçbir şey yazma"""
 
-    def _submit_api_request(self, messages: list, model: str, temperature: float = 0.5, max_tokens: int = 4000, response_format: dict = None) -> str:
-        """
-        Merkezi API istek yöneticisi.
-        Otomatik retry, hata yönetimi ve loglama içerir.
-        """
+    def _build_api_request(self, messages: list, model: str, temperature: float, max_tokens: int,
+                           response_format: dict = None) -> tuple:
+        """OpenRouter chat/completions isteğinin (headers, data) ikilisi"""
         if not self.openrouter_key:
             raise APIError("OpenRouter API Key bulunamadı", "OpenRouter", 401)
 
@@ -825,66 +845,131 @@ SADECE aşağıdaki JSON formatında yanıt ver, başka hiçbir şey yazma:
                 else:
                     logger.warning(f"[AI_SERVICE] Model '{model}' json_object formatını desteklemiyor olabilir, response_format eklenmedi.")
 
+        return headers, data
+
+    def _parse_api_response(self, status_code: int, text: str, json_fn, data: dict) -> Optional[str]:
+        """
+        Yanıtı doğrula ve içeriği döndür.
+        None: response_format kaldırıldı, istek hemen tekrarlanmalı (JSON mode + web search çakışması).
+        """
+        # Özel hata durumları
+        if status_code == 429:
+            raise APIError("Rate limit aşıldı", "OpenRouter", 429, retryable=True)
+        elif status_code == 401:
+            raise APIError("API anahtarı geçersiz", "OpenRouter", 401, retryable=False)
+        elif status_code >= 500:
+            raise APIError(f"Sunucu hatası ({status_code})", "OpenRouter", status_code, retryable=True)
+        elif status_code == 400:
+            err_msg = text
+            logger.error(f"[AI_SERVICE] 400 Bad Request Payload: {json.dumps(data, ensure_ascii=False)[:1000]}")
+            logger.error(f"[AI_SERVICE] 400 Bad Request Response: {err_msg}")
+            
+            # ÖZEL DURUM: Web Search ve JSON Mode çakışması
+            if "Web Search cannot be used with JSON mode" in err_msg and "response_format" in data:
+                logger.warning("[AI_SERVICE] JSON Mode + Web Search çakışması tespit edildi. JSON Mode kapatılarak tekrar deneniyor...")
+                del data["response_format"]
+                return None
+            
+            # Diğer 400 hataları retry edilemez
+            raise APIError(f"İstek hatası (400): {err_msg}", "OpenRouter", 400, retryable=False)
+        elif status_code >= 400:
+            raise APIError(f"İstek hatası ({status_code}): {text[:500]}", "OpenRouter", status_code, retryable=True)
+
+        resp_json = json_fn()
+
+        # Debug: API yanıtını logla
+        logger.debug(f"[AI_SERVICE] API Response (truncated): {json.dumps(resp_json, ensure_ascii=False)[:2000]}")
+
+        if 'choices' not in resp_json or not resp_json['choices']:
+            logger.error(f"[AI_SERVICE] API boş choices döndürdü. Full response: {resp_json}")
+            raise APIError("API boş yanıt döndürdü", "OpenRouter", 500, retryable=True)
+            
+        message_data = resp_json['choices'][0].get('message', {})
+        content = message_data.get('content')
+        
+        # FALLBACK: Çıktı 'reasoning' alanındaysa oradan al (o4-mini vb. için)
+        if not content and message_data.get('reasoning'):
+            logger.info("[AI_SERVICE] Content boş, reasoning kullanılıyor.")
+            content = message_data.get('reasoning')
+
+        logger.debug(f"[AI_SERVICE] Message data keys: {list(message_data.keys())}")
+        logger.debug(f"[AI_SERVICE] Content type: {type(content)}, length: {len(content) if content else 0}")
+
+        if not content or not content.strip():
+            logger.error(f"[AI_SERVICE] API boş içerik döndürdü. Message data: {message_data}")
+            raise APIError("API boş içerik döndürdü", "OpenRouter", 500, retryable=True)
+
+        logger.debug(f"[AI_SERVICE] API Response Length: {len(content)}")
+        return content.strip()
+
+    def _cache_lookup(self, task: Optional[str], data: dict) -> tuple:
+        """
+        Ağ çağrısından önce kalıcı cache'e bak.
+        Dönüş: (cache, key, content) - cache kapalıysa (None, None, None), miss ise content None.
+        """
+        cache, key = self._cache_key(task, data)
+        if cache is None:
+            return None, None, None
+        return cache, key, self._cache_get(cache, key, task, data["model"])
+
+    def _cache_key(self, task: Optional[str], data: dict) -> tuple:
+        """(cache, key) - görev için cache kapalıysa (None, None); cache sorgulanmaz"""
+        cache = get_llm_cache(task) if task else None
+        if cache is None:
+            return None, None
+        return cache, LLMResponseCache.make_key(data["model"], data["messages"], data["temperature"],
+                                                data["max_tokens"], data.get("response_format"))
+
+    def _cache_get(self, cache: LLMResponseCache, key: str, task: str, model: str) -> Optional[str]:
+        content = cache.get(key, task)
+        if content is not None:
+            logger.info(f"[LLM_CACHE] Cache hit ({task}, {model})")
+        return content
+
+    def _cache_store(self, cache: Optional[LLMResponseCache], key: str, task: str, model: str,
+                     content: str, response_format: dict = None):
+        """Yanıtı cache'e yaz; JSON beklenen yanıt parse edilemiyorsa saklama (bozuk çıktı kalıcılaşmasın)"""
+        if cache is None:
+            return
+        if response_format:
+            try:
+                self._process_response(content)
+            except Exception:
+                logger.warning(f"[LLM_CACHE] Parse edilemeyen yanıt cache'lenmedi ({task}, {model})")
+                return
+        try:
+            cache.put(key, content, task, model)
+        except Exception as e:
+            logger.warning(f"[LLM_CACHE] Cache yazılamadı: {e}")
+
+    def _submit_api_request(self, messages: list, model: str, temperature: float = 0.5, max_tokens: int = 4000,
+                            response_format: dict = None, task: str = None) -> str:
+        """
+        Merkezi API istek yöneticisi.
+        Otomatik retry, hata yönetimi ve loglama içerir.
+        task verilirse (analyze/refine/critic) ağ çağrısından önce kalıcı LLM cache'ine bakılır.
+        """
+        headers, data = self._build_api_request(messages, model, temperature, max_tokens, response_format)
+        cache, cache_key, cached = self._cache_lookup(task, data)
+        if cached is not None:
+            return cached
         last_exception = None
 
-        for attempt in range(3):
+        for attempt in range(API_MAX_ATTEMPTS):
             try:
-                logger.debug(f"API Request ({attempt+1}/3): {model}")
-                response = requests.post(
+                logger.debug(f"API Request ({attempt+1}/{API_MAX_ATTEMPTS}): {model}")
+                # Paylaşılan keep-alive havuzu: her çağrıda yeni TCP + TLS el sıkışması yapılmaz
+                response = get_http_session().post(
                     f"{self.base_url}/chat/completions",
                     headers=headers,
                     json=data,
                     timeout=120
                 )
-                
-                # Özel hata durumları
-                if response.status_code == 429:
-                    raise APIError("Rate limit aşıldı", "OpenRouter", 429, retryable=True)
-                elif response.status_code == 401:
-                    raise APIError("API anahtarı geçersiz", "OpenRouter", 401, retryable=False)
-                elif response.status_code >= 500:
-                    raise APIError(f"Sunucu hatası ({response.status_code})", "OpenRouter", response.status_code, retryable=True)
-                elif response.status_code == 400:
-                    err_msg = response.text
-                    logger.error(f"[AI_SERVICE] 400 Bad Request Payload: {json.dumps(data, ensure_ascii=False)[:1000]}")
-                    logger.error(f"[AI_SERVICE] 400 Bad Request Response: {err_msg}")
-                    
-                    # ÖZEL DURUM: Web Search ve JSON Mode çakışması
-                    if "Web Search cannot be used with JSON mode" in err_msg and "response_format" in data:
-                        logger.warning("[AI_SERVICE] JSON Mode + Web Search çakışması tespit edildi. JSON Mode kapatılarak tekrar deneniyor...")
-                        del data["response_format"]
-                        continue # Döngünün başına dön ve tekrar dene (response_format olmadan)
-                    
-                    # Diğer 400 hataları retry edilemez
-                    raise APIError(f"İstek hatası (400): {err_msg}", "OpenRouter", 400, retryable=False)
-                
-                response.raise_for_status()
-                resp_json = response.json()
-
-                # Debug: API yanıtını logla
-                logger.debug(f"[AI_SERVICE] API Response (truncated): {json.dumps(resp_json, ensure_ascii=False)[:2000]}")
-
-                if 'choices' not in resp_json or not resp_json['choices']:
-                    logger.error(f"[AI_SERVICE] API boş choices döndürdü. Full response: {resp_json}")
-                    raise APIError("API boş yanıt döndürdü", "OpenRouter", 500, retryable=True)
-                    
-                message_data = resp_json['choices'][0].get('message', {})
-                content = message_data.get('content')
-                
-                # FALLBACK: Çıktı 'reasoning' alanındaysa oradan al (o4-mini vb. için)
-                if not content and message_data.get('reasoning'):
-                    logger.info("[AI_SERVICE] Content boş, reasoning kullanılıyor.")
-                    content = message_data.get('reasoning')
-
-                logger.debug(f"[AI_SERVICE] Message data keys: {list(message_data.keys())}")
-                logger.debug(f"[AI_SERVICE] Content type: {type(content)}, length: {len(content) if content else 0}")
-
-                if not content or not content.strip():
-                    logger.error(f"[AI_SERVICE] API boş içerik döndürdü. Message data: {message_data}")
-                    raise APIError("API boş içerik döndürdü", "OpenRouter", 500, retryable=True)
-
-                logger.debug(f"[AI_SERVICE] API Response Length: {len(content)}")
-                return content.strip()
+                content = self._parse_api_response(response.status_code, response.text, response.json, data)
+                if content is None:
+                    continue # Döngünün başına dön ve tekrar dene (response_format olmadan)
+                self._cache_store(cache, cache_key, task, data["model"], content, response_format)
+                return content
 
             except (requests.exceptions.Timeout, requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
                 logger.warning(f"Bağlantı hatası (Deneme {attempt+1}): {e}")
@@ -905,8 +990,8 @@ SADECE aşağıdaki JSON formatında yanıt ver, başka hiçbir şey yazma:
                 break
             
             # Retry beklemesi (exponential backoff benzeri)
-            if attempt < 2:
-                time.sleep((attempt + 1) * 2)
+            if attempt < API_MAX_ATTEMPTS - 1:
+                time.sleep((attempt + 1) * API_RETRY_BACKOFF)
 
         raise last_exception or Exception("Bilinmeyen API hatası")
 
@@ -1035,6 +1120,36 @@ SADECE aşağıdaki JSON formatında yanıt ver, başka hiçbir şey yazma:
 
         return json_str
 
+    def _finalize_component(self, comp: Dict[str, Any]) -> Dict[str, Any]:
+        """Tek bileşeni normalize et: varsayılan alanlar, sayısal dönüşüm ve tutar (akışta da kullanılır)"""
+        # Gerekli alanları kontrol et
+        comp.setdefault("type", "Diğer")
+        comp.setdefault("code", "")
+        comp.setdefault("name", "")
+        comp.setdefault("unit", "")
+
+        # Sayısal değerleri güvenli hale getir
+        try:
+            qty = comp.get("quantity", 0)
+            if isinstance(qty, str):
+                qty = qty.replace(',', '.')
+            comp["quantity"] = round(float(qty), 4)
+        except (ValueError, TypeError):
+            comp["quantity"] = 0.0
+
+        try:
+            price = comp.get("unit_price", 0)
+            if isinstance(price, str):
+                price = price.replace(',', '.')
+            comp["unit_price"] = round(float(price), 2)
+        except (ValueError, TypeError):
+            comp["unit_price"] = 0.0
+
+        # Tutarı hesapla
+        comp["total_price"] = round(comp["quantity"] * comp["unit_price"], 2)
+
+        return comp
+
     def _finalize_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Veri yapısını doğrula ve hesaplamaları yap"""
         if "components" not in data:
@@ -1044,31 +1159,7 @@ SADECE aşağıdaki JSON formatında yanıt ver, başka hiçbir şey yazma:
             data["explanation"] = "AI tarafından oluşturulan analiz."
 
         for comp in data["components"]:
-            # Gerekli alanları kontrol et
-            comp.setdefault("type", "Diğer")
-            comp.setdefault("code", "")
-            comp.setdefault("name", "")
-            comp.setdefault("unit", "")
-
-            # Sayısal değerleri güvenli hale getir
-            try:
-                qty = comp.get("quantity", 0)
-                if isinstance(qty, str):
-                    qty = qty.replace(',', '.')
-                comp["quantity"] = round(float(qty), 4)
-            except (ValueError, TypeError):
-                comp["quantity"] = 0.0
-
-            try:
-                price = comp.get("unit_price", 0)
-                if isinstance(price, str):
-                    price = price.replace(',', '.')
-                comp["unit_price"] = round(float(price), 2)
-            except (ValueError, TypeError):
-                comp["unit_price"] = 0.0
-
-            # Tutarı hesapla
-            comp["total_price"] = round(comp["quantity"] * comp["unit_price"], 2)
+            self._finalize_component(comp)
 
         # Poz tarifi alanını kontrol et ve varsayılan değerler ata
         if "poz_tarifi" not in data:
@@ -1099,3 +1190,251 @@ SADECE aşağıdaki JSON formatında yanıt ver, başka hiçbir şey yazma:
             })
 
         return data
+
+
+class AsyncAIAnalysisService(AIAnalysisService):
+    """
+    AIAnalysisService'in asyncio varyantı.
+
+    İstekler paylaşılan httpx.AsyncClient üzerinden event loop'ta yapılır; retry
+    beklemesi asyncio.sleep ile olur. Böylece yüzlerce eşzamanlı LLM çağrısı
+    threadpool'u doldurmaz. Çağıran task iptal edilirse (istemci bağlantısı
+    koptu, gather iptali vb.) bekleyen HTTP isteği de iptal edilir.
+    Senkron metodlar (generate_analysis, review_analysis ...) aynen kullanılabilir.
+    """
+
+    async def _submit_api_request_async(self, messages: list, model: str, temperature: float = 0.5,
+                                        max_tokens: int = 4000, response_format: dict = None,
+                                        task: str = None) -> str:
+        """_submit_api_request ile aynı retry/hata ve cache semantiği, bloklamadan"""
+        import httpx
+        from services.http_client import get_async_http_client
+
+        headers, data = self._build_api_request(messages, model, temperature, max_tokens, response_format)
+        # SQLite okuma/yazma (ve diğer thread'lerle paylaşılan cache kilidi) event loop'u bloklamasın
+        cache, cache_key = self._cache_key(task, data)
+        cached = (await asyncio.to_thread(self._cache_get, cache, cache_key, task, data["model"])
+                  if cache is not None else None)
+        if cached is not None:
+            return cached
+        client = get_async_http_client()
+        last_exception = None
+
+        for attempt in range(API_MAX_ATTEMPTS):
+            try:
+                logger.debug(f"Async API Request ({attempt+1}/{API_MAX_ATTEMPTS}): {model}")
+                response = await client.post(
+                    f"{self.base_url}/chat/completions",
+                    headers=headers,
+                    json=data,
+                    timeout=120
+                )
+                content = self._parse_api_response(response.status_code, response.text, response.json, data)
+                if content is None:
+                    continue # response_format olmadan hemen tekrar dene
+                if cache is not None:
+                    await asyncio.to_thread(self._cache_store, cache, cache_key, task, data["model"],
+                                            content, response_format)
+                return content
+
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                logger.warning(f"Bağlantı hatası (Deneme {attempt+1}): {e}")
+                last_exception = APIError(f"Bağlantı sorunu: {str(e)}", "OpenRouter", retryable=True)
+            except httpx.HTTPError as e:
+                logger.warning(f"İstek hatası (Deneme {attempt+1}): {e}")
+                last_exception = APIError(f"İstek hatası: {str(e)}", "OpenRouter", retryable=True)
+            except APIError as e:
+                logger.warning(f"API Hatası (Deneme {attempt+1}): {e}")
+                last_exception = e
+                if not e.retryable:
+                    raise e
+            except Exception as e:
+                logger.error(f"Beklenmeyen Hata (Deneme {attempt+1}): {e}")
+                last_exception = e
+                break
+
+            if attempt < API_MAX_ATTEMPTS - 1:
+                await asyncio.sleep((attempt + 1) * API_RETRY_BACKOFF)
+
+        raise last_exception or Exception("Bilinmeyen API hatası")
+
+    @staticmethod
+    def _parse_stream_line(line: str) -> Optional[str]:
+        """
+        OpenRouter SSE satırından içerik parçasını çıkar.
+        ": OPENROUTER PROCESSING" gibi yorum satırları ve [DONE] yok sayılır.
+        """
+        if not line.startswith("data:"):
+            return None
+        payload = line[5:].strip()
+        if not payload or payload == "[DONE]":
+            return None
+        event = json.loads(payload)
+        if event.get("error"):
+            # Akış ortasında sağlayıcı hatası
+            error = event["error"]
+            message = error.get("message", str(error)) if isinstance(error, dict) else str(error)
+            raise APIError(f"Akış hatası: {message}", "OpenRouter", 500, retryable=True)
+        choices = event.get("choices") or []
+        if not choices:
+            return None
+        return (choices[0].get("delta") or {}).get("content") or None
+
+    async def _stream_api_request_async(self, messages: list, model: str, temperature: float = 0.5,
+                                        max_tokens: int = 4000, response_format: dict = None,
+                                        task: str = None):
+        """
+        `stream: true` ile istek yapar ve içerik parçalarını geldikçe verir (async generator).
+        Retry/hata semantiği _submit_api_request_async ile aynıdır; ancak parça iletilmeye
+        başladıktan sonra hata olursa tekrar denenmez (tüketici içeriği zaten almıştır).
+        Cache hit olursa tüm yanıt tek parça halinde verilir.
+        """
+        import httpx
+        from services.http_client import get_async_http_client
+
+        headers, data = self._build_api_request(messages, model, temperature, max_tokens, response_format)
+        cache, cache_key = self._cache_key(task, data)
+        cached = (await asyncio.to_thread(self._cache_get, cache, cache_key, task, data["model"])
+                  if cache is not None else None)
+        if cached is not None:
+            yield cached
+            return
+        client = get_async_http_client()
+        last_exception = None
+
+        for attempt in range(API_MAX_ATTEMPTS):
+            parts = []
+            try:
+                logger.debug(f"Stream API Request ({attempt+1}/{API_MAX_ATTEMPTS}): {model}")
+                async with client.stream(
+                    "POST",
+                    f"{self.base_url}/chat/completions",
+                    headers=headers,
+                    json={**data, "stream": True},
+                    timeout=120
+                ) as response:
+                    if response.status_code != 200:
+                        body = (await response.aread()).decode("utf-8", errors="replace")
+                        if self._parse_api_response(response.status_code, body, lambda: json.loads(body), data) is None:
+                            continue # response_format olmadan hemen tekrar dene
+                    async for line in response.aiter_lines():
+                        chunk = self._parse_stream_line(line)
+                        if chunk:
+                            parts.append(chunk)
+                            yield chunk
+
+                content = "".join(parts)
+                if not content.strip():
+                    raise APIError("API boş içerik döndürdü", "OpenRouter", 500, retryable=True)
+                if cache is not None:
+                    await asyncio.to_thread(self._cache_store, cache, cache_key, task, data["model"],
+                                            content.strip(), response_format)
+                return
+
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                logger.warning(f"Bağlantı hatası (Deneme {attempt+1}): {e}")
+                last_exception = APIError(f"Bağlantı sorunu: {str(e)}", "OpenRouter", retryable=True)
+            except httpx.HTTPError as e:
+                logger.warning(f"İstek hatası (Deneme {attempt+1}): {e}")
+                last_exception = APIError(f"İstek hatası: {str(e)}", "OpenRouter", retryable=True)
+            except APIError as e:
+                logger.warning(f"API Hatası (Deneme {attempt+1}): {e}")
+                last_exception = e
+                if not e.retryable:
+                    raise e
+            except Exception as e:
+                logger.error(f"Beklenmeyen Hata (Deneme {attempt+1}): {e}")
+                last_exception = e
+                break
+
+            if parts:
+                # Kısmi içerik iletildi; yeniden denemek tüketiciye tekrarlanan içerik gönderir
+                raise last_exception
+
+            if attempt < API_MAX_ATTEMPTS - 1:
+                await asyncio.sleep((attempt + 1) * API_RETRY_BACKOFF)
+
+        raise last_exception or Exception("Bilinmeyen API hatası")
+
+    async def stream_analysis_async(
+        self,
+        description: str,
+        unit: str,
+        context_data: str = "",
+        model: str = None,
+        temperature: float = None
+    ):
+        """generate_analysis_async'in akış varyantı: ham JSON metnini parça parça verir"""
+        actual_model = model or self.get_model("analyze")
+        logger.info(f"Analiz oluşturuluyor (stream)... (Model: {actual_model})")
+        async for chunk in self._stream_api_request_async(
+            self._analysis_messages(description, unit, context_data),
+            model=actual_model,
+            temperature=temperature if temperature is not None else 0.1,
+            max_tokens=4096,
+            response_format={"type": "json_object"},
+            task="analyze"
+        ):
+            yield chunk
+
+    async def refine_feedback_description_async(self, text: str) -> str:
+        """refine_feedback_description'ın async karşılığı"""
+        try:
+            return await self._submit_api_request_async(
+                self._refine_feedback_messages(text), model=self.get_model("refine"), temperature=0.3, task="refine"
+            )
+        except Exception as e:
+            logger.error(f"Refine Feedback Error: {e}")
+            return text
+
+    async def refine_construction_request_async(self, text: str) -> str:
+        """refine_construction_request'in async karşılığı"""
+        try:
+            return await self._submit_api_request_async(
+                self._refine_request_messages(text), model=self.get_model("refine"), temperature=0.4, task="refine"
+            )
+        except Exception as e:
+            logger.error(f"Refine Request Error: {e}")
+            return text
+
+    async def review_analysis_async(self, analysis_data: Dict[str, Any], description: str) -> Dict[str, Any]:
+        """review_analysis'in async karşılığı"""
+        try:
+            logger.info("LLM Critic (OpenRouter, async) çağrılıyor...")
+            content = await self._submit_api_request_async(
+                self._review_messages(analysis_data, description),
+                model=self.get_model("critic"),
+                temperature=0.2,
+                response_format={"type": "json_object"},
+                task="critic"
+            )
+            return self._process_response(content)
+        except Exception as e:
+            logger.error(f"Critic Failed: {e}")
+        return dict(REVIEW_FALLBACK)
+
+    async def generate_analysis_async(
+        self,
+        description: str,
+        unit: str,
+        context_data: str = "",
+        model: str = None,
+        temperature: float = None
+    ) -> Dict[str, Any]:
+        """generate_analysis'in async karşılığı (aynı argümanlar ve hata davranışı)"""
+        try:
+            actual_model = model or self.get_model("analyze")
+            logger.info(f"Analiz oluşturuluyor (async)... (Model: {actual_model})")
+            content = await self._submit_api_request_async(
+                self._analysis_messages(description, unit, context_data),
+                model=actual_model,
+                temperature=temperature if temperature is not None else 0.1,
+                max_tokens=4096,
+                response_format={"type": "json_object"},
+                task="analyze"
+            )
+            return self._process_response(content)
+        except Exception as e:
+            error_msg = f"AI Analiz Hatası: {e}"
+            logger.error(error_msg)
+            raise Exception(error_msg)
@@ -26,11 +26,15 @@ class ConsensusAnalysisService:
         # Paralel olarak tüm modellerden sonuç al
         tasks = []
         for model in self.models:
-            # ai_service.generate_analysis sync method, asyncio.to_thread ile çağır
-            task = asyncio.to_thread(
-                self.ai_service.generate_analysis,
-                description, unit, context_data, model
-            )
+            if hasattr(self.ai_service, "generate_analysis_async"):
+                # Async servis: istekler event loop'ta, thread tutmadan bekler
+                task = self.ai_service.generate_analysis_async(description, unit, context_data, model)
+            else:
+                # ai_service.generate_analysis sync method, asyncio.to_thread ile çağır
+                task = asyncio.to_thread(
+                    self.ai_service.generate_analysis,
+                    description, unit, context_data, model
+                )
             tasks.append(task)
 
         results = await asyncio.gather(*tasks, return_exceptions=True)
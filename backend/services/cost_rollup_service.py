@@ -0,0 +1,384 @@
+"""
+Alt analiz zinciri üzerinden birim fiyat roll-up motoru.
+
+ÇŞB analizlerinde bir pozun bileşenleri başka pozların analizleri olabilir
+(örn. 15.xxx içinde 15.100.xxxx nakliye analizi). Bu servis analizleri bir
+bağımlılık grafiği (DAG) olarak tutar, topolojik sırayla ve memoize ederek
+değerlendirir; temel (rayiç) fiyat değişince sadece etkilenen bileşik pozları
+yeniden hesaplar.
+"""
+import json
+import hashlib
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from config import get_rollup_config
+from utils.logger import get_price_logger
+
+logger = get_price_logger()
+
+
+def parse_tr_number(value: Any) -> float:
+    """Türkçe formatlı sayıyı float'a çevir ("1.234,56" -> 1234.56, "0,021" -> 0.021)"""
+    if value is None:
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    if not text:
+        return 0.0
+    try:
+        if ',' in text:
+            text = text.replace('.', '').replace(',', '.')
+        return float(text)
+    except ValueError:
+        return 0.0
+
+
+class CostRollupService:
+    """
+    Analiz bağımlılık grafiği ve maliyet roll-up hesaplayıcısı.
+
+    - Yaprak düğümler: rayiç pozlar (işçilik, malzeme, makine) → base_prices
+    - Bileşik düğümler: alt bileşenleri olan analizler → nodes
+    """
+
+    def __init__(self, overhead_rate: Optional[float] = None, nested_use_subtotal: Optional[bool] = None):
+        config = get_rollup_config()
+        self.overhead_rate = config.OVERHEAD_RATE if overhead_rate is None else overhead_rate
+        self.nested_use_subtotal = config.NESTED_USE_SUBTOTAL if nested_use_subtotal is None else nested_use_subtotal
+
+        self.base_prices: Dict[str, float] = {}
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.dependents: Dict[str, Set[str]] = {}
+
+        # Memoize edilmiş değerler
+        self._subtotals: Dict[str, float] = {}
+        self._unit_prices: Dict[str, float] = {}
+
+        # Topolojik sıra (bileşik düğümler, yapraklardan köklere)
+        self._order: List[str] = []
+        self._position: Dict[str, int] = {}
+        self._cyclic: Set[str] = set()
+        self._dirty = True
+
+        self._lock = threading.RLock()
+        self.last_recompute: Dict[str, Any] = {}
+
+    # ------------------------------------------------------------------
+    # GRAF OLUŞTURMA
+    # ------------------------------------------------------------------
+
+    def set_base_prices(self, poz_data: Dict[str, Dict[str, Any]]):
+        """POZ_DATA'daki birim fiyatları yaprak fiyatları olarak yükle"""
+        with self._lock:
+            self.base_prices = {
+                code: parse_tr_number(info.get('unit_price', '0'))
+                for code, info in poz_data.items()
+            }
+            self._dirty = True
+
+    def add_analysis(self, poz_no: str, analysis: Dict[str, Any]):
+        """
+        Tek bir analizi grafa ekle.
+        PozAnalyzer ('sub_analyses') ve LocalPDFService ('components') formatlarını kabul eder.
+        """
+        raw_components = analysis.get('sub_analyses')
+        if raw_components is None:
+            raw_components = analysis.get('components', [])
+
+        components = []
+        for comp in raw_components:
+            code = str(comp.get('code', '')).strip()
+            if not code or code == poz_no:
+                continue
+            components.append({
+                'code': code,
+                'type': comp.get('type', ''),
+                'name': comp.get('name', ''),
+                'unit': comp.get('unit', ''),
+                'quantity': parse_tr_number(comp.get('quantity')),
+                # Analiz satırındaki fiyat: koda ait başka kaynak yoksa kullanılır
+                'fallback_price': parse_tr_number(comp.get('unit_price', comp.get('price'))),
+            })
+
+        if not components:
+            return
+
+        with self._lock:
+            old = self.nodes.get(poz_no)
+            if old:
+                for comp in old['components']:
+                    self.dependents.get(comp['code'], set()).discard(poz_no)
+
+            self.nodes[poz_no] = {
+                'poz_no': poz_no,
+                'description': analysis.get('description') or analysis.get('name', ''),
+                'unit': analysis.get('unit', ''),
+                'components': components,
+            }
+            for comp in components:
+                self.dependents.setdefault(comp['code'], set()).add(poz_no)
+            self._dirty = True
+
+    def load_analyses(self, analyses: Dict[str, Dict[str, Any]]):
+        """Birden fazla analizi grafa ekle"""
+        for poz_no, analysis in analyses.items():
+            self.add_analysis(poz_no, analysis)
+        logger.info(f"[ROLLUP] {len(self.nodes)} bileşik analiz grafa eklendi.")
+
+    def load_from_folder(self, analiz_folder: Path) -> int:
+        """
+        ANALIZ klasöründeki PDF'lerden (PozAnalyzer) analizleri yükle.
+        Sonuçlar dosya hash'leri ile cache'lenir.
+        """
+        analiz_folder = Path(analiz_folder)
+        if not analiz_folder.exists():
+            logger.warning(f"[ROLLUP] ANALIZ klasörü bulunamadı: {analiz_folder}")
+            return 0
+
+        cache_file = Path(__file__).parent / "cache" / "poz_analyses_cache.json"
+        file_hashes = {}
+        for pdf_file in sorted(analiz_folder.glob("*.pdf")):
+            stat = pdf_file.stat()
+            file_hashes[pdf_file.name] = hashlib.md5(
+                f"{pdf_file.name}_{stat.st_size}_{stat.st_mtime}".encode()
+            ).hexdigest()
+
+        analyses = None
+        if cache_file.exists():
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    cache_data = json.load(f)
+                if cache_data.get('file_hashes') == file_hashes:
+                    analyses = cache_data.get('analyses', {})
+                    logger.info(f"[ROLLUP] Analizler cache'den yüklendi ({len(analyses)} poz)")
+            except Exception as e:
+                logger.warning(f"[ROLLUP] Cache okunamadı: {e}")
+
+        if analyses is None:
+            from services.data_manager import PozAnalyzer
+            analyses = PozAnalyzer(analiz_folder).run()
+            try:
+                cache_file.parent.mkdir(exist_ok=True)
+                with open(cache_file, 'w', encoding='utf-8') as f:
+                    json.dump({
+                        'timestamp': datetime.now().isoformat(),
+                        'file_hashes': file_hashes,
+                        'analyses': analyses
+                    }, f, ensure_ascii=False)
+            except Exception as e:
+                logger.warning(f"[ROLLUP] Cache kaydedilemedi: {e}")
+
+        self.load_analyses(analyses)
+        return len(analyses)
+
+    # ------------------------------------------------------------------
+    # DEĞERLENDİRME
+    # ------------------------------------------------------------------
+
+    def _rebuild_order(self):
+        """Bileşik düğümler için topolojik sıra (Kahn). Döngüdeki düğümler sona eklenir."""
+        in_degree = {code: 0 for code in self.nodes}
+        for code, node in self.nodes.items():
+            for child in {c['code'] for c in node['components']}:
+                if child in self.nodes:
+                    in_degree[code] += 1
+
+        queue = deque(code for code, deg in in_degree.items() if deg == 0)
+        order = []
+        while queue:
+            code = queue.popleft()
+            order.append(code)
+            for parent in self.dependents.get(code, ()):
+                if parent in in_degree:
+                    in_degree[parent] -= 1
+                    if in_degree[parent] == 0:
+                        queue.append(parent)
+
+        self._cyclic = {code for code, deg in in_degree.items() if deg > 0}
+        if self._cyclic:
+            logger.warning(f"[ROLLUP] Döngüsel analiz referansı: {sorted(self._cyclic)[:10]}")
+            order.extend(sorted(self._cyclic))
+
+        self._order = order
+        self._position = {code: idx for idx, code in enumerate(order)}
+        self._dirty = False
+
+    def _component_price(self, comp: Dict[str, Any]) -> float:
+        """Bileşenin birim fiyatı: bileşik analiz → rayiç → analiz satırı"""
+        code = comp['code']
+        if code in self.nodes and code not in self._cyclic and code in self._subtotals:
+            if self.nested_use_subtotal:
+                return self._subtotals[code]
+            return self._unit_prices[code]
+        price = self.base_prices.get(code, 0.0)
+        if price > 0:
+            return price
+        return comp['fallback_price']
+
+    def _evaluate(self, code: str) -> bool:
+        """Tek düğümü hesapla. Değer değiştiyse True döner."""
+        node = self.nodes[code]
+        subtotal = sum(comp['quantity'] * self._component_price(comp) for comp in node['components'])
+        subtotal = round(subtotal, 4)
+        changed = self._subtotals.get(code) != subtotal
+        self._subtotals[code] = subtotal
+        self._unit_prices[code] = round(subtotal * (1 + self.overhead_rate), 2)
+        return changed
+
+    def recompute_all(self) -> Dict[str, Any]:
+        """Tüm bileşik pozları topolojik sırayla yeniden hesapla"""
+        with self._lock:
+            start = time.perf_counter()
+            if self._dirty:
+                self._rebuild_order()
+            self._subtotals.clear()
+            self._unit_prices.clear()
+            for code in self._order:
+                self._evaluate(code)
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.last_recompute = {
+                'mode': 'full',
+                'composite_count': len(self._order),
+                'recomputed': len(self._order),
+                'cyclic': len(self._cyclic),
+                'elapsed_ms': round(elapsed_ms, 2)
+            }
+            logger.info(f"[ROLLUP] {len(self._order)} bileşik poz {elapsed_ms:.1f} ms'de hesaplandı.")
+            return self.last_recompute
+
+    def update_base_prices(self, changes: Dict[str, Any]) -> List[str]:
+        """
+        Rayiç fiyatlarını güncelle ve sadece etkilenen bileşik pozları yeniden hesapla.
+
+        Returns:
+            Birim fiyatı değişen bileşik pozların listesi (topolojik sırayla)
+        """
+        with self._lock:
+            if self._dirty or not self._subtotals:
+                for code, price in changes.items():
+                    self.base_prices[code] = parse_tr_number(price)
+                self.recompute_all()
+                return list(self._order)
+
+            start = time.perf_counter()
+            changed_leaves = []
+            for code, price in changes.items():
+                new_price = parse_tr_number(price)
+                if self.base_prices.get(code) != new_price:
+                    self.base_prices[code] = new_price
+                    changed_leaves.append(code)
+
+            # Etkilenen bileşik pozlar: değişen kodlara geçişli olarak bağımlı olanlar
+            affected: Set[str] = set()
+            queue = deque(changed_leaves)
+            while queue:
+                code = queue.popleft()
+                for parent in self.dependents.get(code, ()):
+                    if parent not in affected:
+                        affected.add(parent)
+                        queue.append(parent)
+
+            changed = [
+                code for code in sorted(affected, key=self._position.__getitem__)
+                if self._evaluate(code)
+            ]
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.last_recompute = {
+                'mode': 'incremental',
+                'composite_count': len(self._order),
+                'recomputed': len(affected),
+                'changed': len(changed),
+                'cyclic': len(self._cyclic),
+                'elapsed_ms': round(elapsed_ms, 2)
+            }
+            return changed
+
+    # ------------------------------------------------------------------
+    # SORGULAMA
+    # ------------------------------------------------------------------
+
+    def _ensure_computed(self):
+        if self._dirty or len(self._subtotals) != len(self.nodes):
+            self.recompute_all()
+
+    def has_analysis(self, poz_no: str) -> bool:
+        return poz_no in self.nodes
+
+    def get_unit_price(self, poz_no: str) -> Optional[float]:
+        """Bileşik pozun hesaplanmış birim fiyatı (kâr dahil). Rayiç ise rayiç fiyatı."""
+        with self._lock:
+            if poz_no in self.nodes:
+                self._ensure_computed()
+                return self._unit_prices.get(poz_no)
+            return self.base_prices.get(poz_no)
+
+    def get_breakdown(self, poz_no: str, max_depth: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Pozun maliyet ağacını döndür (alt analizler iç içe)"""
+        if max_depth is None:
+            max_depth = get_rollup_config().MAX_BREAKDOWN_DEPTH
+
+        with self._lock:
+            if poz_no not in self.nodes:
+                return None
+            self._ensure_computed()
+            return self._build_tree(poz_no, max_depth, set())
+
+    def _build_tree(self, poz_no: str, depth: int, path: Set[str]) -> Dict[str, Any]:
+        node = self.nodes[poz_no]
+        path = path | {poz_no}
+        children = []
+        for comp in node['components']:
+            price = self._component_price(comp)
+            child = {
+                'code': comp['code'],
+                'type': comp['type'],
+                'name': comp['name'],
+                'unit': comp['unit'],
+                'quantity': comp['quantity'],
+                'unit_price': round(price, 4),
+                'total': round(comp['quantity'] * price, 2),
+                'is_composite': comp['code'] in self.nodes,
+            }
+            if child['is_composite'] and depth > 1 and comp['code'] not in path:
+                child['breakdown'] = self._build_tree(comp['code'], depth - 1, path)
+            children.append(child)
+
+        return {
+            'poz_no': poz_no,
+            'description': node['description'],
+            'unit': node['unit'],
+            'subtotal': round(self._subtotals.get(poz_no, 0.0), 2),
+            'overhead_rate': self.overhead_rate,
+            'unit_price': self._unit_prices.get(poz_no, 0.0),
+            'cyclic': poz_no in self._cyclic,
+            'components': children,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """İstatistik bilgilerini döndür"""
+        with self._lock:
+            return {
+                'composite_count': len(self.nodes),
+                'base_price_count': len(self.base_prices),
+                'edge_count': sum(len(n['components']) for n in self.nodes.values()),
+                'cyclic_count': len(self._cyclic),
+                'last_recompute': self.last_recompute,
+            }
+
+
+# Singleton
+_cost_rollup_service = None
+
+def get_cost_rollup_service(force_new=False) -> CostRollupService:
+    global _cost_rollup_service
+    if _cost_rollup_service is None or force_new:
+        _cost_rollup_service = CostRollupService()
+    return _cost_rollup_service
@@ -11,9 +11,16 @@ Kontrol Edilen Kurallar:
 4. Eksik Bileşenler
 """
 
+import asyncio
 import re
 from typing import List, Dict
 from dataclasses import dataclass
+from utils.keyword_matcher import KeywordMatcher
+
+# LLM critic issue'larını kural tabanlı issue'larla tekilleştirmek için malzeme kelimeleri
+DEDUP_KEYWORDS = ['demir', 'kalıp', 'harç', 'iskele', 'nakliye',
+                  'çimento', 'çakıl', 'kum', 'beton', 'tuğla', 'astar']
+DEDUP_KEYWORD_MATCHER = KeywordMatcher(DEDUP_KEYWORDS)
 
 @dataclass
 class Issue:
@@ -50,8 +57,9 @@ class CriticService:
         self.rule_service = RuleService()
 
         # AI Service (Lazy load to avoid circular imports if any)
-        from services.ai_service import AIAnalysisService
-        self.ai_service = AIAnalysisService()
+        # Async varyant senkron metodları da sunar: review_analysis ve review_analysis_async aynı servisi kullanır
+        from services.ai_service import AsyncAIAnalysisService
+        self.ai_service = AsyncAIAnalysisService()
     
     def review_analysis(self, 
                        analysis_result: Dict,
@@ -66,6 +74,37 @@ class CriticService:
         Returns:
             CriticReview: Tespit edilen sorunlar ve öneriler
         """
+        all_issues = self._rule_based_issues(analysis_result, description)
+
+        # 7. LLM Tabanlı Semantik Kontrol (YENİ - Gerçek Agent)
+        # Sadece kritik hata yoksa veya kullanıcı özellikle istediyse çalıştırılabilir
+        # Şimdilik her zaman çalıştırıyoruz (User Request)
+        try:
+            from services.ai_service import logger
+            logger.info("LLM Critic başlatılıyor...")
+            
+            llm_result = self.ai_service.review_analysis(analysis_result, description)
+            self._merge_llm_issues(all_issues, llm_result)
+        except Exception as e:
+            print(f"LLM Critic Integration Error: {e}")
+
+        return self._build_review(all_issues)
+
+    async def review_analysis_async(self, analysis_result: Dict, description: str) -> CriticReview:
+        """
+        review_analysis'in async karşılığı: LLM Critic çağrısı event loop'ta beklenir,
+        sadece kısa süren kural kontrolleri (kullanıcı kuralları DB okur) bir thread'e verilir.
+        """
+        all_issues = await asyncio.to_thread(self._rule_based_issues, analysis_result, description)
+        try:
+            llm_result = await self.ai_service.review_analysis_async(analysis_result, description)
+            self._merge_llm_issues(all_issues, llm_result)
+        except Exception as e:
+            print(f"LLM Critic Integration Error: {e}")
+        return self._build_review(all_issues)
+
+    def _rule_based_issues(self, analysis_result: Dict, description: str) -> List[Issue]:
+        """Kural tabanlı kontroller (LLM olmadan)"""
         components = analysis_result.get('components', [])
         all_issues = []
         
@@ -94,39 +133,34 @@ class CriticService:
         # 7. Kullanıcı Tanımlı Kurallar (Öğrenen AI)
         all_issues.extend(self.check_user_rules(components, description))
 
-        # 7. LLM Tabanlı Semantik Kontrol (YENİ - Gerçek Agent)
-        # Sadece kritik hata yoksa veya kullanıcı özellikle istediyse çalıştırılabilir
-        # Şimdilik her zaman çalıştırıyoruz (User Request)
-        try:
-            from services.ai_service import logger
-            logger.info("LLM Critic başlatılıyor...")
-            
-            llm_result = self.ai_service.review_analysis(analysis_result, description)
-            
-            if llm_result.get("status") != "error": # LLM çalıştıysa
-                llm_issues = llm_result.get("issues", [])
-                # Existing messages joined → dedupe check against rule-based issues
-                existing_msgs = " ".join(i.message.lower() for i in all_issues)
-                # Trigger words: if both existing and new issue mention same material → duplicate
-                dedup_keywords = ['demir', 'kalıp', 'harç', 'iskele', 'nakliye',
-                                  'çimento', 'çakıl', 'kum', 'beton', 'tuğla', 'astar']
-
-                for issue in llm_issues:
-                    msg_lower = issue.get("message", "").lower()
-                    # Mevcut issues ile örtüşen material keyword varsa atla
-                    shared = [kw for kw in dedup_keywords if kw in msg_lower and kw in existing_msgs]
-                    if shared:
-                        continue  # Rule-based check daha spesifik → LLM duplicate atılır
-
-                    all_issues.append(Issue(
-                        severity=issue.get("severity", "warning"),
-                        category=f"AI: {issue.get('category', 'Genel')}",
-                        message=issue.get("message", ""),
-                        suggestion=issue.get("suggestion", "")
-                    ))
-        except Exception as e:
-            print(f"LLM Critic Integration Error: {e}")
-        
+        return all_issues
+
+    def _merge_llm_issues(self, all_issues: List[Issue], llm_result: Dict):
+        """LLM Critic bulgularını, kural tabanlı bulgularla örtüşmeyenleri ekleyerek birleştir"""
+        if llm_result.get("status") == "error": # LLM çalışmadıysa
+            return
+        llm_issues = llm_result.get("issues", [])
+        # Existing messages joined → dedupe check against rule-based issues
+        existing_msgs = " ".join(i.message.lower() for i in all_issues)
+        # Trigger words: if both existing and new issue mention same material → duplicate
+        existing_keywords = DEDUP_KEYWORD_MATCHER.find_keywords(existing_msgs)
+
+        for issue in llm_issues:
+            msg_lower = issue.get("message", "").lower()
+            # Mevcut issues ile örtüşen material keyword varsa atla
+            shared = DEDUP_KEYWORD_MATCHER.find_keywords(msg_lower) & existing_keywords
+            if shared:
+                continue  # Rule-based check daha spesifik → LLM duplicate atılır
+
+            all_issues.append(Issue(
+                severity=issue.get("severity", "warning"),
+                category=f"AI: {issue.get('category', 'Genel')}",
+                message=issue.get("message", ""),
+                suggestion=issue.get("suggestion", "")
+            ))
+
+    def _build_review(self, all_issues: List[Issue]) -> CriticReview:
+        """Bulgulardan durum ve önerileri çıkar"""
         # Durum belirle
         has_critical = any(i.severity == "critical" for i in all_issues)
         has_warning = any(i.severity == "warning" for i in all_issues)
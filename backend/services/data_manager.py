@@ -1,15 +1,13 @@
 import sys
-import fitz  # PyMuPDF
 import re
-import pandas as pd
 from pathlib import Path
 import json
 import hashlib
 import os
 from datetime import datetime
 import csv
+# fitz (PyMuPDF) ve pandas ağır modüller: açılışı yavaşlatmamak için kullanıldıkları fonksiyonlarda import edilir
 # Removed PyQt5 and UI imports for backend compatibility
-from services.pdf_engine import PDFSearchEngine
 class CSVDataManager:
     """PDF klasöründeki CSV dosyalarından pozları yönetir"""
 
@@ -48,6 +46,8 @@ class CSVDataManager:
 
     def load_single_csv(self, csv_path):
         """Tek bir CSV dosyasını yükle"""
+        import pandas as pd
+
         try:
             df = pd.read_csv(csv_path, encoding='utf-8-sig')
             print(f"CSV yüklendi: {csv_path.name} ({len(df)} satır)")
@@ -207,6 +207,8 @@ class PozAnalyzer:
 
     def _extract_from_pdf(self, pdf_path):
         """PDF'den poz analizlerini çıkar"""
+        import fitz  # PyMuPDF
+
         try:
             doc = fitz.open(pdf_path)
             lines_all = []
@@ -577,7 +579,9 @@ class CSVLoader:
                 print(f"PDF klasörü bulunamadı: {self.csv_folder}")
                 return {}, 0, []
 
-            # CSV dosyalarını yükle
+            # CSV dosyalarını yükle (pandas sadece cache yoksa gerekli)
+            import pandas as pd
+
             csv_files = list(self.csv_folder.glob("*.csv"))
             if progress_callback: progress_callback(f"CSV dosyaları taranıyor... ({len(csv_files)} dosya)")
 
@@ -663,6 +667,8 @@ class CSVLoader:
 
     def extract_pozlar_from_pdf(self, pdf_path, poz_data):
         """PDF dosyasından pozları çıkar - Koordinat tabanlı satır birleştirme ile"""
+        import fitz  # PyMuPDF
+
         try:
             doc = fitz.open(pdf_path)
             poz_count = 0
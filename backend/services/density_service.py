@@ -1,5 +1,6 @@
 from typing import Dict, Optional, Tuple
 import re
+from utils.keyword_matcher import KeywordMatcher
 
 # Standart Yoğunluklar (ton/m³) - ÇŞB/KİK Normları
 DENSITIES: Dict[str, float] = {
@@ -68,6 +69,8 @@ KEYWORD_MAPPING = {
     "moloz": "moloz"
 }
 
+KEYWORD_MATCHER = KeywordMatcher(KEYWORD_MAPPING)
+
 def normalize_name(name: str) -> str:
     return name.lower().replace('İ','i').replace('I','ı')
 
@@ -83,14 +86,8 @@ def get_material_density(material_name: str) -> Tuple[Optional[float], Optional[
         return DENSITIES[norm_name], norm_name
         
     # 2. Keyword Arama (En uzun eşleşmeyi tercih et)
-    best_match = None
-    max_len = 0
-    
-    for kw, key in KEYWORD_MAPPING.items():
-        if kw in norm_name:
-            if len(kw) > max_len:
-                best_match = key
-                max_len = len(kw)
+    best_kw = KEYWORD_MATCHER.longest_match(norm_name)
+    best_match = KEYWORD_MAPPING[best_kw] if best_kw else None
                 
     if best_match:
         # C20, C25 gibi özel betonlar donatılı ise 2.5, değilse 2.4
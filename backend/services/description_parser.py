@@ -1,5 +1,6 @@
 import re
 from typing import Set, List, Dict
+from utils.keyword_matcher import KeywordMatcher
 
 # Canonical service names
 SERVICE_NAKLIYE = "nakliye"
@@ -44,6 +45,8 @@ KEYWORD_MAPPING = {
     "sulama": SERVICE_SULAMA,
 }
 
+KEYWORD_MATCHER = KeywordMatcher(KEYWORD_MAPPING)
+
 def normalize_text(text: str) -> str:
     """Normalize text for consistent parsing."""
     if not text:
@@ -84,11 +87,10 @@ def extract_included_services(description: str) -> Set[str]:
     
     for match in dahil_matches:
         clause = match.group(1)
-        # Check keywords in this clause
-        for keyword, canonical in KEYWORD_MAPPING.items():
-            # word boundary check. Allow optional dot for abbreviations.
-            if re.search(r'\b' + re.escape(keyword) + r'\.?\b', clause):
-                included_services.add(canonical)
+        # Check keywords in this clause (single pass).
+        # word boundary check. Allow optional dot for abbreviations.
+        for keyword in KEYWORD_MATCHER.find_word_keywords(clause, allow_trailing_dot=True):
+            included_services.add(KEYWORD_MAPPING[keyword])
                 
     # Special case: "X nakli" usually implies transport is the item itself, NOT included extra.
     # BUT if the main item is "Hazır beton", and description says "nakli dahil", then we filter separate transport.
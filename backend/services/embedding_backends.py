@@ -0,0 +1,95 @@
+"""
+Seçilebilir embedding backend'leri (CPU hızlandırma).
+
+- torch       : SentenceTransformer fp32 (varsayılan, mevcut davranış)
+- torch-int8  : torch dynamic int8 quantization (nn.Linear katmanları)
+- onnx        : ONNX Runtime (ilk yüklemede export edilip yerel dizine kaydedilir)
+- onnx-int8   : ONNX Runtime + dynamic int8 quantization (avx2)
+
+Tüm backend'ler aynı modelin aynı boyutta (768) vektörlerini üretir; fp32 ile
+recall karşılaştırması için scripts/embedding_backend_parity.py kullanılır.
+Gerekli paket (optimum/onnxruntime) yoksa torch fp32'ye düşülür.
+"""
+import os
+import re
+import time
+from typing import Any, Tuple
+
+from utils.logger import get_vector_logger
+
+logger = get_vector_logger()
+
+SUPPORTED_BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+ONNX_INT8_CONFIG = "avx2"
+ONNX_INT8_FILE = f"onnx/model_qint8_{ONNX_INT8_CONFIG}.onnx"
+
+
+def _local_model_dir(cache_dir: str, model_name: str, suffix: str) -> str:
+    safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+    return os.path.join(cache_dir, f"{safe_name}-{suffix}")
+
+
+def _load_onnx(model_name: str, device: str, cache_dir: str, quantized: bool):
+    from sentence_transformers import SentenceTransformer
+
+    local_dir = _local_model_dir(cache_dir, model_name, "onnx")
+    if os.path.isdir(local_dir):
+        model = SentenceTransformer(local_dir, device=device, backend="onnx")
+    else:
+        logger.info(f"[EMBEDDING] ONNX export ediliyor: {model_name} -> {local_dir}")
+        model = SentenceTransformer(model_name, device=device, backend="onnx")
+        model.save_pretrained(local_dir)
+
+    if not quantized:
+        return model
+
+    if not os.path.exists(os.path.join(local_dir, ONNX_INT8_FILE)):
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+        logger.info(f"[EMBEDDING] ONNX int8 ({ONNX_INT8_CONFIG}) quantization yapılıyor...")
+        export_dynamic_quantized_onnx_model(model, ONNX_INT8_CONFIG, local_dir)
+    return SentenceTransformer(local_dir, device=device, backend="onnx",
+                               model_kwargs={"file_name": ONNX_INT8_FILE})
+
+
+def _load_torch_int8(model_name: str):
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    # Dynamic quantization sadece CPU'da çalışır
+    model = SentenceTransformer(model_name, device="cpu")
+    torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return model
+
+
+def load_embedding_model(model_name: str, backend: str = "torch", device: str = "cpu",
+                         cache_dir: str = "") -> Tuple[Any, str, float]:
+    """
+    Embedding modelini seçilen backend ile yükle.
+
+    Returns:
+        (model, gerçekte kullanılan backend, yükleme süresi saniye)
+    """
+    from sentence_transformers import SentenceTransformer
+
+    if backend not in SUPPORTED_BACKENDS:
+        logger.warning(f"[EMBEDDING] Bilinmeyen backend '{backend}', torch kullanılacak.")
+        backend = "torch"
+
+    start = time.perf_counter()
+    try:
+        if backend == "torch-int8":
+            model = _load_torch_int8(model_name)
+        elif backend in ("onnx", "onnx-int8"):
+            model = _load_onnx(model_name, device, cache_dir, quantized=backend == "onnx-int8")
+        else:
+            model = SentenceTransformer(model_name, device=device)
+    except Exception as e:
+        if backend == "torch":
+            raise
+        logger.warning(f"[EMBEDDING] '{backend}' backend yüklenemedi ({e}), torch fp32'ye dönülüyor.")
+        start = time.perf_counter()
+        model = SentenceTransformer(model_name, device=device)
+        backend = "torch"
+
+    return model, backend, time.perf_counter() - start
@@ -0,0 +1,69 @@
+"""
+Sorgu embedding'leri için sınırlı LRU cache.
+
+Aynı analiz içinde poz, feedback ve eğitim örneği aramaları aynı açıklamayı
+embed eder; kullanıcılar da aynı tanımı sık sık tekrar çalıştırır. Anahtar
+(model, boşlukları normalize edilmiş metin) olduğundan model değişince cache
+kendiliğinden ayrışır.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+def normalize_query(text: str) -> str:
+    """Tokenizer için anlamsız boşluk farklarını kaldır (büyük/küçük harf korunur, model cased)"""
+    return " ".join((text or "").split())
+
+
+class EmbeddingCache:
+    """Thread-safe LRU cache + isabet metrikleri"""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._data: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model_id: str, text: str) -> Tuple[str, str]:
+        return (model_id, normalize_query(text))
+
+    def get(self, key: Hashable) -> Optional[List[float]]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: List[float]):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
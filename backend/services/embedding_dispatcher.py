@@ -0,0 +1,159 @@
+"""
+Sorgu embedding'leri için mikro-batch dispatcher.
+
+Eşzamanlı analizler tek cümlelik `model.encode` çağrılarını farklı thread'lerden
+yapınca torch thread'leri birbirini bekler ve batched matmul verimi kullanılmaz.
+Dispatcher tüm çağrıları bir kuyrukta toplar, kısa bir pencere (varsayılan 5 ms)
+içinde gelenleri tek bir batch'te birleştirip ayrılmış inference thread'inde
+çalıştırır ve her çağırana kendi sonucunu Future üzerinden döndürür.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.logger import get_vector_logger
+
+logger = get_vector_logger()
+
+
+class _Request:
+    __slots__ = ("texts", "future")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+
+
+class EmbeddingDispatcher:
+    """
+    Args:
+        encode_fn: Metin listesi alıp aynı sırada embedding listesi döndüren fonksiyon
+        max_batch_size: Bir batch'teki en fazla metin sayısı
+        max_wait_ms: İlk istekten sonra ek istekler için beklenecek süre
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], List[Any]], max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0, name: str = "embedding-dispatcher"):
+        self._encode_fn = encode_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._name = name
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+
+        # Metrikler
+        self.batches = 0
+        self.requests = 0
+        self.texts = 0
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._thread.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        """Metinleri kuyruğa ekle; sonuç Future'ı döner"""
+        if self._closed:
+            raise RuntimeError("EmbeddingDispatcher kapatıldı")
+        request = _Request(list(texts))
+        if not request.texts:
+            request.future.set_result([])
+            return request.future
+        self._ensure_started()
+        self._queue.put(request)
+        return request.future
+
+    def encode(self, texts: List[str], timeout: Optional[float] = None) -> List[Any]:
+        """Bloklayan encode: diğer çağıranların istekleriyle birlikte batch'lenir"""
+        return self.submit(texts).result(timeout)
+
+    def shutdown(self, wait: bool = True):
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            if wait:
+                self._thread.join()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            size = len(first.texts)
+            stop = False
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+                size += len(item.texts)
+
+            try:
+                self._run_batch(batch)
+            except Exception as e:
+                # Thread ölürse sonraki tüm istekler sonsuza kadar bekler
+                logger.error(f"[EMBEDDING] Batch işlenemedi ({len(batch)} istek): {e}")
+                self._fail(batch, e)
+            if stop:
+                return
+
+    def _run_batch(self, batch: List[_Request]):
+        # Aynı metin birden fazla çağırandan gelirse bir kez encode edilir
+        unique: Dict[str, int] = {}
+        for request in batch:
+            for text in request.texts:
+                unique.setdefault(text, len(unique))
+
+        try:
+            embeddings = self._encode_fn(list(unique))
+            if len(embeddings) != len(unique):
+                raise ValueError(f"Encoder {len(unique)} metin için {len(embeddings)} vektör döndürdü")
+            results = [[embeddings[unique[text]] for text in request.texts] for request in batch]
+        except Exception as e:
+            logger.error(f"[EMBEDDING] Batch encode hatası ({len(unique)} metin): {e}")
+            self._fail(batch, e)
+            return
+
+        self.batches += 1
+        self.requests += len(batch)
+        self.texts += len(unique)
+        for request, result in zip(batch, results):
+            try:
+                request.future.set_result(result)
+            except InvalidStateError:
+                pass  # Çağıran iptal etmiş
+
+    @staticmethod
+    def _fail(batch: List[_Request], error: Exception):
+        """Henüz sonuçlanmamış tüm isteklere hatayı ilet"""
+        for request in batch:
+            try:
+                request.future.set_exception(error)
+            except InvalidStateError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "texts": self.texts,
+            "avg_requests_per_batch": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0
+        }
@@ -0,0 +1,76 @@
+"""
+Embedding export/import formatı.
+
+Bir dizinde iki dosya:
+  - embeddings.npy : (N, D) float32 matris (satır i = manifest items[i])
+  - manifest.json  : {"format_version", "model", "backend", "dim", "count", "created_at",
+                      "items": [{"id", "document", "metadata"}, ...]}
+
+Colab'da (scripts/colab_vector_db.py) veya başka bir makinede hesaplanan vektörler
+bu formatta taşınır; VectorDBService.import_embeddings modeli yüklemeden toplu yükler.
+İçerik hash'i import sırasında belge + metadata'dan yeniden hesaplandığından
+üreten tarafın hash hesaplaması gerekmez.
+"""
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+FORMAT_VERSION = 1
+EMBEDDINGS_FILE = "embeddings.npy"
+MANIFEST_FILE = "manifest.json"
+
+
+def write_embedding_export(out_dir: str, ids: Sequence[str], embeddings, documents: Sequence[str],
+                           metadatas: Sequence[Dict[str, Any]], model: str, backend: str = "torch") -> Dict[str, Any]:
+    """Embedding'leri ve manifest'i dizine yaz; manifest özetini döndür"""
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if matrix.ndim != 2 or matrix.shape[0] != len(ids):
+        raise ValueError(f"Embedding matrisi ({matrix.shape}) ile id sayısı ({len(ids)}) uyumsuz")
+
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, EMBEDDINGS_FILE), matrix)
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "model": model,
+        "backend": backend,
+        "dim": int(matrix.shape[1]) if matrix.shape[0] else 0,
+        "count": len(ids),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "items": [
+            {"id": doc_id, "document": document, "metadata": metadata}
+            for doc_id, document, metadata in zip(ids, documents, metadatas)
+        ],
+    }
+    tmp = os.path.join(out_dir, MANIFEST_FILE + ".tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp, os.path.join(out_dir, MANIFEST_FILE))
+    return {key: value for key, value in manifest.items() if key != "items"}
+
+
+def read_embedding_export(in_dir: str) -> Tuple[Dict[str, Any], np.ndarray]:
+    """Manifest ve (memory-mapped) embedding matrisini oku"""
+    with open(os.path.join(in_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Desteklenmeyen export formatı: {manifest.get('format_version')}")
+
+    matrix = np.load(os.path.join(in_dir, EMBEDDINGS_FILE), mmap_mode='r')
+    if matrix.shape[0] != len(manifest.get("items", [])):
+        raise ValueError("embeddings.npy satır sayısı manifest ile uyumsuz")
+    return manifest, matrix
+
+
+def export_exists(in_dir: str) -> bool:
+    return bool(in_dir) and all(
+        os.path.exists(os.path.join(in_dir, name)) for name in (EMBEDDINGS_FILE, MANIFEST_FILE)
+    )
+
+
+def chunked(items: List[Any], size: int):
+    for start in range(0, len(items), size):
+        yield start, items[start:start + size]
@@ -0,0 +1,404 @@
+"""
+Embedding sidecar süreci: modeli tek bir süreçte tutup Unix socket üzerinden encode sunar.
+
+Her uvicorn worker'ı ~400 MB'lık Türkçe BERT modelinin kendi kopyasını yükler.
+Sidecar modu açıkken (EMBEDDING_SIDECAR=1) worker'lar modeli yüklemez; bunun yerine
+`SidecarEmbeddingClient` ile sidecar'a bağlanır. Sidecar tüm worker'lardan gelen istekleri
+tek bir EmbeddingDispatcher kuyruğunda batch'ler, böylece inference verimi de ortaklaşır.
+Vektör depoları (Chroma/NumPy) diskte olduğundan arama worker'larda kalır; sidecar sadece
+embedding üretir.
+
+Protokol: her mesaj 4 byte (big-endian) uzunluk + gövde.
+    istek : JSON {"op": "info"} | {"op": "encode", "texts": [...]}
+    yanıt : JSON başlık {"ok": true, ...}; encode için ardından float32 ham vektör gövdesi
+            hata durumunda {"ok": false, "error": "..."}
+
+Çalıştırma (backend dizininden):
+    python -m services.embedding_sidecar [--socket /tmp/approximate-cost-embedding.sock]
+Worker'lar sidecar'ı bulamazsa (EMBEDDING_SIDECAR_AUTOSTART=1) kendisi başlatır; kilit
+dosyası sayesinde aynı socket için tek sidecar çalışır.
+"""
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.logger import get_vector_logger
+from services.embedding_dispatcher import EmbeddingDispatcher
+
+logger = get_vector_logger()
+
+_HEADER = struct.Struct(">I")
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _send(sock: socket.socket, payload: bytes):
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv(sock: socket.socket) -> Optional[bytes]:
+    """Bir mesaj oku; bağlantı kapandıysa None"""
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    (size,) = _HEADER.unpack(header)
+    return _recv_exact(sock, size) if size else b""
+
+
+def _send_json(sock: socket.socket, payload: Dict[str, Any]):
+    _send(sock, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+
+# ============================================
+# SUNUCU
+# ============================================
+
+class _SidecarHandler(socketserver.BaseRequestHandler):
+    """Bir worker bağlantısı: bağlantı kapanana kadar istekleri sırayla işler"""
+
+    def handle(self):
+        sidecar: "EmbeddingSidecarServer" = self.server.sidecar
+        while True:
+            try:
+                message = _recv(self.request)
+            except OSError:
+                return
+            if message is None:
+                return
+            try:
+                request = json.loads(message)
+                op = request.get("op")
+                if op == "info":
+                    _send_json(self.request, {"ok": True, **sidecar.info()})
+                elif op == "encode":
+                    vectors = sidecar.encode(request.get("texts") or [])
+                    _send_json(self.request, {"ok": True, "shape": list(vectors.shape)})
+                    _send(self.request, vectors.tobytes())
+                else:
+                    _send_json(self.request, {"ok": False, "error": f"Bilinmeyen işlem: {op}"})
+            except OSError:
+                return
+            except Exception as e:
+                try:
+                    _send_json(self.request, {"ok": False, "error": str(e)})
+                except OSError:
+                    return
+
+
+class _ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    # Çok sayıda worker aynı anda bağlanırken Unix socket EAGAIN vermesin
+    request_queue_size = 128
+
+
+class EmbeddingSidecarServer:
+    """
+    Modeli sahiplenen ve encode isteklerini tek kuyrukta batch'leyen sunucu.
+
+    Args:
+        socket_path: Unix socket yolu
+        loader: () -> (model, backend, yükleme süresi); model `encode(texts)` sunmalı
+        model_name: İstemcilerin doğruladığı model adı
+        max_batch_size / max_wait_ms: Ortak dispatcher ayarları
+    """
+
+    def __init__(self, socket_path: str, loader: Callable[[], Tuple[Any, str, float]], model_name: str,
+                 max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        self.socket_path = socket_path
+        self.model_name = model_name
+        self._loader = loader
+        self.model = None
+        self.backend: Optional[str] = None
+        self.device = "cpu"
+        self.load_seconds: Optional[float] = None
+        self.load_error: Optional[str] = None
+        self._ready = threading.Event()
+        self._lock_file = None
+        self._server: Optional[_ThreadingUnixServer] = None
+        self.dispatcher = EmbeddingDispatcher(
+            self._encode_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms,
+            name="embedding-sidecar"
+        )
+
+    def _encode_batch(self, texts: List[str]):
+        return np.asarray(self.model.encode(texts), dtype=np.float32)
+
+    def acquire(self) -> bool:
+        """Socket için tek sahip ol; başka sidecar çalışıyorsa False"""
+        try:
+            import fcntl
+        except ImportError:
+            return True
+        self._lock_file = open(f"{self.socket_path}.lock", "w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_file.close()
+            self._lock_file = None
+            return False
+        return True
+
+    def bind(self):
+        """Socket'i aç (eski socket dosyası varsa silinir) ve modeli arka planda yükle"""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = _ThreadingUnixServer(self.socket_path, _SidecarHandler)
+        self._server.sidecar = self
+        threading.Thread(target=self._load, name="embedding-sidecar-load", daemon=True).start()
+
+    def _load(self):
+        try:
+            self.model, self.backend, self.load_seconds = self._loader()
+            try:
+                self.device = self.model.device.type
+            except Exception:
+                self.device = "cpu"
+            logger.info(f"[EMBEDDING_SIDECAR] Model yüklendi ({self.backend}, {self.load_seconds:.1f} sn)")
+        except Exception as e:
+            self.load_error = str(e)
+            logger.error(f"[EMBEDDING_SIDECAR] Model yüklenemedi: {e}")
+        finally:
+            self._ready.set()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Model yükleme denemesi bitene kadar bekle; model hazırsa True"""
+        self._ready.wait(timeout)
+        return self.model is not None
+
+    def serve_forever(self):
+        logger.info(f"[EMBEDDING_SIDECAR] Dinleniyor: {self.socket_path}")
+        self._server.serve_forever(poll_interval=0.2)
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self.dispatcher.shutdown(wait=False)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        self._ready.wait()
+        if self.model is None:
+            raise RuntimeError(f"Sidecar modeli yüklenemedi: {self.load_error}")
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(self.dispatcher.encode(texts)).astype(np.float32, copy=False)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "ready": self._ready.is_set() and self.model is not None,
+            "error": self.load_error,
+            "model_name": self.model_name,
+            "backend": self.backend,
+            "device": self.device,
+            "load_seconds": self.load_seconds,
+            "pid": os.getpid(),
+            "dispatcher": self.dispatcher.stats()
+        }
+
+
+# ============================================
+# İSTEMCİ
+# ============================================
+
+class SidecarDevice:
+    """SentenceTransformer.device ile uyumlu (type + str)"""
+
+    def __init__(self, type: str):
+        self.type = type
+
+    def __str__(self):
+        return f"sidecar:{self.type}"
+
+
+class SidecarEmbeddingClient:
+    """
+    Sidecar'a bağlanan, SentenceTransformer yerine geçen encode istemcisi.
+    Thread-safe: her istek havuzdan bir bağlantı alır, bozulan bağlantı atılıp bir kez yeniden denenir.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 60.0, pool_size: int = 8):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.device = SidecarDevice("cpu")
+        self._pool: "queue.LifoQueue[socket.socket]" = queue.LifoQueue(maxsize=max(1, pool_size))
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _release(self, sock: socket.socket):
+        try:
+            self._pool.put_nowait(sock)
+        except queue.Full:
+            sock.close()
+
+    def _request(self, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        for attempt in range(2):
+            try:
+                sock = self._pool.get_nowait()
+                reused = True
+            except queue.Empty:
+                sock = self._connect()
+                reused = False
+            try:
+                _send_json(sock, payload)
+                message = _recv(sock)
+                if message is None:
+                    raise ConnectionError("Sidecar bağlantıyı kapattı")
+                header = json.loads(message)
+                body = None
+                if header.get("ok") and "shape" in header:
+                    body = _recv(sock)
+                    if body is None:
+                        raise ConnectionError("Sidecar bağlantıyı kapattı")
+            except OSError:
+                sock.close()
+                # Havuzdaki bağlantı sidecar yeniden başladığı için kopmuş olabilir
+                if reused and attempt == 0:
+                    continue
+                raise
+            self._release(sock)
+            if not header.get("ok"):
+                raise RuntimeError(f"Sidecar hatası: {header.get('error')}")
+            return header, body
+        raise ConnectionError("Sidecar'a ulaşılamadı")
+
+    def info(self) -> Dict[str, Any]:
+        header, _ = self._request({"op": "info"})
+        if header.get("device"):
+            self.device = SidecarDevice(header["device"])
+        return header
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        texts = list(texts)
+        header, body = self._request({"op": "encode", "texts": texts})
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.frombuffer(body, dtype=np.float32).reshape(header["shape"])
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def spawn_sidecar(socket_path: str) -> subprocess.Popen:
+    """Sidecar'ı ayrı oturumda başlat (worker kapansa da çalışmaya devam eder)"""
+    logger.info(f"[EMBEDDING_SIDECAR] Başlatılıyor: {socket_path}")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "services.embedding_sidecar", "--socket", socket_path],
+        cwd=BACKEND_DIR, start_new_session=True
+    )
+    # Sidecar bu worker'ın çocuğu: çıktığında (kilit başkasında, model yüklenemedi) zombi kalmasın
+    threading.Thread(target=process.wait, name=f"embedding-sidecar-reaper-{process.pid}", daemon=True).start()
+    return process
+
+
+def connect_sidecar(socket_path: str, model_name: str, autostart: bool = True,
+                    start_timeout: float = 180.0, timeout: float = 60.0) -> SidecarEmbeddingClient:
+    """
+    Sidecar'a bağlan ve model hazır olana kadar bekle.
+    Sidecar yoksa ve autostart açıksa başlatılır. Model adı uyuşmazsa ValueError.
+    """
+    client = SidecarEmbeddingClient(socket_path, timeout=timeout)
+    deadline = time.monotonic() + start_timeout
+    spawned = False
+    while True:
+        try:
+            info = client.info()
+            if info.get("error"):
+                raise RuntimeError(f"Sidecar modeli yüklenemedi: {info['error']}")
+            if info.get("ready"):
+                if info.get("model_name") != model_name:
+                    client.close()
+                    raise ValueError(f"Sidecar modeli farklı: {info.get('model_name')} != {model_name}")
+                return client
+        except (OSError, ConnectionError):
+            if autostart and not spawned:
+                spawn_sidecar(socket_path)
+                spawned = True
+        if time.monotonic() >= deadline:
+            client.close()
+            raise TimeoutError(f"Sidecar {start_timeout:.0f} sn içinde hazır olmadı: {socket_path}")
+        time.sleep(0.25)
+
+
+def main():
+    import argparse
+    from config import get_embedding_config
+    from services.embedding_backends import load_embedding_model
+
+    config = get_embedding_config()
+    parser = argparse.ArgumentParser(description="Embedding sidecar süreci")
+    parser.add_argument("--socket", default=config.SIDECAR_SOCKET)
+    args = parser.parse_args()
+
+    server = EmbeddingSidecarServer(
+        args.socket,
+        lambda: load_embedding_model(config.MODEL_NAME, config.BACKEND, device="cpu",
+                                     cache_dir=config.MODEL_CACHE_DIR),
+        config.MODEL_NAME,
+        max_batch_size=config.MICROBATCH_MAX_SIZE,
+        max_wait_ms=config.MICROBATCH_WAIT_MS
+    )
+    if not server.acquire():
+        logger.info(f"[EMBEDDING_SIDECAR] Bu socket için sidecar zaten çalışıyor: {args.socket}")
+        return
+    server.bind()
+
+    def _stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _stop)
+    thread = threading.Thread(target=server.serve_forever, name="embedding-sidecar-serve", daemon=True)
+    thread.start()
+    try:
+        if not server.wait_ready():
+            # Bekleyen worker'lar hatayı görüp yerel modele düşsün, sonra bir sonraki deneme için çık
+            time.sleep(5)
+            return
+        while thread.is_alive():
+            thread.join(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
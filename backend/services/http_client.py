@@ -0,0 +1,298 @@
+"""
+Süreç genelinde paylaşılan, keep-alive bağlantı havuzlu HTTP istemcileri.
+
+Her `requests.post` çağrısı yeni bir TCP + TLS el sıkışması demektir; OpenRouter'a
+yapılan analiz/refine/critic çağrıları ve consensus'un paralel istekleri bu maliyeti
+her seferinde öder. Burada:
+
+- get_http_session()      : senkron servisler için tek `requests.Session`
+                            (host başına havuz: HTTP_POOL_PER_HOST bağlantı)
+- get_async_http_client() : async route'lar için event loop başına tek `httpx.AsyncClient`
+                            (host başına HTTP_ASYNC_POOL_PER_HOST eşzamanlı istek)
+- run_async()             : sync koddan async servis çağrısı; geçici loop'un client'ı kapatılır
+- get_http_stats()        : host bazında açılan bağlantı sayısı, bağlantı kurulum
+                            süresi (TCP + TLS) ve bağlantı yeniden kullanım oranı
+
+Yeni açılan her bağlantının kurulum süresi ölçülür; /api/health altında raporlanır.
+"""
+import asyncio
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from config import get_http_config
+from utils.logger import get_general_logger
+
+logger = get_general_logger()
+
+
+class ConnectionStats:
+    """Host bazında bağlantı kurulum ve istek sayaçları (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, float]] = {}
+
+    def _host(self, host: str) -> Dict[str, float]:
+        return self._hosts.setdefault(host, {"requests": 0, "connections": 0, "connect_seconds": 0.0,
+                                             "connect_max_seconds": 0.0})
+
+    def record_connect(self, host: str, seconds: float):
+        with self._lock:
+            entry = self._host(host)
+            entry["connections"] += 1
+            entry["connect_seconds"] += seconds
+            entry["connect_max_seconds"] = max(entry["connect_max_seconds"], seconds)
+
+    def record_request(self, host: str):
+        with self._lock:
+            self._host(host)["requests"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            hosts = {host: dict(entry) for host, entry in self._hosts.items()}
+        return {
+            host: {
+                "requests": int(entry["requests"]),
+                "connections": int(entry["connections"]),
+                "connect_ms_avg": round(entry["connect_seconds"] / entry["connections"] * 1000, 1)
+                if entry["connections"] else 0.0,
+                "connect_ms_max": round(entry["connect_max_seconds"] * 1000, 1),
+                # Yeni bağlantı açmadan karşılanan istek oranı
+                "reuse_ratio": round(max(0.0, 1 - entry["connections"] / entry["requests"]), 3)
+                if entry["requests"] else 0.0
+            }
+            for host, entry in sorted(hosts.items())
+        }
+
+    def reset(self):
+        with self._lock:
+            self._hosts.clear()
+
+
+_STATS = ConnectionStats()
+
+
+# ============================================
+# SENKRON (requests)
+# ============================================
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _STATS.record_connect(self.host, time.perf_counter() - start)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        # HTTPS için TCP bağlantısı + TLS el sıkışması
+        start = time.perf_counter()
+        super().connect()
+        _STATS.record_connect(self.host, time.perf_counter() - start)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """Bağlantı kurulum süresini ölçen havuzlu adapter"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+def _count_response(response, *args, **kwargs):
+    _STATS.record_request(urlsplit(response.request.url).hostname or "")
+
+
+def create_http_session() -> requests.Session:
+    """Yapılandırılmış havuz limitleriyle yeni bir Session"""
+    config = get_http_config()
+    session = requests.Session()
+    # pool_block: host başına POOL_PER_HOST'tan fazla eşzamanlı istek boş bağlantı bekler
+    # (bloklanmazsa fazlalık bağlantılar açılır, limit sadece boşta tutulan bağlantılara uygulanır)
+    adapter = PooledHTTPAdapter(pool_connections=config.POOL_HOSTS, pool_maxsize=config.POOL_PER_HOST,
+                                pool_block=True)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.hooks["response"].append(_count_response)
+    logger.info(f"[HTTP] Paylaşılan bağlantı havuzu oluşturuldu (host başına {config.POOL_PER_HOST} bağlantı)")
+    return session
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """Paylaşılan requests.Session singleton"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_http_session()
+    return _session
+
+
+# ============================================
+# ASYNC (httpx)
+# ============================================
+
+def _make_trace(host: str, tls: bool):
+    """httpx trace callback'i: TCP bağlantısı (+ https ise TLS) kurulum süresi"""
+    finished_event = "connection.start_tls.complete" if tls else "connection.connect_tcp.complete"
+    started = {}
+
+    async def trace(event_name: str, info: Dict[str, Any]):
+        if event_name == "connection.connect_tcp.started":
+            started["at"] = time.perf_counter()
+        elif event_name == finished_event and "at" in started:
+            _STATS.record_connect(host, time.perf_counter() - started.pop("at"))
+
+    return trace
+
+
+async def _on_async_request(request):
+    request.extensions["trace"] = _make_trace(request.url.host, request.url.scheme == "https")
+    _STATS.record_request(request.url.host)
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Yanıt gövdesi kapanınca host kotasını geri veren stream (streaming yanıtlar bağlantıyı sonuna kadar tutar)"""
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+class PerHostLimitTransport(httpx.AsyncBaseTransport):
+    """
+    Host başına eşzamanlı istek sınırı. httpx.Limits sadece toplam bağlantı sayısını
+    sınırlar; bu transport aynı host'a giden istekleri `per_host` ile kısıtlar.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, per_host: int):
+        self._transport = transport
+        self._per_host = max(1, per_host)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        semaphore = self._semaphores.setdefault(request.url.host, asyncio.Semaphore(self._per_host))
+        await semaphore.acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            semaphore.release()
+            raise
+        return httpx.Response(
+            response.status_code, headers=response.headers,
+            stream=_ReleasingStream(response.stream, semaphore.release), extensions=response.extensions
+        )
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def create_async_http_client() -> httpx.AsyncClient:
+    """Yapılandırılmış havuz limitleriyle (toplam + host başına) yeni bir AsyncClient"""
+    config = get_http_config()
+    limits = httpx.Limits(
+        max_connections=config.POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=config.POOL_MAX_CONNECTIONS,
+        keepalive_expiry=config.KEEPALIVE_EXPIRY
+    )
+    return httpx.AsyncClient(
+        transport=PerHostLimitTransport(httpx.AsyncHTTPTransport(limits=limits), config.ASYNC_POOL_PER_HOST),
+        event_hooks={"request": [_on_async_request]}
+    )
+
+
+# event loop → client. Uygulama loop'unun client'ı close_http_clients ile kapanır;
+# sync route'lardaki geçici loop'lar run_async ile kendi kısa ömürlü client'ını kapatır.
+_async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_async_clients_lock = threading.Lock()
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Paylaşılan httpx.AsyncClient.
+    Client event loop'a bağlıdır; her loop kendi client'ını kullanır (sync route'lardaki
+    asyncio.run ana loop'un client'ını değiştirmez).
+    """
+    loop = asyncio.get_running_loop()
+    with _async_clients_lock:
+        client = _async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = _async_clients[loop] = create_async_http_client()
+        return client
+
+
+async def close_async_http_client():
+    """Çalışan loop'un client'ını kapat"""
+    with _async_clients_lock:
+        client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def run_async(coro):
+    """
+    Sync koddan coroutine çalıştır (asyncio.run yerine): bu geçici loop'ta açılan
+    client, loop kapanmadan kapatılır.
+    """
+    async def _run():
+        try:
+            return await coro
+        finally:
+            await close_async_http_client()
+
+    return asyncio.run(_run())
+
+
+async def close_http_clients():
+    """Uygulama kapanırken havuzları kapat"""
+    global _session
+    await close_async_http_client()
+    if _session is not None:
+        _session.close()
+        _session = None
+
+
+def get_http_stats() -> Dict[str, Any]:
+    config = get_http_config()
+    return {
+        "pool_per_host": config.POOL_PER_HOST,
+        "async_pool_per_host": config.ASYNC_POOL_PER_HOST,
+        "pool_max_connections": config.POOL_MAX_CONNECTIONS,
+        "hosts": _STATS.snapshot()
+    }
@@ -0,0 +1,174 @@
+"""
+Hibrit aday üretimi: BM25 (lexical) + vektör araması, reciprocal rank fusion ile.
+
+"C25/30", "Ø16", "S420" gibi teknik token'ları BM25, anlamca yakın ama farklı
+yazılmış tanımları embedding yakalar. Vektör aramaları paylaşılan bir thread
+havuzunda, ucuz BM25 ise çağıran thread'de eşzamanlı çalışır ve toplam bir gecikme
+bütçesi paylaşır: bütçe dolduğunda bitmemiş kaynak atlanır.
+
+Zaman aşımına uğrayan bir arama havuz thread'ini bitene kadar tutar (çalışan
+future iptal edilemez). Bu yüzden:
+- BM25 havuza hiç gitmez; havuz dolu olsa da her istekte bir sıralama vardır
+- Kaynak başına en fazla `max_abandoned` zaman aşımına uğramış çağrı çalışmaya
+  devam edebilir; sınır doluysa kaynak o istekte atlanır ("busy"). Tek bir yavaş
+  çağrı diğer isteklerin vektör aramasını kesmez, yavaş aramalar da havuzu doldurmaz.
+  Atlamalar get_retriever_stats() ile /api/health altında raporlanır.
+
+RRF: skor(kod) = Σ ağırlık_kaynak / (k + sıra_kaynak)
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from utils.logger import get_vector_logger
+
+logger = get_vector_logger()
+
+# Alt aramalar için paylaşılan havuz (istek başına thread açılmaz)
+_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hybrid-retriever")
+
+# Kaynak adı -> zaman aşımına uğrayıp hâlâ çalışan future'lar; "busy" ile atlanan istek sayısı
+_ABANDONED: Dict[str, Set[Future]] = {}
+_BUSY_SKIPS: Dict[str, int] = {}
+_ABANDONED_LOCK = threading.Lock()
+
+
+def get_retriever_stats() -> Dict[str, Any]:
+    """Kaynak bazında hâlâ çalışan terk edilmiş çağrı ve "busy" atlama sayıları"""
+    with _ABANDONED_LOCK:
+        return {
+            "abandoned_running": {name: sum(1 for f in futures if not f.done())
+                                  for name, futures in _ABANDONED.items()},
+            "busy_skips": dict(_BUSY_SKIPS)
+        }
+
+
+def reciprocal_rank_fusion(rankings: Dict[str, Sequence[str]], k: int = 60,
+                           weights: Optional[Dict[str, float]] = None) -> List[Tuple[str, float]]:
+    """
+    Sıralı kod listelerini RRF ile birleştir.
+    Eşit skorlarda önce görülen (kaynak sırası, sonra sıra) kod önde kalır.
+    """
+    scores: Dict[str, float] = {}
+    for name, ranking in rankings.items():
+        weight = (weights or {}).get(name, 1.0)
+        seen = set()
+        rank = 0
+        for code in ranking:
+            if code in seen:
+                continue
+            seen.add(code)
+            rank += 1
+            scores[code] = scores.get(code, 0.0) + weight / (k + rank)
+    order = {code: i for i, code in enumerate(scores)}
+    return sorted(scores.items(), key=lambda item: (-item[1], order[item[0]]))
+
+
+class HybridRetriever:
+    """
+    Birden fazla aday kaynağını bütçe içinde eşzamanlı çalıştırıp RRF ile birleştirir.
+
+    Args:
+        sources: {kaynak adı: sorgu -> sıralı kod listesi}
+        budget_ms: Tüm alt aramalar için toplam bekleme süresi
+        rrf_k: RRF sabiti
+        weights: Kaynak ağırlıkları (varsayılan 1.0)
+        inline: Havuza gönderilmeden çağıran thread'de çalışan ucuz kaynaklar
+        max_abandoned: Kaynak başına aynı anda çalışabilecek zaman aşımına uğramış çağrı sayısı
+    """
+
+    def __init__(self, sources: Dict[str, Callable[[str], Sequence[str]]], budget_ms: float = 1000,
+                 rrf_k: int = 60, weights: Optional[Dict[str, float]] = None,
+                 executor: Optional[ThreadPoolExecutor] = None, inline: Sequence[str] = ("bm25",),
+                 max_abandoned: int = 2):
+        self.sources = sources
+        self.budget_ms = budget_ms
+        self.rrf_k = rrf_k
+        self.weights = weights
+        self.executor = executor or _EXECUTOR
+        self.inline = set(inline)
+        self.max_abandoned = max(1, max_abandoned)
+
+    def _submit(self, name: str, fn: Callable) -> Optional[Future]:
+        """Kaynağı havuza gönder; zaman aşımına uğramış çalışan çağrıları sınırdaysa None"""
+        with _ABANDONED_LOCK:
+            running = _ABANDONED.setdefault(name, set())
+            running.difference_update([f for f in running if f.done()])
+            busy = len(running) >= self.max_abandoned
+            if busy:
+                _BUSY_SKIPS[name] = skips = _BUSY_SKIPS.get(name, 0) + 1
+        if busy:
+            logger.warning(
+                f"[HYBRID] '{name}' atlandı: {self.max_abandoned} zaman aşımına uğramış çağrı hâlâ çalışıyor "
+                f"(toplam {skips} atlama)"
+            )
+            return None
+        return self.executor.submit(fn)
+
+    @staticmethod
+    def _abandon(name: str, future: Future):
+        """Sonucu beklenmeyen future: kuyruktaysa iptal et, çalışıyorsa bitene kadar sınıra say"""
+        if future.cancel():
+            return
+        with _ABANDONED_LOCK:
+            _ABANDONED.setdefault(name, set()).add(future)
+
+    def search(self, query: str, limit: int = 100) -> Dict[str, Any]:
+        """
+        Returns:
+            {"results": [(kod, rrf skoru)], "sources": {ad: {"status", "count", "ms"}}}
+            status: ok | timeout | busy | error
+        """
+        start = time.perf_counter()
+
+        def _timed(fn):
+            began = time.perf_counter()
+            result = list(fn(query))
+            return result, (time.perf_counter() - began) * 1000
+
+        rankings: Dict[str, List[str]] = {}
+        stats: Dict[str, Dict[str, Any]] = {}
+        futures: Dict[str, Future] = {}
+        for name, fn in self.sources.items():
+            if name in self.inline:
+                continue
+            future = self._submit(name, lambda fn=fn: _timed(fn))
+            if future is None:
+                # Önceki (zaman aşımına uğramış) çağrılar hâlâ havuz thread'lerini tutuyor
+                stats[name] = {"status": "busy", "count": 0, "ms": 0.0}
+            else:
+                futures[name] = future
+
+        # Ucuz kaynaklar, havuzdakiler çalışırken çağıran thread'de
+        for name in self.inline.intersection(self.sources):
+            try:
+                ranking, elapsed = _timed(self.sources[name])
+                rankings[name] = ranking
+                stats[name] = {"status": "ok", "count": len(ranking), "ms": round(elapsed, 1)}
+            except Exception as e:
+                logger.warning(f"[HYBRID] '{name}' araması başarısız: {e}")
+                stats[name] = {"status": "error", "count": 0, "ms": round((time.perf_counter() - start) * 1000, 1)}
+
+        remaining = self.budget_ms / 1000 - (time.perf_counter() - start)
+        wait(list(futures.values()), timeout=max(0.0, remaining))
+
+        for name, future in futures.items():
+            if not future.done():
+                # Çalışıyorsa devam eder ama sonucu beklenmez
+                self._abandon(name, future)
+                stats[name] = {"status": "timeout", "count": 0, "ms": round((time.perf_counter() - start) * 1000, 1)}
+                continue
+            try:
+                ranking, elapsed = future.result()
+                rankings[name] = ranking
+                stats[name] = {"status": "ok", "count": len(ranking), "ms": round(elapsed, 1)}
+            except Exception as e:
+                logger.warning(f"[HYBRID] '{name}' araması başarısız: {e}")
+                stats[name] = {"status": "error", "count": 0, "ms": round((time.perf_counter() - start) * 1000, 1)}
+
+        # RRF eşitlik sırası kaynakların tanım sırasına göre
+        rankings = {name: rankings[name] for name in self.sources if name in rankings}
+        stats = {name: stats[name] for name in self.sources if name in stats}
+        fused = reciprocal_rank_fusion(rankings, k=self.rrf_k, weights=self.weights)[:limit]
+        return {"results": fused, "sources": stats}
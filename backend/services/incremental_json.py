@@ -0,0 +1,102 @@
+"""
+Akan (streaming) LLM çıktısından analiz bileşenlerini artımlı çıkaran parser.
+
+LLM yanıtı `{"explanation": ..., "components": [{...}, {...}], ...}` şeklinde
+parça parça gelir. Tüm yanıtı beklemek yerine üst seviye "components" dizisinin
+her elemanı kapandığı anda (dengeli süslü parantez) parse edilip döndürülür.
+Her karakter bir kez taranır; string ve kaçış karakterleri (\\") takip edilir,
+böylece açıklama metinlerindeki parantezler sayımı bozmaz.
+"""
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("ai_service")
+
+
+class IncrementalComponentParser:
+    """
+    Kullanım:
+        parser = IncrementalComponentParser()
+        for chunk in stream:
+            for component in parser.feed(chunk):
+                ...
+        full_text = parser.text
+    """
+
+    def __init__(self, key: str = "components"):
+        self.key = key
+        self.text = ""
+        self.emitted = 0
+        self.finished = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._expect_array = False
+        self._array_depth: Optional[int] = None
+        self._item_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Yeni metni ekle, bu parçayla tamamlanan bileşenleri döndür"""
+        self.text += chunk
+        completed = []
+        text = self.text
+
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start + 1:i]
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+                self._expect_array = False
+            elif ch == ":":
+                # Üst seviye nesnede (derinlik 1) "components": [ ...
+                self._expect_array = (self._depth == 1 and self._array_depth is None
+                                      and not self.finished and self._last_string == self.key)
+            elif ch in "{[":
+                if ch == "[" and self._expect_array:
+                    self._array_depth = self._depth + 1
+                elif ch == "{" and self._array_depth is not None and self._depth == self._array_depth:
+                    self._item_start = i
+                self._depth += 1
+                self._expect_array = False
+            elif ch in "}]":
+                self._depth -= 1
+                if self._array_depth is not None:
+                    if ch == "}" and self._depth == self._array_depth and self._item_start is not None:
+                        component = self._parse_item(text[self._item_start:i + 1])
+                        self._item_start = None
+                        if component is not None:
+                            completed.append(component)
+                    elif ch == "]" and self._depth < self._array_depth:
+                        self._array_depth = None
+                        self.finished = True
+            elif not ch.isspace():
+                self._expect_array = False
+
+        self._pos = len(text)
+        self.emitted += len(completed)
+        return completed
+
+    @staticmethod
+    def _parse_item(raw: str) -> Optional[Dict[str, Any]]:
+        try:
+            item = json.loads(raw, strict=False)
+        except json.JSONDecodeError as e:
+            # Bozuk eleman akışı durdurmaz; nihai parse (_process_response) onarmayı dener
+            logger.debug(f"[STREAM] Bileşen parse edilemedi: {e} | {raw[:200]}")
+            return None
+        return item if isinstance(item, dict) else None
@@ -0,0 +1,142 @@
+"""
+Vektör ingestion pipeline'ı: encode ve upsert aşamalarını üst üste bindirir.
+
+Ana thread batch N+1'i encode ederken yazıcı thread batch N'i koleksiyona upsert eder.
+Aradaki kuyruk sınırlı olduğundan yazıcı geride kalırsa encode bekler (bellek sınırlı kalır).
+Batch boyutu ölçülen encode hızına göre hedef batch süresine yaklaşacak şekilde ayarlanır;
+ilerleme (done/total, doküman/sn, ETA) IngestProgress üzerinden okunur.
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from utils.logger import get_vector_logger
+
+logger = get_vector_logger()
+
+# (id, doküman, metadata)
+IngestRow = Tuple[str, str, Dict[str, Any]]
+
+
+class AdaptiveBatchSizer:
+    """Encode süresi hedef süreye yaklaşacak şekilde batch boyutunu ayarlar (adım başına en fazla 2x)"""
+
+    def __init__(self, initial: int, min_size: int = 16, max_size: int = 1024,
+                 target_seconds: float = 1.0, adaptive: bool = True):
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size)
+        self.target_seconds = target_seconds
+        self.adaptive = adaptive
+        self.size = initial if not adaptive else min(max(initial, min_size), self.max_size)
+
+    def record(self, count: int, seconds: float):
+        if not self.adaptive or count <= 0 or seconds <= 0:
+            return
+        # Son batch'ten küçükse (kuyruğun sonu) ölçüm yanıltıcı olabilir
+        if count < self.size:
+            return
+        wanted = int(count / seconds * self.target_seconds)
+        wanted = min(max(wanted, self.size // 2), self.size * 2)
+        self.size = min(max(wanted, self.min_size), self.max_size)
+
+
+class IngestProgress:
+    """Thread-safe ingestion ilerleme durumu (get_status için)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: Dict[str, Any] = {"stage": None, "running": False, "done": 0, "total": 0, "failed": 0}
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+        self.batch_size: Optional[int] = None
+
+    def start(self, stage: str, total: int):
+        with self._lock:
+            self._state = {"stage": stage, "running": True, "done": 0, "total": total, "failed": 0}
+            self._started = time.perf_counter()
+            self._finished = None
+
+    def advance(self, done: int = 0, failed: int = 0):
+        with self._lock:
+            self._state["done"] += done
+            self._state["failed"] += failed
+
+    def finish(self):
+        with self._lock:
+            self._state["running"] = False
+            self._finished = time.perf_counter()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            state = dict(self._state)
+            started, finished = self._started, self._finished
+        elapsed = ((finished or time.perf_counter()) - started) if started is not None else 0.0
+        rate = state["done"] / elapsed if elapsed > 0 else 0.0
+        remaining = state["total"] - state["done"] - state["failed"]
+        state.update({
+            "batch_size": self.batch_size,
+            "elapsed_seconds": round(elapsed, 2),
+            "docs_per_sec": round(rate, 1),
+            "eta_seconds": round(remaining / rate, 1) if state["running"] and rate > 0 else None,
+        })
+        return state
+
+
+def run_pipelined(rows: Sequence[IngestRow],
+                  encode_fn: Callable[[List[str]], List[List[float]]],
+                  upsert_fn: Callable[[List[IngestRow], List[List[float]]], None],
+                  sizer: AdaptiveBatchSizer,
+                  progress: Optional[IngestProgress] = None,
+                  queue_size: int = 2) -> int:
+    """
+    Satırları batch'ler halinde encode edip upsert et (iki aşama eşzamanlı).
+
+    Hatalı batch'ler loglanıp atlanır (failed olarak sayılır).
+
+    Returns:
+        Başarıyla upsert edilen satır sayısı
+    """
+    pending: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max(1, queue_size))
+    upserted = [0]
+
+    def _writer():
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            batch, embeddings = item
+            try:
+                upsert_fn(batch, embeddings)
+                upserted[0] += len(batch)
+                if progress:
+                    progress.advance(done=len(batch))
+            except Exception as e:
+                logger.error(f"[VECTOR_DB] Upsert batch hatası: {e}")
+                if progress:
+                    progress.advance(failed=len(batch))
+
+    writer = threading.Thread(target=_writer, name="vector-ingest-writer", daemon=True)
+    writer.start()
+    start = 0
+    try:
+        while start < len(rows):
+            batch = list(rows[start:start + sizer.size])
+            start += len(batch)
+            if progress:
+                progress.batch_size = sizer.size
+            began = time.perf_counter()
+            try:
+                embeddings = encode_fn([document for _, document, _ in batch])
+            except Exception as e:
+                logger.error(f"[VECTOR_DB] Encode batch hatası: {e}")
+                if progress:
+                    progress.advance(failed=len(batch))
+                continue
+            sizer.record(len(batch), time.perf_counter() - began)
+            # Yazıcı geride kalırsa burada bekler (en fazla queue_size batch bellekte)
+            pending.put((batch, embeddings))
+    finally:
+        pending.put(None)
+        writer.join()
+    return upserted[0]
@@ -0,0 +1,125 @@
+"""
+POZ açıklamaları üzerinde BM25 ters indeks (lexical retrieval).
+
+Hibrit aday üretiminde (services/hybrid_retriever.py) vektör aramasıyla birlikte
+çalışır; "C25/30", "Ø16", "S420" gibi teknik token'ları embedding'den daha iyi
+yakalar. Vector DB boşken (ilk kurulum, ingestion sürerken) tek aday kaynağıdır.
+"""
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+STOP_WORDS = {
+    've', 'ile', 'için', 'bir', 'bu', 'de', 'da', 'den', 'dan', 'nin', 'nın',
+    'ın', 'in', 'her', 'beher', 'veya', 'olan', 'olarak', 'gibi', 'dahil'
+}
+
+# Türkçe için basit F5 kök bulma: rakam içermeyen kelimeler ilk 5 harfe kısaltılır
+STEM_LENGTH = 5
+
+_TOKEN_RE = re.compile(r'\w+(?:[/.,\-]\w+)*')
+
+
+def normalize_text(text: str) -> str:
+    """Türkçe büyük/küçük harf dönüşümü"""
+    if not text:
+        return ""
+    return text.replace('İ', 'i').replace('I', 'ı').lower()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Metni BM25 terimlerine çevir.
+    - Teknik token'lar (rakam içeren) bütün olarak ve parçalarıyla tutulur: "c25/30" -> c25/30, c25, 30
+    - Diğer kelimeler F5 köküne indirgenir: "dökülmesi" -> "dökül"
+    """
+    terms = []
+    for token in _TOKEN_RE.findall(normalize_text(text)):
+        if any(ch.isdigit() for ch in token):
+            terms.append(token)
+            parts = re.split(r'[/.,\-]', token)
+            if len(parts) > 1:
+                terms.extend(p for p in parts if p)
+            continue
+        for word in re.split(r'[/.,\-]', token):
+            if len(word) < 2 or word in STOP_WORDS:
+                continue
+            terms.append(word[:STEM_LENGTH])
+    return terms
+
+
+class BM25Index:
+    """
+    BM25 (Okapi) ters indeks.
+
+    Her posting'in BM25 ağırlığı (idf dahil) yükleme anında hesaplanır;
+    sorgu sadece sorgu terimlerinin posting listelerini toplar.
+    """
+
+    def __init__(self, documents: Dict[str, str], k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_ids: List[str] = list(documents.keys())
+        self.position: Dict[str, int] = {doc_id: i for i, doc_id in enumerate(self.doc_ids)}
+
+        n_docs = len(self.doc_ids)
+        doc_terms = [Counter(tokenize(documents[doc_id])) for doc_id in self.doc_ids]
+        doc_lengths = np.array([sum(c.values()) for c in doc_terms], dtype=np.float64)
+        avg_len = float(doc_lengths.mean()) if n_docs else 0.0
+
+        raw_postings: Dict[str, List[Tuple[int, int]]] = {}
+        for pos, counts in enumerate(doc_terms):
+            for term, tf in counts.items():
+                raw_postings.setdefault(term, []).append((pos, tf))
+
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term, entries in raw_postings.items():
+            docs = np.fromiter((p for p, _ in entries), dtype=np.int64, count=len(entries))
+            tfs = np.fromiter((tf for _, tf in entries), dtype=np.float64, count=len(entries))
+            df = len(entries)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            norm = k1 * (1 - b + b * doc_lengths[docs] / avg_len) if avg_len else k1
+            weights = idf * tfs * (k1 + 1) / (tfs + norm)
+            self.postings[term] = (docs, weights)
+
+        self.avg_doc_length = avg_len
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def scores(self, query: str) -> np.ndarray:
+        """Tüm dokümanlar için BM25 skor vektörü"""
+        scores = np.zeros(len(self.doc_ids), dtype=np.float64)
+        for term, qtf in Counter(tokenize(query)).items():
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            docs, weights = posting
+            scores[docs] += weights * qtf
+        return scores
+
+    def search(self, query: str, limit: int = 200) -> List[Tuple[str, float]]:
+        """En yüksek skorlu en fazla `limit` dokümanı (id, skor) olarak döndür"""
+        if not self.doc_ids:
+            return []
+        scores = self.scores(query)
+        hits = np.nonzero(scores > 0)[0]
+        if len(hits) == 0:
+            return []
+        if len(hits) > limit:
+            top = np.argpartition(-scores[hits], limit - 1)[:limit]
+            hits = hits[top]
+        # Skor azalan, eşitlikte katalog sırası
+        hits = hits[np.lexsort((hits, -scores[hits]))]
+        return [(self.doc_ids[i], float(scores[i])) for i in hits]
+
+    @classmethod
+    def from_poz_data(cls, poz_data: Dict[str, Dict[str, Any]], **kwargs) -> "BM25Index":
+        """POZ_DATA'dan "kod açıklama" dokümanları ile indeks oluştur"""
+        return cls(
+            {code: f"{code} {info.get('description', '')}" for code, info in poz_data.items()},
+            **kwargs
+        )
@@ -0,0 +1,171 @@
+"""
+Kalıcı LLM yanıt cache'i (SQLite).
+
+Aynı tanımın yeniden analizi, golden dataset koşuları ve değişmemiş analizlerin
+critic incelemesi her seferinde OpenRouter'a gidip hem ücret hem onlarca saniye
+harcıyordu. `_submit_api_request` ağ çağrısından önce bu cache'e bakar.
+
+Anahtar: sha256(model, messages, temperature, max_tokens, response_format)
+- TTL: süresi dolan kayıt okunurken silinir
+- Boyut sınırı: kayıt sayısı MAX_ENTRIES'i aşınca en uzun süredir okunmayanlar silinir
+- Görev bazında açma/kapama: analyze | refine | critic (LLM_CACHE_TASKS)
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config import get_llm_cache_config
+from utils.logger import get_ai_logger
+
+logger = get_ai_logger()
+
+
+class LLMResponseCache:
+    """
+    Args:
+        path: SQLite dosyası
+        ttl_seconds: Kayıt ömrü (0 = süresiz)
+        max_entries: En fazla kayıt sayısı (aşılınca LRU silme)
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 7 * 24 * 3600, max_entries: int = 5000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                task TEXT,
+                model TEXT,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                hits INTEGER DEFAULT 0
+            )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, messages: Any, temperature: Optional[float], max_tokens: Optional[int] = None,
+                 response_format: Optional[Dict[str, Any]] = None) -> str:
+        payload = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature,
+             "max_tokens": max_tokens, "response_format": response_format},
+            ensure_ascii=False, sort_keys=True, separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _count(self, task: Optional[str], field: str):
+        entry = self._stats.setdefault(task or "other", {"hits": 0, "misses": 0, "stores": 0})
+        entry[field] += 1
+
+    def get(self, key: str, task: Optional[str] = None) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self._count(task, "misses")
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._count(task, "hits")
+            return row[0]
+
+    def put(self, key: str, response: str, task: Optional[str] = None, model: Optional[str] = None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, task, model, response, created_at, last_access, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0)",
+                (key, task, model, response, now, now)
+            )
+            self._count(task, "stores")
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Süresi dolanları ve sınırı aşan en eski erişilenleri sil (lock altında çağrılır)"""
+        if self.ttl_seconds:
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        overflow = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+            logger.debug(f"[LLM_CACHE] {overflow} kayıt silindi (sınır {self.max_entries})")
+
+    def clear(self) -> int:
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM llm_cache").rowcount
+            self._conn.commit()
+            return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            tasks = {task: dict(entry) for task, entry in self._stats.items()}
+        hits = sum(entry["hits"] for entry in tasks.values())
+        misses = sum(entry["misses"] for entry in tasks.values())
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "tasks": tasks
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache(task: Optional[str] = None) -> Optional[LLMResponseCache]:
+    """
+    Paylaşılan cache; kapalıysa veya görev için devre dışıysa None.
+    task verilmezse sadece genel açık/kapalı durumuna bakılır.
+    """
+    global _cache
+    config = get_llm_cache_config()
+    if not config.ENABLED or (task is not None and task not in config.TASKS):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    _cache = LLMResponseCache(config.PATH, config.TTL_SECONDS, config.MAX_ENTRIES)
+                except sqlite3.Error as e:
+                    logger.error(f"[LLM_CACHE] Cache açılamadı ({config.PATH}): {e}")
+                    return None
+    return _cache
+
+
+def get_llm_cache_stats() -> Dict[str, Any]:
+    """Health/istatistik endpoint'leri için özet"""
+    config = get_llm_cache_config()
+    cache = get_llm_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, "enabled_tasks": sorted(config.TASKS), **cache.stats()}
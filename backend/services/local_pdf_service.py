@@ -1,5 +1,4 @@
 
-import fitz
 import json
 from pathlib import Path
 import re
@@ -89,6 +88,8 @@ class LocalPDFService:
         pdf_files = [f for f in self.analiz_dir.glob("analiz_*.pdf") if f.name[0].islower()]
         print(f"[LOCAL PDF] Taranacak dosyalar: {[f.name for f in pdf_files]}")
 
+        import fitz  # PyMuPDF (ağır, ilk kullanımda yüklenir)
+
         for pdf_file in pdf_files:
             try:
                 doc = fitz.open(pdf_file)
@@ -129,6 +130,8 @@ class LocalPDFService:
 
     def _extract_text_from_pdf(self, file_path, page_num, poz_no, return_structured=False):
         """Belirtilen sayfanın metnini çeker ve Yapısal Analiz veya Tarifi kısmını ayıklatır"""
+        import fitz  # PyMuPDF
+
         try:
             # Dosya varlık kontrolü
             if not Path(file_path).exists():
@@ -0,0 +1,437 @@
+"""
+NumPy tabanlı, memory-mapped vektör deposu (Chroma'ya alternatif backend).
+
+Katalog boyutunda (on binlerce poz) tam (exact) arama, HNSW + SQLite katmanlarından
+daha ucuz: vektörler normalize edilmiş float16 matris olarak `vectors.npy`'de,
+id'ler paralel `ids.npy` dizisinde, belge/metadata `records.json`'da tutulur.
+Açılışta matris mmap ile açılır (sayfalar ilk aramada okunur).
+
+Arama: sorgular normalize edilip matris blok blok (block_rows satır) float32'ye
+çevrilerek çarpılır, her bloktan argpartition ile top-k adaylar alınıp birleştirilir.
+float16 → float32 dönüşümü matris çarpımından pahalı olduğundan çevrilen bloklar
+varsayılan olarak bellekte tutulur (cache_float32=False ile her aramada çevrilir).
+`where` filtresi Chroma sözdiziminin alt kümesini destekler ($eq, $ne, $in, $nin,
+$gt, $gte, $lt, $lte, $and, $or); filtreli aramada sadece eşleşen satırlar çarpılır.
+
+NumpyCollection, VectorDBService'in kullandığı Chroma collection API'sini
+(count, get, query, upsert, update, delete) aynı dönüş formatıyla sağlar.
+Okumalar kilitsizdir: eklemeler ayrılmış kapasiteye yazılıp `count` en son artırılır,
+mevcut satırları değiştiren işlemler yeni bir state nesnesi oluşturur.
+Değişiklikler `flush_delay` saniye sonra (ve çıkışta) diske toplu yazılır.
+"""
+import atexit
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from utils.logger import get_vector_logger
+
+logger = get_vector_logger()
+
+VECTORS_FILE = "vectors.npy"
+IDS_FILE = "ids.npy"
+RECORDS_FILE = "records.json"
+
+DEFAULT_INCLUDE = ("metadatas", "documents")
+DEFAULT_QUERY_INCLUDE = ("metadatas", "documents", "distances")
+
+
+def _normalize(vectors) -> np.ndarray:
+    matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def _condition_mask(column: np.ndarray, condition: Any) -> np.ndarray:
+    if not isinstance(condition, dict):
+        condition = {"$eq": condition}
+    mask = np.ones(len(column), dtype=bool)
+    for op, value in condition.items():
+        if op == "$eq":
+            mask &= column == value
+        elif op == "$ne":
+            mask &= column != value
+        elif op in ("$in", "$nin"):
+            values = set(value)
+            hits = np.fromiter((v in values for v in column), dtype=bool, count=len(column))
+            mask &= hits if op == "$in" else ~hits
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            compare = {
+                "$gt": lambda v: v > value, "$gte": lambda v: v >= value,
+                "$lt": lambda v: v < value, "$lte": lambda v: v <= value,
+            }[op]
+            mask &= np.fromiter(
+                (isinstance(v, (int, float)) and compare(v) for v in column), dtype=bool, count=len(column)
+            )
+        else:
+            raise ValueError(f"Desteklenmeyen where operatörü: {op}")
+    return mask
+
+
+class _State:
+    """Okuyucuların tek seferde aldığı depo durumu (satır < count olanlar geçerli)"""
+
+    __slots__ = ("matrix", "count", "ids", "documents", "metadatas", "rows", "blocks")
+
+    def __init__(self, matrix: Optional[np.ndarray], ids: List[str], documents: List[Optional[str]],
+                 metadatas: List[Dict[str, Any]]):
+        self.matrix = matrix
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self.rows = {doc_id: row for row, doc_id in enumerate(ids)}
+        # float32 blok cache'i: başlangıç satırı → (bitiş satırı, matris)
+        self.blocks: Dict[int, tuple] = {}
+        self.count = len(ids)
+
+
+class NumpyCollection:
+    """Tek koleksiyon: mmap float16 matris + paralel id dizisi"""
+
+    def __init__(self, directory: str, name: str, metadata: Optional[Dict[str, Any]] = None,
+                 block_rows: int = 16384, flush_delay: float = 2.0, cache_float32: bool = True):
+        self.name = name
+        self.metadata = metadata or {}
+        self.directory = directory
+        self.block_rows = block_rows
+        self.flush_delay = flush_delay
+        self.cache_float32 = cache_float32
+        self._write_lock = threading.RLock()
+        self._flush_timer: Optional[threading.Timer] = None
+        self._dirty = False
+        self._version = 0
+        self._columns: Dict[str, tuple] = {}
+        self._state = self._load()
+
+    # ---------- Kalıcılık ----------
+
+    def _load(self) -> _State:
+        vectors_path = os.path.join(self.directory, VECTORS_FILE)
+        records_path = os.path.join(self.directory, RECORDS_FILE)
+        if not (os.path.exists(vectors_path) and os.path.exists(records_path)):
+            return _State(None, [], [], [])
+        try:
+            with open(records_path, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+            ids = np.load(os.path.join(self.directory, IDS_FILE)).tolist()
+            matrix = np.load(vectors_path, mmap_mode='r')
+            if not (len(ids) == matrix.shape[0] == len(records["documents"]) == len(records["metadatas"])):
+                raise ValueError("vectors/ids/records satır sayıları uyumsuz")
+            return _State(matrix, ids, records["documents"], records["metadatas"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"[VECTOR_DB] NumPy koleksiyonu okunamadı ({self.directory}), boş başlatılıyor: {e}")
+            return _State(None, [], [], [])
+
+    def _schedule_flush(self):
+        self._dirty = True
+        self._version += 1
+        if self.flush_delay <= 0:
+            self.flush()
+            return
+        if self._flush_timer is None or not self._flush_timer.is_alive():
+            self._flush_timer = threading.Timer(self.flush_delay, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self):
+        """Bekleyen değişiklikleri diske yaz (her dosya atomik olarak değiştirilir)"""
+        with self._write_lock:
+            if not self._dirty:
+                return
+            state = self._state
+            count = state.count
+            os.makedirs(self.directory, exist_ok=True)
+
+            def _replace(file_name: str, write):
+                target = os.path.join(self.directory, file_name)
+                tmp = target + ".tmp"
+                with open(tmp, 'wb') as f:
+                    write(f)
+                os.replace(tmp, target)
+
+            dim = state.matrix.shape[1] if state.matrix is not None else 0
+            matrix = state.matrix[:count] if state.matrix is not None else np.zeros((0, dim), dtype=np.float16)
+            _replace(VECTORS_FILE, lambda f: np.save(f, matrix))
+            _replace(IDS_FILE, lambda f: np.save(f, np.array(state.ids[:count], dtype=str)))
+            records = {
+                "name": self.name,
+                "metadata": self.metadata,
+                "documents": state.documents[:count],
+                "metadatas": state.metadatas[:count],
+            }
+            _replace(RECORDS_FILE, lambda f: f.write(json.dumps(records, ensure_ascii=False).encode('utf-8')))
+            self._dirty = False
+
+    # ---------- Okuma ----------
+
+    def count(self) -> int:
+        return self._state.count
+
+    def _column(self, state: _State, count: int, field: str) -> np.ndarray:
+        cached = self._columns.get(field)
+        if cached and cached[0] == (id(state), count, self._version):
+            return cached[1]
+        column = np.empty(count, dtype=object)
+        column[:] = [(meta or {}).get(field) for meta in state.metadatas[:count]]
+        self._columns[field] = ((id(state), count, self._version), column)
+        return column
+
+    def _where_mask(self, state: _State, count: int, where: Dict[str, Any]) -> np.ndarray:
+        mask = np.ones(count, dtype=bool)
+        for key, condition in where.items():
+            if key == "$and":
+                for sub in condition:
+                    mask &= self._where_mask(state, count, sub)
+            elif key == "$or":
+                any_mask = np.zeros(count, dtype=bool)
+                for sub in condition:
+                    any_mask |= self._where_mask(state, count, sub)
+                mask &= any_mask
+            else:
+                mask &= _condition_mask(self._column(state, count, key), condition)
+        return mask
+
+    def _float_block(self, state: _State, start: int, end: int) -> np.ndarray:
+        """[start, end) satırlarının float32 kopyası (state'e bağlı cache'ten)"""
+        cached = state.blocks.get(start)
+        if cached is not None and cached[0] == end:
+            return cached[1]
+        block = state.matrix[start:end].astype(np.float32)
+        if self.cache_float32:
+            # Ekleme sonrası son blok uzar: aynı başlangıçlı eski kayıt değiştirilir
+            state.blocks[start] = (end, block)
+        return block
+
+    def _result_fields(self, state: _State, rows: Iterable[int], include: Sequence[str]) -> Dict[str, Any]:
+        rows = list(rows)
+        fields: Dict[str, Any] = {"ids": [state.ids[row] for row in rows]}
+        fields["documents"] = [state.documents[row] for row in rows] if "documents" in include else None
+        fields["metadatas"] = (
+            [dict(state.metadatas[row] or {}) for row in rows] if "metadatas" in include else None
+        )
+        fields["embeddings"] = (
+            state.matrix[rows].astype(np.float32).tolist() if "embeddings" in include and rows else
+            ([] if "embeddings" in include else None)
+        )
+        return fields
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None,
+            limit: Optional[int] = None, offset: Optional[int] = None,
+            include: Sequence[str] = DEFAULT_INCLUDE) -> Dict[str, Any]:
+        state = self._state
+        count = state.count
+        if ids is not None:
+            rows = [state.rows[doc_id] for doc_id in ids if state.rows.get(doc_id, count) < count]
+        else:
+            rows = list(range(count))
+        if where:
+            mask = self._where_mask(state, count, where)
+            rows = [row for row in rows if mask[row]]
+        start = offset or 0
+        rows = rows[start:start + limit] if limit is not None else rows[start:]
+        return self._result_fields(state, rows, include)
+
+    def query(self, query_embeddings, n_results: int = 10, where: Optional[Dict[str, Any]] = None,
+              include: Sequence[str] = DEFAULT_QUERY_INCLUDE) -> Dict[str, Any]:
+        state = self._state
+        count = state.count
+        queries = _normalize(query_embeddings)
+        candidates = np.flatnonzero(self._where_mask(state, count, where)) if where else None
+        total = count if candidates is None else len(candidates)
+        k = min(n_results, total)
+
+        if k == 0:
+            empty = [[] for _ in range(len(queries))]
+            return {"ids": empty, "distances": empty if "distances" in include else None,
+                    "documents": empty if "documents" in include else None,
+                    "metadatas": empty if "metadatas" in include else None, "embeddings": None}
+
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        for start in range(0, total, self.block_rows):
+            end = min(start + self.block_rows, total)
+            if candidates is None:
+                block_rows = np.arange(start, end)
+                block = self._float_block(state, start, end)
+            else:
+                block_rows = candidates[start:end]
+                block = state.matrix[block_rows].astype(np.float32)
+            scores = queries @ block.T
+            kk = min(k, scores.shape[1])
+            part = np.argpartition(-scores, kk - 1, axis=1)[:, :kk]
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, part, axis=1)], axis=1)
+            best_rows = np.concatenate([best_rows, block_rows[part]], axis=1)
+            if best_scores.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind='stable')
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+
+        results: Dict[str, Any] = {"ids": [], "documents": [], "metadatas": [], "embeddings": None}
+        for rows in best_rows:
+            fields = self._result_fields(state, rows.tolist(), include)
+            for key in ("ids", "documents", "metadatas"):
+                results[key].append(fields[key])
+        for key in ("documents", "metadatas"):
+            if key not in include:
+                results[key] = None
+        # Chroma cosine mesafesi: 1 - benzerlik
+        results["distances"] = (1.0 - best_scores).tolist() if "distances" in include else None
+        return results
+
+    # ---------- Yazma ----------
+
+    def _append(self, state: _State, vectors: np.ndarray, ids: List[str], documents: List[Optional[str]],
+                metadatas: List[Dict[str, Any]]) -> _State:
+        """Yeni satırları ekle; kapasite yetmezse büyütülmüş matrisle yeni state döndür"""
+        count = state.count
+        needed = count + len(ids)
+        matrix = state.matrix
+        if matrix is None or matrix.shape[0] < needed or not matrix.flags.writeable:
+            dim = vectors.shape[1]
+            capacity = max(needed, 2 * count, 1024)
+            grown = np.empty((capacity, dim), dtype=np.float16)
+            if matrix is not None and count:
+                grown[:count] = matrix[:count]
+            state = _State(grown, state.ids[:count], state.documents[:count], state.metadatas[:count])
+            matrix = grown
+        matrix[count:needed] = vectors
+        state.ids.extend(ids)
+        state.documents.extend(documents)
+        state.metadatas.extend(metadatas)
+        for offset, doc_id in enumerate(ids):
+            state.rows[doc_id] = count + offset
+        # Okuyucular count'a kadar okur: en son artırılır
+        state.count = needed
+        return state
+
+    def upsert(self, ids: List[str], embeddings, documents: Optional[List[str]] = None,
+               metadatas: Optional[List[Dict[str, Any]]] = None):
+        if embeddings is None:
+            raise ValueError("NumpyCollection.upsert embedding gerektirir")
+        vectors = _normalize(embeddings).astype(np.float16)
+        if len(vectors) != len(ids):
+            raise ValueError("ids ve embeddings uzunlukları uyumsuz")
+
+        # Aynı batch'te tekrar eden id'lerde sonuncusu geçerli
+        latest = {doc_id: i for i, doc_id in enumerate(ids)}
+        with self._write_lock:
+            state = self._state
+            existing = [(doc_id, i) for doc_id, i in latest.items() if doc_id in state.rows]
+            new = [(doc_id, i) for doc_id, i in latest.items() if doc_id not in state.rows]
+
+            if existing:
+                # Mevcut satırlar: okuyucular eski matrisi görmeye devam etsin diye kopyala-yaz
+                count = state.count
+                matrix = np.array(state.matrix[:count], dtype=np.float16)
+                documents_copy = list(state.documents[:count])
+                metadatas_copy = list(state.metadatas[:count])
+                for doc_id, i in existing:
+                    row = state.rows[doc_id]
+                    matrix[row] = vectors[i]
+                    if documents is not None:
+                        documents_copy[row] = documents[i]
+                    if metadatas is not None:
+                        metadatas_copy[row] = metadatas[i]
+                state = _State(matrix, state.ids[:count], documents_copy, metadatas_copy)
+
+            if new:
+                state = self._append(
+                    state,
+                    vectors[[i for _, i in new]],
+                    [doc_id for doc_id, _ in new],
+                    [documents[i] if documents is not None else None for _, i in new],
+                    [metadatas[i] if metadatas is not None else {} for _, i in new],
+                )
+            self._state = state
+            self._schedule_flush()
+
+    def add(self, ids: List[str], embeddings, documents: Optional[List[str]] = None,
+            metadatas: Optional[List[Dict[str, Any]]] = None):
+        self.upsert(ids, embeddings, documents, metadatas)
+
+    def update(self, ids: List[str], embeddings=None, documents: Optional[List[str]] = None,
+               metadatas: Optional[List[Dict[str, Any]]] = None):
+        """Mevcut id'leri güncelle (olmayanlar Chroma'daki gibi yok sayılır)"""
+        with self._write_lock:
+            state = self._state
+            present = [i for i, doc_id in enumerate(ids) if doc_id in state.rows]
+            if not present:
+                return
+            if embeddings is not None:
+                self.upsert(
+                    [ids[i] for i in present], [embeddings[i] for i in present],
+                    [documents[i] for i in present] if documents is not None else None,
+                    [metadatas[i] for i in present] if metadatas is not None else None,
+                )
+                return
+            # Sadece belge/metadata: liste elemanı ataması okuyucular için atomik
+            for i in present:
+                row = state.rows[ids[i]]
+                if documents is not None:
+                    state.documents[row] = documents[i]
+                if metadatas is not None:
+                    state.metadatas[row] = metadatas[i]
+            self._schedule_flush()
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None):
+        with self._write_lock:
+            state = self._state
+            count = state.count
+            remove = np.zeros(count, dtype=bool)
+            if ids is not None:
+                for doc_id in ids:
+                    row = state.rows.get(doc_id)
+                    if row is not None and row < count:
+                        remove[row] = True
+            if where:
+                matches = self._where_mask(state, count, where)
+                remove = remove & matches if ids is not None else matches
+            if not remove.any():
+                return
+            keep = np.flatnonzero(~remove)
+            rows = keep.tolist()
+            self._state = _State(
+                np.array(state.matrix[keep], dtype=np.float16) if state.matrix is not None else None,
+                [state.ids[row] for row in rows],
+                [state.documents[row] for row in rows],
+                [state.metadatas[row] for row in rows],
+            )
+            self._schedule_flush()
+
+
+class NumpyVectorClient:
+    """chromadb.PersistentClient yerine: her koleksiyon `path/<ad>/` dizininde"""
+
+    def __init__(self, path: str, block_rows: int = 16384, flush_delay: float = 2.0,
+                 cache_float32: bool = True):
+        self.path = path
+        self.block_rows = block_rows
+        self.flush_delay = flush_delay
+        self.cache_float32 = cache_float32
+        self._collections: Dict[str, NumpyCollection] = {}
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None) -> NumpyCollection:
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = NumpyCollection(
+                    os.path.join(self.path, name), name, metadata,
+                    block_rows=self.block_rows, flush_delay=self.flush_delay,
+                    cache_float32=self.cache_float32
+                )
+            return self._collections[name]
+
+    def flush(self):
+        for collection in list(self._collections.values()):
+            try:
+                collection.flush()
+            except OSError as e:
+                logger.error(f"[VECTOR_DB] NumPy koleksiyonu yazılamadı ({collection.name}): {e}")
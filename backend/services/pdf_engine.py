@@ -6,9 +6,7 @@ CSV dosyalardan veri okuma desteği ile
 """
 
 import sys
-import fitz  # PyMuPDF
 import re
-import pandas as pd
 from pathlib import Path
 import json
 import hashlib
@@ -183,6 +181,8 @@ class PDFSearchEngine:
 
     def load_pdf(self, pdf_path):
         """PDF dosyasını yükle ve işle - Koordinat tabanlı analiz ile"""
+        import fitz  # PyMuPDF (ağır, ilk kullanımda yüklenir)
+
         try:
             doc = fitz.open(pdf_path)
             file_name = Path(pdf_path).name
@@ -0,0 +1,216 @@
+"""
+POZ kataloğu için ön-hesaplanmış semantik etiket indeksi.
+
+Her poz için etiketler yükleme anında bir bitmask'e (uint64) çevrilir;
+build_context_from_poz_data'daki Jaccard + bonus/ceza kuralları aday dizileri
+üzerinde vektörel olarak uygulanır. SequenceMatcher benzerliği sadece
+sıralamaya girebilecek adaylar için (üst sınır budaması ile) hesaplanır.
+"""
+from difflib import SequenceMatcher
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class PozTagIndex:
+    """
+    POZ_DATA üzerinde etiket bitmask'leri ve vektörel re-ranking.
+
+    Skor formülü build_context_from_poz_data ile birebir aynıdır:
+        tag_jaccard*100 + desc_similarity*40 + keyword_matches*8
+        + birim bonusu + etiket çifti bonus/cezaları
+    """
+
+    # Budama sırasında kayan nokta farkları için güvenlik payı
+    _EPS = 1e-6
+
+    def __init__(
+        self,
+        poz_data: Dict[str, Dict[str, Any]],
+        tag_names: Sequence[str],
+        extract_tags: Callable[[str], List[str]],
+        pair_bonuses: Sequence[Tuple[str, str, float]] = (),
+    ):
+        if len(tag_names) > 64:
+            raise ValueError("PozTagIndex en fazla 64 etiket destekler")
+
+        self.tag_names = list(tag_names)
+        self.tag_bit = {tag: 1 << i for i, tag in enumerate(self.tag_names)}
+        self.extract_tags = extract_tags
+        self.pair_bonuses = [
+            (user_tag, self.tag_bit[poz_tag], float(bonus))
+            for user_tag, poz_tag, bonus in pair_bonuses
+        ]
+
+        self.codes: List[str] = list(poz_data.keys())
+        self.position: Dict[str, int] = {code: i for i, code in enumerate(self.codes)}
+        self.infos: List[Dict[str, Any]] = list(poz_data.values())
+
+        n = len(self.codes)
+        self.descriptions: List[str] = []
+        self.desc_lower: List[str] = []
+        self.desc_sim: List[str] = []
+        self.tags: List[List[str]] = []
+        self.units_lower: List[str] = []
+        tag_bits = np.zeros(n, dtype=np.uint64)
+        tag_counts = np.zeros(n, dtype=np.int64)
+        sim_lengths = np.zeros(n, dtype=np.int64)
+
+        for i, info in enumerate(self.infos):
+            desc = info.get('description', '')
+            tags = extract_tags(desc)
+            bits = 0
+            for tag in tags:
+                bits |= self.tag_bit[tag]
+
+            self.descriptions.append(desc)
+            self.desc_lower.append(desc.lower())
+            # calculate_similarity ile aynı normalizasyon
+            self.desc_sim.append(desc.lower().strip())
+            self.tags.append(tags)
+            self.units_lower.append(info.get('unit', '').lower())
+            tag_bits[i] = bits
+            tag_counts[i] = len(set(tags))
+            sim_lengths[i] = len(self.desc_sim[-1])
+
+        self.tag_bits = tag_bits
+        self.tag_counts = tag_counts
+        self.sim_lengths = sim_lengths
+        self.units_lower_arr = np.array(self.units_lower, dtype=object)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def positions_for(self, codes: Sequence[str]) -> np.ndarray:
+        """Kod listesini (sırayı koruyarak) indeks pozisyonlarına çevir, bilinmeyenleri at"""
+        return np.fromiter(
+            (self.position[c] for c in codes if c in self.position),
+            dtype=np.int64
+        )
+
+    def all_positions(self) -> np.ndarray:
+        return np.arange(len(self.codes), dtype=np.int64)
+
+    def rerank(
+        self,
+        description: str,
+        unit: str,
+        keywords: List[str],
+        user_tags: List[str],
+        candidates: np.ndarray,
+        max_results: int = 15,
+        min_score: float = 5,
+    ) -> List[Dict[str, Any]]:
+        """
+        Adayları puanla ve en iyi max_results eşleşmeyi döndür.
+        Sonuç (sıra ve skorlar dahil) tek tek Python döngüsüyle puanlama ile aynıdır.
+        """
+        if len(candidates) == 0:
+            return []
+
+        bits = self.tag_bits[candidates]
+
+        # 1. Jaccard (bit kesişimi / birleşimi)
+        user_set = [t for t in dict.fromkeys(user_tags) if t in self.tag_bit]
+        if user_set:
+            inter = np.zeros(len(candidates), dtype=np.int64)
+            for tag in user_set:
+                inter += (bits & np.uint64(self.tag_bit[tag])) != 0
+            union = len(user_set) + self.tag_counts[candidates] - inter
+            tag_score = np.where(
+                self.tag_counts[candidates] > 0,
+                inter / np.maximum(union, 1),
+                0.0
+            )
+        else:
+            tag_score = np.zeros(len(candidates), dtype=np.float64)
+
+        # 2. Anahtar kelime eşleşme sayısı
+        kw_counts = np.zeros(len(candidates), dtype=np.int64)
+        for kw in keywords:
+            kw_counts += np.fromiter(
+                (kw in self.desc_lower[p] for p in candidates),
+                dtype=bool, count=len(candidates)
+            )
+
+        # 3. Birim eşleşmesi
+        unit_lower = unit.lower() if unit else ""
+        if unit and unit_lower != "otomatik":
+            unit_mask = self.units_lower_arr[candidates] == unit_lower
+        else:
+            unit_mask = np.zeros(len(candidates), dtype=bool)
+
+        # 4. Etiket çifti bonusları (kural sırası korunur)
+        bonus_terms = []
+        for user_tag, poz_bit, bonus in self.pair_bonuses:
+            if user_tag in user_tags:
+                bonus_terms.append(((bits & np.uint64(poz_bit)) != 0, bonus))
+
+        # Benzerlik için üst sınır: SequenceMatcher.real_quick_ratio (uzunluk tabanlı)
+        user_sim = description.lower().strip() if description else ""
+        la = len(user_sim)
+        lb = self.sim_lengths[candidates]
+        total_len = la + lb
+        sim_upper = np.where(total_len > 0, 2.0 * np.minimum(la, lb) / np.maximum(total_len, 1), 1.0)
+
+        def combine(idx: np.ndarray, sims: np.ndarray) -> np.ndarray:
+            # Orijinal toplama sırasını birebir izle (kayan nokta eşitliği için)
+            score = tag_score[idx] * 100
+            score = score + sims * 40
+            score = score + kw_counts[idx] * 8
+            score = score + np.where(unit_mask[idx], 15.0, 0.0)
+            for mask, bonus in bonus_terms:
+                score = score + np.where(mask[idx], bonus, 0.0)
+            return score
+
+        upper = combine(np.arange(len(candidates)), sim_upper)
+        eligible = np.nonzero(upper + self._EPS > min_score)[0]
+        if len(eligible) == 0:
+            return []
+
+        # Üst sınıra göre azalan sırada gez, k'ıncı en iyi skoru geçemeyenleri budayarak
+        order = eligible[np.argsort(-upper[eligible], kind='stable')]
+        scored_idx: List[int] = []
+        scored_val: List[float] = []
+        kth_best: Optional[float] = None
+        chunk = 64
+
+        for start in range(0, len(order), chunk):
+            block = order[start:start + chunk]
+            if kth_best is not None and upper[block[0]] + self._EPS < kth_best:
+                break
+
+            sims = np.fromiter(
+                (self._similarity(description, user_sim, p) for p in candidates[block]),
+                dtype=np.float64, count=len(block)
+            )
+            exact = combine(block, sims)
+            keep = exact > min_score
+            scored_idx.extend(block[keep].tolist())
+            scored_val.extend(exact[keep].tolist())
+
+            if len(scored_val) >= max_results:
+                kth_best = sorted(scored_val, reverse=True)[max_results - 1]
+
+        # Orijinal davranış: aday sırasıyla stabil, skora göre azalan sıralama
+        ranked = sorted(zip(scored_idx, scored_val), key=lambda x: (-x[1], x[0]))[:max_results]
+
+        matches = []
+        for cand_i, score in ranked:
+            pos = int(candidates[cand_i])
+            info = self.infos[pos]
+            matches.append({
+                'poz_no': info.get('poz_no', ''),
+                'description': self.descriptions[pos],
+                'unit': info.get('unit', ''),
+                'unit_price': info.get('unit_price', '0'),
+                'score': score,
+                'tags': self.tags[pos]
+            })
+        return matches
+
+    def _similarity(self, description: str, user_sim: str, pos: int) -> float:
+        """calculate_similarity(description, poz_desc) ile aynı sonuç"""
+        if not description or not self.descriptions[pos]:
+            return 0.0
+        return SequenceMatcher(None, user_sim, self.desc_sim[pos]).ratio()
@@ -23,11 +23,15 @@ class SelfConsistencyService:
         temperatures = [0.1, 0.2, 0.3][:self.n_samples]
 
         for temp in temperatures:
-            # ai_service.generate_analysis sync method, asyncio.to_thread ile çağır
-            task = asyncio.to_thread(
-                self.ai_service.generate_analysis,
-                description, unit, context_data, None, temp
-            )
+            if hasattr(self.ai_service, "generate_analysis_async"):
+                # Async servis: istekler event loop'ta, thread tutmadan bekler
+                task = self.ai_service.generate_analysis_async(description, unit, context_data, None, temp)
+            else:
+                # ai_service.generate_analysis sync method, asyncio.to_thread ile çağır
+                task = asyncio.to_thread(
+                    self.ai_service.generate_analysis,
+                    description, unit, context_data, None, temp
+                )
             tasks.append(task)
 
         results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -5,6 +5,7 @@ import time
 import logging
 from typing import Dict, Any, List, Optional
 from threading import Lock
+from services.http_client import get_http_session
 
 logger = logging.getLogger("settings_service")
 
@@ -99,7 +100,7 @@ class SettingsService:
             
             for attempt in range(3):
                 try:
-                    response = requests.get(
+                    response = get_http_session().get(
                         "https://openrouter.ai/api/v1/models",
                         headers={
                             "Authorization": f"Bearer {api_key}", 
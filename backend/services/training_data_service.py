@@ -1,51 +1,306 @@
 from pathlib import Path
+import heapq
 import json
+import math
+import os
+import threading
 from typing import List, Dict, Any, Optional
 from difflib import SequenceMatcher
 from utils.logger import get_training_logger
+from config import get_analysis_config
+from services.training_jsonl_index import (
+    CATEGORIES,
+    INDEX_KEYS,
+    LazyExampleList,
+    file_signature,
+    load_or_build_offset_index,
+    save_offset_index,
+    scan_lines,
+    tail_signature,
+)
 
 logger = get_training_logger()
 
 
+def _extract_keywords(text: str) -> List[str]:
+    stop_words = {'ve', 'ile', 'için', 'bir', 'bu', 'de', 'da', 'den', 'dan', 'nin', 'nın', 'ın', 'in', 'her', 'beher'}
+    words = text.lower().replace('/', ' ').replace('-', ' ').split()
+    return [w for w in words if len(w) > 2 and w not in stop_words]
+
+
+class _ExampleIndex:
+    """
+    Örnekler ve lookup/RAG indeksleri (sadece sona ekleme yapılır).
+
+    Okuyucular istek başında `count` değerini alır ve sadece `idx < count` olan
+    girdileri kullanır; böylece istek sürerken yapılan eklemeler görünmez.
+    Dosya baştan değiştiğinde yeni bir _ExampleIndex kurulup referans değiştirilir.
+    """
+
+    def __init__(self, data):
+        self.data = data  # List[Dict] veya LazyExampleList
+        self.count = 0
+        self.inputs: List[str] = []
+        self.normalized: List[str] = []
+        self.exact: Dict[str, int] = {}
+        self.length_buckets: Dict[int, List[int]] = {}
+        self.keywords: List[frozenset] = []
+        self.postings: Dict[str, List[int]] = {}
+        self.category_counts: Dict[str, int] = {c: 0 for c in CATEGORIES}
+
+    def add(self, example_input: str, normalized: str, flags: int = 0):
+        """Tek bir örneği indekslere ekle; örneğin kendisi `data`'ya önceden eklenmiş olmalı"""
+        idx = len(self.inputs)
+        self.inputs.append(example_input)
+        self.normalized.append(normalized)
+        # Aynı input birden fazla kez varsa dosyadaki ilk örnek geçerli
+        self.exact.setdefault(normalized, idx)
+        self.length_buckets.setdefault(len(normalized), []).append(idx)
+
+        keywords = frozenset(_extract_keywords(example_input))
+        self.keywords.append(keywords)
+        for keyword in keywords:
+            self.postings.setdefault(keyword, []).append(idx)
+
+        for bit, category in enumerate(CATEGORIES):
+            if flags & (1 << bit):
+                self.category_counts[category] += 1
+
+    def add_entries(self, entries: Dict[str, Any]):
+        for example_input, normalized, flags in zip(entries['inputs'], entries['normalized'], entries['flags']):
+            self.add(example_input, normalized, flags)
+        # Yeni örnekler okuyuculara en son görünür hale gelir
+        self.count = len(self.inputs)
+
+
 class TrainingDataService:
     """
     Eğitim verisini yönetir (egitim_verisi_CLEANED.jsonl).
 
     Özellikler:
-    - Direct Lookup: Tam eşleşme kontrolü
-    - RAG: Benzer örnekleri bulma
+    - Direct Lookup: Tam eşleşme kontrolü (normalize input hash map + uzunluk kovaları)
+    - RAG: Benzer örnekleri bulma (anahtar kelime → örnek ters indeksi + top-k heap,
+      Vector DB hazırsa ANN aday listesi + lexical rerank)
     - Semantic Search: Anahtar kelime tabanlı arama
+    - Lazy mod: byte-offset indeksi + mmap, output'lar sadece döndürülürken decode edilir
+    - Hot reload: API ile örnek ekleme ve dosyaya dışarıdan eklenen satırları artımlı yükleme
     """
 
-    def __init__(self, jsonl_path: str):
+    def __init__(self, jsonl_path: str, lazy: Optional[bool] = None):
         self.jsonl_path = jsonl_path
-        self.training_data: List[Dict[str, Any]] = []
+        self.lazy = get_analysis_config().TRAINING_LAZY_LOAD if lazy is None else lazy
+        self._index = _ExampleIndex([])
+
+        # Artımlı okuma durumu: taranan byte sayısı, satır sayısı, dosya imzası
+        self._scanned_bytes = 0
+        self._line_count = 0
+        self._signature: Optional[Dict[str, int]] = None
+        self._tail_signature = ""
+        self._offset_index: Optional[Dict[str, Any]] = None
+        # Offset indeksine henüz yazılmamış eklenen örnek sayısı (lazy mod)
+        self._unsaved_examples = 0
+        self._write_lock = threading.Lock()
+        # Sıra: _index_save_lock → _write_lock (indeks diske _write_lock dışında yazılır)
+        self._index_save_lock = threading.Lock()
+
+        # Embedding tabanlı aday üretimi (opsiyonel, VectorDBService.training_collection)
+        self.vector_service = None
+
         self.load_training_data()
 
+    @property
+    def training_data(self):
+        """Örnek listesi (eager modda List[Dict], lazy modda LazyExampleList)"""
+        return self._index.data
+
     def load_training_data(self):
         """JSONL dosyasını yükle"""
         try:
             path = Path(self.jsonl_path)
             if not path.exists():
                 logger.warning(f"⚠️ Training data file not found: {self.jsonl_path}")
+                self._reset_state(_ExampleIndex([]))
+                return
+
+            if self.lazy:
+                self._load_lazy()
                 return
 
-            with open(path, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        data = json.loads(line)
-                        self.training_data.append(data)
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"⚠️ JSON parse error at line {line_num}: {e}")
+            signature = file_signature(self.jsonl_path)
+            with open(path, 'rb') as f:
+                raw = f.read()
+            entries = scan_lines(raw, keep_examples=True)
+            index = _ExampleIndex(entries['examples'])
+            index.add_entries(entries)
+            self._reset_state(index, entries['consumed'], entries['line_count'], signature)
 
-            logger.info(f"✅ Loaded {len(self.training_data)} training examples from {self.jsonl_path}")
+            logger.info(f"✅ Loaded {index.count} training examples from {self.jsonl_path}")
 
         except Exception as e:
             logger.error(f"❌ Error loading training data: {e}")
-            self.training_data = []
+            self._reset_state(_ExampleIndex([]))
+
+    def _load_lazy(self):
+        """Offset indeksini (kayıtlıysa diskten) yükle, örnekleri mmap üzerinden lazy aç"""
+        offset_index = load_or_build_offset_index(self.jsonl_path)
+        # Liste kopyaları: kayıtlı indeks dict'i ile LazyExampleList aynı listeleri paylaşmasın
+        data = LazyExampleList(self.jsonl_path, list(offset_index['offsets']), list(offset_index['lengths']))
+        index = _ExampleIndex(data)
+        index.add_entries(offset_index)
+        self._offset_index = offset_index
+        self._unsaved_examples = 0
+        self._reset_state(
+            index, offset_index.get('scanned_bytes', offset_index['size']), offset_index.get('line_count', 0),
+            {'size': offset_index['size'], 'mtime_ns': offset_index['mtime_ns']}
+        )
+        logger.info(f"✅ Indexed {index.count} training examples (lazy) from {self.jsonl_path}")
+
+    def _reset_state(self, index: _ExampleIndex, scanned_bytes: int = 0, line_count: int = 0,
+                     signature: Optional[Dict[str, int]] = None):
+        self._index = index
+        self._scanned_bytes = scanned_bytes
+        self._line_count = line_count
+        self._signature = signature
+        # Eski LazyExampleList kapatılmaz: devam eden istekler eski görünümü okumaya devam edebilir
+        self._tail_signature = tail_signature(self.jsonl_path, scanned_bytes) if signature else ""
+
+    def get_inputs(self) -> List[str]:
+        """Örnek input metinleri (dosya sırası, index = training_data index'i)"""
+        index = self._index
+        return index.inputs[:index.count]
+
+    def refresh(self) -> Dict[str, Any]:
+        """
+        Dosyadaki değişiklikleri yükle.
+        - Sona eklenen satırlar: sadece yeni byte'lar okunur, indeksler artımlı güncellenir
+        - Dosya kısaldıysa / baştan yeniden yazıldıysa: tam yeniden yükleme
+
+        Returns:
+            {"mode": "unchanged" | "append" | "reload", "added": ..., "total": ...}
+        """
+        with self._write_lock:
+            result = self._refresh_locked()
+        if self._unsaved_examples >= get_analysis_config().TRAINING_INDEX_SAVE_EVERY:
+            self.flush_offset_index()
+        return result
+
+    def _refresh_locked(self) -> Dict[str, Any]:
+        """refresh gövdesi; _write_lock altında çağrılır"""
+        if not os.path.exists(self.jsonl_path):
+            return {"mode": "unchanged", "added": 0, "total": self._index.count}
+
+        signature = file_signature(self.jsonl_path)
+        if signature == self._signature:
+            return {"mode": "unchanged", "added": 0, "total": self._index.count}
+
+        appendable = (
+            self._signature is not None
+            and signature['size'] >= self._scanned_bytes
+            and tail_signature(self.jsonl_path, self._scanned_bytes) == self._tail_signature
+        )
+        if not appendable:
+            logger.info("🔄 Training data file rewritten, reloading...")
+            self.load_training_data()
+            self._sync_vector_index(self.get_inputs(), full=True)
+            return {"mode": "reload", "added": self._index.count, "total": self._index.count}
+
+        added = self._load_appended(signature)
+        return {"mode": "append", "added": added, "total": self._index.count}
+
+    def _load_appended(self, signature: Dict[str, int]) -> int:
+        """Son taranan offset'ten sonraki satırları indekslere ekle"""
+        with open(self.jsonl_path, 'rb') as f:
+            f.seek(self._scanned_bytes)
+            raw = f.read(signature['size'] - self._scanned_bytes)
+        entries = scan_lines(raw, base_offset=self._scanned_bytes, first_line_num=self._line_count + 1,
+                             keep_examples=not self.lazy)
+
+        index = self._index
+        start = index.count
+        if self.lazy:
+            index.data.extend(entries['offsets'], entries['lengths'])
+            if self._offset_index is not None:
+                for key in INDEX_KEYS:
+                    self._offset_index[key].extend(entries[key])
+        else:
+            index.data.extend(entries['examples'])
+        index.add_entries(entries)
+
+        self._scanned_bytes = entries['consumed']
+        self._line_count += entries['line_count']
+        self._signature = signature
+        self._tail_signature = tail_signature(self.jsonl_path, self._scanned_bytes)
+
+        if self.lazy and self._offset_index is not None:
+            # Diske yazma ertelenir (flush_offset_index): her eklemede tüm indeksi yazmak O(korpus)
+            self._offset_index.update(signature, scanned_bytes=self._scanned_bytes, line_count=self._line_count)
+            self._unsaved_examples += index.count - start
+
+        added = index.count - start
+        if added:
+            logger.info(f"➕ Loaded {added} appended training examples (total {index.count})")
+            self._sync_vector_index(
+                [(idx, index.inputs[idx]) for idx in range(start, index.count)]
+            )
+        return added
+
+    def flush_offset_index(self) -> bool:
+        """
+        Bekleyen eklemeleri offset indeksine (.idx.json) yaz.
+        Kapanışta ve TRAINING_INDEX_SAVE_EVERY örnekte bir çağrılır; yazılmamış eklemeler
+        olsa da indeks boyut/mtime kontrolüyle bir sonraki açılışta yeniden oluşturulur.
+        """
+        with self._index_save_lock:
+            with self._write_lock:
+                if not self.lazy or self._offset_index is None or not self._unsaved_examples:
+                    return False
+                # Liste kopyaları kilit altında alınır; JSON yazımı ekleme/refresh'i bloklamaz
+                snapshot = {key: list(value) if key in INDEX_KEYS else value
+                            for key, value in self._offset_index.items()}
+                self._unsaved_examples = 0
+            save_offset_index(self.jsonl_path, snapshot)
+        return True
+
+    def append_examples(self, examples: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Yeni eğitim örneklerini JSONL dosyasının sonuna yaz ve indekslere ekle.
+
+        Args:
+            examples: {"input": ..., "output": {...}, "instruction"?: ..., "metadata"?: ...} listesi
+
+        Returns:
+            refresh() sonucu
+        """
+        for example in examples:
+            if not isinstance(example, dict) or not str(example.get('input', '')).strip():
+                raise ValueError("Her örnekte boş olmayan 'input' alanı olmalı")
+            if not isinstance(example.get('output'), dict):
+                raise ValueError("Her örnekte 'output' sözlüğü olmalı")
+
+        payload = "".join(json.dumps(example, ensure_ascii=False) + "\n" for example in examples)
+        with self._write_lock:
+            with open(self.jsonl_path, 'ab+') as f:
+                # Son satır newline ile bitmiyorsa yeni satırlar ona yapışmasın
+                f.seek(0, os.SEEK_END)
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        f.write(b'\n')
+                f.write(payload.encode('utf-8'))
+        return self.refresh()
+
+    def _sync_vector_index(self, items, full: bool = False):
+        """Eklenen örnekleri training_examples koleksiyonuna işle (model yüklü değilse sonraki senkronda)"""
+        vector_service = self.vector_service
+        if vector_service is None or not getattr(vector_service, '_model_loaded', False):
+            return
+        try:
+            if full:
+                vector_service.ingest_training_data(items)
+            else:
+                vector_service.upsert_training_examples(items)
+        except Exception as e:
+            logger.warning(f"⚠️ Training vector index update failed: {e}")
 
     def calculate_similarity(self, text1: str, text2: str) -> float:
         """İki metin arasındaki benzerlik oranı (0-1)"""
@@ -63,10 +318,7 @@ class TrainingDataService:
 
     def extract_keywords(self, text: str) -> List[str]:
         """Metinden anahtar kelimeleri çıkar"""
-        stop_words = {'ve', 'ile', 'için', 'bir', 'bu', 'de', 'da', 'den', 'dan', 'nin', 'nın', 'ın', 'in', 'her', 'beher'}
-        words = text.lower().replace('/', ' ').replace('-', ' ').split()
-        keywords = [w for w in words if len(w) > 2 and w not in stop_words]
-        return keywords
+        return _extract_keywords(text)
 
     def direct_lookup(self, user_input: str, threshold: float = 0.95) -> Optional[Dict[str, Any]]:
         """
@@ -79,38 +331,56 @@ class TrainingDataService:
         Returns:
             Eşleşen örnek varsa output'u döner, yoksa None
         """
-        if not self.training_data:
+        index = self._index
+        n = index.count
+        if not n:
             return None
 
         user_norm = self.normalize_text(user_input)
 
-        for example in self.training_data:
-            example_input = example.get('input', '')
-            example_norm = self.normalize_text(example_input)
-
-            # Tam eşleşme
-            if user_norm == example_norm:
-                return {
-                    'input': example_input,
-                    'output': example['output'],
-                    'metadata': example.get('metadata', {}),
-                    'match_type': 'exact',
-                    'similarity': 1.0
-                }
-
-            # Çok yüksek benzerlik
+        # 1. Tam eşleşme: O(1) hash lookup
+        exact_idx = index.exact.get(user_norm)
+        if exact_idx is not None and exact_idx < n:
+            return self._lookup_result(index, exact_idx, 'exact', 1.0)
+
+        # 2. Çok yüksek benzerlik: sadece ratio() eşiği geçebilecek uzunluktaki örnekler
+        # ratio = 2*M/(la+lb) ≤ 2*min(la,lb)/(la+lb) → lb ∈ [la*t/(2-t), la*(2-t)/t]
+        if not user_norm or threshold <= 0:
+            return None
+        la = len(user_norm)
+        min_len = math.ceil(la * threshold / (2 - threshold) - 1e-9)
+        max_len = math.floor(la * (2 - threshold) / threshold + 1e-9)
+        candidates = []
+        for length in range(min_len, max_len + 1):
+            candidates.extend(idx for idx in index.length_buckets.get(length, ()) if idx < n)
+        # Dosya sırası korunur (ilk eşik üstü örnek döner)
+        candidates.sort()
+
+        # Üst sınırlar simetrik: kullanıcı metni seq2'de bir kez cache'lenir
+        bound = SequenceMatcher(None)
+        bound.set_seq2(user_norm)
+        for idx in candidates:
+            example_norm = index.normalized[idx]
+            bound.set_seq1(example_norm)
+            if bound.real_quick_ratio() < threshold or bound.quick_ratio() < threshold:
+                continue
+
             similarity = self.calculate_similarity(user_norm, example_norm)
             if similarity >= threshold:
-                return {
-                    'input': example_input,
-                    'output': example['output'],
-                    'metadata': example.get('metadata', {}),
-                    'match_type': 'high_similarity',
-                    'similarity': similarity
-                }
+                return self._lookup_result(index, idx, 'high_similarity', similarity)
 
         return None
 
+    def _lookup_result(self, index: _ExampleIndex, idx: int, match_type: str, similarity: float) -> Dict[str, Any]:
+        example = index.data[idx]
+        return {
+            'input': example.get('input', ''),
+            'output': example['output'],
+            'metadata': example.get('metadata', {}),
+            'match_type': match_type,
+            'similarity': similarity
+        }
+
     def find_similar_examples(self, user_input: str, top_k: int = 5, min_similarity: float = 0.4) -> List[Dict[str, Any]]:
         """
         Benzer örnekleri bul (RAG için).
@@ -123,45 +393,152 @@ class TrainingDataService:
         Returns:
             Benzerlik skoruna göre sıralı örnek listesi
         """
-        if not self.training_data:
+        index = self._index
+        n = index.count
+        if not n or top_k <= 0:
             return []
 
         user_norm = self.normalize_text(user_input)
         user_keywords = set(self.extract_keywords(user_input))
+        la = len(user_norm)
+
+        # Ortak anahtar kelimesi olan örnekler: ters indeksten kesişim sayıları
+        shared: Dict[int, int] = {}
+        for keyword in user_keywords:
+            for idx in index.postings.get(keyword, ()):
+                if idx < n:
+                    shared[idx] = shared.get(idx, 0) + 1
+
+        # Top-k: (skor, -sıra) min-heap; eşit skorda dosyada önce gelen kazanır (eski stabil sort)
+        heap: List[tuple] = []
+        bound = SequenceMatcher(None)
+        bound.set_seq2(user_norm)
+
+        def cutoff() -> float:
+            return heap[0][0] if len(heap) >= top_k else min_similarity
+
+        def consider(idx: int, keyword_similarity: float):
+            example_norm = index.normalized[idx]
+            # Ucuz üst sınırlar: uzunluk (real_quick_ratio) ve karakter çokluğu (quick_ratio)
+            bound.set_seq1(example_norm)
+            if bound.real_quick_ratio() * 0.6 + keyword_similarity * 0.4 < cutoff():
+                return
+            if bound.quick_ratio() * 0.6 + keyword_similarity * 0.4 < cutoff():
+                return
 
-        matches = []
+            text_similarity = self.calculate_similarity(user_norm, example_norm)
+            score = text_similarity * 0.6
+            score += keyword_similarity * 0.4
+            if score < min_similarity:
+                return
+            entry = (score, -idx, text_similarity)
+            if len(heap) < top_k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+        # 1. Anahtar kelime paylaşanlar — en yüksek üst sınırdan başlayarak (budama erken devreye girer)
+        candidates = []
+        for idx, intersection in shared.items():
+            example_keywords = index.keywords[idx]
+            keyword_similarity = intersection / (len(user_keywords) + len(example_keywords) - intersection)
+            lb = len(index.normalized[idx])
+            length_bound = 2.0 * min(la, lb) / (la + lb) if la and lb else 0.0
+            candidates.append((length_bound * 0.6 + keyword_similarity * 0.4, idx, keyword_similarity))
+        candidates.sort(key=lambda c: (-c[0], c[1]))
+        for upper, idx, keyword_similarity in candidates:
+            if upper < cutoff():
+                break
+            consider(idx, keyword_similarity)
+
+        # 2. Ortak kelimesi olmayanlar sadece metin benzerliğiyle (%60) eşiği geçebilir:
+        #    ratio ≤ 2*min(la,lb)/(la+lb) → yalnızca uyumlu uzunluk kovaları taranır
+        required = cutoff() / 0.6
+        if required <= 0:
+            lengths = list(index.length_buckets)
+        elif required <= 1.0 and la:
+            min_len = math.ceil(la * required / (2 - required) - 1e-9)
+            max_len = math.floor(la * (2 - required) / required + 1e-9)
+            lengths = [l for l in list(index.length_buckets) if min_len <= l <= max_len]
+        else:
+            lengths = []
+        # Kullanıcı metnine en yakın uzunluklar önce (en yüksek üst sınır)
+        lengths.sort(key=lambda l: (abs(l - la), l))
+        for length in lengths:
+            if la and 2.0 * min(la, length) / (la + length) * 0.6 < cutoff():
+                continue
+            for idx in index.length_buckets[length]:
+                if idx >= n:
+                    break
+                if idx not in shared:
+                    consider(idx, 0.0)
+
+        return [
+            self._similar_result(index, -neg_idx, score, text_similarity, user_keywords)
+            for score, neg_idx, text_similarity in sorted(heap, reverse=True)
+        ]
 
-        for example in self.training_data:
-            example_input = example.get('input', '')
-            example_norm = self.normalize_text(example_input)
-            example_keywords = set(self.extract_keywords(example_input))
+    def _similar_result(self, index: _ExampleIndex, idx: int, score: float, text_similarity: float,
+                        user_keywords: set) -> Dict[str, Any]:
+        example = index.data[idx]
+        return {
+            'input': example.get('input', ''),
+            'output': example['output'],
+            'similarity': score,
+            'text_similarity': text_similarity,
+            'common_keywords': list(user_keywords & index.keywords[idx])
+        }
 
-            # Benzerlik skoru hesapla (ağırlıklı sistem)
-            score = 0.0
+    def set_vector_service(self, vector_service):
+        """RAG aday üretimi için VectorDBService bağla (training_examples koleksiyonu)"""
+        self.vector_service = vector_service
 
-            # 1. Metin benzerliği (60% ağırlık)
-            text_similarity = self.calculate_similarity(user_norm, example_norm)
-            score += text_similarity * 0.6
+    def find_similar_examples_ann(self, user_input: str, top_k: int = 5, min_similarity: float = 0.4,
+                                  n_candidates: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Embedding (ANN) ile aday örnekleri getirip find_similar_examples ile aynı
+        lexical skorla yeniden sırala.
 
-            # 2. Anahtar kelime eşleşmesi (40% ağırlık)
-            if user_keywords and example_keywords:
-                keyword_intersection = len(user_keywords & example_keywords)
-                keyword_union = len(user_keywords | example_keywords)
-                keyword_similarity = keyword_intersection / keyword_union if keyword_union > 0 else 0
-                score += keyword_similarity * 0.4
+        Returns:
+            Sıralı örnek listesi; Vector DB hazır değilse None (çağıran lexical aramaya düşer)
+        """
+        index = self._index
+        n = index.count
+        if not n or self.vector_service is None or not self.vector_service.is_training_ready:
+            return None
+
+        if n_candidates is None:
+            n_candidates = get_analysis_config().TRAINING_ANN_CANDIDATES
+        hits = self.vector_service.search_training(user_input, n_results=max(n_candidates, top_k))
+        if not hits:
+            return None
+
+        user_norm = self.normalize_text(user_input)
+        user_keywords = set(self.extract_keywords(user_input))
 
+        scored = []
+        seen = set()
+        for hit in hits:
+            # Koleksiyondaki index dosya değiştiyse eskimiş olabilir; normalize input ile eşle
+            idx = index.exact.get(self.normalize_text(hit.get('input', '')))
+            if idx is None or idx >= n or idx in seen:
+                continue
+            seen.add(idx)
+
+            example_keywords = index.keywords[idx]
+            text_similarity = self.calculate_similarity(user_norm, index.normalized[idx])
+            score = text_similarity * 0.6
+            if user_keywords and example_keywords:
+                intersection = len(user_keywords & example_keywords)
+                score += intersection / (len(user_keywords) + len(example_keywords) - intersection) * 0.4
             if score >= min_similarity:
-                matches.append({
-                    'input': example_input,
-                    'output': example['output'],
-                    'similarity': score,
-                    'text_similarity': text_similarity,
-                    'common_keywords': list(user_keywords & example_keywords)
-                })
-
-        # Skorlara göre sırala ve top_k al
-        matches.sort(key=lambda x: x['similarity'], reverse=True)
-        return matches[:top_k]
+                scored.append((score, idx, text_similarity))
+
+        scored.sort(key=lambda x: (-x[0], x[1]))
+        return [
+            self._similar_result(index, idx, score, text_similarity, user_keywords)
+            for score, idx, text_similarity in scored[:top_k]
+        ]
 
     def build_rag_context(self, user_input: str, top_k: int = 3) -> str:
         """
@@ -175,7 +552,13 @@ class TrainingDataService:
         Returns:
             Formatlanmış context metni
         """
-        similar_examples = self.find_similar_examples(user_input, top_k=top_k)
+        similar_examples = None
+        try:
+            similar_examples = self.find_similar_examples_ann(user_input, top_k=top_k)
+        except Exception as e:
+            logger.warning(f"⚠️ ANN eğitim örneği araması başarısız, lexical aramaya geçiliyor: {e}")
+        if not similar_examples:
+            similar_examples = self.find_similar_examples(user_input, top_k=top_k)
 
         if not similar_examples:
             return ""
@@ -229,25 +612,21 @@ class TrainingDataService:
 
     def get_stats(self) -> Dict[str, Any]:
         """İstatistik bilgilerini döndür"""
-        if not self.training_data:
+        index = self._index
+        if not index.count:
             return {
                 'total_examples': 0,
                 'loaded': False
             }
 
-        # Kategori sayıları
-        has_iscilik = sum(1 for ex in self.training_data if ex.get('output', {}).get('iscilik'))
-        has_malzeme = sum(1 for ex in self.training_data if ex.get('output', {}).get('malzeme'))
-        has_makine = sum(1 for ex in self.training_data if ex.get('output', {}).get('makine'))
-        has_nakliye = sum(1 for ex in self.training_data if ex.get('output', {}).get('nakliye'))
-
         return {
-            'total_examples': len(self.training_data),
+            'total_examples': index.count,
             'loaded': True,
+            'lazy': self.lazy,
             'categories': {
-                'with_iscilik': has_iscilik,
-                'with_malzeme': has_malzeme,
-                'with_makine': has_makine,
-                'with_nakliye': has_nakliye
+                'with_iscilik': index.category_counts['iscilik'],
+                'with_malzeme': index.category_counts['malzeme'],
+                'with_makine': index.category_counts['makine'],
+                'with_nakliye': index.category_counts['nakliye']
             }
         }
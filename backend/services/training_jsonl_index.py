@@ -0,0 +1,220 @@
+"""
+Eğitim JSONL dosyası için byte-offset indeksi ve lazy örnek listesi.
+
+Dosya bir kez taranıp her geçerli satırın (offset, uzunluk, input, normalize
+input, kategori bayrakları) bilgisi dosyanın yanına `<dosya>.idx.json` olarak
+kaydedilir. Sonraki açılışlarda dosya boyutu ve mtime aynıysa indeks diskten
+okunur; örneklerin output'ları sadece döndürüleceklerinde mmap üzerinden decode edilir.
+"""
+import hashlib
+import json
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+from utils.logger import get_training_logger
+
+logger = get_training_logger()
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".idx.json"
+
+CATEGORIES = ('iscilik', 'malzeme', 'makine', 'nakliye')
+
+# Örnek başına tutulan indeks alanları
+INDEX_KEYS = ('offsets', 'lengths', 'inputs', 'normalized', 'flags')
+
+
+def normalize_input(text: str) -> str:
+    """TrainingDataService.normalize_text ile aynı normalizasyon"""
+    if not text:
+        return ""
+    return " ".join(text.lower().strip().split())
+
+
+def category_flags(example: Dict[str, Any]) -> int:
+    """Örneğin dolu output kategorilerini bit maskesi olarak döndür (CATEGORIES sırası)"""
+    output = example.get('output', {}) or {}
+    flags = 0
+    for bit, category in enumerate(CATEGORIES):
+        if output.get(category):
+            flags |= 1 << bit
+    return flags
+
+
+def index_path_for(jsonl_path: str) -> str:
+    return str(jsonl_path) + INDEX_SUFFIX
+
+
+def file_signature(jsonl_path: str) -> Dict[str, int]:
+    """Dosya boyutu ve mtime (indeks geçerlilik kontrolü)"""
+    stat = os.stat(jsonl_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def scan_lines(data: bytes, base_offset: int = 0, first_line_num: int = 1,
+               keep_examples: bool = False) -> Dict[str, Any]:
+    """
+    JSONL byte'larındaki geçerli satırları tara (offset'ler `base_offset`'e göre).
+    Boş satırlar ve parse edilemeyen satırlar (eager yükleme ile aynı şekilde) atlanır.
+
+    Son satır newline ile bitmiyorsa yarım yazılmış olabilir: parse edilebiliyorsa alınır,
+    edilemiyorsa `consumed` o satırın başında kalır ve sonraki taramada tekrar denenir.
+    """
+    entries: Dict[str, Any] = {"offsets": [], "lengths": [], "inputs": [], "normalized": [], "flags": []}
+    examples: List[Dict[str, Any]] = []
+    pos = 0
+    line_num = first_line_num
+    end = len(data)
+    consumed = 0
+    while pos < end:
+        newline = data.find(b'\n', pos)
+        line_end = end if newline == -1 else newline
+        raw = data[pos:line_end]
+        if raw.strip():
+            try:
+                example = json.loads(raw.decode('utf-8'))
+                example_input = example.get('input', '')
+                entries["offsets"].append(base_offset + pos)
+                entries["lengths"].append(line_end - pos)
+                entries["inputs"].append(example_input)
+                entries["normalized"].append(normalize_input(example_input))
+                entries["flags"].append(category_flags(example))
+                if keep_examples:
+                    examples.append(example)
+            except (json.JSONDecodeError, UnicodeDecodeError, AttributeError) as e:
+                if newline == -1:
+                    break
+                logger.warning(f"⚠️ JSON parse error at line {line_num}: {e}")
+        pos = line_end + 1
+        consumed = min(pos, end)
+        line_num += 1
+
+    entries["consumed"] = base_offset + consumed
+    entries["line_count"] = line_num - first_line_num
+    if keep_examples:
+        entries["examples"] = examples
+    return entries
+
+
+def tail_signature(jsonl_path: str, end: int, size: int = 256) -> str:
+    """`end` offset'inden önceki son byte'ların hash'i (dosya baştan yeniden yazıldı mı kontrolü)"""
+    start = max(0, end - size)
+    with open(jsonl_path, 'rb') as f:
+        f.seek(start)
+        return hashlib.sha1(f.read(end - start)).hexdigest()
+
+
+def build_offset_index(jsonl_path: str) -> Dict[str, Any]:
+    """Dosyayı tarayıp offset indeksini oluştur"""
+    signature = file_signature(jsonl_path)
+    with open(jsonl_path, 'rb') as f:
+        data = f.read()
+    entries = scan_lines(data)
+    return {
+        "version": INDEX_VERSION,
+        **signature,
+        "scanned_bytes": entries["consumed"],
+        "line_count": entries["line_count"],
+        **{key: entries[key] for key in INDEX_KEYS},
+    }
+
+
+def save_offset_index(jsonl_path: str, index: Dict[str, Any]):
+    """İndeksi dosyanın yanına atomik olarak yaz (yazılamazsa sessizce geç)"""
+    target = index_path_for(jsonl_path)
+    tmp = target + ".tmp"
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(tmp, target)
+    except OSError as e:
+        logger.warning(f"⚠️ Training index could not be saved ({target}): {e}")
+
+
+def load_or_build_offset_index(jsonl_path: str) -> Dict[str, Any]:
+    """
+    Kayıtlı indeks geçerliyse (versiyon + boyut + mtime) onu kullan,
+    değilse dosyayı tarayıp yeniden oluştur ve kaydet.
+    """
+    signature = file_signature(jsonl_path)
+    target = index_path_for(jsonl_path)
+    if os.path.exists(target):
+        try:
+            with open(target, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if (index.get("version") == INDEX_VERSION
+                    and index.get("size") == signature["size"]
+                    and index.get("mtime_ns") == signature["mtime_ns"]):
+                return index
+            logger.info("🔄 Training index is stale (size/mtime changed), rebuilding...")
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Training index unreadable, rebuilding: {e}")
+
+    index = build_offset_index(jsonl_path)
+    save_offset_index(jsonl_path, index)
+    return index
+
+
+class LazyExampleList(Sequence):
+    """
+    mmap üzerinden örnekleri istendiğinde decode eden salt-okunur liste.
+    Son decode edilen örnekler küçük bir LRU cache'te tutulur.
+    """
+
+    def __init__(self, jsonl_path: str, offsets: List[int], lengths: List[int], cache_size: int = 256):
+        self.jsonl_path = jsonl_path
+        self._offsets = offsets
+        self._lengths = lengths
+        self._cache: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+        self._file = open(jsonl_path, 'rb')
+        self._mm: Optional[mmap.mmap] = None
+        if os.fstat(self._file.fileno()).st_size > 0:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+
+        with self._lock:
+            example = self._cache.get(idx)
+            if example is not None:
+                self._cache.move_to_end(idx)
+                return example
+
+        offset = self._offsets[idx]
+        example = json.loads(self._mm[offset:offset + self._lengths[idx]].decode('utf-8'))
+
+        with self._lock:
+            self._cache[idx] = example
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return example
+
+    def extend(self, offsets: List[int], lengths: List[int]):
+        """
+        Dosyaya eklenen satırları listeye ekle (mmap yeni boyutla yeniden açılır).
+        Eski mmap kapatılmaz; okuma yapan thread'ler referansı bırakınca serbest kalır.
+        """
+        with self._lock:
+            if os.fstat(self._file.fileno()).st_size > 0:
+                self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._offsets.extend(offsets)
+            self._lengths.extend(lengths)
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
@@ -1,13 +1,22 @@
 
-import chromadb
-from sentence_transformers import SentenceTransformer
 import os
+import time
+import hashlib
 from typing import List, Dict, Any, Optional
 import threading
 from utils.logger import get_vector_logger
+from config import get_embedding_config
+from services.embedding_cache import EmbeddingCache
+from services.embedding_dispatcher import EmbeddingDispatcher
+from services.embedding_backends import load_embedding_model
+from services.embedding_export import chunked, read_embedding_export, write_embedding_export
+from services.ingest_pipeline import AdaptiveBatchSizer, IngestProgress, run_pipelined
 
 logger = get_vector_logger()
-base_logger = logger # Alias for consistency if needed
+base_logger = logger
+
+# Katalogda ve kullanıcı girişinde farklı yazılan birimler
+UNIT_ALIASES = {"m2": "m²", "m3": "m³", "mt": "m", "ad": "adet", "ad.": "adet"} # Alias for consistency if needed
 
 class VectorDBService:
     _instance = None
@@ -31,16 +40,40 @@ class VectorDBService:
         # os.environ['CUDA_VISIBLE_DEVICES'] = ''
 
         self.persist_directory = os.path.join(os.path.dirname(os.path.dirname(__file__)), "chroma_db")
+        embedding_config = get_embedding_config()
+        self.model_name = embedding_config.MODEL_NAME
+        self.embedding_backend = embedding_config.BACKEND
+        self.model_cache_dir = embedding_config.MODEL_CACHE_DIR
+        self.vector_backend = embedding_config.VECTOR_BACKEND
+        # local: model bu süreçte | sidecar: ortak embedding sürecine Unix socket ile bağlı
+        self.embedding_source = "sidecar" if embedding_config.SIDECAR_ENABLED else "local"
+        self.model_load_seconds: Optional[float] = None
+        self.query_cache = EmbeddingCache(embedding_config.QUERY_CACHE_SIZE)
+        self.ingest_config = embedding_config
+        self.ingest_progress = IngestProgress()
+        # Koleksiyona yazan ingest/import işlemleri ve ortak ingest_progress tek seferde bir iş
+        self._ingest_lock = threading.RLock()
+        self.dispatcher: Optional[EmbeddingDispatcher] = None
+        if embedding_config.MICROBATCH_ENABLED:
+            self.dispatcher = EmbeddingDispatcher(
+                lambda texts: self.model.encode(texts).tolist(),
+                max_batch_size=embedding_config.MICROBATCH_MAX_SIZE,
+                max_wait_ms=embedding_config.MICROBATCH_WAIT_MS
+            )
         self.model = None
         self.client = None
         self.collection = None
         self.collection_name = "poz_data_collection"
+        self.feedback_collection = None
+        self.training_collection = None
+        self.training_collection_name = "training_examples"
 
         # Lazy loading state
         self._model_loaded = False
         self._ingestion_started = False
         self._ingestion_complete = False
         self._pending_data: Optional[List[Dict]] = None
+        self._last_ingest_summary: Optional[Dict[str, int]] = None
 
         self._initialized = True
         logger.info("[VECTOR_DB] Servis hazır (model henüz yüklenmedi).")
@@ -54,7 +87,7 @@ class VectorDBService:
             if self.client is not None:
                 return True
             try:
-                self.client = chromadb.PersistentClient(path=self.persist_directory)
+                self.client = self._create_client()
                 self.collection = self.client.get_or_create_collection(
                     name=self.collection_name,
                     metadata={"hnsw:space": "cosine"}
@@ -63,12 +96,29 @@ class VectorDBService:
                     name="user_feedbacks",
                     metadata={"hnsw:space": "cosine"}
                 )
+                self.training_collection = self.client.get_or_create_collection(
+                    name=self.training_collection_name,
+                    metadata={"hnsw:space": "cosine"}
+                )
                 logger.info(f"[VECTOR_DB] Client bağlandı. Mevcut belge sayısı: {self.collection.count()}")
                 return True
             except Exception as e:
                 logger.error(f"[VECTOR_DB] Client bağlantı hatası: {e}")
                 return False
 
+    def _create_client(self):
+        """Seçili vektör deposu backend'inin client'ı (Chroma ile aynı collection API'si)"""
+        if self.vector_backend == "numpy":
+            from services.numpy_vector_store import NumpyVectorClient
+            config = get_embedding_config()
+            logger.info(f"[VECTOR_DB] NumPy vektör deposu kullanılıyor: {config.NUMPY_INDEX_DIR}")
+            return NumpyVectorClient(
+                config.NUMPY_INDEX_DIR, block_rows=config.NUMPY_BLOCK_ROWS,
+                flush_delay=config.NUMPY_FLUSH_DELAY, cache_float32=config.NUMPY_FLOAT32_CACHE
+            )
+        import chromadb
+        return chromadb.PersistentClient(path=self.persist_directory)
+
     def _ensure_model_loaded(self):
         """Embedding modeli lazy olarak yükle (search/ingest için gerekli)."""
         if self._model_loaded:
@@ -81,22 +131,67 @@ class VectorDBService:
             # Önce client bağlantısını sağla
             self._ensure_client_connected()
 
+            if self.embedding_source == "sidecar" and self._connect_embedding_sidecar():
+                return True
+
             try:
                 import torch
                 device = "cpu"  # GTX 850M incompatibility
             except ImportError:
                 device = "cpu"
 
-            logger.info(f"[VECTOR_DB] Embedding modeli yükleniyor ({device.upper()} modunda)...")
+            logger.info(f"[VECTOR_DB] Embedding modeli yükleniyor ({device.upper()} modunda, backend: {self.embedding_backend})...")
             try:
-                self.model = SentenceTransformer('emrecan/bert-base-turkish-cased-mean-nli-stsb-tr', device=device)
+                self.model, self.embedding_backend, self.model_load_seconds = load_embedding_model(
+                    self.model_name, self.embedding_backend, device=device, cache_dir=self.model_cache_dir
+                )
                 self._model_loaded = True
-                logger.info(f"[VECTOR_DB] Model yüklendi. Mevcut belge: {self.collection.count()}")
+                logger.info(
+                    f"[VECTOR_DB] Model yüklendi ({self.embedding_backend}, {self.model_load_seconds:.1f} sn). "
+                    f"Mevcut belge: {self.collection.count()}"
+                )
                 return True
             except Exception as e:
                 logger.error(f"[VECTOR_DB] Model yüklenemedi: {e}")
                 return False
 
+    def _connect_embedding_sidecar(self) -> bool:
+        """Modeli yüklemek yerine ortak sidecar sürecine bağlan; başarısızsa yerel modele düşülür"""
+        from services.embedding_sidecar import connect_sidecar
+
+        config = get_embedding_config()
+        start = time.perf_counter()
+        try:
+            client = connect_sidecar(
+                config.SIDECAR_SOCKET, self.model_name, autostart=config.SIDECAR_AUTOSTART,
+                start_timeout=config.SIDECAR_START_TIMEOUT, timeout=config.SIDECAR_REQUEST_TIMEOUT
+            )
+            info = client.info()
+        except Exception as e:
+            logger.warning(f"[VECTOR_DB] Embedding sidecar kullanılamadı ({e}), model bu süreçte yüklenecek.")
+            self.embedding_source = "local"
+            return False
+
+        # Farklı backend'in (ör. fp32 ↔ int8) vektörleri koleksiyondakilerle karışmamalı
+        sidecar_backend = info.get("backend") or self.embedding_backend
+        if sidecar_backend != self.embedding_backend:
+            logger.warning(
+                f"[VECTOR_DB] Embedding sidecar farklı backend kullanıyor ({sidecar_backend} != "
+                f"{self.embedding_backend}), model bu süreçte yüklenecek."
+            )
+            client.close()
+            self.embedding_source = "local"
+            return False
+
+        self.model = client
+        self.model_load_seconds = time.perf_counter() - start
+        self._model_loaded = True
+        logger.info(
+            f"[VECTOR_DB] Embedding sidecar'a bağlanıldı ({config.SIDECAR_SOCKET}, pid {info.get('pid')}, "
+            f"{self.embedding_backend}). Mevcut belge: {self.collection.count() if self.collection else 0}"
+        )
+        return True
+
     @property
     def is_ready(self) -> bool:
         """Vector DB'nin sorgulamaya hazır olup olmadığını kontrol eder (model olmadan)."""
@@ -121,6 +216,21 @@ class VectorDBService:
         thread.daemon = True
         thread.start()
 
+    @property
+    def is_search_ready(self) -> bool:
+        """Poz araması model yüklemesini beklemeden yapılabilir mi (model yüklü + koleksiyon dolu)"""
+        return self._model_loaded and self.is_ready
+
+    @property
+    def is_training_ready(self) -> bool:
+        """Eğitim örneği araması model beklemeden yapılabilir mi (model yüklü + koleksiyon dolu)"""
+        if not self._model_loaded or self.training_collection is None:
+            return False
+        try:
+            return self.training_collection.count() > 0
+        except Exception:
+            return False
+
     def _ingest_worker(self, poz_data: List[Dict]):
         """Arka plan thread'i"""
         try:
@@ -129,116 +239,587 @@ class VectorDBService:
             self._ingestion_complete = True
         except Exception as e:
             logger.error(f"[VECTOR_DB] Arka plan yükleme hatası: {e}")
+        finally:
+            # Artımlı senkron ucuz: tamamlanınca tekrar tetiklenebilir
+            self._ingestion_started = False
 
-    def ingest_data(self, poz_data: List[Dict[str, Any]]):
-        """
-        Poz verilerini vektör veritabanına ekler.
-        Zaten varsa atlar (basit kontrol).
+    @property
+    def embedding_model_id(self) -> str:
+        """Vektörleri üreten model + backend (quantize backend'lerin vektör uzayı fp32'den farklı)"""
+        return f"{self.model_name}@{self.embedding_backend}"
+
+    def _stored_model_id(self, metadata: Optional[Dict[str, Any]]) -> str:
+        """Belgenin vektörünü üreten model; alan yoksa backend seçimi öncesi (torch fp32) kabul edilir"""
+        return (metadata or {}).get("embedding_model") or f"{self.model_name}@torch"
+
+    @staticmethod
+    def content_hash(document: str, metadata: Dict[str, Any]) -> str:
+        """Belge metni + metadata için içerik hash'i (değişiklik tespiti)"""
+        payload = "\x1f".join([document] + [f"{k}={metadata[k]}" for k in sorted(metadata)])
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def normalize_unit(unit: str) -> str:
+        """Birim karşılaştırma anahtarı: 'M2 ' -> 'm²'"""
+        key = (unit or "").strip().replace('İ', 'i').lower()
+        return UNIT_ALIASES.get(key, key)
+
+    @staticmethod
+    def code_levels(code: str) -> Dict[str, str]:
+        """Poz kodunun ilk bir ve iki segmenti: '10.100.1062' -> {'code_root': '10', 'code_group': '10.100'}"""
+        parts = str(code).split('.')
+        return {"code_root": parts[0], "code_group": ".".join(parts[:2])}
+
+    @classmethod
+    def build_where(cls, unit: Optional[str] = None, institution: Optional[str] = None,
+                    code_prefix: Optional[str] = None,
+                    where: Optional[Dict[str, Any]] = None) -> tuple:
         """
-        if not self.model:
-            logger.warning("[VECTOR_DB] Model yüklü değil, ingestion iptal.")
-            return
+        Birim / kurum / kod öneki filtrelerinden index içi where ifadesi oluştur.
 
-        current_count = self.collection.count()
-        if current_count >= len(poz_data) * 0.9:
-            logger.info(f"[VECTOR_DB] Veri zaten yüklü görünüyor ({current_count} belge). İşlem atlandı.")
-            return
+        Kod öneki tam segmentlerle ('10.', '10.100.', '15.150.1003') index'te süzülür;
+        segment ortasında biten önek ('15.15') en yakın tam segmentle süzülüp kalan kısım
+        sonuçlarda kontrol edilir.
 
-        logger.info(f"[VECTOR_DB] {len(poz_data)} poz için ingestion başlıyor...")
-        
-        # Cihaz kapasitesine göre batch size ayarla
-        try:
-            device = self.model.device.type
-        except:
-            device = 'cpu'
-            
-        batch_size = 500 if device == 'cuda' else 100
-        total_batches = (len(poz_data) + batch_size - 1) // batch_size
-        
-        ids = []
-        documents = []
-        metadatas = []
-        
-        for idx, poz in enumerate(poz_data):
+        Returns:
+            (where veya None, sonradan uygulanacak önek veya None)
+        """
+        conditions = [where] if where else []
+        if unit:
+            conditions.append({"unit_key": cls.normalize_unit(unit)})
+        if institution:
+            conditions.append({"institution": institution})
+
+        residual_prefix = None
+        prefix = (code_prefix or "").strip()
+        if prefix:
+            complete = prefix.endswith('.')
+            parts = [p for p in prefix.split('.') if p]
+            if not complete:
+                residual_prefix = prefix
+                parts = parts[:-1]
+            if len(parts) == 1:
+                conditions.append({"code_root": parts[0]})
+            elif len(parts) == 2:
+                conditions.append({"code_group": ".".join(parts)})
+            elif len(parts) > 2:
+                if complete:
+                    residual_prefix = prefix
+                conditions.append({"code_group": ".".join(parts[:2])})
+
+        if not conditions:
+            return None, residual_prefix
+        return (conditions[0] if len(conditions) == 1 else {"$and": conditions}), residual_prefix
+
+    def _build_poz_documents(self, poz_data: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Poz listesinden {kod: {document, metadata}} (aynı kod tekrar ederse sonuncusu geçerli)"""
+        docs = {}
+        for poz in poz_data:
             # Poz ID (Code)
             code = poz.get('poz_no') or poz.get('code')
-            if not code: continue
-            
+            if not code:
+                continue
+
             # İçerik: "Kod - Açıklama" formatında
             desc = poz.get('description') or poz.get('name') or ""
             doc_text = f"{code} {desc}"
-            
-            # Metadata
+
+            # Metadata (unit_key / code_root / code_group: index içi where filtreleri için)
             meta = {
                 "code": code,
                 "unit": poz.get('unit', ''),
+                "unit_key": self.normalize_unit(poz.get('unit', '')),
+                "institution": poz.get('institution', ''),
                 "price": str(poz.get('unit_price', '0')),
-                "description": desc
+                "description": desc,
+                "embedding_model": self.embedding_model_id,
+                **self.code_levels(code)
             }
-            
-            ids.append(code)
-            documents.append(doc_text)
-            metadatas.append(meta)
-            
-            # Batch Process
-            if len(ids) >= batch_size or idx == len(poz_data) - 1:
+            meta["content_hash"] = self.content_hash(doc_text, meta)
+            docs[code] = {"document": doc_text, "metadata": meta}
+        return docs
+
+    def ingest_data(self, poz_data: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Poz verilerini vektör veritabanı ile senkronize eder (artımlı).
+        - Yeni veya metni değişen pozlar embed edilip upsert edilir
+        - Sadece fiyat/birim değişen pozların metadata'sı güncellenir (embedding yeniden hesaplanmaz)
+        - Katalogda artık olmayan kodlar silinir
+        - Farklı model/backend ile üretilmiş vektörler (EMBEDDING_BACKEND değişti) yeniden embed edilir
+
+        Returns:
+            {"added", "updated", "metadata_only", "removed", "unchanged", "total"} sayıları
+        """
+        with self._ingest_lock:
+            summary = {"added": 0, "updated": 0, "metadata_only": 0, "removed": 0, "unchanged": 0, "total": 0}
+            if not self.model:
+                logger.warning("[VECTOR_DB] Model yüklü değil, ingestion iptal.")
+                return summary
+
+            docs = self._build_poz_documents(poz_data)
+
+            # Koleksiyondaki mevcut durum: id → (content_hash, belge metni, vektörü üreten model)
+            existing: Dict[str, tuple] = {}
+            try:
+                current = self.collection.get(include=["metadatas", "documents"])
+                for doc_id, meta, document in zip(current['ids'], current['metadatas'], current['documents']):
+                    existing[doc_id] = ((meta or {}).get('content_hash'), document, self._stored_model_id(meta))
+            except Exception as e:
+                logger.error(f"[VECTOR_DB] Mevcut belgeler okunamadı, tam ingestion yapılacak: {e}")
+
+            to_embed: List[str] = []
+            to_update_meta: List[str] = []
+            for code, doc in docs.items():
+                if code not in existing:
+                    to_embed.append(code)
+                    summary["added"] += 1
+                    continue
+                stored_hash, stored_document, stored_model = existing[code]
+                if stored_hash == doc["metadata"]["content_hash"]:
+                    summary["unchanged"] += 1
+                elif stored_document == doc["document"] and stored_model == self.embedding_model_id:
+                    # Metin aynı → embedding geçerli, sadece metadata (fiyat, birim, hash) güncellenir
+                    to_update_meta.append(code)
+                    summary["metadata_only"] += 1
+                else:
+                    to_embed.append(code)
+                    summary["updated"] += 1
+
+            removed = [doc_id for doc_id in existing if doc_id not in docs]
+            if removed:
                 try:
-                    # Embeddings (Model otomatik yapabilir ama manuel kontrol daha iyi)
-                    embeddings = self.model.encode(documents).tolist()
-                    
-                    self.collection.upsert(
-                        ids=ids,
-                        embeddings=embeddings,
-                        documents=documents,
-                        metadatas=metadatas
+                    self.collection.delete(ids=removed)
+                    summary["removed"] = len(removed)
+                except Exception as e:
+                    logger.error(f"[VECTOR_DB] Silme hatası: {e}")
+
+            logger.info(
+                f"[VECTOR_DB] {len(docs)} poz senkronize ediliyor: +{summary['added']} yeni, "
+                f"~{summary['updated']} değişen, {summary['metadata_only']} metadata, -{len(removed)} silinen"
+            )
+
+            batch_size = self._initial_batch_size()
+            for start in range(0, len(to_update_meta), batch_size):
+                batch_ids = to_update_meta[start:start + batch_size]
+                try:
+                    self.collection.update(
+                        ids=batch_ids,
+                        metadatas=[docs[code]["metadata"] for code in batch_ids]
                     )
-                    logger.info(f"[VECTOR_DB] Batch {idx // batch_size + 1}/{total_batches} tamamlandı.")
                 except Exception as e:
-                    logger.error(f"[VECTOR_DB] Batch hatası: {e}")
-                
-                ids = []
-                documents = []
-                metadatas = []
+                    logger.error(f"[VECTOR_DB] Metadata güncelleme hatası: {e}")
+
+            rows = [(code, docs[code]["document"], docs[code]["metadata"]) for code in to_embed]
+            self._run_ingest_pipeline("poz", rows, self.collection)
+
+            summary["total"] = self.collection.count()
+            self._last_ingest_summary = summary
+            logger.info(f"[VECTOR_DB] Ingestion tamamlandı: {summary}")
+            return summary
+
+    def export_embeddings(self, out_dir: str, page_size: int = 1000) -> Dict[str, Any]:
+        """
+        Poz koleksiyonunu embedding'leriyle birlikte dışa aktar (embeddings.npy + manifest.json).
+        Model gerekmez; koleksiyon sayfa sayfa okunur.
+        """
+        if not self._ensure_client_connected():
+            raise RuntimeError("Vector DB client bağlanamadı")
+
+        ids: List[str] = []
+        documents: List[str] = []
+        metadatas: List[Dict[str, Any]] = []
+        embeddings: List[List[float]] = []
+        total = self.collection.count()
+        for offset in range(0, total, page_size):
+            page = self.collection.get(
+                include=["embeddings", "documents", "metadatas"], limit=page_size, offset=offset
+            )
+            ids.extend(page['ids'])
+            documents.extend(page['documents'])
+            metadatas.extend(meta or {} for meta in page['metadatas'])
+            embeddings.extend(list(embedding) for embedding in page['embeddings'])
+
+        summary = write_embedding_export(
+            out_dir, ids, embeddings, documents, metadatas,
+            model=self.model_name, backend=self.embedding_backend
+        )
+        logger.info(f"[VECTOR_DB] {len(ids)} embedding dışa aktarıldı: {out_dir}")
+        return summary
+
+    @staticmethod
+    def _collection_dim(collection) -> Optional[int]:
+        """Koleksiyondaki vektörlerin boyutu (boşsa None)"""
+        try:
+            embeddings = collection.get(limit=1, include=["embeddings"])['embeddings']
+        except Exception:
+            return None
+        if embeddings is None or len(embeddings) == 0:
+            return None
+        return len(embeddings[0])
+
+    def import_embeddings(self, in_dir: str, poz_data: Optional[List[Dict[str, Any]]] = None,
+                          batch_size: int = 5000) -> Dict[str, Any]:
+        """
+        Önceden hesaplanmış embedding'leri modeli yüklemeden koleksiyona toplu yükle.
+
+        poz_data verilirse sadece güncel katalogla metni aynı olan kayıtlar alınır
+        (metadata katalogdan gelir); metni değişmiş veya katalogda olmayan kayıtlar
+        atlanır, böylece sonraki ingest_data yalnızca bunları encode eder.
+
+        Model, backend veya vektör boyutu uyuşmayan export yüklenmez (error:
+        model_mismatch / backend_mismatch / dim_mismatch).
+
+        Returns:
+            {"imported", "stale", "not_in_catalog", "total"} veya {"error": ...}
+        """
+        with self._ingest_lock:
+            summary: Dict[str, Any] = {"imported": 0, "stale": 0, "not_in_catalog": 0, "total": 0}
+            if not self._ensure_client_connected():
+                summary["error"] = "client"
+                return summary
+
+            manifest, matrix = read_embedding_export(in_dir)
+            if manifest.get("model") != self.model_name:
+                logger.warning(
+                    f"[VECTOR_DB] Export farklı bir modelle üretilmiş ({manifest.get('model')}), import atlandı."
+                )
+                summary["error"] = "model_mismatch"
+                return summary
+            # Backend alanı olmayan eski export'lar torch fp32 ile üretilmiştir
+            if manifest.get("backend", "torch") != self.embedding_backend:
+                logger.warning(
+                    f"[VECTOR_DB] Export farklı bir backend ile üretilmiş ({manifest.get('backend', 'torch')}, "
+                    f"mevcut: {self.embedding_backend}), import atlandı."
+                )
+                summary["error"] = "backend_mismatch"
+                return summary
+            dim = int(matrix.shape[1]) if matrix.ndim == 2 and matrix.shape[0] else 0
+            expected_dim = self._collection_dim(self.collection)
+            if dim != manifest.get("dim", dim) or (dim and expected_dim and dim != expected_dim):
+                logger.warning(
+                    f"[VECTOR_DB] Export vektör boyutu uyumsuz (manifest: {manifest.get('dim')}, dosya: {dim}, "
+                    f"koleksiyon: {expected_dim}), import atlandı."
+                )
+                summary["error"] = "dim_mismatch"
+                return summary
+
+            docs = self._build_poz_documents(poz_data) if poz_data is not None else None
+            rows: List[tuple] = []
+            for row, item in enumerate(manifest["items"]):
+                doc_id, document = item["id"], item["document"]
+                if docs is None:
+                    # Hash üretici taraftan bağımsız olarak yeniden hesaplanır
+                    meta = {k: v for k, v in (item.get("metadata") or {}).items() if k != "content_hash"}
+                    meta["embedding_model"] = self.embedding_model_id
+                    meta["content_hash"] = self.content_hash(document, meta)
+                elif doc_id not in docs:
+                    summary["not_in_catalog"] += 1
+                    continue
+                elif docs[doc_id]["document"] != document:
+                    summary["stale"] += 1
+                    continue
+                else:
+                    meta = docs[doc_id]["metadata"]
+                rows.append((row, doc_id, document, meta))
+
+            for _, batch in chunked(rows, batch_size):
+                self.collection.upsert(
+                    ids=[doc_id for _, doc_id, _, _ in batch],
+                    embeddings=matrix[[row for row, _, _, _ in batch]].tolist(),
+                    documents=[document for _, _, document, _ in batch],
+                    metadatas=[meta for _, _, _, meta in batch]
+                )
+                summary["imported"] += len(batch)
 
-        logger.info("[VECTOR_DB] Ingestion tamamlandı.")
+            summary["total"] = self.collection.count()
+            logger.info(f"[VECTOR_DB] Embedding import tamamlandı ({in_dir}): {summary}")
+            return summary
 
-    def search(self, query_text: str, n_results: int = 5) -> List[Dict[str, Any]]:
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        Sorgu metinlerini embed et (LRU cache üzerinden).
+        Cache'te olmayanlar tek bir encode çağrısında hesaplanır.
+        """
+        # Quantize backend'lerin vektörleri fp32'den az da olsa farklı: cache backend'e göre ayrılır
+        model_id = self.embedding_model_id
+        keys = [EmbeddingCache.key(model_id, text) for text in texts]
+        embeddings: List[Optional[List[float]]] = [self.query_cache.get(key) for key in keys]
+
+        missing: Dict[tuple, List[int]] = {}
+        for i, embedding in enumerate(embeddings):
+            if embedding is None:
+                missing.setdefault(keys[i], []).append(i)
+        if missing:
+            texts_to_encode = [key[1] for key in missing]
+            if self.dispatcher is not None:
+                # Eşzamanlı aramalarla aynı batch'te, ayrılmış inference thread'inde
+                encoded = self.dispatcher.encode(
+                    texts_to_encode, timeout=self.ingest_config.MICROBATCH_TIMEOUT_SECONDS
+                )
+            else:
+                encoded = self.model.encode(texts_to_encode).tolist()
+            for (key, positions), embedding in zip(missing.items(), encoded):
+                self.query_cache.put(key, embedding)
+                for i in positions:
+                    embeddings[i] = embedding
+        return embeddings
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_queries([text])[0]
+
+    def search(self, query_text: str, n_results: int = 5, unit: Optional[str] = None,
+               institution: Optional[str] = None, code_prefix: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Sorguya en yakın pozları getirir (lazy loading ile).
+        unit / institution / code_prefix filtreleri index içinde uygulanır (bkz. build_where).
         """
+        return self.search_many(
+            [query_text], n_results=n_results, unit=unit, institution=institution, code_prefix=code_prefix
+        )[0]
+
+    def search_many(self, queries: List[str], n_results: int = 5,
+                    where: Optional[Dict[str, Any]] = None, unit: Optional[str] = None,
+                    institution: Optional[str] = None,
+                    code_prefix: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Birden fazla sorgu için tek encode + tek Chroma sorgusu (BOQ import, toplu fiyatlama).
+
+        Args:
+            queries: Sorgu metinleri
+            n_results: Sorgu başına sonuç sayısı
+            where: Chroma metadata filtresi (opsiyonel)
+            unit: Sadece bu birimdeki pozlar ('m2' ve 'm²' eşdeğer)
+            institution: Sadece bu kurumun pozları
+            code_prefix: Kod öneki, ör. '10.100.' (işçilik)
+
+        Returns:
+            Her sorgu için search() ile aynı formatta sonuç listesi (sorgu sırasıyla)
+        """
+        empty = [[] for _ in queries]
+        if not queries:
+            return empty
+
         # Lazy model loading
         if not self._ensure_model_loaded():
-            return []
+            return empty
 
         # Veri yoksa boş dön
         if self.collection.count() == 0:
             logger.warning("[VECTOR_DB] Koleksiyon boş, arama yapılamıyor.")
-            return []
+            return empty
+
+        try:
+            query_embeddings = self.embed_queries(queries)
+
+            where, residual_prefix = self.build_where(unit, institution, code_prefix, where)
+            # Segment ortasında biten önek sonradan süzülür: eleneceklerin yerine fazladan aday iste
+            fetch = n_results * 4 if residual_prefix else n_results
+            query_kwargs = {"query_embeddings": query_embeddings, "n_results": fetch}
+            if where:
+                query_kwargs["where"] = where
+            results = self.collection.query(**query_kwargs)
+
+            formatted = [self._format_poz_results(results, q) for q in range(len(queries))]
+            if residual_prefix:
+                formatted = [
+                    [res for res in hits if res['code'].startswith(residual_prefix)][:n_results]
+                    for hits in formatted
+                ]
+            return formatted
+
+        except Exception as e:
+            logger.error(f"[VECTOR_DB] Arama hatası: {e}")
+            return empty
+
+    @staticmethod
+    def _format_poz_results(results: Dict[str, Any], q: int) -> List[Dict[str, Any]]:
+        """Chroma query sonucunun q. sorgusunu poz sonuç formatına çevir"""
+        formatted_results = []
+        if results['ids'] and len(results['ids']) > q and results['ids'][q]:
+            for i, doc_id in enumerate(results['ids'][q]):
+                metadata = results['metadatas'][q][i]
+                formatted_results.append({
+                    "code": doc_id,
+                    "description": metadata['description'],
+                    "unit": metadata['unit'],
+                    "unit_price": metadata['price'],
+                    "score": results['distances'][q][i] if 'distances' in results else 0
+                })
+        return formatted_results
+
+    @staticmethod
+    def training_example_id(normalized_input: str) -> str:
+        """Eğitim örneği için içerik tabanlı sabit ID (normalize edilmiş input'un hash'i)"""
+        return "tr_" + hashlib.sha1(normalized_input.encode('utf-8')).hexdigest()[:20]
+
+    def ingest_training_data(self, inputs: List[str], batch_size: Optional[int] = None) -> Dict[str, int]:
+        """
+        Eğitim örneklerinin input metinlerini training_examples koleksiyonuna ekler.
+        Artımlı çalışır: sadece koleksiyonda olmayan (veya farklı model/backend ile
+        embed edilmiş) örnekler embed edilir, dosyadan silinmiş örnekler koleksiyondan çıkarılır.
+
+        Args:
+            inputs: Dosya sırasıyla örnek input metinleri (index = dosyadaki sıra)
+
+        Returns:
+            {"added": ..., "reembedded": ..., "removed": ..., "total": ...}
+        """
+        with self._ingest_lock:
+            if not self._ensure_model_loaded():
+                logger.warning("[VECTOR_DB] Model yüklü değil, eğitim verisi ingestion iptal.")
+                return {"added": 0, "reembedded": 0, "removed": 0, "total": 0}
+
+            # Aynı normalize input birden fazla kez varsa ilk örnek temsil eder
+            current: Dict[str, Dict[str, Any]] = {}
+            for idx, text in enumerate(inputs):
+                normalized = " ".join((text or "").lower().strip().split())
+                if not normalized:
+                    continue
+                doc_id = self.training_example_id(normalized)
+                if doc_id not in current:
+                    current[doc_id] = {"document": text, "metadata": {
+                        "input": text, "index": idx, "embedding_model": self.embedding_model_id
+                    }}
+
+            # id → vektörü üreten model
+            try:
+                stored = self.training_collection.get(include=["metadatas"])
+                existing = {doc_id: self._stored_model_id(meta)
+                            for doc_id, meta in zip(stored['ids'], stored['metadatas'])}
+            except Exception as e:
+                logger.error(f"[VECTOR_DB] Eğitim koleksiyonu okunamadı: {e}")
+                existing = {}
+
+            stale = [doc_id for doc_id in existing if doc_id not in current]
+            if stale:
+                self.training_collection.delete(ids=stale)
+
+            # Yeni örnekler + farklı model/backend ile embed edilmiş olanlar
+            new_ids = [doc_id for doc_id in current
+                       if existing.get(doc_id) != self.embedding_model_id]
+            reembedded = sum(1 for doc_id in new_ids if doc_id in existing)
+            written = self._upsert_training_batches(
+                [(doc_id, current[doc_id]["document"], current[doc_id]["metadata"]) for doc_id in new_ids],
+                batch_size
+            )
+            added = max(written - reembedded, 0)
+
+            total = self.training_collection.count()
+            logger.info(
+                f"[VECTOR_DB] Eğitim verisi ingestion: +{added} / ~{reembedded} / -{len(stale)} (toplam {total})"
+            )
+            return {"added": added, "reembedded": reembedded, "removed": len(stale), "total": total}
 
+    def upsert_training_examples(self, items: List[tuple]) -> int:
+        """
+        Yeni eklenen eğitim örneklerini koleksiyona ekle (tam senkron yapmadan).
+
+        Args:
+            items: (dosyadaki sıra, input metni) listesi
+
+        Returns:
+            Eklenen/güncellenen belge sayısı
+        """
+        with self._ingest_lock:
+            if not items or not self._ensure_model_loaded():
+                return 0
+
+            rows = {}
+            for idx, text in items:
+                normalized = " ".join((text or "").lower().strip().split())
+                if not normalized:
+                    continue
+                doc_id = self.training_example_id(normalized)
+                rows.setdefault(doc_id, (doc_id, text, {"input": text, "index": idx,
+                                                        "embedding_model": self.embedding_model_id}))
+            return self._upsert_training_batches(list(rows.values()))
+
+    def _upsert_training_batches(self, rows: List[tuple], batch_size: Optional[int] = None) -> int:
+        """(id, doküman, metadata) satırlarını batch'ler halinde embed edip upsert et"""
+        return self._run_ingest_pipeline("training", rows, self.training_collection, batch_size)
+
+    def _initial_batch_size(self) -> int:
+        """Cihaz kapasitesine göre başlangıç batch size"""
         try:
-            query_embedding = self.model.encode([query_text]).tolist()
+            device = self.model.device.type
+        except Exception:
+            device = 'cpu'
+        return 500 if device == 'cuda' else 100
+
+    def _run_ingest_pipeline(self, stage: str, rows: List[tuple], collection,
+                             batch_size: Optional[int] = None) -> int:
+        """
+        (id, doküman, metadata) satırlarını encode + upsert pipeline'ından geçir.
+        batch_size verilirse sabit kalır, verilmezse encode hızına göre ayarlanır.
+        """
+        if not rows:
+            return 0
+        config = self.ingest_config
+        sizer = AdaptiveBatchSizer(
+            batch_size or self._initial_batch_size(),
+            min_size=config.INGEST_MIN_BATCH_SIZE,
+            max_size=config.INGEST_MAX_BATCH_SIZE,
+            target_seconds=config.INGEST_TARGET_BATCH_SECONDS,
+            adaptive=batch_size is None
+        )
+
+        def _upsert(batch, embeddings):
+            collection.upsert(
+                ids=[doc_id for doc_id, _, _ in batch],
+                embeddings=embeddings,
+                documents=[document for _, document, _ in batch],
+                metadatas=[metadata for _, _, metadata in batch]
+            )
 
-            results = self.collection.query(
+        self.ingest_progress.start(stage, len(rows))
+        try:
+            upserted = run_pipelined(
+                rows, lambda documents: self.model.encode(documents).tolist(), _upsert,
+                sizer, self.ingest_progress, queue_size=config.INGEST_QUEUE_SIZE
+            )
+        finally:
+            self.ingest_progress.finish()
+        progress = self.ingest_progress.snapshot()
+        logger.info(
+            f"[VECTOR_DB] {stage}: {upserted}/{len(rows)} belge encode edildi "
+            f"({progress['docs_per_sec']} belge/sn, son batch {sizer.size})"
+        )
+        return upserted
+
+    def search_training(self, query_text: str, n_results: int = 30) -> List[Dict[str, Any]]:
+        """
+        Sorguya en yakın eğitim örneklerini getirir.
+
+        Returns:
+            [{"input": ..., "index": dosyadaki sıra, "score": cosine mesafesi}, ...]
+        """
+        if not self._ensure_model_loaded():
+            return []
+
+        if self.training_collection is None or self.training_collection.count() == 0:
+            return []
+
+        try:
+            query_embedding = [self.embed_query(query_text)]
+            results = self.training_collection.query(
                 query_embeddings=query_embedding,
-                n_results=n_results
+                n_results=min(n_results, self.training_collection.count())
             )
 
-            # Sonuçları formatla
             formatted_results = []
             if results['ids'] and results['ids'][0]:
                 for i, doc_id in enumerate(results['ids'][0]):
+                    metadata = results['metadatas'][0][i]
                     formatted_results.append({
-                        "code": doc_id,
-                        "description": results['metadatas'][0][i]['description'],
-                        "unit": results['metadatas'][0][i]['unit'],
-                        "unit_price": results['metadatas'][0][i]['price'],
+                        "id": doc_id,
+                        "input": metadata.get('input', ''),
+                        "index": metadata.get('index', -1),
                         "score": results['distances'][0][i] if 'distances' in results else 0
                     })
-
             return formatted_results
 
         except Exception as e:
-            logger.error(f"[VECTOR_DB] Arama hatası: {e}")
+            logger.error(f"[VECTOR_DB] Eğitim örneği arama hatası: {e}")
             return []
 
     def index_feedback(self, feedback_data: Dict[str, Any]):
@@ -274,7 +855,7 @@ class VectorDBService:
             return []
             
         try:
-            query_embedding = self.model.encode([query_text]).tolist()
+            query_embedding = [self.embed_query(query_text)]
             
             results = self.feedback_collection.query(
                 query_embeddings=query_embedding,
@@ -304,15 +885,27 @@ class VectorDBService:
         self._ensure_client_connected()
         doc_count = 0
         feedback_count = 0
+        training_count = 0
         if self.collection:
             doc_count = self.collection.count()
         if self.feedback_collection:
             feedback_count = self.feedback_collection.count()
+        if self.training_collection:
+            training_count = self.training_collection.count()
 
         return {
             "initialized": self._model_loaded,
             "document_count": doc_count,
             "feedback_count": feedback_count,
+            "training_count": training_count,
+            "last_ingest": self._last_ingest_summary,
+            "ingest_progress": self.ingest_progress.snapshot(),
+            "query_cache": self.query_cache.stats(),
+            "embedding_dispatcher": self.dispatcher.stats() if self.dispatcher else None,
             "model_loaded": self._model_loaded,
-            "device": str(self.model.device) if self.model else "cpu"
+            "device": str(self.model.device) if self.model else "cpu",
+            "embedding_backend": self.embedding_backend,
+            "embedding_source": self.embedding_source,
+            "vector_backend": self.vector_backend,
+            "model_load_seconds": self.model_load_seconds
         }
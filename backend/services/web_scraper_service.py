@@ -1,6 +1,5 @@
 
-import requests
-from bs4 import BeautifulSoup
+from services.http_client import get_http_session
 import json
 from pathlib import Path
 import time
@@ -57,7 +56,7 @@ class WebScraperService:
             }
             
             # 30 saniye timeout (render sürebilir)
-            response = requests.post(self.firecrawl_url, headers=headers, json=data, timeout=45)
+            response = get_http_session().post(self.firecrawl_url, headers=headers, json=data, timeout=45)
             
             if response.status_code == 200:
                 result = response.json()
@@ -151,12 +150,14 @@ class WebScraperService:
 
     def _scrape_from_web_legacy(self, poz_no: str) -> str:
         """Eski legacy requests yöntemi (Bot korumasına takılabilir)"""
+        from bs4 import BeautifulSoup  # Sadece legacy yolda gerekli (ağır import)
+
         try:
             # 1. Arama yap (/site-ici-arama?sitedeArama=...)
             search_url = f"{self.base_url}/site-ici-arama"
             params = {'sitedeArama': poz_no}
             
-            response = requests.get(search_url, params=params, headers=self.headers, timeout=10)
+            response = get_http_session().get(search_url, params=params, headers=self.headers, timeout=10)
             
             if response.status_code != 200:
                 print(f"[SCRAPER] Search HTTP Error: {response.status_code}")
@@ -190,7 +191,7 @@ class WebScraperService:
             print(f"[SCRAPER] Detay sayfasına gidiliyor: {result_link}")
             
             # Detay sayfasına git
-            detail_response = requests.get(result_link, headers=self.headers, timeout=10)
+            detail_response = get_http_session().get(result_link, headers=self.headers, timeout=10)
             if detail_response.status_code != 200:
                 return ""
                 
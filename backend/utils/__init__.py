@@ -6,11 +6,13 @@ from .logger import (
     get_price_logger,
     get_validation_logger
 )
+from .keyword_matcher import KeywordMatcher
 
 __all__ = [
     "setup_logger",
     "get_ai_logger",
     "get_vector_logger",
     "get_price_logger",
-    "get_validation_logger"
+    "get_validation_logger",
+    "KeywordMatcher"
 ]
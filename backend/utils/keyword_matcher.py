@@ -0,0 +1,139 @@
+"""
+Aho-Corasick tabanlı çoklu anahtar kelime eşleştirici.
+
+`for keyword in liste: if keyword in text` döngüleri yerine, sözlük bir kez
+otomata derlenir ve metin tek geçişte taranır. Metin başına maliyet anahtar
+kelime sayısından bağımsızdır (metin uzunluğu + bulunan eşleşme sayısı).
+"""
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, Union
+
+
+def _is_word_char(ch: str) -> bool:
+    """re modülündeki \\w ile aynı tanım (Unicode harf/rakam veya '_')"""
+    return ch.isalnum() or ch == '_'
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick otomatı.
+
+    Args:
+        keywords: Anahtar kelime listesi veya {anahtar_kelime: değer} sözlüğü.
+                  Sözlükte değer olarak etiket, kanonik isim vb. tutulabilir.
+
+    Örnek:
+        matcher = KeywordMatcher({'nakliye': 'nakliye', 'taşıma': 'nakliye'})
+        matcher.find_values("beton taşıma dahil")  # {'nakliye'}
+    """
+
+    def __init__(self, keywords: Union[Iterable[str], Mapping[str, Any]]):
+        if isinstance(keywords, Mapping):
+            items = list(keywords.items())
+        else:
+            items = [(kw, kw) for kw in keywords]
+
+        # Aynı anahtar kelime birden fazla kez verilirse ilk sıra korunur
+        self.keywords: List[str] = []
+        self.values: List[Any] = []
+        self.order: Dict[str, int] = {}
+        for kw, value in items:
+            if not kw or kw in self.order:
+                continue
+            self.order[kw] = len(self.keywords)
+            self.keywords.append(kw)
+            self.values.append(value)
+
+        self._build()
+
+    def _build(self):
+        goto: List[Dict[str, int]] = [{}]
+        output: List[List[int]] = [[]]
+
+        # 1. Trie
+        for kid, kw in enumerate(self.keywords):
+            state = 0
+            for ch in kw:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    output.append([])
+                state = nxt
+            output[state].append(kid)
+
+        # 2. Fail linkleri + tam geçiş tablosu (DFA) — BFS sırasıyla
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict() for _ in goto]
+        delta[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            # Fail durumunun geçişleri miras alınır, kendi kenarları üzerine yazılır
+            delta[state] = dict(delta[fail[state]])
+            delta[state].update(goto[state])
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0) if state else 0
+                output[nxt] = output[nxt] + output[fail[nxt]]
+                queue.append(nxt)
+
+        self._delta = delta
+        self._output = [tuple(o) for o in output]
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Tüm (örtüşenler dahil) eşleşmeleri (başlangıç, bitiş, keyword_id) olarak üret"""
+        if not text:
+            return
+        delta = self._delta
+        output = self._output
+        keywords = self.keywords
+        state = 0
+        for i, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            if output[state]:
+                end = i + 1
+                for kid in output[state]:
+                    yield end - len(keywords[kid]), end, kid
+
+    def find_keywords(self, text: str) -> Set[str]:
+        """Metinde geçen anahtar kelimeler (`kw in text` ile aynı küme)"""
+        return {self.keywords[kid] for _, _, kid in self.iter_matches(text)}
+
+    def find_values(self, text: str) -> Set[Any]:
+        """Metinde geçen anahtar kelimelerin değerleri"""
+        return {self.values[kid] for _, _, kid in self.iter_matches(text)}
+
+    def find_word_keywords(self, text: str, allow_trailing_dot: bool = False) -> Set[str]:
+        """
+        Kelime sınırına oturan anahtar kelimeler.
+        `re.search(r'\\b' + re.escape(kw) + r'\\b', text)` ile aynı sonuç;
+        allow_trailing_dot=True ise `r'\\.?\\b'` sonlanması kabul edilir.
+        """
+        found = set()
+        for start, end, kid in self.iter_matches(text):
+            if not self._is_boundary(text, start):
+                continue
+            if self._is_boundary(text, end) or (
+                allow_trailing_dot and end < len(text) and text[end] == '.'
+                and self._is_boundary(text, end + 1)
+            ):
+                found.add(self.keywords[kid])
+        return found
+
+    def longest_match(self, text: str) -> Optional[str]:
+        """En uzun eşleşen anahtar kelime (eşit uzunlukta sözlük sırasında ilk olan)"""
+        best_kid = None
+        for _, _, kid in self.iter_matches(text):
+            if best_kid is None or (len(self.keywords[kid]), -kid) > (len(self.keywords[best_kid]), -best_kid):
+                best_kid = kid
+        return None if best_kid is None else self.keywords[best_kid]
+
+    @staticmethod
+    def _is_boundary(text: str, pos: int) -> bool:
+        before = pos > 0 and _is_word_char(text[pos - 1])
+        after = pos < len(text) and _is_word_char(text[pos])
+        return before != after
@@ -1,5 +1,6 @@
 import sqlite3
 import json
+import threading
 from datetime import datetime
 from pathlib import Path
 from backend.utils.logger import get_db_logger
@@ -8,9 +9,23 @@ logger = get_db_logger()
 base_logger = logger
 
 class DatabaseManager:
+    # Şeması hazırlanmış veritabanı yolları (süreç başına bir kez migration)
+    _initialized_paths = set()
+    _init_lock = threading.Lock()
+
     def __init__(self, db_path="data.db"):
+        # Router'lar modül seviyesinde oluşturur: tablo/migration işi ilk bağlantıya ertelenir
         self.db_path = db_path
-        self.init_db()
+
+    def _ensure_schema(self):
+        """Şemayı bu yol için ilk kullanımda bir kez oluştur"""
+        key = str(Path(self.db_path).resolve())
+        if key in DatabaseManager._initialized_paths:
+            return
+        with DatabaseManager._init_lock:
+            if key not in DatabaseManager._initialized_paths:
+                self.init_db()
+                DatabaseManager._initialized_paths.add(key)
 
     def init_db(self):
         """Veritabanı tablolarını oluştur"""
@@ -256,6 +271,7 @@ class DatabaseManager:
         conn.close()
 
     def get_connection(self):
+        self._ensure_schema()
         return sqlite3.connect(self.db_path)
 
     # --- Project Methods ---
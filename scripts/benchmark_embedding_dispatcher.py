@@ -0,0 +1,86 @@
+"""
+Eşzamanlı sorgu embedding throughput benchmark'ı: doğrudan model.encode vs EmbeddingDispatcher.
+
+Kullanım:
+    python scripts/benchmark_embedding_dispatcher.py [--threads 16] [--queries 512]
+
+sentence-transformers kuruluysa gerçek model kullanılır; değilse çağrı başına sabit
+maliyeti olan sentetik bir encoder ile (numpy matmul) ölçülür.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from config import get_embedding_config
+from services.embedding_dispatcher import EmbeddingDispatcher
+
+
+def load_encoder():
+    try:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(get_embedding_config().MODEL_NAME, device='cpu')
+        return "sentence-transformers", lambda texts: model.encode(texts).tolist()
+    except Exception:
+        rng = np.random.default_rng(0)
+        weights = rng.standard_normal((768, 768)).astype(np.float32)
+        lock = threading.Lock()
+
+        def encode(texts):
+            # Tek forward pass'in sabit maliyeti + metin başına matmul; model thread-safe değilmiş gibi kilitli
+            with lock:
+                time.sleep(0.004)
+                x = rng.standard_normal((len(texts), 768)).astype(np.float32)
+                for _ in range(12):
+                    x = np.tanh(x @ weights)
+                return x.tolist()
+        return "synthetic", encode
+
+
+def run(encode_one, queries, threads):
+    chunks = [queries[i::threads] for i in range(threads)]
+
+    def worker(chunk):
+        for q in chunk:
+            encode_one(q)
+
+    start = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(c,)) for c in chunks]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--queries', type=int, default=512)
+    parser.add_argument('--wait-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    name, encode = load_encoder()
+    queries = [f"C{20 + i % 30}/{25 + i % 30} hazır beton dökülmesi {i}" for i in range(args.queries)]
+    encode(queries[:4])  # ısınma
+
+    direct = run(lambda q: encode([q]), queries, args.threads)
+    dispatcher = EmbeddingDispatcher(encode, max_wait_ms=args.wait_ms)
+    batched = run(lambda q: dispatcher.encode([q]), queries, args.threads)
+    stats = dispatcher.stats()
+    dispatcher.shutdown()
+
+    print(f"Encoder        : {name}")
+    print(f"Sorgu / thread : {args.queries} / {args.threads}")
+    print(f"Doğrudan       : {args.queries / direct:.0f} sorgu/s")
+    print(f"Dispatcher     : {args.queries / batched:.0f} sorgu/s "
+          f"(ortalama {stats['avg_requests_per_batch']} istek/batch)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+TrainingDataService.direct_lookup / find_similar_examples benchmark'ı.
+
+Eğitim verisini N kat büyütüp (varsayılan 10x, her kopyada küçük metin
+değişiklikleriyle) eski doğrusal taramalar ile indeksli aramaları karşılaştırır.
+
+Kullanım:
+    python scripts/benchmark_training_lookup.py [--scale 10] [--queries 300]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.training_data_service import TrainingDataService
+
+DEFAULT_JSONL = os.path.join(os.path.dirname(__file__), '..', 'egitim_verisi_CLEANED.jsonl')
+
+
+def mutate(rng, text):
+    """Küçük yazım farkları (ekleme/silme/değiştirme)"""
+    chars = list(text)
+    for _ in range(rng.randint(1, 3)):
+        pos = rng.randint(0, max(len(chars) - 1, 0))
+        op = rng.random()
+        if op < 0.4:
+            chars.insert(pos, rng.choice("abcçdeğıilmnoöprsştuüyz 0123"))
+        elif chars and op < 0.8:
+            del chars[pos]
+        elif chars:
+            chars[pos] = rng.choice("aeıioöuü")
+    return "".join(chars)
+
+
+def linear_lookup(service, user_input, threshold):
+    """Eski uygulama: her sorguda tüm örnekleri normalize edip SequenceMatcher ile karşılaştırır"""
+    user_norm = service.normalize_text(user_input)
+    for example in service.training_data:
+        example_norm = service.normalize_text(example.get('input', ''))
+        if user_norm == example_norm:
+            return example
+        if service.calculate_similarity(user_norm, example_norm) >= threshold:
+            return example
+    return None
+
+
+def linear_similar(service, user_input, top_k, min_similarity=0.4):
+    """Eski uygulama: tüm örnekler yeniden tokenize edilip puanlanır, tüm liste sıralanır"""
+    user_norm = service.normalize_text(user_input)
+    user_keywords = set(service.extract_keywords(user_input))
+    matches = []
+    for example in service.training_data:
+        example_input = example.get('input', '')
+        example_keywords = set(service.extract_keywords(example_input))
+        score = service.calculate_similarity(user_norm, service.normalize_text(example_input)) * 0.6
+        if user_keywords and example_keywords:
+            score += len(user_keywords & example_keywords) / len(user_keywords | example_keywords) * 0.4
+        if score >= min_similarity:
+            matches.append((score, example_input))
+    matches.sort(key=lambda x: x[0], reverse=True)
+    return matches[:top_k]
+
+
+def report(name, queries, indexed_time, linear_time):
+    print(f"[{name}]")
+    print(f"  İndeksli       : {indexed_time * 1000 / len(queries):.2f} ms/sorgu")
+    print(f"  Doğrusal (tah.): {linear_time * 1000 / len(queries):.2f} ms/sorgu")
+    print(f"  Hızlanma       : {linear_time / max(indexed_time, 1e-9):.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--jsonl', default=DEFAULT_JSONL)
+    parser.add_argument('--scale', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('--threshold', type=float, default=0.95)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with open(args.jsonl, 'r', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()]
+
+    scaled = list(records)
+    for _ in range(args.scale - 1):
+        for record in records:
+            scaled.append(dict(record, input=mutate(rng, record.get('input', ''))))
+
+    with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False, encoding='utf-8') as tmp:
+        for record in scaled:
+            tmp.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    try:
+        start = time.perf_counter()
+        service = TrainingDataService(tmp.name)
+        load_time = time.perf_counter() - start
+    finally:
+        os.unlink(tmp.name)
+
+    # Yarısı birebir (exact), yarısı yazım farklı, bir kısmı hiç eşleşmeyen sorgular
+    queries = []
+    for i in range(args.queries):
+        text = rng.choice(records).get('input', '')
+        if i % 3 == 1:
+            text = mutate(rng, text)
+        elif i % 3 == 2:
+            text = mutate(rng, text) + " " + rng.choice(["özel imalat", "ek iş", "revize"])
+        queries.append(text)
+
+    linear_queries = queries[:max(1, args.queries // 10)]
+
+    start = time.perf_counter()
+    indexed = [service.direct_lookup(q, args.threshold) for q in queries]
+    indexed_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for q in linear_queries:
+        linear_lookup(service, q, args.threshold)
+    linear_time = (time.perf_counter() - start) * len(queries) / len(linear_queries)
+
+    print(f"Örnek sayısı   : {len(service.training_data)} ({args.scale}x)")
+    print(f"Yükleme+indeks : {load_time:.2f} s")
+    print(f"Sorgu sayısı   : {len(queries)} (direct lookup eşleşen: {sum(1 for r in indexed if r)})")
+    report("direct_lookup", queries, indexed_time, linear_time)
+
+    start = time.perf_counter()
+    for q in queries:
+        service.find_similar_examples(q, top_k=3)
+    indexed_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for q in linear_queries:
+        linear_similar(service, q, top_k=3)
+    linear_time = (time.perf_counter() - start) * len(queries) / len(linear_queries)
+    report("find_similar_examples (top_k=3)", queries, indexed_time, linear_time)
+
+if __name__ == '__main__':
+    main()
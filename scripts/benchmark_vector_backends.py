@@ -0,0 +1,152 @@
+"""
+Vektör deposu benchmark'ı: Chroma (HNSW + SQLite) vs NumPy mmap (tam arama).
+
+Her backend ayrı bir süreçte ölçülür (bellek ölçümü birbirini etkilemesin):
+  - build   : tüm vektörlerin upsert edilip diske yazılması
+  - open    : diskten açılış + ilk sorgu (soğuk başlangıç)
+  - sorgu   : tek sorgu top-k gecikmesi p50/p95 (filtresiz ve unit+institution filtreli)
+  - RSS     : açılış + sorgulardan sonra süreç belleği
+  - recall@k: float32 brute-force sonuçlarına göre
+
+Vektörler sentetik (kümelenmiş, 768 boyut) üretilir; model gerekmez.
+
+Kullanım:
+    python scripts/benchmark_vector_backends.py [--n 50000] [--queries 200] [--k 10] [--backends numpy,chroma]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+UNITS = ("m²", "m³", "kg", "adet", "m")
+INSTITUTIONS = ("ÇŞB", "KGM", "DSİ")
+
+
+def make_data(n, dim, queries, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, n // 50), dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), n)] + 0.5 * rng.standard_normal((n, dim)).astype(np.float32)
+    query_vectors = vectors[rng.integers(0, n, queries)] + 0.3 * rng.standard_normal((queries, dim)).astype(np.float32)
+    metadatas = [{"unit": UNITS[i % len(UNITS)], "institution": INSTITUTIONS[i % len(INSTITUTIONS)]} for i in range(n)]
+    return vectors, query_vectors, metadatas
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def open_client(backend, path):
+    if backend == "numpy":
+        from services.numpy_vector_store import NumpyVectorClient
+        return NumpyVectorClient(path, flush_delay=3600)
+    import chromadb
+    return chromadb.PersistentClient(path=path)
+
+
+def percentile_ms(samples, p):
+    return round(float(np.percentile(samples, p)) * 1000, 2)
+
+
+def worker(args):
+    vectors, query_vectors, metadatas = make_data(args.n, args.dim, args.queries)
+    ids = [f"p{i}" for i in range(args.n)]
+    path = os.path.join(args.workdir, args.worker)
+    where = {"$and": [{"unit": "m²"}, {"institution": "KGM"}]}
+
+    start = time.perf_counter()
+    client = open_client(args.worker, path)
+    collection = client.get_or_create_collection(name="bench", metadata={"hnsw:space": "cosine"})
+    for i in range(0, args.n, 5000):
+        collection.upsert(ids=ids[i:i + 5000], embeddings=vectors[i:i + 5000].tolist(),
+                          documents=ids[i:i + 5000], metadatas=metadatas[i:i + 5000])
+    if hasattr(client, "flush"):
+        client.flush()
+    build = time.perf_counter() - start
+    del client, collection
+
+    # Soğuk açılış ölçümü ayrı süreçte daha doğru olurdu; burada aynı süreçte yeni client açılır
+    base_rss = rss_mb()
+    start = time.perf_counter()
+    client = open_client(args.worker, path)
+    collection = client.get_or_create_collection(name="bench", metadata={"hnsw:space": "cosine"})
+    collection.query(query_embeddings=query_vectors[:1].tolist(), n_results=args.k)
+    open_seconds = time.perf_counter() - start
+
+    latencies, filtered, top_ids = [], [], []
+    for query in query_vectors:
+        began = time.perf_counter()
+        result = collection.query(query_embeddings=[query.tolist()], n_results=args.k)
+        latencies.append(time.perf_counter() - began)
+        top_ids.append(result['ids'][0])
+        began = time.perf_counter()
+        collection.query(query_embeddings=[query.tolist()], n_results=args.k, where=where)
+        filtered.append(time.perf_counter() - began)
+
+    print(json.dumps({
+        "backend": args.worker,
+        "build_s": round(build, 2),
+        "open_s": round(open_seconds, 3),
+        "p50_ms": percentile_ms(latencies, 50),
+        "p95_ms": percentile_ms(latencies, 95),
+        "filtered_p50_ms": percentile_ms(filtered, 50),
+        "rss_mb": round(rss_mb() - base_rss, 1),
+        "top_ids": top_ids,
+    }))
+
+
+def recall(top_ids, args):
+    vectors, query_vectors, _ = make_data(args.n, args.dim, args.queries)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+    exact = np.argsort(-(query_vectors @ vectors.T), axis=1)[:, :args.k]
+    hits = sum(len({f"p{i}" for i in row} & set(found)) for row, found in zip(exact, top_ids))
+    return hits / (len(top_ids) * args.k)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n', type=int, default=50000)
+    parser.add_argument('--dim', type=int, default=768)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--backends', default="numpy,chroma")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    print(f"Vektör: {args.n} x {args.dim}, sorgu: {args.queries}, k={args.k}")
+    print(f"{'backend':8} {'build s':>8} {'open s':>7} {'p50 ms':>7} {'p95 ms':>7} {'filt p50':>8} {'RSS MB':>7} {'recall':>7}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for backend in args.backends.split(","):
+            command = [sys.executable, __file__, "--worker", backend, "--workdir", workdir,
+                       "--n", str(args.n), "--dim", str(args.dim), "--queries", str(args.queries), "--k", str(args.k)]
+            proc = subprocess.run(command, capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(f"{backend:8} çalıştırılamadı: {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else proc.returncode}")
+                continue
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(f"{backend:8} {result['build_s']:>8} {result['open_s']:>7} {result['p50_ms']:>7} {result['p95_ms']:>7} "
+                  f"{result['filtered_p50_ms']:>8} {result['rss_mb']:>7} {recall(result['top_ids'], args):>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,8 @@ import glob
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("ColabVectorDB")
 
+MODEL_NAME = 'emrecan/bert-base-turkish-cased-mean-nli-stsb-tr'
+
 def install_dependencies():
     """Install minimal dependencies for Vector DB generation"""
     logger.info("Installing dependencies...")
@@ -103,7 +105,7 @@ def generate_vector_db():
 
     # 3. Model
     logger.info(f"Loading Model (Device: {device})...")
-    model = SentenceTransformer('emrecan/bert-base-turkish-cased-mean-nli-stsb-tr', device=device)
+    model = SentenceTransformer(MODEL_NAME, device=device)
 
     # 4. Ingest (Batch Processing)
     batch_size = 500 # GPU usually handles larger batches well, but let's be safe
@@ -115,6 +117,9 @@ def generate_vector_db():
     ids = []
     documents = []
     metadatas = []
+    # Taşınabilir export (backend/services/embedding_export.py formatı)
+    export_items = []
+    export_embeddings = []
 
     for i, poz in enumerate(items):
         code = poz.get('poz_no')
@@ -137,6 +142,11 @@ def generate_vector_db():
         if len(ids) >= batch_size or i == len(items) - 1:
             try:
                 embeddings = model.encode(documents).tolist()
+                export_embeddings.extend(embeddings)
+                export_items.extend(
+                    {"id": doc_id, "document": document, "metadata": metadata}
+                    for doc_id, document, metadata in zip(ids, documents, metadatas)
+                )
                 collection.upsert(
                     ids=ids,
                     embeddings=embeddings,
@@ -153,8 +163,30 @@ def generate_vector_db():
             metadatas = []
 
     logger.info("Ingestion Complete!")
+    write_embedding_export(base_dir / "embeddings_export", export_items, export_embeddings)
     return persist_dir
 
+def write_embedding_export(out_dir, items, embeddings):
+    """embeddings.npy + manifest.json (backend'de VECTOR_DB_EXPORT_DIR ile modelsiz yüklenir)"""
+    import numpy as np
+    from datetime import datetime
+
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, "embeddings.npy"), matrix)
+    manifest = {
+        "format_version": 1,
+        "model": MODEL_NAME,
+        "backend": "torch",
+        "dim": int(matrix.shape[1]) if len(items) else 0,
+        "count": len(items),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "items": items,
+    }
+    with open(os.path.join(out_dir, "manifest.json"), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    logger.info(f"Embedding export written: {out_dir} ({len(items)} items)")
+
 def zip_directory(folder_path, output_path):
     with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
         for root, _, files in os.walk(folder_path):
@@ -182,4 +214,6 @@ if __name__ == "__main__":
     if output_dir:
         print("Zipping output...")
         zip_directory(output_dir, "chroma_db_output.zip")
+        zip_directory(output_dir.parent / "embeddings_export", "embeddings_export.zip")
         print("Done! Download 'chroma_db_output.zip' and replace your local 'chroma_db' folder.")
+        print("Alternatively extract 'embeddings_export.zip' into 'backend/' (loaded on startup when the collection is empty).")
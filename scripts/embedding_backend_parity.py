@@ -0,0 +1,131 @@
+"""
+Embedding backend recall-parity kontrolü ve benchmark'ı.
+
+fp32 torch modeli ile seçilen backend'i (torch-int8, onnx, onnx-int8) aynı
+katalog üzerinde karşılaştırır:
+  - model yükleme süresi ve encode throughput (metin/sn)
+  - vektör boyutu ve fp32 vektörleriyle ortalama cosine benzerliği
+  - recall@k: sorgu başına fp32 top-k sonuçlarının backend top-k içinde kalma oranı
+
+Katalog ANALIZ/ ve PDF/ klasörlerindeki CSV'lerden okunur; yoksa eğitim verisindeki
+imalat tanımları kullanılır. Sorgular eğitim verisindeki tanımlardır.
+
+Kullanım:
+    python scripts/embedding_backend_parity.py --backend onnx-int8 [--k 10] [--queries 300] [--min-recall 0.95]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'backend'))
+
+from config import get_embedding_config
+from services.embedding_backends import SUPPORTED_BACKENDS, load_embedding_model
+
+
+def load_catalog_documents():
+    from services.data_manager import CSVLoader
+
+    poz_data = {}
+    for folder in (ROOT / "ANALIZ", ROOT / "PDF"):
+        if folder.exists():
+            data, _, _ = CSVLoader(folder).run()
+            for code, info in data.items():
+                poz_data.setdefault(code, info)
+    if poz_data:
+        return [f"{code} {info.get('description', '')}" for code, info in poz_data.items()]
+
+    with open(ROOT / "egitim_verisi_CLEANED.jsonl", encoding='utf-8') as f:
+        return sorted({json.loads(line).get('input', '') for line in f if line.strip()} - {''})
+
+
+def load_queries(limit):
+    with open(ROOT / "egitim_verisi_CLEANED.jsonl", encoding='utf-8') as f:
+        inputs = [json.loads(line).get('input', '') for line in f if line.strip()]
+    step = max(1, len(inputs) // limit)
+    return [text for text in inputs[::step] if text][:limit]
+
+
+def encode(model, texts, batch_size=64):
+    start = time.perf_counter()
+    vectors = model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+    elapsed = time.perf_counter() - start
+    vectors = vectors.astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+    return vectors, elapsed
+
+
+def top_k(doc_vectors, query_vectors, k):
+    scores = query_vectors @ doc_vectors.T
+    idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return [set(row) for row in idx]
+
+
+def profile(name, backend, documents, queries):
+    model, effective, load_seconds = load_embedding_model(
+        name, backend, device="cpu", cache_dir=get_embedding_config().MODEL_CACHE_DIR
+    )
+    encode(model, documents[:8])  # ısınma
+    doc_vectors, doc_seconds = encode(model, documents)
+    query_start = time.perf_counter()
+    for q in queries[:50]:
+        model.encode([q])
+    single_ms = (time.perf_counter() - query_start) * 1000 / min(50, len(queries))
+    query_vectors, _ = encode(model, queries)
+    return {
+        "backend": effective,
+        "load_seconds": load_seconds,
+        "docs_per_sec": len(documents) / doc_seconds,
+        "single_query_ms": single_ms,
+        "dim": doc_vectors.shape[1],
+        "doc_vectors": doc_vectors,
+        "query_vectors": query_vectors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--backend', choices=SUPPORTED_BACKENDS[1:], default='onnx-int8')
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('--min-recall', type=float, default=0.95)
+    args = parser.parse_args()
+
+    name = get_embedding_config().MODEL_NAME
+    documents = load_catalog_documents()
+    queries = load_queries(args.queries)
+    print(f"Katalog: {len(documents)} belge, sorgu: {len(queries)}, k={args.k}")
+
+    baseline = profile(name, "torch", documents, queries)
+    candidate = profile(name, args.backend, documents, queries)
+    if candidate["backend"] != args.backend:
+        print(f"⚠️ '{args.backend}' yüklenemedi, '{candidate['backend']}' kullanıldı.")
+        return 2
+
+    assert candidate["dim"] == baseline["dim"], "Vektör boyutu farklı"
+    cosine = float(np.mean(np.sum(baseline["doc_vectors"] * candidate["doc_vectors"], axis=1)))
+    base_top = top_k(baseline["doc_vectors"], baseline["query_vectors"], args.k)
+    cand_top = top_k(candidate["doc_vectors"], candidate["query_vectors"], args.k)
+    recall = float(np.mean([len(b & c) / args.k for b, c in zip(base_top, cand_top)]))
+
+    print(f"{'':14}{'torch fp32':>14}{args.backend:>14}")
+    for label, key, fmt in (
+        ("Yükleme (sn)", "load_seconds", "{:>14.2f}"),
+        ("Belge/sn", "docs_per_sec", "{:>14.1f}"),
+        ("Tek sorgu ms", "single_query_ms", "{:>14.1f}"),
+    ):
+        print(f"{label:14}" + fmt.format(baseline[key]) + fmt.format(candidate[key]))
+    print(f"Boyut         : {candidate['dim']}")
+    print(f"Ort. cosine   : {cosine:.4f}")
+    print(f"Recall@{args.k:<6} : {recall:.4f} (eşik {args.min_recall})")
+    return 0 if recall >= args.min_recall else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
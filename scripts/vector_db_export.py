@@ -0,0 +1,57 @@
+"""
+Poz vektör koleksiyonunu embedding'leriyle dışa/içe aktar.
+
+export: chroma_db'deki poz koleksiyonunu embeddings.npy + manifest.json olarak yazar
+import: export dizinini modeli yüklemeden koleksiyona toplu yükler; ANALIZ/ ve PDF/
+        kataloğu varsa sadece metni güncel kalan kayıtlar alınır (kalanlar açılışta
+        ingest_data tarafından encode edilir)
+
+Kullanım:
+    python scripts/vector_db_export.py export [--dir backend/embeddings_export]
+    python scripts/vector_db_export.py import [--dir backend/embeddings_export] [--no-catalog]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'backend'))
+
+from config import get_embedding_config
+from services.vector_db_service import VectorDBService
+
+
+def load_catalog():
+    from services.data_manager import CSVLoader
+
+    poz_data = {}
+    for folder in (ROOT / "ANALIZ", ROOT / "PDF"):
+        if folder.exists():
+            data, _, _ = CSVLoader(folder).run()
+            for code, info in data.items():
+                poz_data.setdefault(code, info)
+    return list(poz_data.values()) or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("export", "import"))
+    parser.add_argument("--dir", default=get_embedding_config().EXPORT_DIR)
+    parser.add_argument("--no-catalog", action="store_true", help="import: katalog kontrolü yapmadan hepsini yükle")
+    args = parser.parse_args()
+
+    service = VectorDBService()
+    start = time.perf_counter()
+    if args.command == "export":
+        result = service.export_embeddings(args.dir)
+    else:
+        poz_data = None if args.no_catalog else load_catalog()
+        result = service.import_embeddings(args.dir, poz_data)
+    result["seconds"] = round(time.perf_counter() - start, 2)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
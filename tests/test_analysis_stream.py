@@ -0,0 +1,245 @@
+"""
+Streaming Analysis Tests
+
+Artımlı JSON parser'ın bileşenleri kapandıkları anda çıkardığını, OpenRouter
+SSE akışının parçalara ayrıldığını ve /api/ai/analyze/stream endpoint'inin
+fiyatı eşleştirilmiş bileşenleri LLM yanıtı bitmeden gönderdiğini sahte bir
+OpenRouter akışı ile doğrular.
+"""
+
+import sys
+import os
+import asyncio
+import json
+
+import httpx
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services import ai_service, http_client
+from services.ai_service import APIError, AsyncAIAnalysisService
+from services.incremental_json import IncrementalComponentParser
+
+ANALYSIS = {
+    "explanation": "Beton {C25/30} dökümü; \"pompa\" dahil",
+    "suggested_unit": "m³",
+    "components": [
+        {"type": "Malzeme", "code": "10.130.1503", "name": "Hazır beton C25/30", "unit": "m³", "quantity": 1.02,
+         "notes": {"fire": "%2 ]}"}},
+        {"type": "İşçilik", "code": "", "name": "Betoncu ustası", "unit": "Sa", "quantity": 0.5},
+        {"type": "Makine", "code": "", "name": "Beton pompası", "unit": "Sa", "quantity": 0.1}
+    ],
+    "analysis_data": {"components": [{"name": "iç içe, akışta gönderilmemeli"}]}
+}
+
+# Gerçekçi bir analiz 8-15 bileşen içerir
+LONG_ANALYSIS = dict(ANALYSIS, components=ANALYSIS["components"] + [
+    {"type": "İşçilik", "code": "", "name": f"Düz işçi {i}", "unit": "Sa", "quantity": 0.25} for i in range(9)
+])
+
+
+def _chunks(text: str, size: int):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _sse_body(text: str, size: int = 7):
+    lines = [": OPENROUTER PROCESSING"]
+    for chunk in _chunks(text, size):
+        lines.append("data: " + json.dumps({"choices": [{"delta": {"content": chunk}}]}))
+    lines.append("data: [DONE]")
+    return [line + "\n\n" for line in lines]
+
+
+class TestIncrementalComponentParser:
+
+    @pytest.mark.parametrize("size", [1, 5, 64, 100000])
+    def test_components_match_full_parse(self, size):
+        text = "```json\n" + json.dumps(ANALYSIS, ensure_ascii=False, indent=2) + "\n```"
+        parser = IncrementalComponentParser()
+        components = [c for chunk in _chunks(text, size) for c in parser.feed(chunk)]
+        assert components == ANALYSIS["components"]
+        assert parser.finished and parser.text == text
+
+    def test_component_emitted_as_soon_as_closed(self):
+        text = json.dumps(ANALYSIS, ensure_ascii=False)
+        first_end = text.index('"%2 ]}"}}') + len('"%2 ]}"}}')
+        parser = IncrementalComponentParser()
+        assert parser.feed(text[:first_end - 1]) == []
+        assert parser.feed(text[first_end - 1:first_end]) == [ANALYSIS["components"][0]]
+
+    def test_broken_item_is_skipped(self):
+        parser = IncrementalComponentParser()
+        assert parser.feed('{"components": [{"name": "a", "quantity": 1,}, {"name": "b"}]}') == [{"name": "b"}]
+
+
+class TestStreamApiRequest:
+
+    @pytest.fixture
+    def fake_openrouter(self, monkeypatch):
+        state = {"handler": None, "requests": []}
+
+        async def dispatch(request):
+            state["requests"].append(json.loads(request.content))
+            return await state["handler"](request)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(dispatch))
+        monkeypatch.setattr(http_client, "get_async_http_client", lambda: client)
+        monkeypatch.setattr(ai_service, "API_RETRY_BACKOFF", 0)
+        monkeypatch.setattr(ai_service, "get_llm_cache", lambda task=None: None)
+        return state
+
+    def _collect(self, service):
+        async def run():
+            return [chunk async for chunk in service.stream_analysis_async("beton", "m³")]
+        return asyncio.run(run())
+
+    def test_chunks_are_forwarded(self, fake_openrouter):
+        text = json.dumps(ANALYSIS, ensure_ascii=False)
+
+        async def handler(request):
+            return httpx.Response(200, content="".join(_sse_body(text)).encode("utf-8"))
+
+        fake_openrouter["handler"] = handler
+        chunks = self._collect(AsyncAIAnalysisService(openrouter_key="test-key", model="openai/gpt-4o-mini"))
+        assert len(chunks) > 1 and "".join(chunks) == text
+        assert fake_openrouter["requests"][0]["stream"] is True
+
+    def test_retries_before_first_chunk(self, fake_openrouter):
+        calls = []
+
+        async def handler(request):
+            calls.append(1)
+            if len(calls) == 1:
+                return httpx.Response(503, text="unavailable")
+            return httpx.Response(200, content="".join(_sse_body("{}")).encode("utf-8"))
+
+        fake_openrouter["handler"] = handler
+        assert self._collect(AsyncAIAnalysisService(openrouter_key="test-key", model="openai/gpt-4o-mini")) == ["{}"]
+        assert len(calls) == 2
+
+    def test_error_mid_stream_is_not_retried(self, fake_openrouter):
+        calls = []
+
+        async def handler(request):
+            calls.append(1)
+            body = "".join(_sse_body('{"components": [')[:2]) + 'data: {"error": {"message": "provider down"}}\n\n'
+            return httpx.Response(200, content=body.encode("utf-8"))
+
+        fake_openrouter["handler"] = handler
+        with pytest.raises(APIError, match="provider down"):
+            self._collect(AsyncAIAnalysisService(openrouter_key="test-key", model="openai/gpt-4o-mini"))
+        assert len(calls) == 1
+
+
+class TestAnalyzeStreamEndpoint:
+
+    @pytest.fixture
+    def llm_output(self):
+        """Sahte LLM'in akıttığı analiz; test içinde değiştirilebilir"""
+        return {"analysis": LONG_ANALYSIS}
+
+    @pytest.fixture
+    def client(self, monkeypatch, llm_output):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from routers import ai as ai_router
+
+        async def slow_body():
+            # Her parça arasında gecikme: gerçek LLM üretimini taklit eder
+            text = json.dumps(llm_output["analysis"], ensure_ascii=False)
+            for line in _sse_body(text, size=16):
+                await asyncio.sleep(0.01)
+                yield line.encode("utf-8")
+
+        async def dispatch(request):
+            body = json.loads(request.content)
+            if body.get("stream"):
+                return httpx.Response(200, content=slow_body())
+            return httpx.Response(200, json={"choices": [{"message": {"content": '{"status": "ok", "issues": []}'}}]})
+
+        monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+        monkeypatch.setattr(http_client, "get_async_http_client",
+                            lambda: httpx.AsyncClient(transport=httpx.MockTransport(dispatch)))
+        monkeypatch.setattr(ai_service, "get_llm_cache", lambda task=None: None)
+        monkeypatch.setattr(ai_router, "get_training_service", lambda: None)
+        monkeypatch.setattr(ai_router, "build_analysis_context", lambda request, training_service: {
+            "full_context": "", "feedback_context": "", "training_rag_context": "",
+            "technical_description": None, "analysis_data": None
+        })
+        monkeypatch.setattr(ai_router, "get_poz_data", lambda: {
+            "10.130.1503": {"description": "C25/30 hazır beton", "unit": "m³", "unit_price": "2.500,00"}
+        })
+
+        app = FastAPI()
+        app.include_router(ai_router.router, prefix="/api")
+        return TestClient(app)
+
+    def _events(self, client):
+        events = []
+        with client.stream("POST", "/api/ai/analyze/stream", json={"description": "C25/30 beton", "unit": "m³"}) as response:
+            assert response.headers["content-type"].startswith("text/event-stream")
+            event = None
+            for line in response.iter_lines():
+                if line.startswith("event: "):
+                    event = line[7:]
+                elif line.startswith("data: "):
+                    events.append((event, json.loads(line[6:])))
+        return events
+
+    def test_components_stream_before_result(self, client):
+        events = self._events(client)
+        names = [e[0] for e in events]
+        assert names == ["component"] * 12 + ["result"], names
+
+        first = events[0][1]["component"]
+        assert first["name"] == "Hazır beton C25/30"
+        assert first["unit_price"] == 2500.0 and first["price_source"] == "exact_code_validated"
+        assert [e[1]["index"] for e in events[:12]] == list(range(12))
+
+        result = events[-1][1]
+        assert len(result["components"]) >= 12 and "critic_review" in result
+        stream = result["metadata"]["stream"]
+        assert stream["streamed_components"] == 12
+        # İlk bileşen, LLM akışının küçük bir kısmı tamamlandığında gönderilir
+        # (TestClient yanıtı tamponladığı için süre sunucu tarafında ölçülür)
+        assert stream["time_to_first_component_ms"] < stream["llm_ms"] / 2
+
+    def test_error_event(self, client, monkeypatch):
+        monkeypatch.delenv("OPENROUTER_API_KEY")
+        events = self._events(client)
+        assert [e[0] for e in events] == ["error"]
+        assert "API Key" in events[0][1]["detail"]
+
+    def test_components_are_normalised_before_price_matching(self, client, llm_output):
+        llm_output["analysis"] = {"components": [
+            {"type": "İşçilik", "name": "Betoncu ustası", "unit": "Sa", "quantity": "0,5", "unit_price": "120,456"},
+            {"name": "Düz işçi", "quantity": "2"},
+            {"type": "Malzeme", "code": "10.130.1503", "name": "Hazır beton C25/30", "unit": "m³", "quantity": "1,02"}
+        ]}
+        events = self._events(client)
+        assert [e[0] for e in events] == ["component"] * 3 + ["result"]
+
+        usta, isci, beton = [e[1]["component"] for e in events[:3]]
+        assert usta["quantity"] == 0.5 and usta["unit_price"] == 120.46 and usta["total_price"] == 60.23
+        assert isci["quantity"] == 2.0 and isci["type"] == "Diğer" and isci["code"] == "" and isci["unit"] == ""
+        assert beton["quantity"] == 1.02 and beton["unit_price"] == 2500.0 and beton["total_price"] == 2550.0
+
+    def test_failing_component_does_not_end_stream(self, client, monkeypatch):
+        from routers import ai as ai_router
+
+        match_prices = ai_router.match_prices_from_poz_data
+
+        def flaky_match(result):
+            if result["components"][0]["name"] == "Betoncu ustası":
+                raise ValueError("eşleştirme patladı")
+            return match_prices(result)
+
+        monkeypatch.setattr(ai_router, "match_prices_from_poz_data", flaky_match)
+        events = self._events(client)
+        streamed = [e[1]["component"]["name"] for e in events if e[0] == "component"]
+        assert "Betoncu ustası" not in streamed and len(streamed) == 11
+        assert events[-1][0] == "result"
+        assert events[-1][1]["metadata"]["stream"]["streamed_components"] == 11
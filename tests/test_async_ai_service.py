@@ -0,0 +1,219 @@
+"""
+Async AI Service Tests
+
+AsyncAIAnalysisService'in LLM çağrılarını event loop'ta yaptığını (thread
+tutmadan), retry/backoff ve hata semantiğinin senkron servisle aynı olduğunu,
+iptalin bekleyen HTTP isteğine yansıdığını ve consensus/self-consistency'nin
+async yolu kullandığını sahte bir OpenRouter transport'u ile doğrular.
+"""
+
+import sys
+import os
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services import ai_service, http_client
+from services.ai_service import APIError, AsyncAIAnalysisService
+from services.consensus_service import ConsensusAnalysisService
+from services.self_consistency_service import SelfConsistencyService
+
+ANALYSIS = {"components": [{"type": "Malzeme", "name": "Hazır beton C25/30", "unit": "m³", "quantity": 1.0}]}
+
+
+def _completion(content: str) -> httpx.Response:
+    return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+
+@pytest.fixture
+def fake_openrouter(monkeypatch):
+    """Async client'ı sahte transport'la değiştir; handler test içinde atanır"""
+    state = {"handler": None, "requests": []}
+
+    async def dispatch(request):
+        state["requests"].append(json.loads(request.content))
+        return await state["handler"](request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(dispatch))
+    monkeypatch.setattr(http_client, "get_async_http_client", lambda: client)
+    monkeypatch.setattr(ai_service, "API_RETRY_BACKOFF", 0)
+    # Kalıcı LLM cache'i istek sayılarını değiştirmesin
+    monkeypatch.setattr(ai_service, "get_llm_cache", lambda task=None: None)
+    return state
+
+
+def _service():
+    return AsyncAIAnalysisService(openrouter_key="test-key", model="openai/gpt-4o-mini")
+
+
+class TestAsyncAIAnalysisService:
+
+    def test_concurrent_calls_do_not_use_threads(self, fake_openrouter):
+        async def handler(request):
+            await asyncio.sleep(0.2)
+            return _completion(json.dumps(ANALYSIS))
+
+        fake_openrouter["handler"] = handler
+        service = _service()
+
+        async def run():
+            threads_before = threading.active_count()
+            start = time.perf_counter()
+            results = await asyncio.gather(*[
+                service.generate_analysis_async("C25/30 beton", "m³") for _ in range(200)
+            ])
+            return results, time.perf_counter() - start, threading.active_count() - threads_before
+
+        results, elapsed, extra_threads = asyncio.run(run())
+        assert len(results) == 200 and all(r["components"][0]["name"] == "Hazır beton C25/30" for r in results)
+        assert elapsed < 5
+        assert extra_threads <= 2
+        assert fake_openrouter["requests"][0]["response_format"] == {"type": "json_object"}
+
+    def test_retries_then_succeeds(self, fake_openrouter):
+        calls = []
+
+        async def handler(request):
+            calls.append(1)
+            if len(calls) < 3:
+                return httpx.Response(503, text="unavailable")
+            return _completion("ok")
+
+        fake_openrouter["handler"] = handler
+        assert asyncio.run(_service()._submit_api_request_async([], "openai/gpt-4o-mini")) == "ok"
+        assert len(calls) == 3
+
+    def test_non_retryable_error_raises_immediately(self, fake_openrouter):
+        calls = []
+
+        async def handler(request):
+            calls.append(1)
+            return httpx.Response(401, text="bad key")
+
+        fake_openrouter["handler"] = handler
+        with pytest.raises(APIError) as exc:
+            asyncio.run(_service()._submit_api_request_async([], "openai/gpt-4o-mini"))
+        assert exc.value.status_code == 401 and len(calls) == 1
+
+    def test_json_mode_conflict_retries_without_response_format(self, fake_openrouter):
+        async def handler(request):
+            body = json.loads(request.content)
+            if "response_format" in body:
+                return httpx.Response(400, text="Web Search cannot be used with JSON mode")
+            return _completion(json.dumps(ANALYSIS))
+
+        fake_openrouter["handler"] = handler
+        result = asyncio.run(_service().generate_analysis_async("beton", "m³"))
+        assert result["components"]
+        assert [("response_format" in r) for r in fake_openrouter["requests"]] == [True, False]
+
+    def test_cancellation_cancels_in_flight_request(self, fake_openrouter):
+        async def run():
+            seen = {"started": asyncio.Event(), "cancelled": False}
+
+            async def handler(request):
+                seen["started"].set()
+                try:
+                    await asyncio.sleep(30)
+                except asyncio.CancelledError:
+                    seen["cancelled"] = True
+                    raise
+                return _completion("late")
+
+            fake_openrouter["handler"] = handler
+            task = asyncio.create_task(_service().generate_analysis_async("beton", "m³"))
+            await seen["started"].wait()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return seen["cancelled"]
+
+        assert asyncio.run(run())
+
+    def test_critic_review_falls_back_on_failure(self, fake_openrouter):
+        async def handler(request):
+            return httpx.Response(401, text="bad key")
+
+        fake_openrouter["handler"] = handler
+        review = asyncio.run(_service().review_analysis_async(ANALYSIS, "beton"))
+        assert review["status"] == "ok" and review["issues"] == []
+
+
+class TestAsyncEnsembles:
+
+    def test_consensus_and_self_consistency_use_async_path(self, fake_openrouter, monkeypatch):
+        async def handler(request):
+            return _completion(json.dumps(ANALYSIS))
+
+        async def no_threads(*args, **kwargs):
+            raise AssertionError("asyncio.to_thread kullanılmamalı")
+
+        fake_openrouter["handler"] = handler
+        monkeypatch.setattr(asyncio, "to_thread", no_threads)
+        service = _service()
+
+        consensus = asyncio.run(ConsensusAnalysisService(service).analyze_with_consensus("beton", "m³"))
+        assert consensus["model_count"] == 2
+        consistency = asyncio.run(SelfConsistencyService(service, n_samples=3).analyze_with_consistency("beton", "m³"))
+        assert consistency["sample_count"] == 3
+        models = [r["model"] for r in fake_openrouter["requests"]]
+        assert models[:2] == ConsensusAnalysisService(service).models
+        assert [r["temperature"] for r in fake_openrouter["requests"][2:]] == [0.1, 0.2, 0.3]
+
+
+class TestAnalyzeRoute:
+
+    def test_blocking_context_work_runs_off_the_event_loop(self, fake_openrouter, monkeypatch):
+        from routers import ai as ai_router
+
+        async def handler(request):
+            return _completion(json.dumps(ANALYSIS))
+
+        fake_openrouter["handler"] = handler
+        threads = []
+
+        def slow_direct_lookup(request, training_service):
+            threads.append(threading.current_thread())
+            time.sleep(0.2)
+            return None
+
+        def slow_context(request, training_service):
+            # Hibrit arama / PDF / web scraper gecikmesi
+            threads.append(threading.current_thread())
+            time.sleep(0.2)
+            return {"full_context": "", "feedback_context": "", "training_rag_context": "",
+                    "technical_description": None, "analysis_data": None}
+
+        monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+        monkeypatch.setattr(ai_router, "get_training_service", lambda: None)
+        monkeypatch.setattr(ai_router, "get_poz_data", lambda: {})
+        monkeypatch.setattr(ai_router, "_direct_lookup_analysis", slow_direct_lookup)
+        monkeypatch.setattr(ai_router, "build_analysis_context", slow_context)
+
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            task = asyncio.create_task(ticker())
+            result = await ai_router.analyze_poz(ai_router.AnalysisRequest(description="beton", unit="m³"))
+            task.cancel()
+            return result, ticks
+
+        result, ticks = asyncio.run(run())
+        assert result["components"]
+        assert len(threads) == 2 and threading.main_thread() not in threads
+        # 0.4 s bloklayan iş boyunca event loop diğer işleri yürütmeye devam eder
+        assert ticks >= 20
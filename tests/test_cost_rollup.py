@@ -0,0 +1,119 @@
+"""
+Cost Rollup Service Tests
+
+Tests for:
+- Topological evaluation of nested ÇŞB analyses
+- Incremental recompute on base price changes
+- Cost breakdown tree
+"""
+
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.cost_rollup_service import CostRollupService, parse_tr_number
+
+
+def _build_service():
+    service = CostRollupService(overhead_rate=0.25, nested_use_subtotal=True)
+    service.set_base_prices({
+        '10.100.1062': {'unit_price': '100,00'},   # Düz işçi
+        '10.130.1001': {'unit_price': '1.000,00'},  # Çimento
+        '10.130.2001': {'unit_price': '50,00'},     # Kum
+    })
+    service.load_analyses({
+        # Harç: alt analiz
+        '19.100.0001': {
+            'description': 'Harç',
+            'unit': 'm³',
+            'sub_analyses': [
+                {'code': '10.130.1001', 'quantity': '0,300', 'unit_price': '0,00'},
+                {'code': '10.130.2001', 'quantity': '1,000', 'unit_price': '0,00'},
+                {'code': '10.100.1062', 'quantity': '2,000', 'unit_price': '0,00'},
+            ]
+        },
+        # Duvar: harç analizini kullanır
+        '15.200.0001': {
+            'description': 'Tuğla duvar',
+            'unit': 'm²',
+            'sub_analyses': [
+                {'code': '19.100.0001', 'quantity': '0,100', 'unit_price': '0,00'},
+                {'code': '10.100.1062', 'quantity': '1,000', 'unit_price': '0,00'},
+            ]
+        },
+        # Bağımsız analiz (LocalPDFService formatı)
+        '15.300.0001': {
+            'name': 'Boya',
+            'unit': 'm²',
+            'components': [
+                {'code': '10.999.9999', 'quantity': '2', 'price': '10,00'},
+            ]
+        },
+    })
+    return service
+
+
+class TestCostRollup:
+
+    def test_parse_tr_number(self):
+        assert parse_tr_number('1.234,56') == 1234.56
+        assert parse_tr_number('0,021') == 0.021
+        assert parse_tr_number('12.5') == 12.5
+        assert parse_tr_number('') == 0.0
+
+    def test_nested_analysis_uses_subtotal(self):
+        service = _build_service()
+        service.recompute_all()
+
+        # Harç: 0.3*1000 + 1*50 + 2*100 = 550 → 687.5
+        assert service.get_unit_price('19.100.0001') == 687.5
+        # Duvar: 0.1*550 (kârsız) + 100 = 155 → 193.75
+        assert service.get_unit_price('15.200.0001') == 193.75
+        # Rayiç yoksa analiz satırındaki fiyat kullanılır: 2*10 = 20 → 25
+        assert service.get_unit_price('15.300.0001') == 25.0
+
+    def test_incremental_update_touches_only_dependents(self):
+        service = _build_service()
+        service.recompute_all()
+
+        changed = service.update_base_prices({'10.130.2001': 150.0})
+
+        assert changed == ['19.100.0001', '15.200.0001']
+        assert service.last_recompute['recomputed'] == 2
+        # Harç: 300 + 150 + 200 = 650
+        assert service.get_unit_price('19.100.0001') == 812.5
+        assert service.get_unit_price('15.300.0001') == 25.0
+
+    def test_unchanged_price_recomputes_nothing(self):
+        service = _build_service()
+        service.recompute_all()
+
+        assert service.update_base_prices({'10.130.2001': '50,00'}) == []
+        assert service.last_recompute['recomputed'] == 0
+
+    def test_cycle_is_reported_not_fatal(self):
+        service = CostRollupService(overhead_rate=0.0)
+        service.load_analyses({
+            'A': {'sub_analyses': [{'code': 'B', 'quantity': '1', 'unit_price': '5'}]},
+            'B': {'sub_analyses': [{'code': 'A', 'quantity': '1', 'unit_price': '7'}]},
+        })
+        stats = service.recompute_all()
+
+        assert stats['cyclic'] == 2
+        assert service.get_unit_price('A') == 5.0
+
+    def test_breakdown_tree(self):
+        service = _build_service()
+        tree = service.get_breakdown('15.200.0001')
+
+        assert tree['unit_price'] == 193.75
+        nested = tree['components'][0]
+        assert nested['is_composite'] is True
+        assert nested['total'] == 55.0
+        assert nested['breakdown']['poz_no'] == '19.100.0001'
+        assert len(nested['breakdown']['components']) == 3
+
+        shallow = service.get_breakdown('15.200.0001', max_depth=1)
+        assert 'breakdown' not in shallow['components'][0]
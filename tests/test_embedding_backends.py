@@ -0,0 +1,82 @@
+"""
+Embedding Backend Tests
+
+load_embedding_model'in bilinmeyen backend'i torch'a çevirdiğini, torch dışı bir
+backend yüklenemediğinde torch fp32'ye düştüğünü ve ONNX modelinin ilk yüklemede
+yerel dizine kaydedildiğini sahte bir sentence_transformers modülü ile doğrular.
+"""
+
+import sys
+import os
+import types
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services import embedding_backends
+from services.embedding_backends import load_embedding_model
+
+
+class _FakeSentenceTransformer:
+
+    calls = []
+    fail_backends = set()
+
+    def __init__(self, name_or_path, device="cpu", backend="torch", model_kwargs=None):
+        self.calls.append((name_or_path, backend, model_kwargs))
+        if backend in self.fail_backends:
+            raise RuntimeError(f"{backend} kurulu değil")
+        self.name_or_path = name_or_path
+        self.backend = backend
+        self.model_kwargs = model_kwargs
+
+    def save_pretrained(self, path):
+        os.makedirs(path)
+
+
+@pytest.fixture
+def sentence_transformers(monkeypatch):
+    """sentence_transformers yerine kayıt tutan sahte modül"""
+    _FakeSentenceTransformer.calls = []
+    _FakeSentenceTransformer.fail_backends = set()
+    module = types.ModuleType("sentence_transformers")
+    module.SentenceTransformer = _FakeSentenceTransformer
+    monkeypatch.setitem(sys.modules, "sentence_transformers", module)
+    return _FakeSentenceTransformer
+
+
+class TestLoadEmbeddingModel:
+
+    def test_unknown_backend_uses_torch(self, sentence_transformers):
+        model, backend, seconds = load_embedding_model("test/model", "tensorrt")
+        assert backend == "torch" and model.backend == "torch" and seconds >= 0
+        assert sentence_transformers.calls == [("test/model", "torch", None)]
+
+    def test_failing_backend_falls_back_to_torch(self, sentence_transformers, tmp_path):
+        sentence_transformers.fail_backends = {"onnx"}
+        model, backend, _ = load_embedding_model("test/model", "onnx-int8", cache_dir=str(tmp_path))
+        assert backend == "torch" and model.backend == "torch"
+        assert [call[1] for call in sentence_transformers.calls] == ["onnx", "torch"]
+
+    def test_torch_int8_without_torch_falls_back(self, sentence_transformers, monkeypatch):
+        def broken_quantize(model_name):
+            raise ImportError("No module named 'torch'")
+
+        monkeypatch.setattr(embedding_backends, "_load_torch_int8", broken_quantize)
+        assert load_embedding_model("test/model", "torch-int8")[1] == "torch"
+
+    def test_torch_failure_is_raised(self, sentence_transformers):
+        sentence_transformers.fail_backends = {"torch"}
+        with pytest.raises(RuntimeError):
+            load_embedding_model("test/model", "torch")
+
+    def test_onnx_export_is_saved_and_reused(self, sentence_transformers, tmp_path):
+        model, backend, _ = load_embedding_model("org/model", "onnx", cache_dir=str(tmp_path))
+        local_dir = str(tmp_path / "org_model-onnx")
+        assert backend == "onnx" and os.path.isdir(local_dir)
+        assert model.name_or_path == "org/model"
+
+        model, backend, _ = load_embedding_model("org/model", "onnx", cache_dir=str(tmp_path))
+        assert backend == "onnx" and model.name_or_path == local_dir
@@ -0,0 +1,37 @@
+"""
+Query Embedding Cache Tests
+"""
+
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.embedding_cache import EmbeddingCache
+
+
+class TestEmbeddingCache:
+
+    def test_key_normalizes_whitespace_and_keeps_case(self):
+        assert EmbeddingCache.key('m', '  C25/30   hazır beton ') == ('m', 'C25/30 hazır beton')
+        assert EmbeddingCache.key('m', 'Beton') != EmbeddingCache.key('m', 'beton')
+        assert EmbeddingCache.key('a', 'beton') != EmbeddingCache.key('b', 'beton')
+
+    def test_lru_eviction_and_hit_rate(self):
+        cache = EmbeddingCache(max_size=2)
+        cache.put('a', [1.0])
+        cache.put('b', [2.0])
+        assert cache.get('a') == [1.0]      # a en son kullanılan
+        cache.put('c', [3.0])               # b düşer
+        assert cache.get('b') is None
+        assert cache.get('c') == [3.0]
+
+        stats = cache.stats()
+        assert stats['size'] == 2 and stats['hits'] == 2 and stats['misses'] == 1
+        assert stats['hit_rate'] == round(2 / 3, 4)
+
+    def test_disabled_cache(self):
+        cache = EmbeddingCache(max_size=0)
+        cache.put('a', [1.0])
+        assert cache.get('a') is None and len(cache) == 0
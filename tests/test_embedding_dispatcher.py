@@ -0,0 +1,115 @@
+"""
+Embedding Dispatcher (micro-batching) Tests
+"""
+
+import sys
+import os
+import threading
+import time
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.embedding_dispatcher import EmbeddingDispatcher
+
+
+def _vector(text):
+    return [float(len(text)), float(sum(map(ord, text)) % 97)]
+
+
+class _SlowEncoder:
+    """Çağrı başına sabit maliyetli sahte encoder (forward pass overhead'i)"""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.calls = []
+        self.thread_names = set()
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        self.thread_names.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        return [_vector(text) for text in texts]
+
+
+class TestEmbeddingDispatcher:
+
+    def test_concurrent_requests_are_coalesced(self):
+        encoder = _SlowEncoder()
+        dispatcher = EmbeddingDispatcher(encoder, max_batch_size=64, max_wait_ms=20)
+        texts = [f"sorgu {i}" for i in range(32)]
+        results = {}
+
+        def worker(text):
+            results[text] = dispatcher.encode([text, "ortak"])
+
+        threads = [threading.Thread(target=worker, args=(t,)) for t in texts]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        dispatcher.shutdown()
+
+        for text in texts:
+            assert results[text] == [_vector(text), _vector("ortak")]
+        assert len(encoder.calls) < len(texts)
+        # Aynı batch'teki tekrar eden metin bir kez encode edilir
+        assert all(batch.count("ortak") == 1 for batch in encoder.calls)
+        assert encoder.thread_names == {"embedding-dispatcher"}
+
+    def test_batch_size_limit(self):
+        encoder = _SlowEncoder(delay=0)
+        dispatcher = EmbeddingDispatcher(encoder, max_batch_size=4, max_wait_ms=50)
+        futures = [dispatcher.submit([f"t{i}"]) for i in range(10)]
+        assert [f.result(timeout=5)[0] for f in futures] == [_vector(f"t{i}") for i in range(10)]
+        dispatcher.shutdown()
+        assert all(len(batch) <= 4 for batch in encoder.calls)
+
+    def test_errors_propagate_to_callers(self):
+        def failing(texts):
+            raise RuntimeError("model yok")
+
+        dispatcher = EmbeddingDispatcher(failing, max_wait_ms=1)
+        with pytest.raises(RuntimeError, match="model yok"):
+            dispatcher.encode(["beton"], timeout=5)
+        dispatcher.shutdown()
+        with pytest.raises(RuntimeError):
+            dispatcher.submit(["beton"])
+
+    def test_short_encoder_output_fails_callers_and_keeps_thread(self):
+        calls = []
+
+        def short(texts):
+            calls.append(list(texts))
+            if len(calls) == 1:
+                return [_vector(texts[0])]   # İki metin için tek vektör
+            return [_vector(text) for text in texts]
+
+        dispatcher = EmbeddingDispatcher(short, max_wait_ms=50)
+        futures = [dispatcher.submit(["beton"]), dispatcher.submit(["boya"])]
+        for future in futures:
+            with pytest.raises(ValueError, match="2 metin için 1 vektör"):
+                future.result(timeout=5)
+
+        assert dispatcher.encode(["tuğla"], timeout=5) == [_vector("tuğla")]
+        assert dispatcher._thread.is_alive()
+        dispatcher.shutdown()
+
+    def test_unexpected_error_does_not_kill_thread(self, monkeypatch):
+        dispatcher = EmbeddingDispatcher(_SlowEncoder(delay=0), max_wait_ms=1)
+        original = dispatcher._run_batch
+        failures = []
+
+        def flaky(batch):
+            if not failures:
+                failures.append(1)
+                raise KeyError("beklenmeyen")
+            return original(batch)
+
+        monkeypatch.setattr(dispatcher, "_run_batch", flaky)
+        with pytest.raises(KeyError):
+            dispatcher.encode(["beton"], timeout=5)
+        assert dispatcher.encode(["beton"], timeout=5) == [_vector("beton")]
+        dispatcher.shutdown()
@@ -0,0 +1,172 @@
+"""
+Embedding Sidecar Tests
+
+Unix socket üzerinden encode protokolünü, eşzamanlı worker isteklerinin tek
+dispatcher'da batch'lenmesini, hata iletimini ve VectorDBService'in model
+yüklemek yerine sidecar'a bağlanmasını doğrular (gerçek model gerekmez).
+"""
+
+import sys
+import os
+import hashlib
+import socket
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix socket desteklenmiyor")
+
+from services.embedding_sidecar import EmbeddingSidecarServer, SidecarEmbeddingClient, connect_sidecar
+
+MODEL_NAME = "test-model"
+
+
+class _HashEncoder:
+
+    class device:
+        type = 'cpu'
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        if any(t == "boom" for t in texts):
+            raise ValueError("encode patladı")
+        return np.vstack([
+            np.frombuffer(hashlib.sha256(t.encode('utf-8')).digest(), dtype=np.uint8)[:16].astype(np.float32)
+            for t in texts
+        ])
+
+
+@pytest.fixture
+def sidecar():
+    # tmp_path Unix socket yol limitini (108 byte) aşabilir
+    directory = tempfile.mkdtemp(prefix="sidecar")
+    encoder = _HashEncoder()
+    server = EmbeddingSidecarServer(os.path.join(directory, "e.sock"), lambda: (encoder, "torch", 0.0),
+                                    MODEL_NAME, max_batch_size=64, max_wait_ms=20)
+    assert server.acquire()
+    server.bind()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, encoder
+    server.shutdown()
+    thread.join(timeout=5)
+
+
+class TestEmbeddingSidecar:
+
+    def test_encode_round_trip(self, sidecar):
+        server, encoder = sidecar
+        client = connect_sidecar(server.socket_path, MODEL_NAME, autostart=False, start_timeout=5)
+        vectors = client.encode(["beton", "boya"])
+        assert vectors.shape == (2, 16) and vectors.dtype == np.float32
+        assert np.array_equal(vectors, _HashEncoder().encode(["beton", "boya"]))
+        assert client.encode([]).shape == (0, 0)
+        assert str(client.device) == "sidecar:cpu"
+        client.close()
+
+    def test_second_owner_is_rejected(self, sidecar):
+        server, _ = sidecar
+        other = EmbeddingSidecarServer(server.socket_path, lambda: (None, "torch", 0.0), MODEL_NAME)
+        assert not other.acquire()
+
+    def test_concurrent_clients_share_batches(self, sidecar):
+        server, encoder = sidecar
+        clients = [SidecarEmbeddingClient(server.socket_path, timeout=5) for _ in range(4)]
+        texts = [f"poz {i}" for i in range(32)]
+
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            results = list(pool.map(lambda i: clients[i % 4].encode([texts[i]])[0], range(32)))
+
+        assert all(np.array_equal(result, _HashEncoder().encode([t])[0]) for result, t in zip(results, texts))
+        stats = server.info()["dispatcher"]
+        assert stats["requests"] == 32 and stats["batches"] < 32
+        assert len(encoder.calls) == stats["batches"]
+
+    def test_errors_are_forwarded_and_connection_survives(self, sidecar):
+        server, _ = sidecar
+        client = SidecarEmbeddingClient(server.socket_path, timeout=5)
+        with pytest.raises(RuntimeError, match="encode patladı"):
+            client.encode(["boom"])
+        assert client.encode(["beton"]).shape == (1, 16)
+
+    def test_model_name_mismatch(self, sidecar):
+        server, _ = sidecar
+        with pytest.raises(ValueError):
+            connect_sidecar(server.socket_path, "other-model", autostart=False, start_timeout=5)
+
+    def test_missing_sidecar_times_out(self, tmp_path):
+        with pytest.raises(TimeoutError):
+            connect_sidecar(str(tmp_path / "none.sock"), MODEL_NAME, autostart=False, start_timeout=0.3)
+
+    def test_vector_service_uses_sidecar(self, sidecar, monkeypatch):
+        from config import get_embedding_config
+        from services.vector_db_service import VectorDBService
+
+        server, encoder = sidecar
+        config = get_embedding_config()
+        monkeypatch.setattr(config, "SIDECAR_SOCKET", server.socket_path)
+        monkeypatch.setattr(config, "SIDECAR_AUTOSTART", False)
+
+        service = VectorDBService()
+        monkeypatch.setattr(service, "model_name", MODEL_NAME)
+        monkeypatch.setattr(service, "model", None)
+        monkeypatch.setattr(service, "embedding_source", "sidecar")
+        monkeypatch.setattr(service, "_model_loaded", False)
+        monkeypatch.setattr(service, "_ensure_client_connected", lambda: True)
+        service.query_cache.clear()
+
+        assert service._ensure_model_loaded()
+        assert isinstance(service.model, SidecarEmbeddingClient)
+        assert service.embed_query("hazır beton") == _HashEncoder().encode(["hazır beton"])[0].tolist()
+        assert ["hazır beton"] in encoder.calls
+        service.model.close()
+        service.query_cache.clear()
+
+    def test_vector_service_rejects_sidecar_with_other_backend(self, sidecar, monkeypatch):
+        from config import get_embedding_config
+        from services.vector_db_service import VectorDBService
+
+        server, encoder = sidecar
+        config = get_embedding_config()
+        monkeypatch.setattr(config, "SIDECAR_SOCKET", server.socket_path)
+        monkeypatch.setattr(config, "SIDECAR_AUTOSTART", False)
+
+        service = VectorDBService()
+        monkeypatch.setattr(service, "model_name", MODEL_NAME)
+        monkeypatch.setattr(service, "model", None)
+        monkeypatch.setattr(service, "embedding_backend", "onnx-int8")
+        monkeypatch.setattr(service, "embedding_source", "sidecar")
+
+        # Sidecar torch fp32 sunuyor: koleksiyon onnx-int8 vektörleriyle dolu olabilir
+        assert not service._connect_embedding_sidecar()
+        assert service.model is None and service.embedding_source == "local"
+        assert service.embedding_backend == "onnx-int8"
+
+
+class TestSpawnSidecar:
+
+    def test_exited_sidecar_is_reaped(self, monkeypatch):
+        from services import embedding_sidecar
+
+        popen = embedding_sidecar.subprocess.Popen
+        # Kilit başka sidecar'da olduğu için hemen çıkan süreci taklit eder
+        monkeypatch.setattr(embedding_sidecar.subprocess, "Popen",
+                            lambda args, **kwargs: popen([sys.executable, "-c", "pass"], **kwargs))
+        process = embedding_sidecar.spawn_sidecar("/tmp/kullanilmayan.sock")
+
+        deadline = time.monotonic() + 10
+        while process.returncode is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert process.returncode == 0
+        with pytest.raises(ChildProcessError):
+            os.waitpid(process.pid, os.WNOHANG)
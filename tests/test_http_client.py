@@ -0,0 +1,195 @@
+"""
+Pooled HTTP Client Tests
+
+Paylaşılan requests.Session ve httpx.AsyncClient'ın bağlantıları yeniden
+kullandığını, host başına havuz limitini ve bağlantı kurulum istatistiklerini
+yerel bir keep-alive HTTP sunucusu ile doğrular.
+"""
+
+import sys
+import os
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services import http_client
+from services.http_client import create_http_session, get_async_http_client, get_http_stats
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/slow":
+            time.sleep(0.05)
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    http_client._STATS.reset()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestPooledSession:
+
+    def test_sequential_requests_reuse_one_connection(self, server):
+        session = create_http_session()
+        for _ in range(5):
+            assert session.get(f"{server}/", timeout=5).json() == {"ok": True}
+        stats = get_http_stats()["hosts"]["127.0.0.1"]
+        assert stats["requests"] == 5 and stats["connections"] == 1
+        assert stats["reuse_ratio"] == 0.8 and stats["connect_ms_max"] >= 0
+        session.close()
+
+    def test_parallel_requests_bounded_per_host(self, server, monkeypatch):
+        monkeypatch.setattr(http_client.get_http_config(), "POOL_PER_HOST", 3)
+        session = create_http_session()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: session.get(f"{server}/slow", timeout=5), range(24)))
+        stats = get_http_stats()["hosts"]["127.0.0.1"]
+        assert stats["requests"] == 24
+        # pool_block: host başına en fazla POOL_PER_HOST bağlantı açılır, fazlası boş bağlantı bekler
+        assert stats["connections"] <= 3
+        session.close()
+
+
+class TestAsyncClient:
+
+    def test_async_client_is_shared_and_traced(self, server):
+        async def run():
+            client = get_async_http_client()
+            assert get_async_http_client() is client
+            for _ in range(3):
+                response = await client.get(f"{server}/", timeout=5)
+                assert response.json() == {"ok": True}
+            await http_client.close_http_clients()
+
+        asyncio.run(run())
+        stats = get_http_stats()["hosts"]["127.0.0.1"]
+        assert stats["requests"] == 3 and stats["connections"] == 1
+
+    def test_run_async_closes_its_client(self, server):
+        async def run():
+            client = get_async_http_client()
+            response = await client.get(f"{server}/", timeout=5)
+            assert response.json() == {"ok": True}
+            return client
+
+        first = http_client.run_async(run())
+        assert first.is_closed
+        second = http_client.run_async(run())
+        assert second is not first and second.is_closed
+
+    def test_concurrent_loops_keep_their_own_client(self, server):
+        barrier = threading.Barrier(2, timeout=5)
+        clients = {}
+
+        async def run(name):
+            client = get_async_http_client()
+            barrier.wait()   # Diğer loop da client'ını aldı
+            response = await client.get(f"{server}/", timeout=5)
+            assert response.json() == {"ok": True}
+            clients[name] = (client, get_async_http_client() is client and not client.is_closed)
+            await http_client.close_async_http_client()
+
+        threads = [threading.Thread(target=asyncio.run, args=(run(name),)) for name in ("a", "b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+            assert not thread.is_alive()
+
+        assert clients["a"][0] is not clients["b"][0]
+        assert clients["a"][1] and clients["b"][1]
+        assert all(client.is_closed for client, _ in clients.values())
+
+
+class _ConcurrencyTransport(httpx.AsyncBaseTransport):
+    """Aynı anda işlenen istek sayısını kaydeden sahte transport"""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+
+    async def handle_async_request(self, request):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        transport = self
+
+        class _Body(httpx.AsyncByteStream):
+            async def __aiter__(self):
+                yield b'{"ok": true}'
+
+            async def aclose(self):
+                transport.active -= 1
+
+        return httpx.Response(200, stream=_Body())
+
+
+class TestPerHostLimit:
+
+    def test_async_requests_are_limited_per_host(self):
+        inner = _ConcurrencyTransport()
+
+        async def run():
+            async with httpx.AsyncClient(transport=http_client.PerHostLimitTransport(inner, 3)) as client:
+                responses = await asyncio.gather(*[
+                    client.get(f"http://{host}/") for host in ["a.test"] * 10 + ["b.test"] * 10
+                ])
+                assert all(response.json() == {"ok": True} for response in responses)
+
+        asyncio.run(run())
+        # İki host × 3
+        assert inner.max_active == 6 and inner.active == 0
+
+    def test_streaming_response_holds_slot_until_closed(self):
+        inner = _ConcurrencyTransport()
+
+        async def run():
+            async with httpx.AsyncClient(transport=http_client.PerHostLimitTransport(inner, 1)) as client:
+                async with client.stream("GET", "http://a.test/") as response:
+                    second = asyncio.ensure_future(client.get("http://a.test/"))
+                    await asyncio.sleep(0.05)
+                    assert not second.done()   # İlk yanıt akışı kapanmadan slot boşalmaz
+                    await response.aread()
+                assert (await second).json() == {"ok": True}
+
+        asyncio.run(run())
+        assert inner.max_active == 1
+
+    def test_failed_request_releases_slot(self):
+        class _Failing(httpx.AsyncBaseTransport):
+            async def handle_async_request(self, request):
+                raise httpx.ConnectError("bağlanamadı")
+
+        async def run():
+            async with httpx.AsyncClient(transport=http_client.PerHostLimitTransport(_Failing(), 1)) as client:
+                for _ in range(3):
+                    with pytest.raises(httpx.ConnectError):
+                        await asyncio.wait_for(client.get("http://a.test/"), 2)
+
+        asyncio.run(run())
@@ -0,0 +1,141 @@
+"""
+Hybrid Retriever Tests
+
+RRF birleştirmesini, alt aramaların ortak gecikme bütçesini ve zaman aşımına
+uğrayan aramaların havuzu doldurmadığını doğrular.
+"""
+
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.hybrid_retriever import HybridRetriever, get_retriever_stats, reciprocal_rank_fusion
+from services.lexical_index import BM25Index
+
+
+class TestReciprocalRankFusion:
+
+    def test_items_in_both_rankings_win(self):
+        fused = reciprocal_rank_fusion({
+            "bm25": ["c25", "c30", "c20"],
+            "vector": ["c20", "c25", "boya"],
+        }, k=60)
+        codes = [code for code, _ in fused]
+        assert codes[:2] == ["c25", "c20"]
+        assert set(codes) == {"c25", "c30", "c20", "boya"}
+        assert fused[0][1] == 1 / 61 + 1 / 62
+
+    def test_duplicates_and_weights(self):
+        fused = dict(reciprocal_rank_fusion({"a": ["x", "x", "y"], "b": ["y"]}, k=1, weights={"b": 2.0}))
+        assert fused == {"x": 1 / 2, "y": 1 / 3 + 2 / 2}
+
+
+class TestHybridRetriever:
+
+    def test_runs_sources_concurrently(self):
+        barrier = threading.Barrier(2, timeout=2)
+
+        def source(codes):
+            def run(query):
+                barrier.wait()   # İki kaynak aynı anda çalışmıyorsa zaman aşımına düşer
+                return codes
+            return run
+
+        result = HybridRetriever({"bm25": source(["a", "b"]), "vector": source(["b", "c"])},
+                                 budget_ms=3000).search("q")
+        assert [code for code, _ in result["results"]][0] == "b"
+        assert {s["status"] for s in result["sources"].values()} == {"ok"}
+
+    def test_slow_and_failing_sources_are_skipped_within_budget(self):
+        release = threading.Event()
+        finished = threading.Event()
+
+        def slow(query):
+            release.wait(5)
+            finished.set()
+            return ["late"]
+
+        def broken(query):
+            raise RuntimeError("index yok")
+
+        start = time.perf_counter()
+        result = HybridRetriever({"bm25": lambda q: ["a"], "slow_vector": slow, "other": broken},
+                                 budget_ms=100).search("q")
+        elapsed = time.perf_counter() - start
+        release.set()
+        assert finished.wait(2)
+
+        assert elapsed < 1.0
+        assert result["results"] == [("a", 1 / 61)]
+        assert result["sources"]["slow_vector"]["status"] == "timeout"
+        assert result["sources"]["other"]["status"] == "error"
+
+    def test_bm25_keeps_exact_technical_tokens_with_vector_source(self):
+        poz_data = {
+            '15.150.1004': {'description': 'Santralde üretilen C25/30 hazır beton dökülmesi'},
+            '15.150.1003': {'description': 'Santralde üretilen C 20/25 hazır beton dökülmesi'},
+            '15.160.1003': {'description': 'Ø 8- Ø 12 mm nervürlü beton çelik çubuğu (S420)'},
+        }
+        index = BM25Index.from_poz_data(poz_data)
+        # Embedding teknik token'ı ayırt edemeyip yanlış pozu öne koysa da BM25 sırası dengeler
+        result = HybridRetriever({
+            "bm25": lambda q: [code for code, _ in index.search(q)],
+            "vector": lambda q: ['15.150.1003', '15.150.1004', '15.160.1003'],
+        }).search("C25/30 hazır beton", limit=2)
+        assert [code for code, _ in result["results"]] == ['15.150.1004', '15.150.1003']
+
+    def test_bm25_runs_inline_when_pool_is_saturated(self):
+        pool = ThreadPoolExecutor(max_workers=1)
+        release = threading.Event()
+        pool.submit(release.wait, 5)   # Havuzu tamamen meşgul et
+        callers = []
+
+        def bm25(query):
+            callers.append(threading.current_thread())
+            return ["a", "b"]
+
+        result = HybridRetriever({"bm25": bm25, "saturated_vector": lambda q: ["c"]},
+                                 budget_ms=100, executor=pool).search("q")
+        release.set()
+        pool.shutdown(wait=True)
+
+        assert callers == [threading.current_thread()]
+        assert [code for code, _ in result["results"]] == ["a", "b"]
+        assert result["sources"]["saturated_vector"]["status"] == "timeout"
+
+    def test_abandoned_calls_per_source_are_bounded(self):
+        pool = ThreadPoolExecutor(max_workers=4)
+        release = threading.Event()
+        calls = []
+
+        def slow(query):
+            calls.append(query)
+            release.wait(5)
+            return ["late"]
+
+        retriever = HybridRetriever({"bm25": lambda q: ["a"], "stuck_vector": slow}, budget_ms=50,
+                                    executor=pool, max_abandoned=2)
+        skips_before = get_retriever_stats()["busy_skips"].get("stuck_vector", 0)
+        # Tek yavaş çağrı kaynağı kilitlemez: sınır dolana kadar yeni istekler denenir
+        assert retriever.search("1")["sources"]["stuck_vector"]["status"] == "timeout"
+        assert retriever.search("2")["sources"]["stuck_vector"]["status"] == "timeout"
+        third = retriever.search("3")
+        assert third["sources"]["stuck_vector"]["status"] == "busy"
+        assert third["results"] == [("a", 1 / 61)] and calls == ["1", "2"]
+
+        stats = get_retriever_stats()
+        assert stats["abandoned_running"]["stuck_vector"] == 2
+        assert stats["busy_skips"]["stuck_vector"] == skips_before + 1
+
+        release.set()
+        pool.shutdown(wait=True)
+        pool = ThreadPoolExecutor(max_workers=1)
+        retriever.executor = pool
+        assert retriever.search("4")["sources"]["stuck_vector"]["status"] == "ok"
+        assert calls == ["1", "2", "4"]
+        pool.shutdown(wait=True)
@@ -0,0 +1,86 @@
+"""
+Import Time Tests
+
+Uygulama açılışında ağır kütüphanelerin (chromadb, sentence_transformers/torch,
+fitz, pandas, bs4) yüklenmediğini ve `python -X importtime` ile ölçülen import
+süresinin bütçe içinde kaldığını doğrular. Her ölçüm temiz bir alt süreçte yapılır.
+"""
+
+import sys
+import os
+import json
+import subprocess
+import tempfile
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+ROOT_DIR = os.path.dirname(BACKEND_DIR)
+
+HEAVY_MODULES = ("chromadb", "sentence_transformers", "torch", "fitz", "pandas", "bs4")
+
+# Modül import bütçesi (ms); yavaş CI makineleri için ortam değişkeniyle genişletilebilir
+IMPORT_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "1000"))
+
+_PROBE = """
+import json, sys, time
+sys.path.insert(0, {backend!r})
+sys.path.append({root!r})
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"elapsed_ms": elapsed, "loaded": sorted(m for m in {heavy!r} if m in sys.modules)}}))
+"""
+
+
+def _import_probe(module):
+    """Modülü -X importtime ile temiz bir süreçte import et; (sonuç, importtime satırları)"""
+    code = _PROBE.format(backend=BACKEND_DIR, root=ROOT_DIR, module=module, heavy=HEAVY_MODULES)
+    with tempfile.TemporaryDirectory() as cwd:
+        # cwd geçici: göreli yollu veritabanı/log dosyaları repoya yazılmasın
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                              capture_output=True, text=True, cwd=cwd, timeout=120)
+    if proc.returncode != 0:
+        last = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else str(proc.returncode)
+        if "ModuleNotFoundError" in proc.stderr or "is not installed" in proc.stderr or "to be installed" in proc.stderr:
+            pytest.skip(f"{module} import edilemedi (eksik bağımlılık): {last}")
+        raise AssertionError(f"{module} import hatası: {last}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    return result, [line for line in proc.stderr.splitlines() if line.startswith("import time:")]
+
+
+def _cumulative_ms(lines, module):
+    """importtime çıktısından modülün kümülatif süresi (ms)"""
+    for line in lines:
+        _, cumulative_us, name = line.split("|")
+        if name.strip() == module:
+            return int(cumulative_us) / 1000
+    raise AssertionError(f"{module} importtime çıktısında yok")
+
+
+@pytest.mark.parametrize("module", ["routers.ai", "main"])
+def test_startup_imports_skip_heavy_libraries(module):
+    result, lines = _import_probe(module)
+    assert result["loaded"] == [], f"{module} ağır modülleri erken yüklüyor: {result['loaded']}"
+    cumulative = _cumulative_ms(lines, module)
+    assert cumulative < IMPORT_BUDGET_MS, f"{module} import süresi {cumulative:.0f} ms > {IMPORT_BUDGET_MS:.0f} ms"
+
+
+def test_database_manager_defers_schema_until_first_use(tmp_path):
+    if ROOT_DIR not in sys.path:
+        sys.path.append(ROOT_DIR)
+    from database import DatabaseManager
+
+    db_path = tmp_path / "data.db"
+    db = DatabaseManager(str(db_path))
+    assert not db_path.exists()
+
+    db.get_connection().close()
+    assert db_path.exists()
+    conn = db.get_connection()
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    conn.close()
+    assert "projects" in tables
@@ -0,0 +1,99 @@
+"""
+Ingestion Pipeline Tests
+
+Encode ve upsert aşamalarının üst üste bindiğini, batch boyutunun encode hızına
+göre ayarlandığını ve ilerlemenin doğru raporlandığını doğrular.
+"""
+
+import sys
+import os
+import threading
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.ingest_pipeline import AdaptiveBatchSizer, IngestProgress, run_pipelined
+
+
+def _rows(n):
+    return [(f"id{i}", f"doc {i}", {"i": i}) for i in range(n)]
+
+
+def _encode(documents):
+    return [[float(len(doc))] for doc in documents]
+
+
+class TestRunPipelined:
+
+    def test_encoding_overlaps_upsert(self):
+        second_encode_started = threading.Event()
+        encode_calls = []
+
+        def encode(documents):
+            encode_calls.append(len(documents))
+            if len(encode_calls) == 2:
+                second_encode_started.set()
+            return _encode(documents)
+
+        upserted = []
+
+        def upsert(batch, embeddings):
+            # İlk upsert, ikinci batch'in encode'u başlamadan bitemez → aşamalar eşzamanlı
+            if not upserted:
+                assert second_encode_started.wait(timeout=5)
+            upserted.extend(doc_id for doc_id, _, _ in batch)
+
+        progress = IngestProgress()
+        progress.start("poz", 10)
+        count = run_pipelined(_rows(10), encode, upsert, AdaptiveBatchSizer(4, adaptive=False), progress)
+        progress.finish()
+
+        assert count == 10
+        assert upserted == [f"id{i}" for i in range(10)]
+        assert encode_calls == [4, 4, 2]
+        snapshot = progress.snapshot()
+        assert snapshot["done"] == 10 and snapshot["total"] == 10 and not snapshot["running"]
+        assert snapshot["eta_seconds"] is None
+
+    def test_failed_batches_are_counted_and_skipped(self):
+        def upsert(batch, embeddings):
+            if batch[0][0] == "id2":
+                raise RuntimeError("disk dolu")
+
+        def encode(documents):
+            if "doc 4" in documents:
+                raise RuntimeError("OOM")
+            return _encode(documents)
+
+        progress = IngestProgress()
+        progress.start("training", 6)
+        count = run_pipelined(_rows(6), encode, upsert, AdaptiveBatchSizer(2, adaptive=False), progress)
+
+        assert count == 2
+        snapshot = progress.snapshot()
+        assert snapshot["done"] == 2 and snapshot["failed"] == 4
+
+
+class TestAdaptiveBatchSizer:
+
+    def test_grows_when_fast_and_shrinks_when_slow(self):
+        sizer = AdaptiveBatchSizer(100, min_size=16, max_size=1024, target_seconds=1.0)
+        sizer.record(100, 0.1)   # 1000 belge/sn → en fazla 2x büyür
+        assert sizer.size == 200
+        sizer.record(200, 0.2)
+        assert sizer.size == 400
+        sizer.record(400, 8.0)   # 50 belge/sn → en fazla yarıya iner
+        assert sizer.size == 200
+        sizer.record(200, 1.0)   # hedefte → sabit
+        assert sizer.size == 200
+
+    def test_bounds_and_partial_batches(self):
+        sizer = AdaptiveBatchSizer(600, min_size=16, max_size=1000)
+        sizer.record(600, 0.01)
+        assert sizer.size == 1000
+        sizer.record(10, 100.0)  # son (eksik) batch ölçülmez
+        assert sizer.size == 1000
+
+        slow = AdaptiveBatchSizer(20, min_size=16)
+        slow.record(20, 100.0)
+        assert slow.size == 16
@@ -0,0 +1,82 @@
+"""
+KeywordMatcher (Aho-Corasick) Tests
+
+Otomatın `kw in text` döngüleri ve regex kelime sınırı kontrolleri ile
+aynı sonucu verdiğini doğrular.
+"""
+
+import sys
+import os
+import re
+import random
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from utils.keyword_matcher import KeywordMatcher
+from services import description_parser, density_service
+
+
+TEXTS = [
+    "santralde üretilen c 25/30 hazır beton pompa ile dökülmesi",
+    "betonarme perde nervürlü s420 donatı çeliği",
+    "elle beton harcı, torbadan çimento karışımı",
+    "yatay delikli tuğla duvar örülmesi ve sıva",
+    "kum ve çakıl nak. dahil, yerine konulması",
+    "hazır beton nakliye ve döküm dahil",
+    "hdpe boru döşenmesi (nakliye dahil)",
+    "abcabcab aaaa ab",
+    "",
+]
+
+
+def _random_texts(vocab, count=200, seed=11):
+    rng = random.Random(seed)
+    alphabet = list("abcçdeğıiklmnoöprsştuüvyz .,-/()0123456789")
+    texts = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(0, 8)):
+            if rng.random() < 0.6:
+                parts.append(rng.choice(vocab))
+            else:
+                parts.append("".join(rng.choice(alphabet) for _ in range(rng.randint(1, 6))))
+        texts.append(rng.choice([" ", "", ".", ","]).join(parts))
+    return texts
+
+
+class TestKeywordMatcher:
+
+    def test_find_keywords_equals_substring_loop(self):
+        keywords = ['he', 'she', 'his', 'hers', 'c25', 'c25/30', 'beton', 'betonarme', 'a', 'aa']
+        matcher = KeywordMatcher(keywords)
+        for text in TEXTS + _random_texts(keywords) + ["ushers", "hishe"]:
+            assert matcher.find_keywords(text) == {kw for kw in keywords if kw in text}, text
+
+    def test_find_values_with_shared_keywords(self):
+        matcher = KeywordMatcher({'nervürlü': ('betonarme', 'demir'), 'donatı': ('betonarme',)})
+        assert matcher.find_values("nervürlü donatı") == {('betonarme', 'demir'), ('betonarme',)}
+
+    def test_word_boundary_equals_regex(self):
+        keywords = list(description_parser.KEYWORD_MAPPING.keys())
+        matcher = KeywordMatcher(keywords)
+        for text in TEXTS + _random_texts(keywords):
+            expected = {kw for kw in keywords if re.search(r'\b' + re.escape(kw) + r'\.?\b', text)}
+            assert matcher.find_word_keywords(text, allow_trailing_dot=True) == expected, text
+
+            strict = {kw for kw in keywords if re.search(r'\b' + re.escape(kw) + r'\b', text)}
+            assert matcher.find_word_keywords(text) == strict, text
+
+    def test_longest_match_prefers_first_on_tie(self):
+        mapping = density_service.KEYWORD_MAPPING
+        for text in TEXTS + _random_texts(list(mapping.keys())):
+            best, max_len = None, 0
+            for kw in mapping:
+                if kw in text and len(kw) > max_len:
+                    best, max_len = kw, len(kw)
+            assert density_service.KEYWORD_MATCHER.longest_match(text) == best, text
+
+    def test_included_services(self):
+        assert description_parser.extract_included_services("Kum, nak. dahil") == {"nakliye"}
+        assert description_parser.extract_included_services("beton döküm ve nakliye dahil") == {"nakliye", "döşeme"}
+        assert description_parser.extract_included_services("sadece malzeme") == set()
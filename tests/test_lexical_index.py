@@ -0,0 +1,44 @@
+"""
+BM25 Lexical Index Tests
+"""
+
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.lexical_index import BM25Index, tokenize
+
+
+POZ_DATA = {
+    '15.150.1003': {'description': 'Santralde üretilen C 20/25 hazır beton dökülmesi'},
+    '15.150.1004': {'description': 'Santralde üretilen C25/30 hazır beton dökülmesi'},
+    '15.160.1003': {'description': 'Ø 8- Ø 12 mm nervürlü beton çelik çubuğu (S420)'},
+    '15.220.1011': {'description': 'Yatay delikli tuğla ile duvar yapılması'},
+    '15.540.1101': {'description': 'Plastik boya yapılması'},
+}
+
+
+class TestBM25Index:
+
+    def test_tokenize_keeps_technical_tokens(self):
+        terms = tokenize("C25/30 beton, Ø16 S420 dökülmesi")
+        assert 'c25/30' in terms and 'c25' in terms and '30' in terms
+        assert 's420' in terms and 'ø16' in terms
+        assert 'dökül' in terms
+
+    def test_search_ranks_exact_technical_token_first(self):
+        index = BM25Index.from_poz_data(POZ_DATA)
+        hits = index.search("c25/30 hazır beton", limit=3)
+        assert hits[0][0] == '15.150.1004'
+        assert len(hits) <= 3
+
+    def test_search_is_bounded_and_skips_unrelated(self):
+        index = BM25Index.from_poz_data(POZ_DATA)
+        assert [code for code, _ in index.search("tuğla duvar örülmesi", limit=1)] == ['15.220.1011']
+        assert index.search("asansör montajı") == []
+
+    def test_poz_code_query(self):
+        index = BM25Index.from_poz_data(POZ_DATA)
+        assert index.search("15.540.1101")[0][0] == '15.540.1101'
@@ -0,0 +1,200 @@
+"""
+LLM Response Cache Tests
+
+Kalıcı SQLite cache'in anahtar, TTL, boyut sınırı (LRU silme) ve görev bazlı
+istatistiklerini; `_submit_api_request` (senkron ve async) çağrılarının aynı
+istek için ağa ikinci kez gitmediğini sahte bir OpenRouter ile doğrular.
+"""
+
+import sys
+import os
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services import ai_service, http_client
+from services.ai_service import AIAnalysisService, AsyncAIAnalysisService
+from services.llm_cache import LLMResponseCache
+
+ANALYSIS = {"components": [{"type": "Malzeme", "name": "Hazır beton C25/30", "unit": "m³", "quantity": 1.0}]}
+MODEL = "openai/gpt-4o-mini"
+
+
+def _key(text: str, temperature: float = 0.1) -> str:
+    return LLMResponseCache.make_key(MODEL, [{"role": "user", "content": text}], temperature, 4096,
+                                     {"type": "json_object"})
+
+
+class TestLLMResponseCache:
+
+    def test_round_trip_and_persistence(self, tmp_path):
+        path = str(tmp_path / "llm.db")
+        cache = LLMResponseCache(path)
+        assert cache.get(_key("beton"), "analyze") is None
+        cache.put(_key("beton"), "yanıt", "analyze", MODEL)
+        assert cache.get(_key("beton"), "analyze") == "yanıt"
+        cache.close()
+
+        reopened = LLMResponseCache(path)
+        assert reopened.get(_key("beton"), "analyze") == "yanıt"
+        reopened.close()
+
+    def test_key_covers_request_parameters(self):
+        assert _key("beton") == _key("beton")
+        assert _key("beton") != _key("beton", temperature=0.2)
+        assert _key("beton") != LLMResponseCache.make_key(MODEL, [{"role": "user", "content": "beton"}], 0.1, 4096)
+        assert _key("beton") != LLMResponseCache.make_key("google/gemini-2.0-flash-001",
+                                                          [{"role": "user", "content": "beton"}], 0.1, 4096,
+                                                          {"type": "json_object"})
+
+    def test_ttl_expiry(self, tmp_path):
+        cache = LLMResponseCache(str(tmp_path / "llm.db"), ttl_seconds=0.05)
+        cache.put(_key("beton"), "yanıt", "analyze")
+        time.sleep(0.1)
+        assert cache.get(_key("beton"), "analyze") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = LLMResponseCache(str(tmp_path / "llm.db"), max_entries=3)
+        for text in ("a", "b", "c"):
+            cache.put(_key(text), text, "analyze")
+            time.sleep(0.01)
+        assert cache.get(_key("a"), "analyze") == "a"
+        cache.put(_key("d"), "d", "analyze")
+
+        assert cache.stats()["entries"] == 3
+        assert cache.get(_key("b"), "analyze") is None
+        assert [cache.get(_key(t), "analyze") for t in ("a", "c", "d")] == ["a", "c", "d"]
+
+    def test_stats_per_task(self, tmp_path):
+        cache = LLMResponseCache(str(tmp_path / "llm.db"))
+        cache.put(_key("beton"), "yanıt", "critic")
+        cache.get(_key("beton"), "critic")
+        cache.get(_key("boya"), "critic")
+        cache.get(_key("boya"), "refine")
+
+        stats = cache.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 2 and stats["hit_rate"] == 0.333
+        assert stats["tasks"]["critic"] == {"hits": 1, "misses": 1, "stores": 1}
+        assert cache.clear() == 1 and cache.stats()["entries"] == 0
+
+
+class _FakeResponse:
+
+    def __init__(self, content: str):
+        self.status_code = 200
+        self._body = {"choices": [{"message": {"content": content}}]}
+        self.text = json.dumps(self._body)
+
+    def json(self):
+        return self._body
+
+
+class _FakeSession:
+
+    def __init__(self, content: str):
+        self.content = content
+        self.calls = []
+
+    def post(self, url, headers=None, json=None, timeout=None):
+        self.calls.append(json)
+        return _FakeResponse(self.content)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """ai_service'in kullandığı cache'i geçici bir dosyaya yönlendir (sadece analyze açık)"""
+    cache = LLMResponseCache(str(tmp_path / "llm.db"))
+    monkeypatch.setattr(ai_service, "get_llm_cache", lambda task=None: cache if task == "analyze" else None)
+    monkeypatch.setattr(ai_service, "API_RETRY_BACKOFF", 0)
+    yield cache
+    cache.close()
+
+
+class TestSubmitApiRequestCache:
+
+    def test_identical_analysis_served_from_cache(self, cache, monkeypatch):
+        session = _FakeSession(json.dumps(ANALYSIS))
+        monkeypatch.setattr(ai_service, "get_http_session", lambda: session)
+        service = AIAnalysisService(openrouter_key="test-key", model=MODEL)
+
+        first = service.generate_analysis("C25/30 beton", "m³")
+        second = service.generate_analysis("C25/30 beton", "m³")
+        assert first == second and len(session.calls) == 1
+        service.generate_analysis("C30/37 beton", "m³")
+        assert len(session.calls) == 2
+        assert cache.stats()["tasks"]["analyze"] == {"hits": 1, "misses": 2, "stores": 2}
+
+    def test_disabled_task_always_hits_network(self, cache, monkeypatch):
+        session = _FakeSession("Netleştirilmiş tanım")
+        monkeypatch.setattr(ai_service, "get_http_session", lambda: session)
+        service = AIAnalysisService(openrouter_key="test-key", model=MODEL)
+
+        for _ in range(2):
+            assert service.refine_construction_request("beton dök") == "Netleştirilmiş tanım"
+        assert len(session.calls) == 2 and cache.stats()["entries"] == 0
+
+    def test_unparseable_json_is_not_cached(self, cache, monkeypatch):
+        session = _FakeSession("üzgünüm, yardımcı olamam")
+        monkeypatch.setattr(ai_service, "get_http_session", lambda: session)
+        service = AIAnalysisService(openrouter_key="test-key", model=MODEL)
+
+        for _ in range(2):
+            with pytest.raises(Exception):
+                service.generate_analysis("beton", "m³")
+        assert len(session.calls) == 2 and cache.stats()["entries"] == 0
+
+    def test_async_path_shares_cache(self, cache, monkeypatch):
+        requests_seen = []
+
+        async def handler(request):
+            requests_seen.append(request)
+            return httpx.Response(200, json={"choices": [{"message": {"content": json.dumps(ANALYSIS)}}]})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(http_client, "get_async_http_client", lambda: client)
+        session = _FakeSession(json.dumps(ANALYSIS))
+        monkeypatch.setattr(ai_service, "get_http_session", lambda: session)
+        service = AsyncAIAnalysisService(openrouter_key="test-key", model=MODEL)
+
+        async def run():
+            return [await service.generate_analysis_async("beton", "m³") for _ in range(3)]
+
+        results = asyncio.run(run())
+        assert len(requests_seen) == 1 and results[0] == results[2]
+        # Senkron yol aynı kaydı kullanır
+        assert service.generate_analysis("beton", "m³") == results[0] and session.calls == []
+
+    def test_async_path_keeps_sqlite_off_the_event_loop(self, cache, monkeypatch):
+        async def handler(request):
+            return httpx.Response(200, json={"choices": [{"message": {"content": json.dumps(ANALYSIS)}}]})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(http_client, "get_async_http_client", lambda: client)
+        threads = []
+        for name in ("get", "put"):
+            original = getattr(cache, name)
+
+            def recorded(*args, _original=original, _name=name):
+                threads.append((_name, threading.current_thread()))
+                return _original(*args)
+
+            monkeypatch.setattr(cache, name, recorded)
+        service = AsyncAIAnalysisService(openrouter_key="test-key", model=MODEL)
+
+        async def run():
+            loop_thread = threading.current_thread()
+            await service.generate_analysis_async("beton", "m³")
+            await service.generate_analysis_async("beton", "m³")
+            return loop_thread
+
+        loop_thread = asyncio.run(run())
+        assert [name for name, _ in threads] == ["get", "put", "get"]
+        assert all(thread is not loop_thread for _, thread in threads)
@@ -0,0 +1,166 @@
+"""
+NumPy Vector Store Tests
+
+Blok blok tam aramanın brute-force ile aynı sonucu verdiğini, where filtrelerini,
+upsert/update/delete ve diskten yeniden açılmayı doğrular; VectorDBService'in
+numpy backend'i ile uçtan uca çalıştığını kontrol eder.
+"""
+
+import sys
+import os
+import hashlib
+
+import numpy as np
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.numpy_vector_store import NumpyCollection, NumpyVectorClient
+
+
+def _random_vectors(n, dim=32, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def _collection(tmp_path, **kwargs):
+    return NumpyCollection(str(tmp_path / "poz"), "poz", flush_delay=0, **kwargs)
+
+
+class TestNumpyCollection:
+
+    def test_blocked_query_matches_brute_force(self, tmp_path):
+        vectors = _random_vectors(500)
+        collection = _collection(tmp_path, block_rows=64)
+        ids = [f"p{i}" for i in range(500)]
+        collection.upsert(ids=ids, embeddings=vectors, documents=ids,
+                          metadatas=[{"unit": "m²" if i % 2 else "m³"} for i in range(500)])
+
+        queries = _random_vectors(3, seed=1)
+        results = collection.query(query_embeddings=queries, n_results=10)
+
+        # Depo float16 tutar: karşılaştırma aynı yuvarlanmış vektörlerle
+        normalized = (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float16).astype(np.float32)
+        for q, query in enumerate(queries):
+            scores = normalized @ (query / np.linalg.norm(query))
+            expected = [ids[i] for i in np.argsort(-scores)[:10]]
+            assert results['ids'][q] == expected
+            assert np.allclose(results['distances'][q], 1 - np.sort(scores)[::-1][:10], atol=1e-2)
+            assert results['distances'][q] == sorted(results['distances'][q])
+
+    def test_where_filters_unit_and_institution(self, tmp_path):
+        collection = _collection(tmp_path, block_rows=8)
+        metadatas = [{"unit": unit, "institution": inst}
+                     for unit in ("m²", "m³", "kg") for inst in ("ÇŞB", "KGM")] * 5
+        ids = [f"p{i}" for i in range(len(metadatas))]
+        collection.upsert(ids=ids, embeddings=_random_vectors(len(ids)), documents=ids, metadatas=metadatas)
+
+        results = collection.query(query_embeddings=_random_vectors(1, seed=2), n_results=50,
+                                   where={"$and": [{"unit": "m²"}, {"institution": {"$in": ["KGM"]}}]})
+        assert len(results['ids'][0]) == 5
+        assert all(m == {"unit": "m²", "institution": "KGM"} for m in results['metadatas'][0])
+
+        assert collection.get(where={"unit": {"$ne": "kg"}}, include=[])['ids'] == \
+            [doc_id for doc_id, m in zip(ids, metadatas) if m["unit"] != "kg"]
+        assert collection.query(query_embeddings=_random_vectors(1), where={"unit": "adet"})['ids'] == [[]]
+
+    def test_upsert_update_delete_and_reopen(self, tmp_path):
+        collection = _collection(tmp_path)
+        vectors = _random_vectors(4)
+        collection.upsert(ids=["a", "b", "c", "d"], embeddings=vectors, documents=["A", "B", "C", "D"],
+                          metadatas=[{"price": "1"}] * 4)
+        collection.upsert(ids=["b"], embeddings=vectors[:1], documents=["B2"], metadatas=[{"price": "2"}])
+        collection.update(ids=["c", "missing"], metadatas=[{"price": "3"}, {"price": "x"}])
+        collection.delete(ids=["d"])
+
+        assert collection.count() == 3
+        page = collection.get(include=["documents", "metadatas", "embeddings"], limit=2, offset=1)
+        assert page['ids'] == ["b", "c"] and page['documents'] == ["B2", "C"]
+        assert page['metadatas'] == [{"price": "2"}, {"price": "3"}]
+        assert collection.query(query_embeddings=vectors[:1], n_results=2)['ids'][0] == ["a", "b"]
+
+        reopened = _collection(tmp_path)
+        assert reopened.count() == 3
+        assert reopened.get(ids=["c", "b", "d"])['ids'] == ["c", "b"]
+        assert np.allclose(reopened.get(ids=["a"], include=["embeddings"])['embeddings'][0],
+                           vectors[0] / np.linalg.norm(vectors[0]), atol=1e-3)
+
+    def test_unsupported_operator(self, tmp_path):
+        collection = _collection(tmp_path)
+        collection.upsert(ids=["a"], embeddings=_random_vectors(1), metadatas=[{"unit": "m"}])
+        with pytest.raises(ValueError):
+            collection.get(where={"unit": {"$regex": "m"}})
+
+
+class _HashEncoder:
+
+    class device:
+        type = 'cpu'
+
+    def encode(self, texts):
+        return np.vstack([
+            np.frombuffer(hashlib.sha256(t.encode('utf-8')).digest(), dtype=np.uint8)[:16].astype(np.float32) + 1.0
+            for t in texts
+        ])
+
+
+class TestVectorDBServiceNumpyBackend:
+
+    def test_ingest_and_search(self, tmp_path):
+        from services.vector_db_service import VectorDBService
+
+        service = VectorDBService()
+        client = NumpyVectorClient(str(tmp_path), flush_delay=0)
+        service.client = client
+        service.collection = client.get_or_create_collection("poz_data_collection")
+        service.feedback_collection = client.get_or_create_collection("user_feedbacks")
+        service.model = _HashEncoder()
+        service._model_loaded = True
+        service.query_cache.clear()
+
+        catalog = [
+            {'poz_no': '15.150.1003', 'description': 'C 20/25 hazır beton', 'unit': 'm³', 'institution': 'ÇŞB', 'unit_price': '2100'},
+            {'poz_no': '15.540.1101', 'description': 'Plastik boya', 'unit': 'm²', 'institution': 'ÇŞB', 'unit_price': '120'},
+            {'poz_no': 'K-1001', 'description': 'Plastik boya (karayolu)', 'unit': 'm²', 'institution': 'KGM', 'unit_price': '130'},
+        ]
+        assert service.ingest_data(catalog)['added'] == 3
+
+        hits = service.search('15.540.1101 Plastik boya', n_results=1)
+        assert hits[0]['code'] == '15.540.1101' and hits[0]['score'] == pytest.approx(0, abs=1e-3)
+        filtered = service.search_many(['Plastik boya'], n_results=5, where={"institution": "KGM"})[0]
+        assert [hit['code'] for hit in filtered] == ['K-1001']
+
+        service.index_feedback({'id': 'fb1', 'original_description': 'boya', 'correction_type': 'price', 'user_note': 'ok'})
+        assert service.search_feedback('boya -> price : ok')[0]['id'] == 'fb1'
+
+    def test_search_filters_run_inside_index(self, tmp_path):
+        from services.vector_db_service import VectorDBService
+
+        service = VectorDBService()
+        client = NumpyVectorClient(str(tmp_path), flush_delay=0)
+        service.client = client
+        service.collection = client.get_or_create_collection("poz_data_collection")
+        service.model = _HashEncoder()
+        service._model_loaded = True
+        service.query_cache.clear()
+        service.ingest_data([
+            {'poz_no': '10.100.1062', 'description': 'Düz işçi', 'unit': 'Sa', 'institution': 'ÇŞB'},
+            {'poz_no': '10.100.1063', 'description': 'Usta', 'unit': 'Sa', 'institution': 'ÇŞB'},
+            {'poz_no': '10.130.1503', 'description': 'Çimento', 'unit': 'Ton', 'institution': 'ÇŞB'},
+            {'poz_no': '15.150.1003', 'description': 'Hazır beton', 'unit': 'm³', 'institution': 'ÇŞB'},
+            {'poz_no': '15.150.1004', 'description': 'Hazır beton C25', 'unit': 'm³', 'institution': 'KGM'},
+        ])
+
+        def codes(**filters):
+            return sorted(hit['code'] for hit in service.search('beton işçi', n_results=10, **filters))
+
+        assert codes(code_prefix='10.100.') == ['10.100.1062', '10.100.1063']
+        assert codes(code_prefix='10.') == ['10.100.1062', '10.100.1063', '10.130.1503']
+        assert codes(code_prefix='10.13') == ['10.130.1503']
+        assert codes(code_prefix='15.150.1004') == ['15.150.1004']
+        assert codes(unit='M3') == ['15.150.1003', '15.150.1004']
+        assert codes(unit='m3', institution='KGM') == ['15.150.1004']
+        assert codes(unit='sa', code_prefix='15.') == []
+
+        where, residual = VectorDBService.build_where(unit='m2', code_prefix='15.150.10')
+        assert where == {"$and": [{"unit_key": "m²"}, {"code_group": "15.150"}]} and residual == '15.150.10'
@@ -0,0 +1,174 @@
+"""
+POZ Tag Index Tests
+
+Vektörel re-ranking'in eski poz-başına Python puanlamasıyla
+birebir aynı sonucu verdiğini doğrular.
+"""
+
+import sys
+import os
+import random
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from routers.ai import (
+    SEMANTIC_TAGS,
+    TAG_PAIR_BONUSES,
+    calculate_similarity,
+    calculate_tag_match_score,
+    extract_keywords,
+    extract_semantic_tags,
+)
+from services.poz_tag_index import PozTagIndex
+
+
+DESCRIPTIONS = [
+    "Santralde üretilen veya satın alınan ve beton pompasıyla basılan, C 25/30 basınç dayanım sınıfında betonarme betonu",
+    "Santralde üretilen veya satın alınan ve transmikserle taşınan, C 20/25 basınç dayanım sınıfında, gri renkte, normal hazır beton dökülmesi",
+    "Elle beton harcı hazırlanması (şantiye betonu, torbadan çimento)",
+    "Ahşaptan düz yüzeyli betonarme kalıbı yapılması",
+    "Çelik kalıp ile perde beton kalıbı yapılması",
+    "Ø 8- Ø 12 mm nervürlü beton çelik çubuğu, çubukların kesilmesi, bükülmesi ve yerine konulması (S420)",
+    "Yatay delikli tuğla ile 19 cm duvar yapılması",
+    "Gazbeton duvar blokları ile duvar yapılması",
+    "Makine ile her derinlik ve genişlikte yumuşak ve sert toprak kazılması",
+    "Elle her derinlikte yumuşak toprak kazılması (iksasız)",
+    "Trapez kesitli kanal kalıbı yapılması",
+    "Yalın beton dökülmesi (donatısız)",
+    "Kireç harçlı sıva yapılması",
+    "Plastik esaslı boya yapılması",
+    "PVC atık su borusu döşenmesi",
+    "Düz işçi",
+    "Duvarcı ustası",
+    "Beton santralinden beton nakli",
+    "Kum (0-5 mm)",
+    "   ",
+]
+UNITS = ["m³", "m²", "m", "Sa", "ton", "kg", "M3"]
+QUERIES = [
+    ("C25/30 hazır beton dökülmesi pompa ile", "m³"),
+    ("betonarme perde duvar c30", "m³"),
+    ("elle beton harcı", "otomatik"),
+    ("ahşap kalıp yapılması", "m²"),
+    ("makine ile kazı", "m³"),
+    ("trapez kanal betonu", "m"),
+    ("tuğla duvar örülmesi", "m²"),
+    ("", "m²"),
+]
+
+
+def _reference_rerank(description, unit, candidates, max_results=15):
+    """build_context_from_poz_data'nın orijinal poz-başına puanlaması"""
+    keywords = extract_keywords(description)
+    user_tags = extract_semantic_tags(description)
+    matches = []
+    for poz_info in candidates:
+        poz_desc = poz_info.get('description', '')
+        poz_unit = poz_info.get('unit', '')
+        poz_tags = extract_semantic_tags(poz_desc)
+
+        score = 0
+        score += calculate_tag_match_score(user_tags, poz_tags) * 100
+        score += calculate_similarity(description, poz_desc) * 40
+        poz_desc_lower = poz_desc.lower()
+        score += sum(1 for kw in keywords if kw in poz_desc_lower) * 8
+        if unit and unit.lower() != "otomatik" and unit.lower() == poz_unit.lower():
+            score += 15
+        for user_tag, poz_tag, bonus in TAG_PAIR_BONUSES:
+            if user_tag in user_tags and poz_tag in poz_tags:
+                score += bonus
+
+        if score > 5:
+            matches.append({'poz_no': poz_info['poz_no'], 'score': score, 'tags': poz_tags})
+
+    matches.sort(key=lambda x: x['score'], reverse=True)
+    return matches[:max_results]
+
+
+def _catalog(size=400, seed=7):
+    rng = random.Random(seed)
+    poz_data = {}
+    for i in range(size):
+        code = f"15.{100 + i // 100}.{1000 + i}"
+        desc = rng.choice(DESCRIPTIONS)
+        if rng.random() < 0.5:
+            desc = f"{desc} {rng.choice(DESCRIPTIONS)[:20]}"
+        poz_data[code] = {
+            'poz_no': code,
+            'description': desc,
+            'unit': rng.choice(UNITS),
+            'unit_price': f"{rng.randint(1, 5000)},00",
+        }
+    return poz_data
+
+
+def _index(poz_data):
+    return PozTagIndex(
+        poz_data,
+        tag_names=list(SEMANTIC_TAGS.keys()),
+        extract_tags=extract_semantic_tags,
+        pair_bonuses=TAG_PAIR_BONUSES,
+    )
+
+
+class TestPozTagIndex:
+
+    def test_full_scan_matches_reference(self):
+        poz_data = _catalog()
+        index = _index(poz_data)
+
+        for query, unit in QUERIES:
+            expected = _reference_rerank(query, unit, list(poz_data.values()))
+            actual = index.rerank(
+                query, unit, extract_keywords(query), extract_semantic_tags(query),
+                index.all_positions(), max_results=15
+            )
+            assert [(m['poz_no'], m['score'], m['tags']) for m in actual] == \
+                   [(m['poz_no'], m['score'], m['tags']) for m in expected], query
+
+    def test_vector_candidates_keep_candidate_order(self):
+        poz_data = _catalog()
+        index = _index(poz_data)
+        codes = list(poz_data.keys())
+        random.Random(3).shuffle(codes)
+        vector_codes = codes[:50] + ["99.999.9999"]  # bilinmeyen kod atlanmalı
+
+        query, unit = QUERIES[0]
+        expected = _reference_rerank(query, unit, [poz_data[c] for c in vector_codes if c in poz_data])
+        actual = index.rerank(
+            query, unit, extract_keywords(query), extract_semantic_tags(query),
+            index.positions_for(vector_codes), max_results=15
+        )
+        assert [(m['poz_no'], m['score']) for m in actual] == [(m['poz_no'], m['score']) for m in expected]
+
+    def test_tag_bitmask_roundtrip(self):
+        poz_data = _catalog(size=50)
+        index = _index(poz_data)
+        for pos, code in enumerate(index.codes):
+            tags = extract_semantic_tags(poz_data[code]['description'])
+            bits = int(index.tag_bits[pos])
+            decoded = [t for t in SEMANTIC_TAGS if bits & index.tag_bit[t]]
+            assert sorted(decoded) == sorted(tags)
+
+    def test_cached_index_follows_reloaded_catalog(self, monkeypatch):
+        from routers import ai as ai_router
+
+        monkeypatch.setattr(ai_router, "_POZ_INDEXES", {})
+        built = []
+
+        def factory(data):
+            built.append(data)
+            return dict(data)
+
+        first = {"15.150.1003": {"description": "hazır beton"}}
+        assert ai_router._get_cached_poz_index("test", first, factory) == first
+        assert ai_router._get_cached_poz_index("test", first, factory) is not None and len(built) == 1
+
+        # Aynı boyutta yeni katalog (reload): id() eski dict'inkiyle çakışsa bile yeniden oluşturulur
+        second = {"15.540.1101": {"description": "plastik boya"}}
+        assert ai_router._get_cached_poz_index("test", second, factory) == second
+        assert built == [first, second]
+        # Cache kaynak dict'i tuttuğu için eski dict serbest kalıp id'si yeniden kullanılamaz
+        assert ai_router._POZ_INDEXES["test"][0] is second
@@ -0,0 +1,135 @@
+"""
+TrainingDataService Lazy Load Tests
+
+Offset indeksi + mmap ile açılan servisin eager yükleme ile aynı sonuçları
+verdiğini ve diskteki indeksin boyut/mtime ile doğrulandığını test eder.
+"""
+
+import sys
+import os
+import json
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.training_data_service import TrainingDataService
+from services.training_jsonl_index import index_path_for
+
+
+LINES = [
+    {'input': 'C25/30 hazır beton dökülmesi', 'output': {'malzeme': [{'kod': '10.130.1503', 'ad': 'Hazır beton', 'birim': 'm³'}]}},
+    {'input': 'Yatay delikli tuğla ile duvar yapılması', 'output': {'iscilik': [{'kod': '10.100.1062', 'ad': 'Duvarcı ustası', 'birim': 'Sa'}], 'nakliye': [{'kod': '15.100.1001', 'ad': 'Nakliye', 'birim': 'ton'}]}},
+    {'input': 'Plastik boya yapılması', 'output': {'iscilik': [{'kod': '10.100.1041', 'ad': 'Boyacı ustası', 'birim': 'Sa'}]}, 'metadata': {'source': 'test'}},
+]
+
+
+def _write(path, records, extra_lines=()):
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        for line in extra_lines:
+            f.write(line + '\n')
+
+
+class TestLazyLoad:
+
+    def test_lazy_matches_eager(self, tmp_path):
+        path = tmp_path / 'egitim.jsonl'
+        _write(path, LINES, extra_lines=['', '{bozuk satır', '   '])
+
+        eager = TrainingDataService(str(path), lazy=False)
+        lazy = TrainingDataService(str(path), lazy=True)
+
+        assert len(lazy.training_data) == len(eager.training_data) == 3
+        assert list(lazy.training_data) == eager.training_data
+        assert lazy.get_stats()['categories'] == eager.get_stats()['categories']
+        for query in ("plastik boya yapılması", "Yatay delikli tuğla duvar", "hazır beton"):
+            assert lazy.direct_lookup(query) == eager.direct_lookup(query)
+            assert lazy.find_similar_examples(query) == eager.find_similar_examples(query)
+            assert lazy.build_rag_context(query) == eager.build_rag_context(query)
+
+    def test_index_is_persisted_and_reused(self, tmp_path):
+        path = tmp_path / 'egitim.jsonl'
+        _write(path, LINES)
+        TrainingDataService(str(path), lazy=True)
+
+        index_file = index_path_for(str(path))
+        assert os.path.exists(index_file)
+
+        # Geçerli indeks yeniden kullanılır (dosya taranmaz): içeriği işaretleyip kontrol et
+        with open(index_file, encoding='utf-8') as f:
+            index = json.load(f)
+        index['inputs'][0] = 'indeksten okundu'
+        with open(index_file, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False)
+        service = TrainingDataService(str(path), lazy=True)
+        assert service.get_inputs()[0] == 'indeksten okundu'
+
+    def test_stale_index_is_rebuilt(self, tmp_path):
+        path = tmp_path / 'egitim.jsonl'
+        _write(path, LINES)
+        TrainingDataService(str(path), lazy=True)
+
+        _write(path, LINES + [{'input': 'Seramik yer karosu döşenmesi', 'output': {'malzeme': []}}])
+        service = TrainingDataService(str(path), lazy=True)
+        assert len(service.training_data) == 4
+        assert service.direct_lookup('Seramik yer karosu döşenmesi')['match_type'] == 'exact'
+
+
+class TestOffsetIndexPersistence:
+
+    def _index_mtime(self, path):
+        return os.stat(index_path_for(str(path))).st_mtime_ns
+
+    def test_append_does_not_rewrite_index_until_flush(self, tmp_path, monkeypatch):
+        from config import get_analysis_config
+
+        monkeypatch.setattr(get_analysis_config(), "TRAINING_INDEX_SAVE_EVERY", 1000)
+        path = tmp_path / 'egitim.jsonl'
+        _write(path, LINES)
+        service = TrainingDataService(str(path), lazy=True)
+        saved = self._index_mtime(path)
+
+        service.append_examples([{'input': 'Seramik yer karosu döşenmesi', 'output': {'malzeme': []}}])
+        service.append_examples([{'input': 'Alçı sıva yapılması', 'output': {'iscilik': []}}])
+        assert self._index_mtime(path) == saved
+        assert service.direct_lookup('Alçı sıva yapılması')['match_type'] == 'exact'
+
+        assert service.flush_offset_index()
+        assert not service.flush_offset_index()   # Bekleyen ekleme yok
+        with open(index_path_for(str(path)), encoding='utf-8') as f:
+            index = json.load(f)
+        assert index['inputs'][-2:] == ['Seramik yer karosu döşenmesi', 'Alçı sıva yapılması']
+        assert index['size'] == os.path.getsize(path)
+
+        # Yazılan indeks geçerli: yeniden açılışta dosya taranmadan kullanılır
+        index['inputs'][0] = 'indeksten okundu'
+        with open(index_path_for(str(path)), 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False)
+        assert TrainingDataService(str(path), lazy=True).get_inputs()[0] == 'indeksten okundu'
+
+    def test_index_is_saved_every_n_examples(self, tmp_path, monkeypatch):
+        from config import get_analysis_config
+
+        monkeypatch.setattr(get_analysis_config(), "TRAINING_INDEX_SAVE_EVERY", 2)
+        path = tmp_path / 'egitim.jsonl'
+        _write(path, LINES)
+        service = TrainingDataService(str(path), lazy=True)
+        saved = self._index_mtime(path)
+
+        service.append_examples([{'input': 'Seramik yer karosu döşenmesi', 'output': {}}])
+        assert self._index_mtime(path) == saved
+        service.append_examples([{'input': 'Alçı sıva yapılması', 'output': {}}])
+        assert self._index_mtime(path) != saved
+        assert not service.flush_offset_index()
+
+    def test_unflushed_appends_are_rescanned(self, tmp_path):
+        path = tmp_path / 'egitim.jsonl'
+        _write(path, LINES)
+        service = TrainingDataService(str(path), lazy=True)
+        service.append_examples([{'input': 'Seramik yer karosu döşenmesi', 'output': {'malzeme': []}}])
+
+        # Kapanışta flush yapılmadı (çökme): eski indeks boyut kontrolüyle geçersiz sayılır
+        reopened = TrainingDataService(str(path), lazy=True)
+        assert len(reopened.training_data) == 4
+        assert reopened.direct_lookup('Seramik yer karosu döşenmesi')['match_type'] == 'exact'
@@ -0,0 +1,193 @@
+"""
+TrainingDataService Lookup Tests
+
+Direct lookup (hash map + uzunluk kovası) ve RAG benzer örnek aramasının
+(ters indeks + top-k heap) eski doğrusal taramalarla aynı sonucu verdiğini doğrular.
+"""
+
+import sys
+import os
+import json
+import random
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.training_data_service import TrainingDataService
+
+
+INPUTS = [
+    "C25/30 hazır beton dökülmesi",
+    "C 25/30 hazır beton dökülmesi",
+    "Yatay delikli tuğla ile duvar yapılması",
+    "Yatay delikli tuğla ile 19 cm duvar yapılması",
+    "Plastik boya yapılması",
+    "Plastik  boya yapılması",
+    "Ø 8- Ø 12 mm nervürlü beton çelik çubuğu",
+    "Ø 14- Ø 28 mm nervürlü beton çelik çubuğu",
+    "Seramik yer karosu döşenmesi",
+    "",
+]
+
+
+def _write_corpus(path, inputs):
+    with open(path, 'w', encoding='utf-8') as f:
+        for i, text in enumerate(inputs):
+            f.write(json.dumps({
+                'instruction': 'analiz',
+                'input': text,
+                'output': {'iscilik': [{'kod': f'10.100.{i}', 'ad': 'Düz işçi', 'birim': 'Sa'}]},
+            }, ensure_ascii=False) + '\n')
+
+
+def _linear_lookup(service, user_input, threshold):
+    """Referans: tüm örnekleri dosya sırasıyla tarayan eski uygulama (tam eşleşme öncelikli)"""
+    user_norm = service.normalize_text(user_input)
+    for example in service.training_data:
+        if service.normalize_text(example.get('input', '')) == user_norm:
+            return example['input'], 'exact', 1.0
+    for example in service.training_data:
+        similarity = service.calculate_similarity(user_norm, service.normalize_text(example.get('input', '')))
+        if similarity >= threshold:
+            return example['input'], 'high_similarity', similarity
+    return None
+
+
+def _linear_similar(service, user_input, top_k, min_similarity):
+    """Referans: eski find_similar_examples (tüm örnekler puanlanıp sıralanır)"""
+    user_norm = service.normalize_text(user_input)
+    user_keywords = set(service.extract_keywords(user_input))
+    matches = []
+    for example in service.training_data:
+        example_keywords = set(service.extract_keywords(example['input']))
+        text_similarity = service.calculate_similarity(user_norm, service.normalize_text(example['input']))
+        score = text_similarity * 0.6
+        if user_keywords and example_keywords:
+            score += len(user_keywords & example_keywords) / len(user_keywords | example_keywords) * 0.4
+        if score >= min_similarity:
+            matches.append((example['input'], score, text_similarity, user_keywords & example_keywords))
+    matches.sort(key=lambda x: x[1], reverse=True)
+    return matches[:top_k]
+
+
+def _mutate(rng, text):
+    chars = list(text)
+    for _ in range(rng.randint(0, 3)):
+        op = rng.random()
+        pos = rng.randint(0, len(chars))
+        if op < 0.4:
+            chars.insert(pos, rng.choice("abcçdeğıilmnoöprsştuüyz 0123"))
+        elif chars and op < 0.8:
+            del chars[min(pos, len(chars) - 1)]
+        elif chars:
+            chars[min(pos, len(chars) - 1)] = rng.choice("aeıioöuü")
+    return "".join(chars)
+
+
+class TestDirectLookup:
+
+    def test_exact_match_uses_normalized_input(self, tmp_path):
+        path = tmp_path / 'egitim.jsonl'
+        _write_corpus(path, INPUTS)
+        service = TrainingDataService(str(path))
+
+        result = service.direct_lookup("  plastik BOYA   yapılması ")
+        assert result['match_type'] == 'exact'
+        # Normalize sonrası aynı olan girdilerde dosyadaki ilk örnek döner
+        assert result['input'] == "Plastik boya yapılması"
+
+    def test_matches_linear_scan(self, tmp_path):
+        rng = random.Random(7)
+        corpus = INPUTS + [_mutate(rng, rng.choice(INPUTS)) for _ in range(300)]
+        path = tmp_path / 'egitim.jsonl'
+        _write_corpus(path, corpus)
+        service = TrainingDataService(str(path))
+
+        queries = INPUTS + [_mutate(rng, rng.choice(INPUTS)) for _ in range(300)]
+        for threshold in (0.95, 0.85, 0.6):
+            for query in queries:
+                result = service.direct_lookup(query, threshold=threshold)
+                expected = _linear_lookup(service, query, threshold)
+                got = None if result is None else (result['input'], result['match_type'], result['similarity'])
+                assert got == expected, (query, threshold)
+
+    def test_no_match(self, tmp_path):
+        path = tmp_path / 'egitim.jsonl'
+        _write_corpus(path, INPUTS)
+        service = TrainingDataService(str(path))
+        assert service.direct_lookup("Asansör kabini montajı") is None
+
+
+class TestFindSimilarExamples:
+
+    def test_matches_linear_scan(self, tmp_path):
+        rng = random.Random(3)
+        corpus = INPUTS + [_mutate(rng, rng.choice(INPUTS)) for _ in range(200)]
+        path = tmp_path / 'egitim.jsonl'
+        _write_corpus(path, corpus)
+        service = TrainingDataService(str(path))
+
+        queries = INPUTS + ["beton", "duvar boya", "Asansör kabini montajı"]
+        queries += [_mutate(rng, rng.choice(INPUTS)) for _ in range(100)]
+        for top_k, min_similarity in ((3, 0.4), (5, 0.4), (10, 0.2), (2, 0.0)):
+            for query in queries:
+                got = [
+                    (m['input'], m['similarity'], m['text_similarity'], set(m['common_keywords']))
+                    for m in service.find_similar_examples(query, top_k=top_k, min_similarity=min_similarity)
+                ]
+                assert got == _linear_similar(service, query, top_k, min_similarity), (query, top_k)
+
+    def test_rag_context_lists_best_example_first(self, tmp_path):
+        path = tmp_path / 'egitim.jsonl'
+        _write_corpus(path, INPUTS)
+        service = TrainingDataService(str(path))
+        context = service.build_rag_context("Yatay delikli tuğla ile duvar yapılması", top_k=2)
+        assert 'ÖRNEK 1 (Benzerlik: 100%)' in context
+        assert context.index('"Yatay delikli tuğla ile duvar yapılması"') < context.index('ÖRNEK 2')
+
+
+class _FakeTrainingIndex:
+    """VectorDBService.search_training yerine sabit aday listesi döndürür"""
+
+    is_training_ready = True
+
+    def __init__(self, inputs):
+        self.inputs = inputs
+
+    def search_training(self, query_text, n_results=30):
+        return [{'input': text, 'index': -1, 'score': 0.1} for text in self.inputs[:n_results]]
+
+
+class TestAnnRetrieval:
+
+    def test_ann_candidates_are_reranked_lexically(self, tmp_path):
+        path = tmp_path / 'egitim.jsonl'
+        _write_corpus(path, INPUTS)
+        service = TrainingDataService(str(path))
+        service.set_vector_service(_FakeTrainingIndex([
+            "Seramik yer karosu döşenmesi",
+            "Yatay delikli tuğla ile 19 cm duvar yapılması",
+            "Yatay delikli tuğla ile duvar yapılması",
+            "silinmiş örnek",
+        ]))
+
+        query = "Yatay delikli tuğla ile duvar yapılması"
+        results = service.find_similar_examples_ann(query, top_k=2)
+        assert [r['input'] for r in results] == [
+            "Yatay delikli tuğla ile duvar yapılması",
+            "Yatay delikli tuğla ile 19 cm duvar yapılması",
+        ]
+        # Aday kümesi içinde skorlar lexical arama ile aynı
+        assert results == service.find_similar_examples(query, top_k=2)
+
+    def test_falls_back_to_lexical_when_not_ready(self, tmp_path):
+        path = tmp_path / 'egitim.jsonl'
+        _write_corpus(path, INPUTS)
+        service = TrainingDataService(str(path))
+        assert service.find_similar_examples_ann("Plastik boya yapılması") is None
+
+        fake = _FakeTrainingIndex([])
+        fake.is_training_ready = False
+        service.set_vector_service(fake)
+        assert service.find_similar_examples_ann("Plastik boya yapılması") is None
+        assert 'Plastik boya yapılması' in service.build_rag_context("Plastik boya yapılması")
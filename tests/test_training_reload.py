@@ -0,0 +1,123 @@
+"""
+TrainingDataService Hot Reload Tests
+
+API ile eklenen ve dosyaya dışarıdan yazılan örneklerin artımlı olarak
+indekslendiğini ve sonuçların sıfırdan yükleme ile aynı olduğunu doğrular.
+"""
+
+import sys
+import os
+import json
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services.training_data_service import TrainingDataService
+
+
+def _example(text, kod='10.100.1062'):
+    return {'instruction': 'analiz', 'input': text, 'output': {'iscilik': [{'kod': kod, 'ad': 'Usta', 'birim': 'Sa'}]}}
+
+
+BASE = [_example('Yatay delikli tuğla ile duvar yapılması'), _example('Plastik boya yapılması')]
+QUERIES = ['Seramik yer karosu döşenmesi', 'plastik boya', 'tuğla duvar yapılması', 'Alçı sıva yapılması']
+
+
+def _write(path, records, mode='w'):
+    with open(path, mode, encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+class _RecordingVectorService:
+    _model_loaded = True
+    is_training_ready = False
+
+    def __init__(self):
+        self.upserts = []
+        self.full_syncs = []
+
+    def upsert_training_examples(self, items):
+        self.upserts.append(list(items))
+        return len(items)
+
+    def ingest_training_data(self, inputs):
+        self.full_syncs.append(list(inputs))
+        return {'added': 0, 'removed': 0, 'total': len(inputs)}
+
+
+def _assert_same_as_fresh(service, path):
+    fresh = TrainingDataService(str(path), lazy=service.lazy)
+    assert list(service.training_data) == list(fresh.training_data)
+    assert service.get_inputs() == fresh.get_inputs()
+    assert service.get_stats() == fresh.get_stats()
+    for query in QUERIES:
+        assert service.direct_lookup(query) == fresh.direct_lookup(query)
+        assert service.find_similar_examples(query) == fresh.find_similar_examples(query)
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+class TestHotReload:
+
+    def test_append_examples(self, tmp_path, lazy):
+        path = tmp_path / 'egitim.jsonl'
+        _write(path, BASE)
+        service = TrainingDataService(str(path), lazy=lazy)
+        vector = _RecordingVectorService()
+        service.set_vector_service(vector)
+
+        result = service.append_examples([_example('Seramik yer karosu döşenmesi', '10.100.1058')])
+        assert result == {'mode': 'append', 'added': 1, 'total': 3}
+        assert service.direct_lookup('seramik yer karosu döşenmesi')['match_type'] == 'exact'
+        assert vector.upserts == [[(2, 'Seramik yer karosu döşenmesi')]]
+        _assert_same_as_fresh(service, path)
+
+        with pytest.raises(ValueError):
+            service.append_examples([{'input': '', 'output': {}}])
+
+    def test_external_append_and_partial_line(self, tmp_path, lazy):
+        path = tmp_path / 'egitim.jsonl'
+        _write(path, BASE)
+        service = TrainingDataService(str(path), lazy=lazy)
+        assert service.refresh()['mode'] == 'unchanged'
+
+        # Yarım yazılmış satır: sonraki yenilemede tamamlanınca alınır
+        line = json.dumps(_example('Alçı sıva yapılması'), ensure_ascii=False)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line[:20])
+        assert service.refresh()['added'] == 0
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line[20:] + '\n')
+        assert service.refresh()['added'] == 1
+        assert service.direct_lookup('Alçı sıva yapılması') is not None
+        _assert_same_as_fresh(service, path)
+
+    def test_rewritten_file_triggers_full_reload(self, tmp_path, lazy):
+        path = tmp_path / 'egitim.jsonl'
+        _write(path, BASE)
+        service = TrainingDataService(str(path), lazy=lazy)
+        vector = _RecordingVectorService()
+        service.set_vector_service(vector)
+
+        _write(path, [_example('Seramik yer karosu döşenmesi')])
+        result = service.refresh()
+        assert result['mode'] == 'reload' and result['total'] == 1
+        assert service.direct_lookup('Plastik boya yapılması') is None
+        assert vector.full_syncs == [['Seramik yer karosu döşenmesi']]
+        _assert_same_as_fresh(service, path)
+
+    def test_snapshot_hides_examples_added_later(self, tmp_path, lazy):
+        path = tmp_path / 'egitim.jsonl'
+        _write(path, BASE)
+        service = TrainingDataService(str(path), lazy=lazy)
+
+        # İstek başında alınan görünüm, sonradan eklenen örnekleri içermez
+        index = service._index
+        count = index.count
+        service.append_examples([_example('Plastik boya yapılması (ek)')])
+        assert index.count == count + 1
+        assert service._index is index
+        # Yeni örneğin sırası eski görünümün sınırının dışında kalır
+        assert index.exact['plastik boya yapılması (ek)'] >= count
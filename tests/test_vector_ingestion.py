@@ -0,0 +1,270 @@
+"""
+VectorDBService Incremental Ingestion Tests
+
+İçerik hash'i ile sadece yeni/değişen pozların embed edildiğini ve silinen
+kodların koleksiyondan çıkarıldığını doğrular (gerçek Chroma, sahte encoder).
+"""
+
+import sys
+import os
+import uuid
+import hashlib
+import threading
+import time
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+chromadb = pytest.importorskip("chromadb")
+pytest.importorskip("sentence_transformers")
+np = pytest.importorskip("numpy")
+
+from services.vector_db_service import VectorDBService
+
+
+class _CountingEncoder:
+    """Metin hash'inden deterministik vektör üreten, encode edilen metinleri sayan model"""
+
+    class device:
+        type = 'cpu'
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts):
+        self.encoded.extend(texts)
+        rows = []
+        for text in texts:
+            digest = hashlib.sha256(text.encode('utf-8')).digest()
+            rows.append(np.frombuffer(digest, dtype=np.uint8)[:16].astype(np.float32) + 1.0)
+        return np.vstack(rows)
+
+
+@pytest.fixture
+def service():
+    svc = VectorDBService()
+    client = chromadb.EphemeralClient()
+    svc.client = client
+    svc.collection = client.get_or_create_collection(name=f"test_{uuid.uuid4().hex}", metadata={"hnsw:space": "cosine"})
+    svc.training_collection = client.get_or_create_collection(name=f"test_{uuid.uuid4().hex}", metadata={"hnsw:space": "cosine"})
+    svc.model = _CountingEncoder()
+    svc.embedding_backend = "torch"
+    svc._model_loaded = True
+    svc.query_cache.clear()
+    return svc
+
+
+CATALOG = [
+    {'poz_no': '15.150.1003', 'description': 'C 20/25 hazır beton dökülmesi', 'unit': 'm³', 'unit_price': '2.100,00'},
+    {'poz_no': '15.220.1011', 'description': 'Yatay delikli tuğla ile duvar', 'unit': 'm²', 'unit_price': '850,00'},
+    {'poz_no': '15.540.1101', 'description': 'Plastik boya yapılması', 'unit': 'm²', 'unit_price': '120,00'},
+]
+
+
+class TestIncrementalIngestion:
+
+    def test_first_ingest_embeds_everything(self, service):
+        summary = service.ingest_data(CATALOG)
+        assert summary['added'] == 3 and summary['total'] == 3
+        assert len(service.model.encoded) == 3
+
+    def test_only_changed_items_are_embedded(self, service):
+        service.ingest_data(CATALOG)
+        service.model.encoded.clear()
+
+        changed = [dict(p) for p in CATALOG[:2]]
+        changed[0]['description'] = 'C 25/30 hazır beton dökülmesi'   # metin değişti → yeniden embed
+        changed[1]['unit_price'] = '900,00'                          # sadece fiyat → metadata
+        changed.append({'poz_no': '15.250.1001', 'description': 'Seramik döşenmesi', 'unit': 'm²', 'unit_price': '400'})
+
+        summary = service.ingest_data(changed)
+        assert summary == {'added': 1, 'updated': 1, 'metadata_only': 1, 'removed': 1, 'unchanged': 0, 'total': 3}
+        assert sorted(service.model.encoded) == ['15.150.1003 C 25/30 hazır beton dökülmesi', '15.250.1001 Seramik döşenmesi']
+
+        stored = service.collection.get(ids=['15.220.1011'])
+        assert stored['metadatas'][0]['price'] == '900,00'
+
+    def test_unchanged_catalog_is_a_noop(self, service):
+        service.ingest_data(CATALOG)
+        service.model.encoded.clear()
+        summary = service.ingest_data(CATALOG)
+        assert summary['unchanged'] == 3 and service.model.encoded == []
+
+    def test_backend_change_reembeds_documents(self, service):
+        inputs = ["C20 beton dökülmesi", "iç cephe boyası"]
+        assert service.ingest_data(CATALOG)['added'] == 3
+        assert service.ingest_training_data(inputs)['added'] == 2
+        assert service.ingest_data(CATALOG)['unchanged'] == 3
+        assert service.ingest_training_data(inputs) == {"added": 0, "reembedded": 0, "removed": 0, "total": 2}
+        assert len(service.model.encoded) == 5
+
+        # Quantize backend'in vektörleri fp32 ile karıştırılmamalı
+        service.embedding_backend = "onnx-int8"
+        service.model.encoded.clear()
+        summary = service.ingest_data(CATALOG)
+        assert summary['updated'] == 3 and summary['metadata_only'] == 0
+        assert service.ingest_training_data(inputs) == {"added": 0, "reembedded": 2, "removed": 0, "total": 2}
+        assert len(service.model.encoded) == 5
+        stored = service.collection.get(include=["metadatas"])['metadatas']
+        assert {meta['embedding_model'] for meta in stored} == {f"{service.model_name}@onnx-int8"}
+
+    def test_legacy_documents_count_as_torch(self, service):
+        service.ingest_data(CATALOG[2:])
+
+        # embedding_model alanı eklenmeden önce yazılmış belge: sadece metadata güncellenir
+        meta = service.collection.get(include=["metadatas"])['metadatas'][0]
+        del meta['embedding_model']
+        meta['content_hash'] = 'eski'
+        service.collection.update(ids=['15.540.1101'], metadatas=[meta])
+        assert service.ingest_data(CATALOG[2:])['metadata_only'] == 1
+
+
+class TestQueryEmbeddingCache:
+
+    def test_repeated_queries_encode_once(self, service):
+        service.ingest_data(CATALOG)
+        service.model.encoded.clear()
+
+        first = service.search("hazır  beton", n_results=2)
+        second = service.search("hazır beton ", n_results=2)
+        assert first == second
+        assert service.embed_queries(["hazır beton", "plastik boya", "plastik boya"])[1] is not None
+        # "hazır beton" bir kez, "plastik boya" bir kez encode edilir
+        assert service.model.encoded == ["hazır beton", "plastik boya"]
+        assert service.query_cache.stats()['hits'] >= 2
+
+
+class TestSearchMany:
+
+    def test_matches_single_searches_with_one_encode(self, service):
+        service.ingest_data(CATALOG)
+        service.model.encoded.clear()
+
+        queries = ["hazır beton", "tuğla duvar", "plastik boya", "hazır beton"]
+        batched = service.search_many(queries, n_results=2)
+        assert len(service.model.encoded) == 3  # tekrar eden sorgu bir kez
+        assert batched == [service.search(q, n_results=2) for q in queries]
+
+    def test_where_filter_and_empty_input(self, service):
+        service.ingest_data(CATALOG)
+        results = service.search_many(["beton", "boya"], n_results=3, where={"unit": "m²"})
+        assert all(hit['unit'] == 'm²' for hits in results for hit in hits)
+        assert service.search_many([]) == []
+
+
+class TestEmbeddingExport:
+
+    def _fresh_collection(self, service):
+        return service.client.get_or_create_collection(name=f"test_{uuid.uuid4().hex}", metadata={"hnsw:space": "cosine"})
+
+    def test_round_trip_needs_no_encoding(self, service, tmp_path):
+        service.ingest_data(CATALOG)
+        source = service.collection.get(include=["embeddings"])
+        exported = service.export_embeddings(str(tmp_path), page_size=2)
+        assert exported['count'] == 3 and exported['dim'] == 16
+
+        service.collection = self._fresh_collection(service)
+        service.model.encoded.clear()
+        summary = service.import_embeddings(str(tmp_path), CATALOG)
+        assert summary == {'imported': 3, 'stale': 0, 'not_in_catalog': 0, 'total': 3}
+
+        imported = service.collection.get(ids=source['ids'], include=["embeddings"])
+        assert np.allclose(np.asarray(imported['embeddings']), np.asarray(source['embeddings']))
+        assert service.ingest_data(CATALOG)['unchanged'] == 3
+        assert service.model.encoded == []
+
+    def test_only_stale_entries_are_reencoded(self, service, tmp_path):
+        service.ingest_data(CATALOG)
+        service.export_embeddings(str(tmp_path))
+
+        changed = [dict(p) for p in CATALOG]
+        changed[0]['description'] = 'C 25/30 hazır beton dökülmesi'   # metin değişti → export'taki vektör geçersiz
+        changed[1]['unit_price'] = '900,00'                          # metin aynı → vektör alınır, metadata yeni
+        service.collection = self._fresh_collection(service)
+        service.model.encoded.clear()
+
+        summary = service.import_embeddings(str(tmp_path), changed[:2])
+        assert summary == {'imported': 1, 'stale': 1, 'not_in_catalog': 1, 'total': 1}
+        assert service.collection.get(ids=['15.220.1011'])['metadatas'][0]['price'] == '900,00'
+
+        assert service.ingest_data(changed[:2])['added'] == 1
+        assert service.model.encoded == ['15.150.1003 C 25/30 hazır beton dökülmesi']
+
+    def test_model_mismatch_is_refused(self, service, tmp_path):
+        service.ingest_data(CATALOG)
+        service.export_embeddings(str(tmp_path))
+        service.collection = self._fresh_collection(service)
+        original = service.model_name
+        service.model_name = "baska/model"
+        try:
+            assert service.import_embeddings(str(tmp_path))['error'] == 'model_mismatch'
+        finally:
+            service.model_name = original
+        assert service.collection.count() == 0
+
+    def test_backend_mismatch_is_refused(self, service, tmp_path):
+        service.ingest_data(CATALOG)
+        service.export_embeddings(str(tmp_path))
+        service.collection = self._fresh_collection(service)
+        original = service.embedding_backend
+        service.embedding_backend = "onnx-int8"
+        try:
+            assert service.import_embeddings(str(tmp_path))['error'] == 'backend_mismatch'
+        finally:
+            service.embedding_backend = original
+        assert service.collection.count() == 0
+
+    def test_dim_mismatch_is_refused(self, service, tmp_path):
+        service.ingest_data(CATALOG)
+        service.export_embeddings(str(tmp_path))
+        service.collection = self._fresh_collection(service)
+        service.collection.upsert(ids=['eski'], embeddings=[[1.0] * 8], documents=['eski'], metadatas=[{'code': 'eski'}])
+
+        assert service.import_embeddings(str(tmp_path))['error'] == 'dim_mismatch'
+        assert service.collection.get(include=[])['ids'] == ['eski']
+
+
+class TestIngestProgress:
+
+    def test_status_reports_pipeline_progress(self, service):
+        service.ingest_data(CATALOG)
+        progress = service.get_status()['ingest_progress']
+        assert progress['stage'] == 'poz' and not progress['running']
+        assert progress['done'] == progress['total'] == 3 and progress['failed'] == 0
+
+    def test_concurrent_ingests_are_serialised(self, service):
+        state = {"active": 0, "max_active": 0}
+        state_lock = threading.Lock()
+
+        class _SlowEncoder(_CountingEncoder):
+            def encode(self, texts):
+                with state_lock:
+                    state["active"] += 1
+                    state["max_active"] = max(state["max_active"], state["active"])
+                time.sleep(0.02)
+                with state_lock:
+                    state["active"] -= 1
+                return super().encode(texts)
+
+        service.model = _SlowEncoder()
+        catalog = [{'poz_no': f'15.150.{1000 + i}', 'description': f'Hazır beton {i}', 'unit': 'm³'} for i in range(20)]
+        inputs = [f"beton dökülmesi {i}" for i in range(20)]
+
+        results = {}
+        threads = [
+            threading.Thread(target=lambda: results.update(poz=service.ingest_data(catalog))),
+            threading.Thread(target=lambda: results.update(training=service.ingest_training_data(inputs, batch_size=2))),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+            assert not thread.is_alive()
+
+        # İki ingest aynı anda encode etmez; ilerleme durumu karışmaz
+        assert state["max_active"] == 1
+        assert results["poz"]["added"] == 20 and results["training"]["added"] == 20
+        progress = service.ingest_progress.snapshot()
+        assert not progress["running"] and progress["done"] == progress["total"] == 20